@@ -1137,7 +1137,7 @@ async def get_loaded_configuration(
         # Otherwise check if it's in system_config (loaded by load_agent_personality)
         elif hasattr(v5_engine, 'system_config') and v5_engine.system_config:
             # The system_config contains the agent config when loaded via load_agent_personality
-            agent_config = v5_engine.system_config
+            agent_config = dict(v5_engine.system_config)
             config_loaded = True
 
         configurations['agent'] = {
@@ -1162,7 +1162,7 @@ async def get_loaded_configuration(
             "name": v5_engine.current_personality,
             "source": f"agents/{v5_engine.current_agent}/personalities/{v5_engine.current_personality}.json",
             "loaded": bool(hasattr(v5_engine, 'personality_traits') and v5_engine.personality_traits),
-            "traits": getattr(v5_engine, 'personality_traits', {})
+            "traits": dict(getattr(v5_engine, 'personality_traits', None) or {})
         }
 
     # 5. Intent configuration
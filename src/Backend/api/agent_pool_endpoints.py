@@ -150,7 +150,7 @@ async def switch_agent(
             raise HTTPException(status_code=400, detail="Failed to switch agent")
 
         # Get updated session info
-        session = pool.get_session(session_id)
+        session = await pool.load_session(session_id)
 
         return {
             "success": True,
@@ -185,7 +185,7 @@ async def get_agent_pool_metrics():
 
 @router.get("/sessions/active")
 async def get_active_sessions():
-    """Get list of active sessions"""
+    """Get list of active sessions held by this worker"""
     try:
         pool = get_agent_pool()
 
@@ -1,7 +1,7 @@
 """Chat WebSocket endpoints for real-time messaging"""
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Dict, List, Optional
 import json
 import uuid
@@ -176,12 +176,6 @@ async def websocket_endpoint(websocket: WebSocket):
                     personality = session_data.get("personality", "friendly")
                     timing_points['session_lookup'] = time.time() - debug_start
 
-                    # Load agent and personality if needed
-                    agent_load_start = time.time()
-                    if ai_engine.current_agent != agent or ai_engine.current_personality_type != personality:
-                        ai_engine.load_agent_personality(agent, personality)
-                    timing_points['agent_load'] = time.time() - agent_load_start
-
                     # Send typing indicator
                     await manager.send_message(json.dumps({
                         "type": "typing",
@@ -192,6 +186,23 @@ async def websocket_endpoint(websocket: WebSocket):
                     start_time = time.time()
                     prompt_tokens = len(user_message.split())  # Simple approximation
 
+                    # Stream model output as it is generated; the final
+                    # "message" carries the same id and the complete text
+                    message_id = str(uuid.uuid4())
+                    streamed_deltas = 0
+
+                    async def forward_delta(delta: str):
+                        nonlocal streamed_deltas
+                        if streamed_deltas == 0:
+                            timing_points['time_to_first_token'] = time.time() - start_time
+                        await manager.send_message(json.dumps({
+                            "type": "stream_delta",
+                            "message_id": message_id,
+                            "delta": delta,
+                            "index": streamed_deltas
+                        }), session_id)
+                        streamed_deltas += 1
+
                     # Log before AI response
                     logger.info(f"[chat_endpoints] Calling AI engine - User ID: {user_id}, Agent: {agent}, Personality: {personality}")
 
@@ -203,14 +214,15 @@ async def websocket_endpoint(websocket: WebSocket):
                         if not agent_pool:
                             raise Exception("Agent pool not initialized")
 
-                        if session_id not in agent_pool.sessions:
+                        if not await agent_pool.has_session(session_id):
                             raise Exception(f"Session {session_id} not found in agent pool")
 
                         # Use agent pool for generation with cached context and get full response
                         response_data = await agent_pool.generate_message_with_products(
                             session_id=session_id,
                             message=user_message,
-                            user_id=user_id
+                            user_id=user_id,
+                            on_token=forward_delta
                         )
 
                         logger.info(f"[CHAT-WS] Response data keys: {list(response_data.keys())}")
@@ -234,7 +246,7 @@ async def websocket_endpoint(websocket: WebSocket):
                     response_time = time.time() - start_time
 
                     # Log debug timing
-                    logger.info(f"Chat timing breakdown - Total: {response_time:.3f}s | Session: {timing_points.get('session_lookup', 0):.3f}s | Agent: {timing_points.get('agent_load', 0):.3f}s | AI Response: {timing_points.get('ai_response', 0):.3f}s")
+                    logger.info(f"Chat timing breakdown - Total: {response_time:.3f}s | Session: {timing_points.get('session_lookup', 0):.3f}s | AI Response: {timing_points.get('ai_response', 0):.3f}s | First token: {timing_points.get('time_to_first_token', 0):.3f}s")
                     completion_tokens = len(ai_response.split())  # Simple approximation
                     total_tokens = prompt_tokens + completion_tokens
 
@@ -279,8 +291,11 @@ async def websocket_endpoint(websocket: WebSocket):
                     # Build response message with optional products
                     response_message = {
                         "type": "message",
+                        "id": message_id,
                         "role": "assistant",
                         "content": ai_response,
+                        "streamed": streamed_deltas > 0,
+                        "time_to_first_token": timing_points.get('time_to_first_token'),
                         "timestamp": datetime.utcnow().isoformat(),
                         "response_time": response_time,
                         "token_count": total_tokens,
@@ -371,8 +386,8 @@ async def websocket_endpoint(websocket: WebSocket):
                             if success:
                                 logger.info(f"Hot-swapped personality to '{personality}' for session {session_id}")
 
-                        # Also update the main AI engine for backward compatibility
-                        ai_engine.load_agent_personality(agent, personality)
+                        # Compile the engine profile now rather than on the next message
+                        await ai_engine.get_profile_async(agent, personality)
 
                     except Exception as e:
                         logger.warning(f"Could not switch agent/personality: {e}")
@@ -427,9 +442,9 @@ async def create_session(agent: str = "dispensary", personality: str = "marcel")
     except Exception as e:
         logger.warning(f"Could not create agent pool session: {e}")
 
-    # Also load in main AI engine for backward compatibility
+    # Compile the engine profile now rather than on the first message
     try:
-        ai_engine.load_agent_personality(agent, personality)
+        await ai_engine.get_profile_async(agent, personality)
     except Exception as e:
         logger.warning(f"Could not load agent/personality: {e}")
 
@@ -485,9 +500,12 @@ async def send_message(session_id: str, message: str, user_id: Optional[str] = N
     agent = chat_sessions[session_id].get("agent", "dispensary")
     personality = chat_sessions[session_id].get("personality", "friendly")
 
-    # Load agent and personality if needed
-    if ai_engine.current_agent != agent or ai_engine.current_personality_type != personality:
-        ai_engine.load_agent_personality(agent, personality)
+    # Per-request profile; other sessions' agent/personality are unaffected
+    try:
+        profile = await ai_engine.get_profile_async(agent, personality)
+    except ValueError as e:
+        logger.warning(f"Could not load agent/personality: {e}")
+        profile = None
 
     # Get user_id from session if not provided
     if not user_id and "user_id" in chat_sessions[session_id]:
@@ -506,7 +524,8 @@ async def send_message(session_id: str, message: str, user_id: Optional[str] = N
             message,
             session_id=session_id,
             user_id=user_id,  # Pass user_id for context-aware responses
-            max_tokens=500
+            max_tokens=500,
+            profile=profile
         )
     except Exception as e:
         logger.error(f"AI engine error: {e}")
@@ -566,6 +585,78 @@ async def send_message(session_id: str, message: str, user_id: Optional[str] = N
         "completion_tokens": completion_tokens
     })
 
+@router.post("/message/stream")
+async def stream_message(session_id: str, message: str, user_id: Optional[str] = None):
+    """
+    Send a message and stream the reply as Server-Sent Events
+
+    Events (one JSON object per "data:" line):
+    - {"type": "text", "content": "<delta>", "chunk_id": n}: model output as generated
+    - {"type": "message", "content": "<full text>", "products": [...], ...}: final response
+    - {"type": "done"} or {"type": "error", "content": "<message>"}
+    """
+    agent_pool = get_agent_pool()
+    if not agent_pool:
+        raise HTTPException(status_code=503, detail="Agent pool not initialized")
+
+    if not await agent_pool.has_session(session_id):
+        await agent_pool.create_session(
+            session_id=session_id,
+            agent_id="dispensary",
+            personality_id="marcel",
+            user_id=user_id
+        )
+
+    async def event_stream():
+        start_time = time.time()
+        time_to_first_token = None
+        chunk_id = 0
+
+        try:
+            async for event in agent_pool.process_message_stream(
+                session_id, message, user_id=user_id
+            ):
+                if event["type"] == "delta":
+                    if time_to_first_token is None:
+                        time_to_first_token = time.time() - start_time
+                    payload = {
+                        "type": "text",
+                        "content": event["delta"],
+                        "session_id": session_id,
+                        "chunk_id": chunk_id
+                    }
+                    chunk_id += 1
+                    yield f"data: {json.dumps(payload)}\n\n"
+                else:
+                    response_data = event["response"]
+                    payload = {
+                        "type": "message",
+                        "content": response_data.get("text", ""),
+                        "products": response_data.get("products"),
+                        "products_found": response_data.get("products_found"),
+                        "session_id": session_id,
+                        "streamed": chunk_id > 0,
+                        "time_to_first_token": time_to_first_token,
+                        "response_time": time.time() - start_time
+                    }
+                    yield f"data: {json.dumps(payload, default=str)}\n\n"
+
+            yield f"data: {json.dumps({'type': 'done', 'session_id': session_id})}\n\n"
+
+        except Exception as e:
+            logger.error(f"[chat_endpoints SSE] Streaming error: {e}")
+            yield f"data: {json.dumps({'type': 'error', 'content': str(e), 'session_id': session_id})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
 @router.delete("/session/{session_id}")
 async def end_session(session_id: str):
     """End a chat session"""
@@ -10,6 +10,8 @@ import os
 from datetime import datetime
 import logging
 
+from services.llm_gateway.tenant_router import invalidate_tenant_config
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/tenants", tags=["Tenant LLM Configuration"])
@@ -289,6 +291,8 @@ async def update_llm_tokens(tenant_id: str, tokens: LLMTokens):
             tenant_id
         )
         
+        # Other workers are notified by the tenants trigger (LISTEN/NOTIFY)
+        invalidate_tenant_config(tenant_id)
         logger.info(f"Updated LLM tokens for tenant {tenant_id}")
         
         return {
@@ -397,6 +401,7 @@ async def update_inference_config(tenant_id: str, config: InferenceConfig):
             tenant_id
         )
         
+        invalidate_tenant_config(tenant_id)
         logger.info(f"Updated inference config for tenant {tenant_id}: {config.preferred_provider}")
         
         return {
@@ -146,8 +146,8 @@ async def translate_bulk(
     Translate multiple texts efficiently
     
     Optimized for bulk operations with:
-    - Concurrent processing
-    - Batch caching
+    - One cache lookup per tier for all texts
+    - Cache misses packed into a few LLM requests
     - Statistics tracking
     """
     try:
@@ -467,21 +467,19 @@ async def warm_translation_cache(
             for lang_code in languages:
                 if lang_code == 'en':
                     continue  # Skip English (source language)
-                    
-                for item in common_translations:
-                    try:
-                        await translation_service.translate_single({
-                            "text": item["text"],
-                            "target_language": lang_code,
-                            "source_language": "en",
-                            "context": item.get("context"),
-                            "namespace": item.get("namespace"),
-                            "use_cache": True
-                        })
-                        warmed_count += 1
-                    except Exception as e:
-                        logger.error(f"Failed to warm cache for {lang_code}: {e}")
-                        failed_count += 1
+
+                try:
+                    result = await translation_service.translate_bulk(
+                        texts=common_translations,
+                        target_language=lang_code,
+                        source_language="en"
+                    )
+                    failed = result["statistics"]["errors"]
+                    warmed_count += len(common_translations) - failed
+                    failed_count += failed
+                except Exception as e:
+                    logger.error(f"Failed to warm cache for {lang_code}: {e}")
+                    failed_count += len(common_translations)
             
             logger.info(f"Cache warming complete: {warmed_count} translations cached, {failed_count} failed")
         
@@ -196,36 +196,43 @@ async def warmup_translations_task(
 
         logger.info(f"🔥 Starting cache warmup for {len(languages)} languages, {len(strings_to_translate)} strings")
 
-        # Translate each string for each language
+        # Determine namespace based on which list the string came from
+        items = []
+        for text in dict.fromkeys(strings_to_translate):
+            if text in COMMON_UI_STRINGS:
+                namespace = 'common'
+            elif text in AUTH_STRINGS:
+                namespace = 'auth'
+            else:
+                namespace = 'dashboard'
+            items.append({'text': text, 'context': f'ui_{namespace}', 'namespace': namespace})
+
+        # One bulk call per language: cache hits in one lookup, misses in a
+        # few packed LLM requests (results are cached by the service)
         for lang in languages:
-            for text in strings_to_translate:
-                try:
-                    # Determine namespace based on which list the string came from
-                    if text in COMMON_UI_STRINGS:
-                        namespace = 'common'
-                    elif text in AUTH_STRINGS:
-                        namespace = 'auth'
-                    else:
-                        namespace = 'dashboard'
-
-                    # Call translation service (will cache the result)
-                    result = await translation_service.translate_single(
-                        text=text,
-                        target_language=lang,
-                        source_language='en',
-                        context=f'ui_{namespace}',
-                        namespace=namespace,
-                        use_cache=True  # This will store in cache if not already cached
-                    )
-
-                    # Check if translation was successful (no error in result)
-                    if not result.get('error'):
-                        translations_cached += 1
-
-                except Exception as e:
-                    error_msg = f"Failed to translate '{text}' to {lang}: {str(e)}"
-                    logger.warning(error_msg)
-                    errors.append(error_msg)
+            try:
+                result = await translation_service.translate_bulk(
+                    texts=items,
+                    target_language=lang,
+                    source_language='en'
+                )
+            except Exception as e:
+                error_msg = f"Failed to translate strings to {lang}: {str(e)}"
+                logger.warning(error_msg)
+                errors.append(error_msg)
+                continue
+
+            for translation in result['translations']:
+                if translation.get('error'):
+                    errors.append(f"Failed to translate '{translation['original']}' to {lang}: {translation['error']}")
+                else:
+                    translations_cached += 1
+
+            stats = result['statistics']
+            logger.info(
+                f"   {lang}: {stats['from_cache']} cached, {stats['from_ai']} translated "
+                f"in {stats['llm_requests']} LLM requests, {stats['errors']} errors"
+            )
 
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
@@ -5,6 +5,7 @@ This router consolidates all chat-related REST endpoints into a single,
 consistent API following RESTful principles and SOLID design.
 """
 
+import asyncio
 import logging
 from typing import Optional
 from fastapi import APIRouter, HTTPException, Query, Body, status
@@ -152,31 +153,56 @@ async def send_message_stream(request: ChatRequest = Body(...)):
                 else:
                     session_id = request.session_id
 
-                # For now, get full response and stream it
-                # TODO: Implement true streaming at the LLM level
-                response_data = await chat_service.process_message(
-                    message=request.message,
-                    session_id=session_id,
-                    user_id=request.user_id,
-                    store_id=request.store_id,
-                    language=request.language,
-                    use_tools=request.use_tools,
-                    use_context=request.use_context,
-                    max_tokens=request.max_tokens
-                )
-
+                # Run generation in the background and forward model deltas
+                # as "text" events while it runs
+                deltas: asyncio.Queue = asyncio.Queue()
+                done = object()
+
+                async def run_generation():
+                    try:
+                        return await chat_service.process_message(
+                            message=request.message,
+                            session_id=session_id,
+                            user_id=request.user_id,
+                            store_id=request.store_id,
+                            language=request.language,
+                            use_tools=request.use_tools,
+                            use_context=request.use_context,
+                            max_tokens=request.max_tokens,
+                            on_token=deltas.put
+                        )
+                    finally:
+                        await deltas.put(done)
+
+                generation = asyncio.create_task(run_generation())
                 chunk_id = 0
 
-                # Stream text response
-                text = response_data.get("text", "")
-                words = text.split()
-                for i in range(0, len(words), 3):  # Stream 3 words at a time
-                    chunk = " ".join(words[i:i+3])
-                    if i + 3 < len(words):
-                        chunk += " "
+                try:
+                    while True:
+                        delta = await deltas.get()
+                        if delta is done:
+                            break
+                        event = {
+                            "type": "text",
+                            "content": delta,
+                            "session_id": session_id,
+                            "chunk_id": chunk_id
+                        }
+                        yield f"data: {json.dumps(event)}\n\n"
+                        chunk_id += 1
+
+                    response_data = await generation
+                finally:
+                    if not generation.done():
+                        # Client disconnected mid-stream
+                        generation.cancel()
+
+                # Responses produced without model output (e.g. signup
+                # shortcuts) arrive in one piece
+                if chunk_id == 0 and response_data.get("text"):
                     event = {
                         "type": "text",
-                        "content": chunk,
+                        "content": response_data["text"],
                         "session_id": session_id,
                         "chunk_id": chunk_id
                     }
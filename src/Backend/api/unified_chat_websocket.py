@@ -7,7 +7,7 @@ consolidating all real-time chat functionality into a single, maintainable handl
 
 import logging
 import json
-import asyncio
+import uuid
 from typing import Optional, Dict, Any
 from fastapi import WebSocket, WebSocketDisconnect, status
 from datetime import datetime
@@ -20,6 +20,9 @@ from services.chat import (
 
 logger = logging.getLogger(__name__)
 
+# Send a token_update event every N streamed deltas
+TOKEN_UPDATE_INTERVAL = 10
+
 
 class WebSocketConnectionManager:
     """
@@ -147,6 +150,26 @@ class WebSocketConnectionManager:
             }
         )
 
+    async def send_stream_delta(self, session_id: str, message_id: str, delta: str, index: int):
+        """
+        Send a chunk of model output while the response is being generated.
+
+        Args:
+            session_id: Session identifier
+            message_id: Message being generated (matches the final "message" id)
+            delta: Text generated since the previous delta
+            index: Sequence number of this delta
+        """
+        await self.send_message(
+            session_id,
+            {
+                "type": WebSocketMessageType.STREAM_DELTA.value,
+                "message_id": message_id,
+                "delta": delta,
+                "index": index
+            }
+        )
+
     async def send_token_update(self, session_id: str, message_id: str, current_tokens: int):
         """
         Send token count update to client during response streaming.
@@ -194,7 +217,9 @@ async def handle_websocket_connection(
         session_id: Optional existing session ID to resume
 
     Message Types:
-        - "message": User message (requires: message)
+        - "message": User message (requires: message). The reply is streamed
+          as "stream_delta" events followed by a final "message" with the
+          same message_id/id.
         - "session_update": Update agent/personality (requires: agent and/or personality)
         - "heartbeat": Keep-alive ping (no payload required)
 
@@ -248,7 +273,26 @@ async def handle_websocket_connection(
                     # Send typing indicator
                     await manager.send_typing_indicator(active_session_id, True)
 
-                    # Process message through ChatService
+                    # Generate message ID up front so deltas and the final
+                    # message can be correlated by the client
+                    message_id = str(uuid.uuid4())
+                    streamed_deltas = 0
+
+                    async def forward_delta(delta: str):
+                        nonlocal streamed_deltas
+                        if streamed_deltas == 0:
+                            await manager.send_typing_indicator(active_session_id, False)
+                        await manager.send_stream_delta(
+                            active_session_id, message_id, delta, streamed_deltas
+                        )
+                        streamed_deltas += 1
+                        # Streamed tokens so far (one provider delta ~ one token)
+                        if streamed_deltas % TOKEN_UPDATE_INTERVAL == 0:
+                            await manager.send_token_update(
+                                active_session_id, message_id, streamed_deltas
+                            )
+
+                    # Process message through ChatService, streaming model output
                     response_data = await chat_service.process_message(
                         message=user_message,
                         session_id=active_session_id,
@@ -257,7 +301,8 @@ async def handle_websocket_connection(
                         language=data.get("language", "en"),
                         use_tools=data.get("use_tools", True),
                         use_context=data.get("use_context", True),
-                        max_tokens=data.get("max_tokens", 500)
+                        max_tokens=data.get("max_tokens", 500),
+                        on_token=forward_delta
                     )
 
                     # Stop typing indicator
@@ -265,25 +310,9 @@ async def handle_websocket_connection(
 
                     # Extract metadata for top-level fields
                     metadata = response_data.get("metadata", {})
-                    final_token_count = metadata.get("tokens_used", 0)
-
-                    # Generate message ID for this response
-                    message_id = response_data.get("id", datetime.utcnow().isoformat())
-
-                    # Simulate token streaming for UX (send incremental updates)
-                    if final_token_count > 0:
-                        num_updates = min(5, final_token_count // 10)  # Send 5-10 updates
-
-                        for i in range(1, num_updates + 1):
-                            current_tokens = int((final_token_count * i) / (num_updates + 1))
-                            await manager.send_token_update(
-                                active_session_id,
-                                message_id,
-                                current_tokens
-                            )
-                            await asyncio.sleep(0.05)  # 50ms between updates
 
                     # Send response with extracted metadata fields
+                    # (content is authoritative: post-processing may amend streamed text)
                     await manager.send_message(
                         active_session_id,
                         {
@@ -295,6 +324,7 @@ async def handle_websocket_connection(
                             "metadata": metadata,
                             "response_time": metadata.get("response_time"),
                             "token_count": metadata.get("tokens_used"),
+                            "streamed": streamed_deltas > 0,
                             "timestamp": datetime.utcnow().isoformat()
                         }
                     )
@@ -13,7 +13,9 @@ from fastapi.responses import Response
 from pydantic import BaseModel
 import asyncpg
 
-from core.voice.voice_model_router import VoiceModelRouter, SynthesisContext, VoiceQuality
+from core.voice.voice_model_router import (
+    VoiceModelRouter, SynthesisContext, VoiceQuality, personality_fixed_phrases
+)
 from core.voice.voice_cache import VoiceCache
 
 logger = logging.getLogger(__name__)
@@ -73,7 +75,10 @@ async def get_voice_router() -> VoiceModelRouter:
 
     if voice_router is None:
         logger.info("Initializing VoiceModelRouter...")
-        voice_router = VoiceModelRouter(device="cpu")  # TODO: Auto-detect GPU
+        voice_router = VoiceModelRouter(
+            device="cpu",  # TODO: Auto-detect GPU
+            voice_cache=get_voice_cache()
+        )
         success = await voice_router.initialize()
 
         if not success:
@@ -132,7 +137,7 @@ async def synthesize_voice(
         cache = get_voice_cache()
 
         # Check cache first
-        cached = cache.get(
+        cached = await cache.get(
             text=request.text,
             personality_id=request.personality_id,
             language=request.language,
@@ -193,7 +198,11 @@ async def synthesize_voice(
                             logger.info(f"Auto-loading voice sample for personality {request.personality_id}")
                             load_results = await router.load_personality_voice(
                                 personality_id=request.personality_id,
-                                voice_sample_path=voice_sample_path
+                                voice_sample_path=voice_sample_path,
+                                phrases=personality_fixed_phrases(
+                                    personality['personality_name'], voice_config
+                                ),
+                                language=voice_config.get('language', 'en')
                             )
                             logger.info(f"Voice sample loaded: {load_results}")
                         else:
@@ -238,7 +247,7 @@ async def synthesize_voice(
             )
 
             # Cache the result
-            cache.set(
+            await cache.set(
                 text=request.text,
                 personality_id=request.personality_id,
                 audio_data=result.audio,
@@ -344,9 +353,12 @@ async def load_personality_voice(
             # Load voice into providers
             logger.info(f"Loading voice sample for personality '{personality['personality_name']}'")
 
+            # Fixed phrases are then pre-synthesized into the voice cache in the background
             results = await router.load_personality_voice(
                 personality_id=personality_id,
-                voice_sample_path=voice_sample_path
+                voice_sample_path=voice_sample_path,
+                phrases=personality_fixed_phrases(personality['personality_name'], voice_config),
+                language=voice_config.get('language', 'en')
             )
 
             success_count = sum(1 for r in results.values() if r)
@@ -430,7 +442,8 @@ async def get_provider_status():
             "providers_available": stats["providers_available"],
             "provider_usage": stats["provider_usage"],
             "total_requests": stats["total_requests"],
-            "total_cost": stats["total_cost"]
+            "total_cost": stats["total_cost"],
+            "presynthesis": stats["presynthesis"]
         }
 
     except Exception as e:
@@ -451,7 +464,7 @@ async def get_cache_stats():
     """
     try:
         cache = get_voice_cache()
-        stats = cache.get_stats()
+        stats = await cache.get_stats()
 
         return {
             "success": True,
@@ -483,7 +496,7 @@ async def clear_cache(
     """
     try:
         cache = get_voice_cache()
-        success = cache.clear_all()
+        success = await cache.clear_all()
 
         return {
             "success": success,
@@ -517,7 +530,7 @@ async def invalidate_personality_cache(
     """
     try:
         cache = get_voice_cache()
-        deleted_count = cache.invalidate_personality(personality_id)
+        deleted_count = await cache.invalidate_personality(personality_id)
 
         return {
             "success": True,
@@ -9,7 +9,7 @@ import json
 import base64
 import time
 import numpy as np
-from typing import Dict, Any, Optional, Set
+from typing import Dict, Any, Optional, Set, AsyncGenerator
 from fastapi import WebSocket, WebSocketDisconnect, HTTPException
 from fastapi import APIRouter
 from enum import Enum
@@ -23,6 +23,7 @@ from core.voice.wake_word_state_manager import (
     WakeWordStateManager,
     WakeWordSessionState
 )
+from services.agent_pool_manager import get_agent_pool
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +39,9 @@ class WSMessageType(Enum):
     STOP_LISTENING = "stop_listening"
     CONFIGURE = "configure"
     HEARTBEAT = "heartbeat"
+    SYNTHESIZE = "synthesize"  # Speak the given text
+    RESPOND = "respond"  # Ask the chat agent and speak its answer as it streams
+    STOP_SPEAKING = "stop_speaking"
 
     # Server to client
     WAKE_WORD_DETECTED = "wake_word_detected"
@@ -46,6 +50,8 @@ class WSMessageType(Enum):
     STATUS = "status"
     ERROR = "error"
     HEARTBEAT_ACK = "heartbeat_ack"
+    AUDIO_CHUNK = "audio_chunk"
+    AUDIO_END = "audio_end"
 
 
 class ListeningState(Enum):
@@ -70,6 +76,7 @@ class WSSession:
     audio_buffer: list
     wake_word_active: bool
     command_timeout_task: Optional[asyncio.Task]
+    speech_task: Optional[asyncio.Task] = None
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization"""
@@ -114,6 +121,8 @@ class VoiceWebSocketManager:
             if session.command_timeout_task:
                 session.command_timeout_task.cancel()
 
+            await self.stop_speaking(session)
+
             # Remove from active sessions
             del self.active_sessions[session_id]
 
@@ -344,6 +353,140 @@ class VoiceWebSocketManager:
         logger.info(f"Stopped listening for session {session.session_id}")
 
 
+    async def start_speaking(self, session: WSSession, msg_type: str, data: Dict[str, Any]):
+        """Start streaming a spoken response, replacing any response in progress
+
+        SYNTHESIZE speaks data["text"]; RESPOND sends data["text"] to the chat
+        session data["chat_session_id"] and speaks the answer while it is
+        still being generated.
+        """
+        await self.stop_speaking(session)
+
+        text = data.get("text")
+        if not text:
+            await self._send_error(session, "No text provided")
+            return
+
+        if msg_type == WSMessageType.RESPOND.value:
+            chat_session_id = data.get("chat_session_id") or session.config.get("chat_session_id")
+            if not chat_session_id:
+                await self._send_error(session, "No chat_session_id provided")
+                return
+            text_stream = self._agent_text_stream(chat_session_id, text, data.get("user_id"))
+        else:
+            text_stream = self._text_once(text)
+
+        if not session.pipeline:
+            session.pipeline = await self.get_pipeline(session.session_id)
+
+        session.speech_task = asyncio.create_task(
+            self._stream_speech(session, text_stream, data)
+        )
+
+    async def stop_speaking(self, session: WSSession):
+        """Cancel the spoken response in progress (barge-in)"""
+        task = session.speech_task
+        session.speech_task = None
+        if task and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _text_once(self, text: str) -> AsyncGenerator[str, None]:
+        yield text
+
+    async def _agent_text_stream(
+        self,
+        chat_session_id: str,
+        message: str,
+        user_id: Optional[str]
+    ) -> AsyncGenerator[str, None]:
+        """Yield the chat agent's answer as model deltas arrive"""
+        agent_pool = get_agent_pool()
+        if not agent_pool or not await agent_pool.has_session(chat_session_id):
+            raise ValueError(f"Chat session {chat_session_id} not found in agent pool")
+
+        deltas: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def run_generation():
+            try:
+                return await agent_pool.generate_message_with_products(
+                    session_id=chat_session_id,
+                    message=message,
+                    user_id=user_id,
+                    on_token=deltas.put
+                )
+            finally:
+                await deltas.put(done)
+
+        generation = asyncio.create_task(run_generation())
+        streamed = False
+        try:
+            while True:
+                delta = await deltas.get()
+                if delta is done:
+                    break
+                streamed = True
+                yield delta
+
+            response_data = await generation
+            # Responses produced without model output (e.g. signup flows)
+            if not streamed and response_data.get("text"):
+                yield response_data["text"]
+        finally:
+            if not generation.done():
+                generation.cancel()
+
+    async def _stream_speech(
+        self,
+        session: WSSession,
+        text_stream: AsyncGenerator[str, None],
+        data: Dict[str, Any]
+    ):
+        """Send each synthesized sentence to the client as soon as it is ready"""
+        started = time.perf_counter()
+        time_to_first_audio_ms = None
+        chunk_count = 0
+
+        try:
+            async for chunk in session.pipeline.synthesize_stream(
+                text_stream,
+                voice=data.get("voice"),
+                language=data.get("language"),
+                speed=data.get("speed", 1.0)
+            ):
+                if time_to_first_audio_ms is None:
+                    time_to_first_audio_ms = (time.perf_counter() - started) * 1000
+
+                await session.websocket.send_json({
+                    "type": WSMessageType.AUDIO_CHUNK.value,
+                    "data": {
+                        "index": chunk.index,
+                        "text": chunk.text,
+                        "audio": base64.b64encode(chunk.audio).decode("utf-8"),
+                        "format": chunk.format,
+                        "sample_rate": chunk.sample_rate,
+                        "duration_ms": chunk.duration_ms
+                    }
+                })
+                chunk_count += 1
+
+            await session.websocket.send_json({
+                "type": WSMessageType.AUDIO_END.value,
+                "data": {
+                    "chunks": chunk_count,
+                    "time_to_first_audio_ms": time_to_first_audio_ms,
+                    "total_ms": (time.perf_counter() - started) * 1000
+                }
+            })
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Streamed speech failed for session {session.session_id}: {e}")
+            await self._send_error(session, f"Speech synthesis error: {str(e)}")
+
+
 # Global manager instance
 ws_manager = VoiceWebSocketManager()
 
@@ -357,7 +500,10 @@ async def websocket_listen(websocket: WebSocket):
     2. Client streams audio data in chunks
     3. Server detects wake words and transcribes commands
     4. Server sends notifications for wake words, transcriptions, and VAD states
-    5. Client sends STOP_LISTENING to end session
+    5. Client may send SYNTHESIZE (text) or RESPOND (text + chat_session_id);
+       the server streams AUDIO_CHUNK messages sentence by sentence, then
+       AUDIO_END. STOP_SPEAKING cancels the response in progress
+    6. Client sends STOP_LISTENING to end session
 
     Message Format:
     {
@@ -425,6 +571,12 @@ async def websocket_listen(websocket: WebSocket):
                     audio_bytes = base64.b64decode(audio_base64)
                     await ws_manager.handle_audio_data(session, audio_bytes)
 
+            elif msg_type in (WSMessageType.SYNTHESIZE.value, WSMessageType.RESPOND.value):
+                await ws_manager.start_speaking(session, msg_type, msg_data)
+
+            elif msg_type == WSMessageType.STOP_SPEAKING.value:
+                await ws_manager.stop_speaking(session)
+
             elif msg_type == WSMessageType.CONFIGURE.value:
                 # Update configuration
                 session.config.update(msg_data)
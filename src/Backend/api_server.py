@@ -359,7 +359,19 @@ async def lifespan(app: FastAPI):
         if hasattr(app.state, 'context_manager'):
             logger.info("Closing context manager...")
             await app.state.context_manager.close()
+
+        # Write out buffered LLM usage records
+        from services.model_usage_tracker import shutdown_usage_tracker
+        await shutdown_usage_tracker()
+
+        # Ship traces still waiting for export
+        from services.metrics.tracing import shutdown_tracing
+        await shutdown_tracing()
         if v5_engine:
+            if getattr(v5_engine, 'llm_router', None):
+                await v5_engine.llm_router.close()
+            if getattr(v5_engine, 'agent_pool', None):
+                await v5_engine.agent_pool.close()
             v5_engine.cleanup()
 
 
@@ -1408,7 +1420,8 @@ async def get_stats():
         "uptime": "N/A",
         "requests_processed": 0,
         "active_sessions": 0,
-        "tools_available": len(v5_engine.tool_manager.tools) if v5_engine and v5_engine.tool_manager else 0
+        "tools_available": len(v5_engine.tool_manager.tools) if v5_engine and v5_engine.tool_manager else 0,
+        "local_inference": v5_engine.local_inference.get_stats() if v5_engine else None
     }
 
 # LLM Router endpoints for hot-swap control
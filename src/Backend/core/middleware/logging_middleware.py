@@ -13,6 +13,8 @@ import contextvars
 from datetime import datetime
 from elasticsearch import Elasticsearch
 
+from services.metrics.tracing import trace_span, current_span
+
 # Context variable to store correlation ID for the current request
 correlation_id_ctx = contextvars.ContextVar('correlation_id', default=None)
 
@@ -98,6 +100,11 @@ class PerformanceLoggingMiddleware(BaseHTTPMiddleware):
         self.slow_request_threshold = slow_request_threshold
 
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        # Root span of the request; engine, tool and store spans nest under it
+        with trace_span("http.request", method=request.method, path=request.url.path):
+            return await self._dispatch(request, call_next)
+
+    async def _dispatch(self, request: Request, call_next: Callable) -> Response:
         # Generate or extract correlation ID
         correlation_id = request.headers.get('X-Correlation-ID') or str(uuid.uuid4())
         correlation_id_ctx.set(correlation_id)
@@ -106,6 +113,9 @@ class PerformanceLoggingMiddleware(BaseHTTPMiddleware):
         session_id = request.headers.get('X-Session-ID', 'no-session')
         user_id = request.headers.get('X-User-ID', 'anonymous')
 
+        span = current_span()
+        span.set_attribute("correlation_id", correlation_id)
+
         # Start performance timer
         start_time = time.time()
 
@@ -162,11 +172,18 @@ class PerformanceLoggingMiddleware(BaseHTTPMiddleware):
                     'status_code': response.status_code,
                     'duration_ms': round(duration_ms, 2),
                     'slow_request': duration_ms > self.slow_request_threshold * 1000,
+                    'trace_id': span.trace_id,
                 }
             )
 
+            span.set_attribute("status_code", response.status_code)
+            if response.status_code >= 500:
+                span.set_status("error")
+
             # Add correlation ID to response headers
             response.headers['X-Correlation-ID'] = correlation_id
+            if span.trace_id:
+                response.headers['X-Trace-ID'] = span.trace_id
 
             return response
 
@@ -185,6 +202,7 @@ class PerformanceLoggingMiddleware(BaseHTTPMiddleware):
                     'path': request.url.path,
                     'duration_ms': round(duration_ms, 2),
                     'exception_type': type(e).__name__,
+                    'trace_id': span.trace_id,
                 },
                 exc_info=True
             )
@@ -7,7 +7,9 @@ from .base_handler import BaseVoiceHandler, VoiceState
 from .whisper_stt import WhisperSTTHandler
 from .offline_tts import OfflineTTSHandler
 from .vad_handler import SileroVADHandler
-from .voice_pipeline import VoicePipeline, PipelineMode
+from .silero_vad import VADStreamState
+from .audio_ring_buffer import AudioRingBuffer
+from .voice_pipeline import VoicePipeline, PipelineMode, SpeechChunk
 
 __all__ = [
     'BaseVoiceHandler',
@@ -15,6 +17,9 @@ __all__ = [
     'WhisperSTTHandler',
     'OfflineTTSHandler',
     'SileroVADHandler',
+    'VADStreamState',
+    'AudioRingBuffer',
     'VoicePipeline',
-    'PipelineMode'
+    'PipelineMode',
+    'SpeechChunk'
 ]
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""
+Ring Buffer for Streaming PCM Audio
+Fixed-size, preallocated sample storage for streaming paths that used to
+append chunks to a list and np.concatenate them on every step.
+
+- Appending a chunk is a constant number of slice copies, whatever the
+  amount of audio already buffered; no per-chunk allocation
+- Storage is mirrored (every sample is written at i and i + capacity), so
+  the most recent n samples are always one contiguous slice and latest()
+  returns a read-only view instead of a copy
+- Memory per session is fixed at 2 * capacity samples; the oldest audio is
+  overwritten once the buffer is full
+
+Views alias the storage: a view of the latest n samples stays valid until
+another capacity - n samples are appended. Copy a view before handing it to
+code that outlives the next append (callbacks, other threads).
+
+Usage:
+    ring = AudioRingBuffer.for_duration(1000, sample_rate=16000)
+    ring.append(chunk)
+    context = ring.latest()          # up to 1s, no copy
+    new_audio = ring.since(position) # samples appended after `position`
+"""
+from typing import Optional, Union
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Fixed-capacity ring buffer of mono PCM samples"""
+
+    def __init__(self, capacity: int, dtype: Union[str, np.dtype] = np.float32):
+        """Initialize buffer
+
+        Args:
+            capacity: Maximum samples held
+            dtype: Sample type; bytes appended are read as 16-bit PCM and
+                scaled to [-1, 1] for floating point buffers
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = int(capacity)
+        self.dtype = np.dtype(dtype)
+        self._data = np.zeros(2 * self.capacity, dtype=self.dtype)
+        self._write = 0      # Next write index in [0, capacity)
+        self._length = 0     # Samples currently held
+        self.total_written = 0  # Samples appended since creation (absolute position)
+
+    @classmethod
+    def for_duration(
+        cls,
+        duration_ms: float,
+        sample_rate: int = 16000,
+        dtype: Union[str, np.dtype] = np.float32
+    ) -> "AudioRingBuffer":
+        """Buffer holding duration_ms of audio at sample_rate"""
+        return cls(max(1, int(duration_ms * sample_rate / 1000)), dtype)
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def is_full(self) -> bool:
+        return self._length == self.capacity
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+    def _to_samples(self, chunk: Union[np.ndarray, bytes]) -> np.ndarray:
+        if isinstance(chunk, (bytes, bytearray, memoryview)):
+            samples = np.frombuffer(chunk, dtype=np.int16)
+            if self.dtype.kind == "f":
+                return samples.astype(self.dtype) / 32768.0
+            return samples.astype(self.dtype, copy=False)
+        return np.asarray(chunk).reshape(-1).astype(self.dtype, copy=False)
+
+    def append(self, chunk: Union[np.ndarray, bytes]) -> int:
+        """Add samples, overwriting the oldest once full
+
+        Args:
+            chunk: Samples (any shape is flattened) or 16-bit PCM bytes
+
+        Returns:
+            Number of samples appended
+        """
+        samples = self._to_samples(chunk)
+        count = len(samples)
+        if count == 0:
+            return 0
+        self.total_written += count
+
+        if count >= self.capacity:
+            samples = samples[-self.capacity:]
+            self._data[:self.capacity] = samples
+            self._data[self.capacity:] = samples
+            self._write = 0
+            self._length = self.capacity
+            return count
+
+        first = min(count, self.capacity - self._write)
+        for offset in (0, self.capacity):
+            start = self._write + offset
+            self._data[start:start + first] = samples[:first]
+            if first < count:
+                # Wrapped: the rest goes to the start of each half
+                self._data[offset:offset + count - first] = samples[first:]
+        self._write = (self._write + count) % self.capacity
+        self._length = min(self._length + count, self.capacity)
+        return count
+
+    def latest(self, samples: Optional[int] = None) -> np.ndarray:
+        """Read-only view of the most recent samples (all held by default)"""
+        n = self._length if samples is None else max(0, min(int(samples), self._length))
+        end = self._write + self.capacity
+        view = self._data[end - n:end]
+        view.flags.writeable = False
+        return view
+
+    def since(self, position: int) -> np.ndarray:
+        """Read-only view of samples appended after absolute `position`
+
+        Audio already overwritten is skipped, so the view may start later.
+        """
+        return self.latest(self.total_written - position)
+
+    def keep_latest(self, samples: int) -> None:
+        """Drop all but the most recent samples"""
+        self._length = max(0, min(int(samples), self._length))
+
+    def clear(self) -> None:
+        self._length = 0
+
+    def duration_ms(self, sample_rate: int) -> float:
+        return self._length / sample_rate * 1000
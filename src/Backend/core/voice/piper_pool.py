@@ -0,0 +1,321 @@
+"""
+Warm Piper Worker Pool
+Keeps long-running Piper processes (piper_worker.py) with their voice model
+already loaded, instead of starting `piper` and reloading the ONNX model for
+every utterance.
+
+- Workers are started per voice on first use (or by warm()), up to
+  workers_per_voice each; that is also the voice's concurrency limit, extra
+  requests wait for a free worker
+- Audio is read from the worker's stdout as length-prefixed PCM frames, no
+  temp files
+- A worker that times out, crashes or returns garbage is killed and replaced
+  on next use; idle workers are pinged every health_interval seconds
+- A voice whose worker cannot start (e.g. the piper Python package is not
+  installed for PIPER_WORKER_PYTHON) is skipped for retry_seconds so callers
+  fall back to one-shot synthesis without paying the start-up cost each time
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = Path(__file__).with_name("piper_worker.py")
+
+PIPER_WORKERS_PER_VOICE = int(os.getenv("PIPER_WORKERS_PER_VOICE", "1"))
+PIPER_WORKER_PYTHON = os.getenv("PIPER_WORKER_PYTHON") or sys.executable
+PIPER_REQUEST_TIMEOUT = float(os.getenv("PIPER_REQUEST_TIMEOUT", "30"))
+PIPER_HEALTH_INTERVAL = float(os.getenv("PIPER_HEALTH_INTERVAL", "30"))
+
+
+class PiperWorkerError(RuntimeError):
+    """A Piper worker could not start or failed a request"""
+
+
+class PiperWorker:
+    """One Piper process serving a single voice, one request at a time"""
+
+    def __init__(self, voice_id: str, model: Path, config: Path, python: str = PIPER_WORKER_PYTHON):
+        self.voice_id = voice_id
+        self.model = model
+        self.config = config
+        self.python = python
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.sample_rate: Optional[int] = None
+        self.requests = 0
+        self.started_at = 0.0
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self, timeout: float) -> None:
+        """Start the process and wait until the voice model is loaded"""
+        self.process = await asyncio.create_subprocess_exec(
+            self.python, str(WORKER_SCRIPT),
+            "--model", str(self.model),
+            "--config", str(self.config),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        try:
+            header = await asyncio.wait_for(self._read_header(), timeout)
+        except BaseException:
+            # Includes cancellation (barge-in) while the model is loading;
+            # nothing else holds this worker yet, so it would be orphaned
+            await self.kill()
+            raise
+        if not header.get("ready"):
+            await self.stop()
+            raise PiperWorkerError(header.get("error", "worker did not start"))
+        self.sample_rate = header["sample_rate"]
+        self.started_at = time.time()
+
+    async def _read_header(self) -> Dict[str, Any]:
+        line = await self.process.stdout.readline()
+        if not line:
+            raise PiperWorkerError(f"Piper worker for {self.voice_id} exited")
+        return json.loads(line)
+
+    async def _send(self, request: Dict[str, Any]) -> None:
+        self.process.stdin.write(json.dumps(request).encode("utf-8") + b"\n")
+        await self.process.stdin.drain()
+
+    async def _read_audio(self) -> Tuple[np.ndarray, int]:
+        frames: List[bytes] = []
+        while True:
+            header = await self._read_header()
+            if "audio" in header:
+                frames.append(await self.process.stdout.readexactly(header["audio"]))
+            elif header.get("done"):
+                return np.frombuffer(b"".join(frames), dtype=np.int16), header["sample_rate"]
+            else:
+                raise PiperWorkerError(header.get("error", f"unexpected worker output: {header}"))
+
+    async def synthesize(self, request: Dict[str, Any], timeout: float) -> Tuple[np.ndarray, int]:
+        """Synthesize one request; returns 16-bit mono PCM and its sample rate"""
+        await self._send(request)
+        pcm = await asyncio.wait_for(self._read_audio(), timeout)
+        self.requests += 1
+        return pcm
+
+    async def ping(self, timeout: float) -> bool:
+        try:
+            await self._send({"ping": True})
+            header = await asyncio.wait_for(self._read_header(), timeout)
+            return bool(header.get("pong"))
+        except Exception:
+            return False
+
+    async def kill(self) -> None:
+        """Stop immediately (the process may be mid-response) and reap it"""
+        process, self.process = self.process, None
+        if process is None or process.returncode is not None:
+            return
+        process.kill()
+        await process.wait()
+
+    async def stop(self) -> None:
+        if self.process is None:
+            return
+        process, self.process = self.process, None
+        if process.returncode is not None:
+            return
+        try:
+            process.stdin.close()
+            await asyncio.wait_for(process.wait(), 2.0)
+        except Exception:
+            process.kill()
+            await process.wait()
+
+
+class PiperWorkerPool:
+    """Warm Piper workers per voice with a per-voice concurrency limit"""
+
+    def __init__(
+        self,
+        voices: Dict[str, Dict[str, Any]],
+        workers_per_voice: int = PIPER_WORKERS_PER_VOICE,
+        request_timeout: float = PIPER_REQUEST_TIMEOUT,
+        health_interval: float = PIPER_HEALTH_INTERVAL,
+        start_timeout: float = 60.0,
+        retry_seconds: float = 60.0
+    ):
+        """Initialize pool
+
+        Args:
+            voices: Voice id -> info with "model" and "config" paths
+            workers_per_voice: Processes (and concurrent requests) per voice
+            request_timeout: Seconds before a request's worker is replaced
+            health_interval: Seconds between pings of idle workers
+            start_timeout: Seconds allowed for a worker to load its model
+            retry_seconds: Seconds before retrying a voice whose worker failed to start
+        """
+        self.voices = voices
+        self.workers_per_voice = max(1, workers_per_voice)
+        self.request_timeout = request_timeout
+        self.health_interval = health_interval
+        self.start_timeout = start_timeout
+        self.retry_seconds = retry_seconds
+
+        # Free slots per voice: a started worker, or None for one not started yet
+        self._slots: Dict[str, asyncio.Queue] = {}
+        self._unavailable_until: Dict[str, float] = {}
+        self._health_task: Optional[asyncio.Task] = None
+        self._voice_requests: Dict[str, int] = {}
+
+        self.stats = {
+            "requests": 0,
+            "worker_starts": 0,
+            "start_failures": 0,
+            "request_failures": 0,
+            "health_restarts": 0
+        }
+
+    def available(self, voice_id: str) -> bool:
+        return time.monotonic() >= self._unavailable_until.get(voice_id, 0.0)
+
+    def _voice_slots(self, voice_id: str) -> asyncio.Queue:
+        slots = self._slots.get(voice_id)
+        if slots is None:
+            # LIFO: the most recently used (warm) worker is reused first and
+            # unstarted slots are only taken under concurrent load
+            slots = asyncio.LifoQueue()
+            for _ in range(self.workers_per_voice):
+                slots.put_nowait(None)
+            self._slots[voice_id] = slots
+        return slots
+
+    async def _start_worker(self, voice_id: str) -> PiperWorker:
+        voice = self.voices[voice_id]
+        worker = PiperWorker(voice_id, voice["model"], voice["config"])
+        started = time.perf_counter()
+        try:
+            await worker.start(self.start_timeout)
+        except Exception as e:
+            self.stats["start_failures"] += 1
+            self._unavailable_until[voice_id] = time.monotonic() + self.retry_seconds
+            raise PiperWorkerError(f"Piper worker for {voice_id} failed to start: {e}") from e
+
+        self.stats["worker_starts"] += 1
+        logger.info(f"✅ Piper worker for {voice_id} ready in {(time.perf_counter() - started) * 1000:.0f}ms")
+        if self._health_task is None and self.health_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+        return worker
+
+    async def synthesize(self, voice_id: str, request: Dict[str, Any]) -> Tuple[np.ndarray, int]:
+        """Synthesize on a warm worker for the voice
+
+        Args:
+            voice_id: Voice to use
+            request: Worker request (text, length_scale, noise_scale, ...)
+
+        Returns:
+            16-bit mono PCM and its sample rate
+
+        Raises:
+            PiperWorkerError: Worker could not start or the request failed
+        """
+        if not self.available(voice_id):
+            raise PiperWorkerError(f"Piper workers for {voice_id} unavailable")
+
+        slots = self._voice_slots(voice_id)
+        worker = await slots.get()
+        try:
+            if worker is None or not worker.alive:
+                worker = await self._start_worker(voice_id)
+            result = await worker.synthesize(request, self.request_timeout)
+            self.stats["requests"] += 1
+            self._voice_requests[voice_id] = self._voice_requests.get(voice_id, 0) + 1
+            return result
+        except asyncio.CancelledError:
+            # Its reply may still be on stdout; a reused worker would be out of step
+            if worker is not None:
+                await worker.kill()
+                worker = None
+            raise
+        except Exception as e:
+            if worker is not None:
+                self.stats["request_failures"] += 1
+                await worker.stop()
+                worker = None
+            if isinstance(e, PiperWorkerError):
+                raise
+            raise PiperWorkerError(f"Piper worker for {voice_id} failed: {e}") from e
+        finally:
+            slots.put_nowait(worker)
+
+    async def warm(self, voice_id: str) -> bool:
+        """Start a voice's first worker ahead of its first request"""
+        if not self.available(voice_id):
+            return False
+        slots = self._voice_slots(voice_id)
+        worker = await slots.get()
+        try:
+            if worker is None or not worker.alive:
+                worker = await self._start_worker(voice_id)
+            return True
+        except PiperWorkerError as e:
+            logger.warning(f"{e}; using one-shot Piper processes")
+            return False
+        finally:
+            slots.put_nowait(worker)
+
+    async def check_health(self) -> None:
+        """Ping idle workers and restart any that stopped answering"""
+        for voice_id, slots in self._slots.items():
+            idle = []
+            while not slots.empty():
+                idle.append(slots.get_nowait())
+            for worker in idle:
+                if worker is not None and not (worker.alive and await worker.ping(5.0)):
+                    logger.warning(f"Piper worker for {voice_id} unhealthy, restarting")
+                    self.stats["health_restarts"] += 1
+                    await worker.stop()
+                    try:
+                        worker = await self._start_worker(voice_id)
+                    except PiperWorkerError as e:
+                        logger.error(str(e))
+                        worker = None
+                slots.put_nowait(worker)
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.error(f"Piper health check failed: {e}")
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for slots in self._slots.values():
+            while not slots.empty():
+                worker = slots.get_nowait()
+                if worker is not None:
+                    await worker.stop()
+        self._slots.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "workers_per_voice": self.workers_per_voice,
+            "voices": {
+                voice_id: {
+                    "busy": self.workers_per_voice - slots.qsize(),
+                    "requests": self._voice_requests.get(voice_id, 0)
+                }
+                for voice_id, slots in self._slots.items()
+            }
+        }
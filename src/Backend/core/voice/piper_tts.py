@@ -7,17 +7,20 @@ import logging
 import time
 import json
 import subprocess
-import tempfile
 import wave
 import numpy as np
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
 import io
 
 from .base_handler import TTSHandler, SynthesisResult, AudioConfig, VoiceState
+from .piper_pool import PiperWorkerPool, PiperWorkerError
 
 logger = logging.getLogger(__name__)
 
+# Output format sent to clients
+OUTPUT_SAMPLE_RATE = 48000
+
 class PiperTTSHandler(TTSHandler):
     """High-quality neural TTS using Piper models"""
     
@@ -174,6 +177,10 @@ class PiperTTSHandler(TTSHandler):
         
         self.current_voice_id = "amy"  # Default to Amy
         self.piper_binary = None
+
+        # Long-running Piper processes with their voice already loaded
+        self.worker_pool = PiperWorkerPool(self.available_voices)
+        self._sample_rates: Dict[str, int] = {}
         
     async def initialize(self) -> bool:
         """Initialize Piper TTS handler"""
@@ -201,6 +208,9 @@ class PiperTTSHandler(TTSHandler):
                     self.set_state(VoiceState.ERROR)
                     return False
             
+            # Load the default voice now so the first reply does not pay for it
+            await self.worker_pool.warm(self.current_voice_id)
+
             logger.info(f"✅ Piper TTS initialized with {len(self.available_voices)} high-quality neural voices")
             self.set_state(VoiceState.IDLE)
             return True
@@ -293,21 +303,34 @@ class PiperTTSHandler(TTSHandler):
                 voice_id = "amy"  # Default
             
             voice_info = self.available_voices[voice_id]
-            
-            # If Piper binary not available, return error
-            if not self.piper_binary:
-                logger.error("Piper binary not available - cannot synthesize speech")
-                raise RuntimeError("Piper TTS not installed. Please install with: pip install piper-tts")
-            
-            # Generate audio with Piper
+
+            # Preprocess text for more natural speech
+            # Add subtle pauses and emphasis markers
+            request = self._piper_request(self._preprocess_for_natural_speech(text), speed)
+
+            # Generate audio on a warm worker, else with a one-shot Piper process
+            pcm = None
+            if self.worker_pool.available(voice_id):
+                try:
+                    pcm, source_rate = await self.worker_pool.synthesize(voice_id, request)
+                except PiperWorkerError as e:
+                    logger.warning(f"{e}; falling back to one-shot Piper process")
+
             loop = asyncio.get_event_loop()
-            audio_data = await loop.run_in_executor(
-                None,
-                self._synthesize_with_piper,
-                text,
-                voice_info,
-                speed
-            )
+            if pcm is None:
+                # If Piper binary not available, return error
+                if not self.piper_binary:
+                    logger.error("Piper binary not available - cannot synthesize speech")
+                    raise RuntimeError("Piper TTS not installed. Please install with: pip install piper-tts")
+                pcm, source_rate = await loop.run_in_executor(
+                    None,
+                    self._synthesize_with_piper,
+                    request,
+                    voice_info
+                )
+
+            # Upsample to 48kHz stereo and enhance in one vectorized pass
+            audio_data = await loop.run_in_executor(None, self._render_output, pcm, source_rate)
             
             # Calculate metrics
             duration_ms = (time.time() - start_time) * 1000
@@ -320,7 +343,7 @@ class PiperTTSHandler(TTSHandler):
             
             return SynthesisResult(
                 audio=audio_data,
-                sample_rate=48000,  # We upsample to 48kHz
+                sample_rate=OUTPUT_SAMPLE_RATE,  # We upsample to 48kHz
                 duration_ms=audio_duration_ms,
                 format="wav",
                 provider="piper"
@@ -340,67 +363,54 @@ class PiperTTSHandler(TTSHandler):
                 provider="piper"
             )
     
-    def _synthesize_with_piper(self, text: str, voice_info: Dict, speed: float) -> bytes:
-        """Synthesize using Piper with conversational parameters"""
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp_file:
-            output_path = tmp_file.name
-        
-        try:
-            # Preprocess text for more natural speech
-            # Add subtle pauses and emphasis markers
-            text = self._preprocess_for_natural_speech(text)
-            
-            # Piper command with enhanced parameters
-            cmd = [
-                self.piper_binary,
-                "--model", str(voice_info["model"]),
-                "--config", str(voice_info["config"]),
-                "--output_file", output_path,
-                # Add variability for more natural speech
-                "--noise_scale", "0.667",  # Add slight variability (default is 0.667)
-                "--noise_w", "0.8",  # Control prosody variation
-                "--sentence_silence", "0.2"  # Natural pause between sentences
-            ]
-            
-            # Adjust speed for more natural pacing
-            if speed != 1.0:
-                # Piper uses length_scale for speed (inverse relationship)
-                # Slightly slower for more natural speech
-                length_scale = (1.0 / speed) * 1.1  # Add 10% more time for naturalness
-                cmd.extend(["--length_scale", str(length_scale)])
-            else:
-                # Default to slightly slower for conversational tone
-                cmd.extend(["--length_scale", "1.1"])
-            
-            # Run Piper
-            process = subprocess.Popen(
-                cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            
-            stdout, stderr = process.communicate(input=text, timeout=30)
-            
-            if process.returncode != 0:
-                logger.error(f"Piper failed: {stderr}")
-                raise RuntimeError(f"Piper synthesis failed: {stderr}")
-            
-            # Read the generated audio
-            with open(output_path, 'rb') as f:
-                audio_data = f.read()
-            
-            # Upsample to 48kHz stereo for better quality
-            audio_data = self._upsample_to_48khz_stereo(audio_data)
-            
-            # Apply audio enhancements for more natural sound
-            audio_data = self._enhance_audio_quality(audio_data)
-            
-            return audio_data
-            
-        finally:
-            Path(output_path).unlink(missing_ok=True)
+    def _piper_request(self, text: str, speed: float) -> Dict[str, Any]:
+        """Synthesis parameters tuned for conversational speech"""
+        # Piper uses length_scale for speed (inverse relationship); default to
+        # slightly slower (10% more time) for a more natural pace
+        length_scale = (1.0 / speed) * 1.1 if speed != 1.0 else 1.1
+        return {
+            "text": text,
+            "length_scale": length_scale,
+            "noise_scale": 0.667,  # Add slight variability (default is 0.667)
+            "noise_w": 0.8,  # Control prosody variation
+            "sentence_silence": 0.2  # Natural pause between sentences
+        }
+
+    def _voice_sample_rate(self, voice_info: Dict) -> int:
+        """Native sample rate from the voice's .onnx.json config"""
+        voice_id = voice_info["id"]
+        if voice_id not in self._sample_rates:
+            with open(voice_info["config"], "r") as f:
+                self._sample_rates[voice_id] = json.load(f).get("audio", {}).get("sample_rate", 22050)
+        return self._sample_rates[voice_id]
+
+    def _synthesize_with_piper(self, request: Dict[str, Any], voice_info: Dict) -> Tuple[np.ndarray, int]:
+        """Synthesize with a one-shot Piper process (used when no worker is available)"""
+        cmd = [
+            self.piper_binary,
+            "--model", str(voice_info["model"]),
+            "--config", str(voice_info["config"]),
+            "--output_raw",
+            "--noise_scale", str(request["noise_scale"]),
+            "--noise_w", str(request["noise_w"]),
+            "--sentence_silence", str(request["sentence_silence"]),
+            "--length_scale", str(request["length_scale"])
+        ]
+
+        # Raw 16-bit mono PCM on stdout, no temp file
+        process = subprocess.run(
+            cmd,
+            input=request["text"].encode("utf-8"),
+            capture_output=True,
+            timeout=30
+        )
+
+        if process.returncode != 0:
+            stderr = process.stderr.decode("utf-8", errors="replace")
+            logger.error(f"Piper failed: {stderr}")
+            raise RuntimeError(f"Piper synthesis failed: {stderr}")
+
+        return np.frombuffer(process.stdout, dtype=np.int16), self._voice_sample_rate(voice_info)
     
     def _preprocess_for_natural_speech(self, text: str) -> str:
         """Preprocess text to make speech more natural and conversational"""
@@ -490,148 +500,79 @@ class PiperTTSHandler(TTSHandler):
     
     # Removed espeak fallback - only use Piper for production
     
-    def _enhance_audio_quality(self, audio_data: bytes) -> bytes:
-        """Apply audio enhancements for more natural, conversational sound"""
-        try:
-            # Read the WAV data
-            with io.BytesIO(audio_data) as input_buffer:
-                with wave.open(input_buffer, 'rb') as wav_in:
-                    params = wav_in.getparams()
-                    frames = wav_in.readframes(params.nframes)
-                    
-                    # Convert to numpy array
-                    if params.sampwidth == 2:
-                        audio = np.frombuffer(frames, dtype=np.int16).astype(np.float32)
-                    else:
-                        audio = np.frombuffer(frames, dtype=np.int8).astype(np.float32)
-                    
-                    # Reshape for stereo if needed
-                    if params.nchannels == 2:
-                        audio = audio.reshape(-1, 2)
-                    
-                    # Normalize to -1 to 1 range for processing
-                    max_val = np.abs(audio).max()
-                    if max_val > 0:
-                        audio = audio / max_val
-                    
-                    # 1. Apply subtle compression for more consistent volume
-                    threshold = 0.6
-                    ratio = 3.0
-                    above_threshold = np.abs(audio) > threshold
-                    if audio.ndim == 2:
-                        for ch in range(2):
-                            channel = audio[:, ch]
-                            compressed = np.where(
-                                above_threshold[:, ch],
-                                np.sign(channel) * (threshold + (np.abs(channel) - threshold) / ratio),
-                                channel
-                            )
-                            audio[:, ch] = compressed
-                    else:
-                        audio = np.where(
-                            above_threshold,
-                            np.sign(audio) * (threshold + (np.abs(audio) - threshold) / ratio),
-                            audio
-                        )
-                    
-                    # 2. Add subtle warmth with harmonic enhancement
-                    # Create a gentle saturation effect
-                    warmth_amount = 0.15
-                    warmed = np.tanh(audio * (1 + warmth_amount)) / (1 + warmth_amount * 0.5)
-                    audio = audio * 0.7 + warmed * 0.3
-                    
-                    # 3. Apply gentle EQ for presence
-                    # Simple high-shelf boost for clarity (crude approximation)
-                    if len(audio) > 100:
-                        # Very simple high-frequency emphasis
-                        diff = np.diff(audio, axis=0 if audio.ndim == 2 else None)
-                        diff_padded = np.pad(diff, ((0, 1), (0, 0)) if audio.ndim == 2 else (0, 1), 'constant')
-                        audio = audio + diff_padded * 0.05  # Subtle high-frequency boost
-                    
-                    # 4. Add micro-dynamics for liveliness
-                    # Random subtle volume variations
-                    if len(audio) > 1000:
-                        # Create smooth random variations
-                        variation_length = len(audio) // 100
-                        variations = np.random.normal(1.0, 0.02, variation_length)
-                        # Smooth the variations
-                        from scipy.ndimage import gaussian_filter1d
-                        variations = gaussian_filter1d(variations, sigma=5)
-                        # Interpolate to match audio length
-                        variation_indices = np.linspace(0, len(variations) - 1, len(audio))
-                        smooth_variations = np.interp(variation_indices, np.arange(len(variations)), variations)
-                        
-                        if audio.ndim == 2:
-                            audio = audio * smooth_variations.reshape(-1, 1)
-                        else:
-                            audio = audio * smooth_variations
-                    
-                    # 5. Soft limiting to prevent clipping while maintaining dynamics
-                    audio = np.tanh(audio * 0.9) * 0.95
-                    
-                    # Convert back to int16
-                    audio = (audio * 32767).clip(-32768, 32767).astype(np.int16)
-                    
-                    # Create output WAV
-                    output_buffer = io.BytesIO()
-                    with wave.open(output_buffer, 'wb') as wav_out:
-                        wav_out.setnchannels(params.nchannels)
-                        wav_out.setsampwidth(2)  # 16-bit
-                        wav_out.setframerate(params.framerate)
-                        wav_out.writeframes(audio.tobytes())
-                    
-                    output_buffer.seek(0)
-                    return output_buffer.read()
-                    
-        except Exception as e:
-            logger.warning(f"Audio enhancement failed: {e}, using original audio")
-            return audio_data  # Return original if enhancement fails
-    
-    def _upsample_to_48khz_stereo(self, audio_data: bytes) -> bytes:
-        """Upsample audio to 48kHz stereo for better quality"""
-        try:
-            # Read the WAV data
-            with io.BytesIO(audio_data) as input_buffer:
-                with wave.open(input_buffer, 'rb') as wav_in:
-                    params = wav_in.getparams()
-                    frames = wav_in.readframes(params.nframes)
-                    
-                    # Convert to numpy array
-                    if params.sampwidth == 2:
-                        audio = np.frombuffer(frames, dtype=np.int16)
-                    else:
-                        audio = np.frombuffer(frames, dtype=np.int8)
-                    
-                    # Resample to 48kHz if needed
-                    if params.framerate != 48000:
-                        # Simple linear interpolation resampling
-                        old_rate = params.framerate
-                        new_rate = 48000
-                        duration = len(audio) / old_rate
-                        new_length = int(duration * new_rate)
-                        
-                        old_indices = np.arange(len(audio))
-                        new_indices = np.linspace(0, len(audio) - 1, new_length)
-                        audio = np.interp(new_indices, old_indices, audio).astype(np.int16)
-                    
-                    # Convert mono to stereo
-                    if params.nchannels == 1:
-                        audio = np.column_stack((audio, audio))
-                    
-                    # Create output WAV
-                    output_buffer = io.BytesIO()
-                    with wave.open(output_buffer, 'wb') as wav_out:
-                        wav_out.setnchannels(2)  # Stereo
-                        wav_out.setsampwidth(2)  # 16-bit
-                        wav_out.setframerate(48000)  # 48kHz
-                        wav_out.writeframes(audio.tobytes())
-                    
-                    output_buffer.seek(0)
-                    return output_buffer.read()
-                    
-        except Exception as e:
-            logger.error(f"Upsampling failed: {e}")
-            return audio_data  # Return original if conversion fails
+    def _render_output(self, pcm: np.ndarray, source_rate: int) -> bytes:
+        """Resample Piper's mono PCM to 48kHz, enhance it and encode stereo WAV"""
+        audio = pcm.astype(np.float32)
+
+        # Simple linear interpolation resampling
+        if source_rate != OUTPUT_SAMPLE_RATE and len(audio) > 1:
+            new_length = int(len(audio) * OUTPUT_SAMPLE_RATE / source_rate)
+            new_indices = np.linspace(0, len(audio) - 1, new_length, dtype=np.float32)
+            audio = np.interp(new_indices, np.arange(len(audio), dtype=np.float32), audio).astype(np.float32)
+
+        # Both output channels are identical, so enhance once in mono
+        audio = self._enhance_audio_quality(audio)
+        stereo = np.repeat(audio, 2)
+
+        output_buffer = io.BytesIO()
+        with wave.open(output_buffer, 'wb') as wav_out:
+            wav_out.setnchannels(2)  # Stereo
+            wav_out.setsampwidth(2)  # 16-bit
+            wav_out.setframerate(OUTPUT_SAMPLE_RATE)
+            wav_out.writeframes(stereo.tobytes())
+        return output_buffer.getvalue()
+
+    def _enhance_audio_quality(self, audio: np.ndarray) -> np.ndarray:
+        """Apply audio enhancements for more natural, conversational sound
+
+        Args:
+            audio: Mono float32 samples on the int16 scale
+
+        Returns:
+            Enhanced mono int16 samples
+        """
+        if audio.size == 0:
+            return audio.astype(np.int16)
+
+        # Normalize to -1 to 1 range for processing
+        max_val = np.abs(audio).max()
+        if max_val > 0:
+            audio = audio / max_val
+
+        # 1. Apply subtle compression for more consistent volume
+        threshold = 0.6
+        ratio = 3.0
+        magnitude = np.abs(audio)
+        audio = np.where(
+            magnitude > threshold,
+            np.sign(audio) * (threshold + (magnitude - threshold) / ratio),
+            audio
+        )
+
+        # 2. Add subtle warmth with harmonic enhancement
+        # Create a gentle saturation effect
+        warmth_amount = 0.15
+        warmed = np.tanh(audio * (1 + warmth_amount)) / (1 + warmth_amount * 0.5)
+        audio = audio * 0.7 + warmed * 0.3
+
+        # 3. Apply gentle EQ for presence
+        # Very simple high-frequency emphasis (crude high-shelf boost)
+        if len(audio) > 100:
+            audio[:-1] += np.diff(audio) * 0.05
+
+        # 4. Add micro-dynamics for liveliness
+        # Smooth random subtle volume variations
+        if len(audio) > 1000:
+            variations = np.random.normal(1.0, 0.02, len(audio) // 100).astype(np.float32)
+            variations = _gaussian_smooth(variations, sigma=5)
+            variation_indices = np.linspace(0, len(variations) - 1, len(audio), dtype=np.float32)
+            audio *= np.interp(variation_indices, np.arange(len(variations), dtype=np.float32), variations)
+
+        # 5. Soft limiting to prevent clipping while maintaining dynamics
+        audio = np.tanh(audio * 0.9) * 0.95
+
+        # Convert back to int16
+        return (audio * 32767).clip(-32768, 32767).astype(np.int16)
     
     async def get_available_voices(self) -> List[Dict[str, str]]:
         """Get list of available high-quality voices"""
@@ -673,7 +614,23 @@ class PiperTTSHandler(TTSHandler):
         buffer.seek(0)
         return buffer.read()
     
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = super().get_metrics()
+        metrics["workers"] = self.worker_pool.get_stats()
+        return metrics
+
     async def cleanup(self) -> None:
         """Clean up resources"""
+        await self.worker_pool.close()
         self.set_state(VoiceState.IDLE)
-        logger.info("Piper TTS handler cleaned up")
\ No newline at end of file
+        logger.info("Piper TTS handler cleaned up")
+
+
+def _gaussian_smooth(values: np.ndarray, sigma: float) -> np.ndarray:
+    """Gaussian smoothing (same kernel and edge handling as scipy's gaussian_filter1d)"""
+    radius = int(4.0 * sigma + 0.5)
+    x = np.arange(-radius, radius + 1, dtype=np.float32)
+    kernel = np.exp(-0.5 * (x / sigma) ** 2)
+    kernel /= kernel.sum()
+    padded = np.pad(values, radius, mode="symmetric")
+    return np.convolve(padded, kernel, mode="valid").astype(values.dtype)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Long-running Piper synthesis worker
+Loads one Piper voice once and serves synthesis requests over stdin/stdout,
+so the ONNX model is not reloaded for every utterance. Started and managed by
+PiperWorkerPool (piper_pool.py); runs as a plain script so it does not import
+the voice package and its STT/VAD dependencies.
+
+Protocol (one request at a time):
+    stdin:  one JSON object per line
+            {"text": "...", "length_scale": 1.1, "noise_scale": 0.667,
+             "noise_w": 0.8, "sentence_silence": 0.2}   or   {"ping": true}
+    stdout: a JSON header line per frame, followed by that many bytes of raw
+            16-bit mono PCM for "audio" frames:
+            {"audio": <bytes>}  ...  {"done": true, "sample_rate": 22050}
+            {"error": "..."} ends a failed request; {"pong": true} answers a ping
+
+Usage:
+    python piper_worker.py --model en_US-amy-medium.onnx --config en_US-amy-medium.onnx.json
+"""
+import argparse
+import json
+import sys
+
+
+def _load_voice(model: str, config: str):
+    from piper import PiperVoice
+    return PiperVoice.load(model, config_path=config, use_cuda=False)
+
+
+def _synthesize(voice, request):
+    """Yield raw PCM chunks (one per sentence) for a request"""
+    text = request["text"]
+    if hasattr(voice, "synthesize_stream_raw"):
+        # piper-tts 1.2
+        yield from voice.synthesize_stream_raw(
+            text,
+            length_scale=request.get("length_scale"),
+            noise_scale=request.get("noise_scale"),
+            noise_w=request.get("noise_w"),
+            sentence_silence=request.get("sentence_silence", 0.0)
+        )
+        return
+
+    # piper-tts 1.3+
+    from piper import SynthesisConfig
+    syn_config = SynthesisConfig(
+        length_scale=request.get("length_scale"),
+        noise_scale=request.get("noise_scale"),
+        noise_w_scale=request.get("noise_w")
+    )
+    silence = b"\x00\x00" * int(voice.config.sample_rate * request.get("sentence_silence", 0.0))
+    for chunk in voice.synthesize(text, syn_config=syn_config):
+        yield chunk.audio_int16_bytes + silence
+
+
+def _write_header(out, header) -> None:
+    out.write(json.dumps(header).encode("utf-8") + b"\n")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Persistent Piper synthesis worker")
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--config", required=True)
+    args = parser.parse_args()
+
+    out = sys.stdout.buffer
+    try:
+        voice = _load_voice(args.model, args.config)
+    except Exception as e:
+        _write_header(out, {"error": f"failed to load voice: {e}", "fatal": True})
+        out.flush()
+        return 1
+
+    sample_rate = voice.config.sample_rate
+    _write_header(out, {"ready": True, "sample_rate": sample_rate})
+    out.flush()
+
+    for line in sys.stdin.buffer:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+            if request.get("ping"):
+                _write_header(out, {"pong": True})
+            else:
+                for pcm in _synthesize(voice, request):
+                    _write_header(out, {"audio": len(pcm)})
+                    out.write(pcm)
+                    out.flush()
+                _write_header(out, {"done": True, "sample_rate": sample_rate})
+        except Exception as e:
+            _write_header(out, {"error": str(e)})
+        out.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
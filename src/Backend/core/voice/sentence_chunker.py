@@ -0,0 +1,116 @@
+"""
+Sentence Chunker for Streaming TTS
+Splits an incoming LLM token stream into speakable chunks so synthesis can
+start on the first sentence while the rest of the answer is still generating.
+
+- Chunks end at sentence boundaries (. ! ? … and line breaks)
+- Abbreviations ("Dr.", "e.g.") and list numbers at the start of a line
+  ("1.") do not end a sentence; other numbers ("until 9.") do
+- The first chunk may end at a clause boundary (, ; :) once it is long
+  enough, to get audio out sooner; later chunks only do so past max_chars
+- Text with no punctuation at all is cut at a word boundary past max_chars
+"""
+import re
+from typing import List, Optional
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) then whitespace
+_SENTENCE_END = re.compile(r'[.!?…]+["\')\]]*\s+|\n+')
+_CLAUSE_END = re.compile(r'[,;:—–]\s+')
+
+_ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "st", "jr", "sr", "vs", "etc", "approx",
+    "e.g", "i.e", "no", "inc", "ltd", "mt", "ft", "oz", "mg", "ml"
+}
+
+
+class SentenceChunker:
+    """Incremental splitter: feed() text deltas, flush() at end of stream"""
+
+    def __init__(
+        self,
+        min_chars: int = 12,
+        first_chunk_chars: int = 40,
+        max_chars: int = 220
+    ):
+        """Initialize chunker
+
+        Args:
+            min_chars: Shorter sentences are merged into the next chunk
+            first_chunk_chars: First chunk may end at a clause past this length
+            max_chars: Later chunks end at a clause (or word) past this length
+        """
+        self.min_chars = min_chars
+        self.first_chunk_chars = first_chunk_chars
+        self.max_chars = max_chars
+        self.buffer = ""
+        self.chunks_emitted = 0
+
+    def _is_sentence_end(self, end: int) -> bool:
+        """Reject boundaries that follow an abbreviation or a list number"""
+        text = self.buffer[:end].rstrip()
+        if not text.endswith("."):
+            return True
+        body = text.rstrip(".")
+        word = body.rsplit(None, 1)[-1] if body else ""
+        if word.lower() in _ABBREVIATIONS or len(word) == 1 and not word.isdigit():
+            return False
+        if word.isdigit():
+            # "1." opening a line is a list marker; "open until 9." ends a sentence
+            before = body[:len(body) - len(word)].rstrip(" \t")
+            return not (before == "" or before.endswith("\n"))
+        return True
+
+    def _find_cut(self) -> Optional[int]:
+        """Index just past the next chunk boundary in the buffer, if any"""
+        for match in _SENTENCE_END.finditer(self.buffer):
+            if len(self.buffer[:match.start()].strip()) < self.min_chars:
+                continue
+            if match.group().startswith("\n") or self._is_sentence_end(match.start() + 1):
+                return match.end()
+
+        limit = self.first_chunk_chars if self.chunks_emitted == 0 else self.max_chars
+        if len(self.buffer) < limit:
+            return None
+
+        clauses = [m.end() for m in _CLAUSE_END.finditer(self.buffer) if m.start() >= self.min_chars]
+        if clauses:
+            return clauses[-1] if self.chunks_emitted else clauses[0]
+
+        if len(self.buffer) >= self.max_chars:
+            space = self.buffer.rfind(" ", self.min_chars, self.max_chars)
+            return space + 1 if space > 0 else self.max_chars
+        return None
+
+    def feed(self, delta: str) -> List[str]:
+        """Add streamed text; returns chunks that are complete"""
+        self.buffer += delta
+        chunks = []
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            chunk = self.buffer[:cut].strip()
+            self.buffer = self.buffer[cut:]
+            if chunk:
+                chunks.append(chunk)
+                self.chunks_emitted += 1
+        return chunks
+
+    def flush(self) -> Optional[str]:
+        """Whatever is left once the stream ends"""
+        chunk = self.buffer.strip()
+        self.buffer = ""
+        if not chunk:
+            return None
+        self.chunks_emitted += 1
+        return chunk
+
+
+def split_sentences(text: str, **kwargs) -> List[str]:
+    """Split complete text into the chunks a stream of it would produce"""
+    chunker = SentenceChunker(**kwargs)
+    chunks = chunker.feed(text)
+    tail = chunker.flush()
+    if tail:
+        chunks.append(tail)
+    return chunks
@@ -13,8 +13,14 @@ from enum import Enum
 from abc import ABC, abstractmethod
 import json
 
+from .audio_ring_buffer import AudioRingBuffer
+
 logger = logging.getLogger(__name__)
 
+# Utterance audio kept per session (16kHz 16-bit PCM)
+SESSION_AUDIO_BUFFER_MS = 30000
+SESSION_SAMPLE_RATE = 16000
+
 class ConnectionType(Enum):
     """Connection types for streaming"""
     WEBSOCKET = "websocket"
@@ -87,7 +93,11 @@ class StreamingSession:
     connection_type: ConnectionType
     metrics: ConnectionMetrics = field(default_factory=ConnectionMetrics)
     start_time: float = field(default_factory=time.time)
-    audio_buffer: List[bytes] = field(default_factory=list)
+    audio_buffer: AudioRingBuffer = field(
+        default_factory=lambda: AudioRingBuffer.for_duration(
+            SESSION_AUDIO_BUFFER_MS, SESSION_SAMPLE_RATE, dtype=np.int16
+        )
+    )
     transcript_buffer: List[str] = field(default_factory=list)
     is_speaking: bool = False
     last_speech_time: float = 0
@@ -339,5 +349,5 @@ class StreamingManager:
             'latency_ms': session.metrics.latency_ms,
             'packet_loss': session.metrics.packet_loss_rate,
             'transcripts_count': len(session.transcript_buffer),
-            'audio_chunks_buffered': len(session.audio_buffer)
+            'audio_buffered_ms': session.audio_buffer.duration_ms(SESSION_SAMPLE_RATE)
         }
\ No newline at end of file
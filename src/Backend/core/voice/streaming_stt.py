@@ -8,7 +8,6 @@ import time
 import logging
 from typing import Dict, Any, Optional, List, Callable
 from dataclasses import dataclass, field
-from collections import deque
 import threading
 import queue
 
@@ -20,6 +19,7 @@ except ImportError:
     logging.warning("Whisper not available for streaming STT")
 
 from .base_handler import STTHandler, STTResult, AudioConfig, VoiceState
+from .audio_ring_buffer import AudioRingBuffer
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +31,7 @@ class StreamingConfig:
     buffer_duration_ms: int = 1000  # Buffer before processing
     overlap_duration_ms: int = 200  # Overlap between chunks
     partial_interval_ms: int = 300  # How often to emit partials
+    max_buffer_ms: int = 10000  # Audio held while a partial is being transcribed
     enable_vad: bool = True  # Use VAD to optimize processing
     temperature: float = 0.0  # Deterministic decoding
     compression_ratio_threshold: float = 2.4
@@ -54,7 +55,10 @@ class StreamingSTTHandler(STTHandler):
         super().__init__(AudioConfig())
         self.stream_config = config or StreamingConfig()
         self.model = None
-        self.audio_buffer = deque(maxlen=100)  # Circular buffer
+        # Audio awaiting the next partial (used by the processing thread)
+        self.audio_buffer = AudioRingBuffer.for_duration(
+            self.stream_config.max_buffer_ms, self.config.sample_rate
+        )
         self.transcript_buffer: List[TranscriptSegment] = []
         self.processing_thread: Optional[threading.Thread] = None
         self.should_stop = threading.Event()
@@ -111,7 +115,13 @@ class StreamingSTTHandler(STTHandler):
         """Transcribe streaming audio with partial results"""
         
         self.session_start_time = time.time()
-        accumulated_audio = []
+        accumulated_audio = AudioRingBuffer.for_duration(
+            2 * self.stream_config.buffer_duration_ms, self.config.sample_rate
+        )
+        overlap_samples = int(
+            self.stream_config.overlap_duration_ms * 
+            self.config.sample_rate / 1000
+        )
         last_final_end = 0
         
         try:
@@ -127,15 +137,12 @@ class StreamingSTTHandler(STTHandler):
                 self.audio_queue.put(audio_chunk)
                 
                 # Check if we should process
-                total_duration = len(np.concatenate(accumulated_audio)) / self.config.sample_rate * 1000
+                total_duration = accumulated_audio.duration_ms(self.config.sample_rate)
                 
                 if total_duration >= self.stream_config.buffer_duration_ms:
-                    # Process accumulated audio
-                    full_audio = np.concatenate(accumulated_audio)
-                    
-                    # Get partial result
+                    # Get partial result (a view; nothing is appended until this returns)
                     partial_result = await self._process_audio_chunk(
-                        full_audio,
+                        accumulated_audio.latest(),
                         language=language or self.stream_config.language,
                         is_final=False
                     )
@@ -144,20 +151,13 @@ class StreamingSTTHandler(STTHandler):
                         yield partial_result
                     
                     # Keep overlap for context
-                    overlap_samples = int(
-                        self.stream_config.overlap_duration_ms * 
-                        self.config.sample_rate / 1000
-                    )
-                    
-                    if len(full_audio) > overlap_samples:
-                        accumulated_audio = [full_audio[-overlap_samples:]]
+                    accumulated_audio.keep_latest(overlap_samples)
                     
         finally:
             # Process any remaining audio
-            if accumulated_audio:
-                full_audio = np.concatenate(accumulated_audio)
+            if len(accumulated_audio):
                 final_result = await self._process_audio_chunk(
-                    full_audio,
+                    accumulated_audio.latest(),
                     language=language or self.stream_config.language,
                     is_final=True
                 )
@@ -268,8 +268,12 @@ class StreamingSTTHandler(STTHandler):
     def _processing_loop(self) -> None:
         """Background thread for continuous processing"""
         
-        accumulated_audio = []
+        accumulated_audio = self.audio_buffer
         last_process_time = time.time()
+        overlap_samples = int(
+            self.stream_config.overlap_duration_ms * 
+            self.config.sample_rate / 1000
+        )
         
         while not self.should_stop.is_set():
             try:
@@ -284,12 +288,9 @@ class StreamingSTTHandler(STTHandler):
                 current_time = time.time()
                 time_since_last = (current_time - last_process_time) * 1000
                 
-                if accumulated_audio and time_since_last >= self.stream_config.partial_interval_ms:
-                    # Combine accumulated audio
-                    full_audio = np.concatenate(accumulated_audio)
-                    
-                    # Process with Whisper
-                    result = self._transcribe_with_whisper(full_audio)
+                if len(accumulated_audio) and time_since_last >= self.stream_config.partial_interval_ms:
+                    # Process with Whisper (this thread is the only writer)
+                    result = self._transcribe_with_whisper(accumulated_audio.latest())
                     
                     if result and result.get('text'):
                         # Put result in queue
@@ -304,14 +305,7 @@ class StreamingSTTHandler(STTHandler):
                     last_process_time = current_time
                     
                     # Keep some audio for context
-                    overlap_samples = int(
-                        self.stream_config.overlap_duration_ms * 
-                        self.config.sample_rate / 1000
-                    )
-                    if len(full_audio) > overlap_samples:
-                        accumulated_audio = [full_audio[-overlap_samples:]]
-                    else:
-                        accumulated_audio = [full_audio]
+                    accumulated_audio.keep_latest(overlap_samples)
                         
             except Exception as e:
                 logger.error(f"Error in processing loop: {e}")
@@ -1,6 +1,10 @@
 """
 Silero Voice Activity Detection handler for V5
 Detects speech segments in audio - completely offline
+
+Inference runs through the process-wide batched SileroVADModel
+(silero_vad.py): whole buffers are scored in a few batched model calls, and
+streams keep their recurrent state in per-session VADStreamState objects.
 """
 import torch
 import numpy as np
@@ -9,9 +13,11 @@ import logging
 import time
 from typing import Dict, Any, Optional, Union, List, Callable
 from pathlib import Path
-import onnxruntime as ort
 
 from .base_handler import VADHandler, VADResult, AudioConfig, VoiceState
+from .silero_vad import (
+    SAMPLE_RATE, WINDOW_SAMPLES, SileroVADModel, VADStreamState, frame_windows, get_shared_vad_model
+)
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +29,7 @@ class SileroVADHandler(VADHandler):
         super().__init__(config)
         self.model = None
         self.model_path = Path("models/voice/silero/silero_vad.onnx")
+        self.vad_model: Optional[SileroVADModel] = None
         self.ort_session = None
 
         # VAD parameters - tuned for Silero VAD model
@@ -31,16 +38,19 @@ class SileroVADHandler(VADHandler):
         self.min_silence_duration_ms = 100
         self.speech_pad_ms = 30
 
-        # Silero VAD hidden state for streaming (renamed to avoid conflict with base class state)
-        self.vad_state = None  # Combined state tensor for ONNX model
-        self.last_sr = 16000  # Sample rate
-        self.reset_states()
+        # Silero VAD hidden state for single-window calls (renamed to avoid conflict
+        # with base class state); sessions pass their own VADStreamState to detect()
+        self.vad_state = VADStreamState()
+        self.last_sr = SAMPLE_RATE
+        self._onnx_failed_logged = False
+
+    def reset_states(self):
+        """Reset the handler's own Silero VAD hidden state"""
+        self.vad_state.reset()
 
-    def reset_states(self, batch_size: int = 1):
-        """Reset the hidden states for the Silero VAD model"""
-        # Silero VAD expects a single state tensor with shape [2, batch, 128]
-        # where state[0] is h and state[1] is c
-        self.vad_state = np.zeros((2, batch_size, 128), dtype=np.float32)
+    def new_stream_state(self) -> VADStreamState:
+        """Fresh recurrent state for one audio stream (e.g. a voice session)"""
+        return VADStreamState()
 
     async def initialize(self) -> bool:
         """Initialize VAD model"""
@@ -57,10 +67,12 @@ class SileroVADHandler(VADHandler):
             logger.info(f"Loading Silero VAD model from {self.model_path}")
             
             loop = asyncio.get_event_loop()
-            self.ort_session = await loop.run_in_executor(
+            self.vad_model = await loop.run_in_executor(
                 None,
-                self._load_model_sync
+                get_shared_vad_model,
+                self.model_path
             )
+            self.ort_session = self.vad_model.session
             
             if self.ort_session:
                 logger.info("✅ Silero VAD model loaded successfully")
@@ -82,27 +94,6 @@ class SileroVADHandler(VADHandler):
             self.set_state(VoiceState.ERROR)
             return False
     
-    def _load_model_sync(self):
-        """Load ONNX model synchronously"""
-        try:
-            import onnxruntime as ort
-            # Create ONNX inference session
-            sess_options = ort.SessionOptions()
-            sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
-            
-            session = ort.InferenceSession(
-                str(self.model_path),
-                sess_options,
-                providers=['CPUExecutionProvider']
-            )
-            return session
-        except ImportError:
-            logger.warning("onnxruntime not installed, will use PyTorch model")
-            return None
-        except Exception as e:
-            logger.error(f"Error loading ONNX model: {e}")
-            return None
-    
     async def _load_pytorch_model(self):
         """Load PyTorch model as fallback"""
         try:
@@ -123,13 +114,16 @@ class SileroVADHandler(VADHandler):
     async def detect(
         self,
         audio: Union[np.ndarray, bytes],
-        threshold: Optional[float] = None
+        threshold: Optional[float] = None,
+        stream_state: Optional[VADStreamState] = None
     ) -> VADResult:
         """Detect voice activity in audio
         
         Args:
             audio: Audio data as numpy array or bytes
             threshold: Detection threshold (0.0-1.0)
+            stream_state: Continue this stream's recurrent state (None scores
+                the audio as a complete clip)
             
         Returns:
             VADResult with detection results
@@ -151,7 +145,7 @@ class SileroVADHandler(VADHandler):
             audio = self._preprocess_audio_for_vad(audio)
 
             # Run VAD detection directly (ONNX is thread-safe)
-            speech_segments = self._detect_speech_sync(audio, threshold)
+            speech_segments = self._detect_speech_sync(audio, threshold, stream_state)
             
             # Calculate metrics
             has_speech = len(speech_segments) > 0
@@ -199,26 +193,33 @@ class SileroVADHandler(VADHandler):
         """
         all_segments = []
         total_audio_length = 0
+        stream_state = self.new_stream_state()
         
         async for chunk in audio_stream:
-            # Detect in this chunk
-            result = await self.detect(chunk, self.threshold)
+            # Detect in this chunk, continuing the stream's model state
+            chunk_start_ms = total_audio_length / SAMPLE_RATE * 1000
+            result = await self.detect(chunk, self.threshold, stream_state)
             
             # Adjust segment timestamps based on total audio processed
             adjusted_segments = [
-                (start + total_audio_length, end + total_audio_length)
+                (start + chunk_start_ms, end + chunk_start_ms)
                 for start, end in result.speech_segments
             ]
             
             all_segments.extend(adjusted_segments)
-            total_audio_length += len(chunk)
+            total_audio_length = (
+                stream_state.windows_processed * WINDOW_SAMPLES + len(stream_state.pending)
+            )
             
             # Call callback if provided
             if callback and result.has_speech:
                 await callback(result)
         
         # Merge nearby segments
-        merged_segments = self._merge_segments(all_segments)
+        merged_segments = [
+            (start, end) for start, end in self._merge_segments(all_segments)
+            if end - start >= self.min_speech_duration_ms
+        ]
         
         return VADResult(
             has_speech=len(merged_segments) > 0,
@@ -227,104 +228,89 @@ class SileroVADHandler(VADHandler):
             energy_level=0.5  # Average energy
         )
     
-    def _detect_speech_sync(self, audio: np.ndarray, threshold: float) -> List[tuple]:
-        """Synchronously detect speech segments"""
-        segments = []
-        
-        # Process audio in windows
-        window_size = 512  # ~32ms at 16kHz
-        hop_size = 160     # ~10ms at 16kHz
-        
-        in_speech = False
-        speech_start = 0
-        silence_samples = 0
-        
-        for i in range(0, len(audio) - window_size, hop_size):
-            window = audio[i:i + window_size]
-            
-            # Get speech probability for this window
-            prob = self._get_speech_probability(window)
-            
-            if prob > threshold:
-                if not in_speech:
-                    # Start of speech
-                    in_speech = True
-                    speech_start = i
-                    silence_samples = 0
-            else:
-                if in_speech:
-                    silence_samples += hop_size
-                    
-                    # Check if silence is long enough to end speech
-                    silence_ms = (silence_samples / self.config.sample_rate) * 1000
-                    if silence_ms > self.min_silence_duration_ms:
-                        # End of speech
-                        speech_end = i
-                        
-                        # Check minimum duration
-                        duration_ms = ((speech_end - speech_start) / self.config.sample_rate) * 1000
-                        if duration_ms >= self.min_speech_duration_ms:
-                            # Convert to milliseconds
-                            start_ms = (speech_start / self.config.sample_rate) * 1000
-                            end_ms = (speech_end / self.config.sample_rate) * 1000
-                            segments.append((start_ms, end_ms))
-                        
-                        in_speech = False
-                        silence_samples = 0
-        
-        # Handle speech that extends to the end
-        if in_speech:
-            speech_end = len(audio)
-            duration_ms = ((speech_end - speech_start) / self.config.sample_rate) * 1000
-            if duration_ms >= self.min_speech_duration_ms:
-                start_ms = (speech_start / self.config.sample_rate) * 1000
-                end_ms = (speech_end / self.config.sample_rate) * 1000
-                segments.append((start_ms, end_ms))
-        
-        return segments
-    
+    def _detect_speech_sync(
+        self,
+        audio: np.ndarray,
+        threshold: float,
+        stream_state: Optional[VADStreamState] = None
+    ) -> List[tuple]:
+        """Synchronously detect speech segments
+
+        Returns:
+            (start_ms, end_ms) tuples relative to the start of `audio`
+        """
+        # Stream samples carried over from the previous chunk start the first window early
+        carried = len(stream_state.pending) if stream_state is not None else 0
+        probs = self._speech_probabilities(audio, stream_state)
+        if len(probs) == 0:
+            return []
+
+        # Runs of speech windows as [start, end) window indices
+        speech = np.concatenate(([0], (probs > threshold).view(np.int8), [0]))
+        edges = np.flatnonzero(np.diff(speech))
+        starts, ends = edges[0::2], edges[1::2]
+        if len(starts) == 0:
+            return []
+
+        # Join runs separated by less than the minimum silence
+        window_ms = WINDOW_SAMPLES / SAMPLE_RATE * 1000
+        gaps_ms = (starts[1:] - ends[:-1]) * window_ms
+        breaks = np.flatnonzero(gaps_ms > self.min_silence_duration_ms)
+        starts = starts[np.concatenate(([0], breaks + 1))]
+        ends = ends[np.concatenate((breaks, [len(ends) - 1]))]
+
+        audio_ms = len(audio) / SAMPLE_RATE * 1000
+        offset_ms = carried / SAMPLE_RATE * 1000
+        start_ms = np.maximum(starts * window_ms - offset_ms - self.speech_pad_ms, 0.0)
+        end_ms = np.minimum(ends * window_ms - offset_ms + self.speech_pad_ms, audio_ms)
+        # Speech running into the unscored tail extends to the end of the audio
+        end_ms[ends == len(probs)] = audio_ms
+
+        keep = (end_ms - start_ms) >= self.min_speech_duration_ms
+        if stream_state is not None:
+            # Speech touching a chunk edge may continue in the neighbouring
+            # chunk; detect_stream applies the minimum after merging
+            keep |= (starts == 0) | (ends == len(probs))
+        return [(float(s), float(e)) for s, e in zip(start_ms[keep], end_ms[keep])]
+
+    def _speech_probabilities(
+        self,
+        audio: np.ndarray,
+        stream_state: Optional[VADStreamState] = None
+    ) -> np.ndarray:
+        """Speech probability per WINDOW_SAMPLES window"""
+        if self.vad_model is not None and self.vad_model.session is not None:
+            try:
+                if stream_state is not None:
+                    return self.vad_model.stream_probabilities(audio, stream_state)
+                return self.vad_model.probabilities(audio)
+            except Exception as e:
+                if not self._onnx_failed_logged:
+                    logger.error(f"Error in speech detection, using energy VAD: {e}")
+                    self._onnx_failed_logged = True
+
+        if stream_state is not None:
+            # Keep window alignment consistent with the model path
+            audio = np.concatenate([stream_state.pending, audio])
+            used = len(audio) // WINDOW_SAMPLES * WINDOW_SAMPLES
+            stream_state.pending = audio[used:]
+            stream_state.windows_processed += used // WINDOW_SAMPLES
+        windows = frame_windows(audio)[:, -WINDOW_SAMPLES:]
+
+        if self.model is not None:
+            return np.array([self._get_speech_probability(w) for w in windows], dtype=np.float32)
+        return np.minimum(np.mean(windows ** 2, axis=1), 1.0)
+
     def _get_speech_probability(self, window: np.ndarray) -> float:
         """Get speech probability for audio window"""
         try:
             if self.ort_session:
-                # Use ONNX model with proper inputs
-                # Ensure window is float32 and properly shaped
-                if window.dtype != np.float32:
-                    window = window.astype(np.float32)
-
-                # Silero expects (batch_size, chunk_size)
-                if window.ndim == 1:
-                    input_tensor = window.reshape(1, -1)
-                else:
-                    input_tensor = window
-
-                # Prepare sample rate tensor
-                sr = np.array(self.last_sr, dtype=np.int64)
-
-                # Run inference with all required inputs
-                outputs = self.ort_session.run(
-                    None,
-                    {
-                        'input': input_tensor,
-                        'state': self.vad_state,
-                        'sr': sr
-                    }
+                # One window through the handler's own stream state
+                probs = self.vad_model.stream_probabilities(
+                    np.asarray(window, dtype=np.float32).reshape(-1)[:WINDOW_SAMPLES],
+                    self.vad_state
                 )
-
-                # Update state for next iteration
-                if len(outputs) > 1 and outputs[1] is not None:
-                    self.vad_state = outputs[1]
-
-                # Extract probability from output shape (batch_size, 1)
-                prob_array = outputs[0]
-                if isinstance(prob_array, np.ndarray):
-                    # Silero outputs shape (batch_size, 1)
-                    if prob_array.shape == (1, 1):
-                        return float(prob_array[0, 0])
-                    else:
-                        return float(prob_array.flatten()[0])
-                else:
-                    return float(prob_array)
+                return float(probs[-1]) if len(probs) else 0.0
 
             elif self.model:
                 # Use PyTorch model
@@ -474,8 +460,17 @@ class SileroVADHandler(VADHandler):
         
         return merged
     
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get performance metrics, including shared model batching stats"""
+        metrics = super().get_metrics()
+        if self.vad_model is not None:
+            metrics["batched_model"] = self.vad_model.get_stats()
+        return metrics
+
     async def cleanup(self) -> None:
         """Clean up resources"""
+        # The shared model stays loaded for other handlers
+        self.vad_model = None
         self.ort_session = None
         self.model = None
         self.reset_states()
@@ -1,43 +1,115 @@
 """
-Voice Synthesis Cache - Redis-backed audio caching
+Voice Synthesis Cache - two-tier audio caching
 Caches synthesized audio to avoid regenerating identical requests
+
+- Tier 1: per-process LRU of decoded WAV bytes, bounded by total size;
+  entries expire after local_ttl, and invalidations are published on a
+  pub/sub channel so other workers drop their copies immediately
+- Tier 2: Redis (async client), audio stored compressed (FLAC by default,
+  Opus optional) so a cached clip costs a fraction of its WAV size
 """
 
+import asyncio
 import hashlib
+import io
+import json
 import logging
-import redis
-from typing import Optional, Dict
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Dict, Set, Tuple
 from datetime import timedelta
 
 logger = logging.getLogger(__name__)
 
+try:
+    import soundfile as sf
+    SOUNDFILE_AVAILABLE = True
+except ImportError:
+    SOUNDFILE_AVAILABLE = False
+    logger.warning("soundfile not installed - voice cache stores uncompressed WAV")
+
+# In-process tier size and Redis audio codec (flac, opus or wav)
+VOICE_CACHE_LOCAL_MB = int(os.getenv("VOICE_CACHE_LOCAL_MB", "64"))
+VOICE_CACHE_CODEC = os.getenv("VOICE_CACHE_CODEC", "flac").lower()
+# Seconds an in-process entry is served before it is re-read from Redis
+VOICE_CACHE_LOCAL_TTL = float(os.getenv("VOICE_CACHE_LOCAL_TTL", "300"))
+
+# Pub/sub channel for invalidations ("{node_id}:{personality_id}", "*" = all)
+_INVALIDATE_CHANNEL = "voice:invalidate"
+
+# First byte of a stored audio payload
+_CODEC_HEADERS = {"wav": b"w", "flac": b"f", "opus": b"o"}
+_SOUNDFILE_FORMATS = {"flac": ("FLAC", "PCM_16"), "opus": ("OGG", "OPUS")}
+
+
+def _transcode(audio: bytes, file_format: str, subtype: str) -> bytes:
+    data, sample_rate = sf.read(io.BytesIO(audio), dtype="int16")
+    output = io.BytesIO()
+    sf.write(output, data, sample_rate, format=file_format, subtype=subtype)
+    return output.getvalue()
+
+
+def encode_audio(wav: bytes, codec: str = VOICE_CACHE_CODEC) -> bytes:
+    """Compress WAV audio for storage, falling back to FLAC, then plain WAV
+
+    Opus is lossy and only accepts 8/12/16/24/48kHz audio; FLAC is lossless.
+    """
+    if SOUNDFILE_AVAILABLE:
+        for candidate in dict.fromkeys([codec, "flac"]):
+            if candidate not in _SOUNDFILE_FORMATS:
+                continue
+            try:
+                return _CODEC_HEADERS[candidate] + _transcode(wav, *_SOUNDFILE_FORMATS[candidate])
+            except Exception as e:
+                logger.debug(f"Voice cache {candidate} encode failed: {e}")
+    return _CODEC_HEADERS["wav"] + wav
+
+
+def decode_audio(payload: bytes) -> bytes:
+    """WAV bytes from a stored payload"""
+    if payload[:4] == b"RIFF":
+        # Entry written before audio was compressed
+        return payload
+    header, body = payload[:1], payload[1:]
+    if header == _CODEC_HEADERS["wav"]:
+        return body
+    if header in (_CODEC_HEADERS["flac"], _CODEC_HEADERS["opus"]):
+        if not SOUNDFILE_AVAILABLE:
+            raise ValueError("soundfile required to decode compressed voice cache entry")
+        return _transcode(body, "WAV", "PCM_16")
+    raise ValueError(f"Unknown voice cache payload format: {header!r}")
+
 
 class VoiceCache:
     """
-    Redis-based cache for synthesized voice audio
+    Two-tier cache for synthesized voice audio
 
     Features:
     - Content-based caching (hash of text + personality + settings)
-    - Automatic expiration (default 7 days)
+    - In-process LRU in front of Redis for repeated phrases
+    - Compressed audio in Redis with automatic expiration (default 7 days)
     - Size limits to prevent cache bloat
+    - Per-personality key index for invalidation
     - Cache statistics tracking
-    - Efficient binary storage for audio data
 
     Cache Key Format:
-        voice:audio:{hash}
+        voice:audio:{hash}            codec byte + compressed audio
         voice:metadata:{hash}
+        voice:personality:{id}        set of hashes cached for a personality
         voice:stats
 
     Example:
         cache = VoiceCache()
 
         # Try to get from cache
-        audio = cache.get(text, personality_id, language)
+        audio = await cache.get(text, personality_id, language)
 
         if audio is None:
             # Cache miss - synthesize
             audio = await synthesize_voice(...)
-            cache.set(text, personality_id, language, audio, metadata)
+            await cache.set(text, personality_id, audio, metadata, language)
     """
 
     def __init__(
@@ -46,7 +118,11 @@ class VoiceCache:
         redis_port: int = 6379,
         redis_db: int = 0,
         ttl_days: int = 7,
-        max_audio_size_mb: int = 10
+        max_audio_size_mb: int = 10,
+        local_max_mb: int = VOICE_CACHE_LOCAL_MB,
+        local_ttl: float = VOICE_CACHE_LOCAL_TTL,
+        codec: str = VOICE_CACHE_CODEC,
+        retry_seconds: float = 30.0
     ):
         """
         Initialize voice cache
@@ -57,29 +133,121 @@ class VoiceCache:
             redis_db: Redis database number
             ttl_days: Time-to-live for cached audio (days)
             max_audio_size_mb: Maximum audio file size to cache (MB)
+            local_max_mb: Size of the in-process tier (MB, 0 disables it)
+            local_ttl: Seconds an in-process entry is served (capped at ttl_days)
+            codec: Audio codec in Redis (flac, opus or wav)
+            retry_seconds: Seconds before retrying an unreachable Redis
         """
         self.redis_host = redis_host
         self.redis_port = redis_port
         self.redis_db = redis_db
         self.ttl = timedelta(days=ttl_days)
         self.max_audio_size = max_audio_size_mb * 1024 * 1024  # Convert to bytes
+        self.local_max_bytes = local_max_mb * 1024 * 1024
+        self.local_ttl = min(local_ttl, self.ttl.total_seconds())
+        self.codec = codec
+        self.retry_seconds = retry_seconds
+
+        self.redis_client = None
+        self._retry_at = 0.0
+        self._connect_lock = asyncio.Lock()
+        self._node_id = uuid.uuid4().hex[:12]
+        self._listener: Optional[asyncio.Task] = None
+
+        # cache key -> (entry, size, expires_at, personality);
+        # personality -> cache keys held locally
+        self._local: "OrderedDict[str, Tuple[Dict, int, float, str]]" = OrderedDict()
+        self._local_bytes = 0
+        self._local_personalities: Dict[str, Set[str]] = {}
+
+        self.stats = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "invalidations": 0,
+            "stored_bytes": 0,
+            "wav_bytes": 0
+        }
+
+    async def _get_redis(self):
+        """Async Redis client, or None while Redis is unreachable"""
+        if self.redis_client is not None:
+            return self.redis_client
+        if time.monotonic() < self._retry_at:
+            return None
 
-        try:
-            self.redis_client = redis.Redis(
-                host=redis_host,
-                port=redis_port,
-                db=redis_db,
-                decode_responses=False  # We store binary data
-            )
-            # Test connection
-            self.redis_client.ping()
+        async with self._connect_lock:
+            if self.redis_client is not None or time.monotonic() < self._retry_at:
+                return self.redis_client
+            try:
+                import redis.asyncio as aioredis
+                client = aioredis.Redis(
+                    host=self.redis_host,
+                    port=self.redis_port,
+                    db=self.redis_db,
+                    decode_responses=False  # We store binary data
+                )
+                # Test connection
+                await client.ping()
+            except Exception as e:
+                logger.error(f"Failed to connect to Redis: {e}")
+                self._retry_at = time.monotonic() + self.retry_seconds
+                return None
+
+            self.redis_client = client
+            self._listener = asyncio.create_task(self._listen(client))
             logger.info(
                 f"✓ Voice cache connected to Redis "
-                f"({redis_host}:{redis_port}/{redis_db})"
+                f"({self.redis_host}:{self.redis_port}/{self.redis_db})"
             )
+        return self.redis_client
+
+    def _redis_failed(self, error: Exception) -> None:
+        logger.error(f"Voice cache Redis error: {error}")
+        self.redis_client = None
+        self._retry_at = time.monotonic() + self.retry_seconds
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+    async def _listen(self, client) -> None:
+        """Drop local copies of audio invalidated by other workers"""
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(_INVALIDATE_CHANNEL)
+            async for message in pubsub.listen():
+                data = message.get("data")
+                if isinstance(data, bytes):
+                    data = data.decode("utf-8")
+                node_id, _, personality_id = str(data).partition(":")
+                if node_id == self._node_id:
+                    continue
+                if personality_id == "*":
+                    self._local_clear()
+                else:
+                    self._local_invalidate(personality_id)
+                self.stats["invalidations"] += 1
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            logger.error(f"Failed to connect to Redis: {e}")
-            self.redis_client = None
+            # Invalidations may have been missed; stop trusting the local tier
+            logger.warning(f"Voice cache invalidation listener stopped: {e}")
+            self._local_clear()
+            if self.redis_client is client:
+                self.redis_client = None
+                self._listener = None
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+    async def _publish_invalidation(self, redis, personality_id: str) -> None:
+        try:
+            await redis.publish(_INVALIDATE_CHANNEL, f"{self._node_id}:{personality_id}")
+        except Exception as e:
+            logger.warning(f"Voice cache invalidation publish failed: {e}")
 
     def _generate_cache_key(
         self,
@@ -118,7 +286,58 @@ class VoiceCache:
 
         return hash_key
 
-    def get(
+    # ------------------------------------------------------------------
+    # In-process tier
+    # ------------------------------------------------------------------
+
+    def _local_get(self, cache_key: str) -> Optional[Dict]:
+        item = self._local.get(cache_key)
+        if item is None:
+            return None
+        if time.monotonic() >= item[2]:
+            self._local_drop(cache_key)
+            return None
+        self._local.move_to_end(cache_key)
+        return item[0]
+
+    def _local_put(self, cache_key: str, personality_id: str, entry: Dict) -> None:
+        size = len(entry["audio_data"])
+        if size > self.local_max_bytes:
+            return
+        self._local_drop(cache_key)
+        self._local[cache_key] = (entry, size, time.monotonic() + self.local_ttl, personality_id)
+        self._local_bytes += size
+        self._local_personalities.setdefault(personality_id, set()).add(cache_key)
+        while self._local_bytes > self.local_max_bytes:
+            self._local_drop(next(iter(self._local)))
+
+    def _local_drop(self, cache_key: str) -> None:
+        item = self._local.pop(cache_key, None)
+        if item is None:
+            return
+        self._local_bytes -= item[1]
+        keys = self._local_personalities.get(item[3])
+        if keys is not None:
+            keys.discard(cache_key)
+            if not keys:
+                del self._local_personalities[item[3]]
+
+    def _local_invalidate(self, personality_id: str) -> int:
+        local_keys = self._local_personalities.pop(personality_id, set())
+        for cache_key in local_keys:
+            self._local_drop(cache_key)
+        return len(local_keys)
+
+    def _local_clear(self) -> None:
+        self._local.clear()
+        self._local_bytes = 0
+        self._local_personalities.clear()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def get(
         self,
         text: str,
         personality_id: str,
@@ -139,52 +358,87 @@ class VoiceCache:
             quality: Quality level
 
         Returns:
-            Dict with audio_data and metadata, or None if cache miss
+            Dict with audio_data (WAV) and metadata, or None if cache miss
         """
-        if not self.redis_client:
+        # Generate cache key
+        cache_key = self._generate_cache_key(
+            text, personality_id, language, speed, pitch, quality
+        )
+
+        entry = self._local_get(cache_key)
+        if entry is not None:
+            self.stats["local_hits"] += 1
+            return entry
+
+        redis = await self._get_redis()
+        if redis is None:
+            self.stats["misses"] += 1
             return None
 
         try:
-            # Generate cache key
-            cache_key = self._generate_cache_key(
-                text, personality_id, language, speed, pitch, quality
+            # Try to get audio data and metadata in one round trip
+            audio_payload, metadata_data = await redis.mget(
+                f"voice:audio:{cache_key}",
+                f"voice:metadata:{cache_key}"
             )
 
-            # Try to get audio data
-            audio_key = f"voice:audio:{cache_key}"
-            metadata_key = f"voice:metadata:{cache_key}"
-
-            audio_data = self.redis_client.get(audio_key)
-            metadata_data = self.redis_client.get(metadata_key)
-
-            if audio_data and metadata_data:
+            if audio_payload and metadata_data:
                 # Cache hit
-                import json
-                metadata = json.loads(metadata_data.decode('utf-8'))
+                audio_data = await asyncio.to_thread(decode_audio, audio_payload)
+                entry = {
+                    "audio_data": audio_data,
+                    "metadata": json.loads(metadata_data.decode('utf-8'))
+                }
+                self._local_put(cache_key, personality_id, entry)
 
                 logger.info(
                     f"✓ Cache HIT: {cache_key[:8]}... "
-                    f"({len(audio_data) / 1024:.1f}KB)"
+                    f"({len(audio_payload) / 1024:.1f}KB stored, {len(audio_data) / 1024:.1f}KB WAV)"
                 )
 
                 # Update stats
-                self._increment_stat("hits")
-
-                return {
-                    "audio_data": audio_data,
-                    "metadata": metadata
-                }
-            else:
-                # Cache miss
-                logger.debug(f"✗ Cache MISS: {cache_key[:8]}...")
-                self._increment_stat("misses")
-                return None
+                self.stats["redis_hits"] += 1
+                await self._increment_stat(redis, "hits")
+                return entry
+
+            # Cache miss
+            logger.debug(f"✗ Cache MISS: {cache_key[:8]}...")
+            self.stats["misses"] += 1
+            await self._increment_stat(redis, "misses")
+            return None
 
         except Exception as e:
             logger.error(f"Cache get error: {e}")
+            self._redis_failed(e)
+            self.stats["misses"] += 1
             return None
 
-    def set(
+    async def contains(
+        self,
+        text: str,
+        personality_id: str,
+        language: str = "en",
+        speed: float = 1.0,
+        pitch: float = 0.0,
+        quality: str = "high"
+    ) -> bool:
+        """Whether audio is cached, without fetching it"""
+        cache_key = self._generate_cache_key(
+            text, personality_id, language, speed, pitch, quality
+        )
+        if self._local_get(cache_key) is not None:
+            return True
+
+        redis = await self._get_redis()
+        if redis is None:
+            return False
+        try:
+            return await redis.exists(f"voice:audio:{cache_key}") > 0
+        except Exception as e:
+            self._redis_failed(e)
+            return False
+
+    async def set(
         self,
         text: str,
         personality_id: str,
@@ -211,53 +465,56 @@ class VoiceCache:
         Returns:
             True if cached successfully
         """
-        if not self.redis_client:
+        # Check audio size
+        audio_size = len(audio_data)
+        if audio_size > self.max_audio_size:
+            logger.warning(
+                f"Audio too large to cache: {audio_size / 1024 / 1024:.1f}MB "
+                f"(max: {self.max_audio_size / 1024 / 1024:.1f}MB)"
+            )
             return False
 
-        try:
-            # Check audio size
-            audio_size = len(audio_data)
-            if audio_size > self.max_audio_size:
-                logger.warning(
-                    f"Audio too large to cache: {audio_size / 1024 / 1024:.1f}MB "
-                    f"(max: {self.max_audio_size / 1024 / 1024:.1f}MB)"
-                )
-                return False
+        # Generate cache key
+        cache_key = self._generate_cache_key(
+            text, personality_id, language, speed, pitch, quality
+        )
+        self._local_put(cache_key, personality_id, {"audio_data": audio_data, "metadata": metadata})
 
-            # Generate cache key
-            cache_key = self._generate_cache_key(
-                text, personality_id, language, speed, pitch, quality
-            )
-
-            # Store audio data
-            audio_key = f"voice:audio:{cache_key}"
-            metadata_key = f"voice:metadata:{cache_key}"
+        redis = await self._get_redis()
+        if redis is None:
+            return False
 
-            # Serialize metadata
-            import json
-            metadata_json = json.dumps(metadata).encode('utf-8')
+        try:
+            payload = await asyncio.to_thread(encode_audio, audio_data, self.codec)
 
             # Store with TTL
             ttl_seconds = int(self.ttl.total_seconds())
+            index_key = f"voice:personality:{personality_id}"
 
-            self.redis_client.setex(audio_key, ttl_seconds, audio_data)
-            self.redis_client.setex(metadata_key, ttl_seconds, metadata_json)
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.setex(f"voice:audio:{cache_key}", ttl_seconds, payload)
+                pipe.setex(f"voice:metadata:{cache_key}", ttl_seconds, json.dumps(metadata).encode('utf-8'))
+                pipe.sadd(index_key, cache_key)
+                pipe.expire(index_key, ttl_seconds)
+                pipe.hincrby("voice:stats", "sets", 1)
+                await pipe.execute()
+
+            self.stats["sets"] += 1
+            self.stats["stored_bytes"] += len(payload)
+            self.stats["wav_bytes"] += audio_size
 
             logger.info(
                 f"✓ Cached audio: {cache_key[:8]}... "
-                f"({audio_size / 1024:.1f}KB, TTL: {self.ttl.days}d)"
+                f"({audio_size / 1024:.1f}KB WAV -> {len(payload) / 1024:.1f}KB, TTL: {self.ttl.days}d)"
             )
-
-            # Update stats
-            self._increment_stat("sets")
-
             return True
 
         except Exception as e:
             logger.error(f"Cache set error: {e}")
+            self._redis_failed(e)
             return False
 
-    def invalidate_personality(self, personality_id: str) -> int:
+    async def invalidate_personality(self, personality_id: str) -> int:
         """
         Invalidate all cached audio for a personality
 
@@ -269,42 +526,38 @@ class VoiceCache:
         Returns:
             Number of cache entries deleted
         """
-        if not self.redis_client:
-            return 0
+        local_deleted = self._local_invalidate(personality_id)
+
+        redis = await self._get_redis()
+        if redis is None:
+            return local_deleted
 
         try:
-            # Find all keys for this personality
-            # Note: This uses pattern matching which can be slow on large datasets
-            pattern = f"voice:*:*{personality_id}*"
-
-            keys = []
-            cursor = 0
-            while True:
-                cursor, batch_keys = self.redis_client.scan(
-                    cursor=cursor,
-                    match=pattern,
-                    count=100
-                )
-                keys.extend(batch_keys)
-                if cursor == 0:
-                    break
+            index_key = f"voice:personality:{personality_id}"
+            cache_keys = [k.decode('utf-8') for k in await redis.smembers(index_key)]
 
-            if keys:
-                deleted = self.redis_client.delete(*keys)
+            keys = [index_key]
+            for cache_key in cache_keys:
+                keys += [f"voice:audio:{cache_key}", f"voice:metadata:{cache_key}"]
+
+            await redis.delete(*keys)
+            await self._publish_invalidation(redis, personality_id)
+            deleted = len(cache_keys)
+            if deleted:
                 logger.info(
                     f"✓ Invalidated {deleted} cache entries for "
                     f"personality {personality_id}"
                 )
-                return deleted
             else:
                 logger.debug(f"No cache entries found for personality {personality_id}")
-                return 0
+            return deleted
 
         except Exception as e:
             logger.error(f"Cache invalidation error: {e}")
+            self._redis_failed(e)
             return 0
 
-    def clear_all(self) -> bool:
+    async def clear_all(self) -> bool:
         """
         Clear all voice cache entries
 
@@ -313,65 +566,67 @@ class VoiceCache:
         Returns:
             True if successful
         """
-        if not self.redis_client:
+        self._local_clear()
+
+        redis = await self._get_redis()
+        if redis is None:
             return False
 
         try:
             # Find all voice cache keys
-            pattern = "voice:*"
-
-            keys = []
-            cursor = 0
-            while True:
-                cursor, batch_keys = self.redis_client.scan(
-                    cursor=cursor,
-                    match=pattern,
-                    count=1000
-                )
-                keys.extend(batch_keys)
-                if cursor == 0:
-                    break
+            keys = [key async for key in redis.scan_iter(match="voice:*", count=1000)]
 
             if keys:
-                deleted = self.redis_client.delete(*keys)
+                deleted = await redis.delete(*keys)
                 logger.info(f"✓ Cleared {deleted} cache entries")
-                return True
             else:
                 logger.debug("Cache already empty")
-                return True
+            await self._publish_invalidation(redis, "*")
+            return True
 
         except Exception as e:
             logger.error(f"Cache clear error: {e}")
+            self._redis_failed(e)
             return False
 
-    def _increment_stat(self, stat_name: str):
+    async def _increment_stat(self, redis, stat_name: str):
         """Increment cache statistic counter"""
-        if not self.redis_client:
-            return
-
         try:
-            self.redis_client.hincrby("voice:stats", stat_name, 1)
+            await redis.hincrby("voice:stats", stat_name, 1)
         except Exception:
             pass  # Stats are non-critical
 
-    def get_stats(self) -> Dict:
+    async def get_stats(self) -> Dict:
         """
         Get cache statistics
 
         Returns:
-            Dict with hits, misses, sets, and hit rate
+            Dict with shared (Redis) hits, misses, sets and hit rate, plus
+            this process's tier statistics
         """
-        if not self.redis_client:
+        stored, wav = self.stats["stored_bytes"], self.stats["wav_bytes"]
+        local = {
+            "local_entries": len(self._local),
+            "local_bytes": self._local_bytes,
+            "local_hits": self.stats["local_hits"],
+            "invalidations": self.stats["invalidations"],
+            "codec": self.codec if SOUNDFILE_AVAILABLE else "wav",
+            "compression_ratio": round(stored / wav, 3) if wav else None
+        }
+
+        redis = await self._get_redis()
+        if redis is None:
             return {
                 "enabled": False,
                 "hits": 0,
                 "misses": 0,
                 "sets": 0,
-                "hit_rate": 0.0
+                "hit_rate": 0.0,
+                **local
             }
 
         try:
-            stats = self.redis_client.hgetall("voice:stats")
+            stats = await redis.hgetall("voice:stats")
 
             # Decode bytes to integers
             hits = int(stats.get(b"hits", 0))
@@ -387,12 +642,27 @@ class VoiceCache:
                 "misses": misses,
                 "sets": sets,
                 "hit_rate": hit_rate,
-                "total_requests": total_requests
+                "total_requests": total_requests,
+                **local
             }
 
         except Exception as e:
             logger.error(f"Get stats error: {e}")
+            self._redis_failed(e)
             return {
                 "enabled": False,
-                "error": str(e)
+                "error": str(e),
+                **local
             }
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        if self.redis_client is not None:
+            await self.redis_client.aclose()
+            self.redis_client = None
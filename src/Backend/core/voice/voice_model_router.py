@@ -12,10 +12,14 @@ Supports:
 - Local voice cloning: XTTS v2, StyleTTS2, Piper
 - Cloud TTS: Google TTS, Azure TTS, IBM Watson
 - Zero-shot voice cloning with personality voice samples
+- Background pre-synthesis of a personality's fixed phrases into the voice cache
 """
 
 import asyncio
+import json
 import logging
+import os
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from enum import Enum
@@ -25,9 +29,59 @@ from .styletts2_handler import StyleTTS2Handler
 from .piper_tts import PiperTTSHandler
 from .google_tts_handler import GoogleTTSHandler
 from .base_handler import SynthesisResult, TTSHandler
+from .voice_cache import VoiceCache
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on phrases pre-synthesized per personality
+PRESYNTHESIS_MAX_PHRASES = int(os.getenv("VOICE_PRESYNTHESIS_MAX_PHRASES", "40"))
+
+# Phrases every personality speaks verbatim (age gate, store hours lead-ins)
+DEFAULT_FIXED_PHRASES = [
+    "Before we get started, can you confirm you're of legal age to purchase cannabis?",
+    "Sorry, you need to be of legal age to shop with us.",
+    "Thanks for confirming! How can I help you today?",
+    "Let me check our store hours for you.",
+    "Here are our store hours."
+]
+
+
+def personality_fixed_phrases(
+    personality_name: Optional[str],
+    voice_config: Optional[Dict] = None,
+    prompts_dir: str = "prompts"
+) -> List[str]:
+    """Fixed phrases worth pre-synthesizing for a personality
+
+    Combines voice_config["fixed_phrases"], the opening/closing phrases from
+    the personality's prompt file and DEFAULT_FIXED_PHRASES.
+
+    Args:
+        personality_name: Personality name (matches prompts/agents/*/personality/<name>.json)
+        voice_config: Personality voice_config from the database
+        prompts_dir: Folder holding agents/
+
+    Returns:
+        Unique phrases, at most PRESYNTHESIS_MAX_PHRASES
+    """
+    phrases = list((voice_config or {}).get("fixed_phrases", []))
+
+    if personality_name:
+        slug = personality_name.strip().lower()
+        for path in sorted(Path(prompts_dir).glob(f"agents/*/personality/{slug}.json")):
+            try:
+                with open(path, "r") as f:
+                    style = json.load(f).get("personality", {}).get("conversation_style", {})
+            except Exception as e:
+                logger.warning(f"Could not read phrases from {path}: {e}")
+                continue
+            phrases += style.get("opening_phrases", []) + style.get("closing_phrases", [])
+            break
+
+    phrases += DEFAULT_FIXED_PHRASES
+    unique = [p.strip() for p in dict.fromkeys(phrases) if isinstance(p, str) and p.strip()]
+    return unique[:PRESYNTHESIS_MAX_PHRASES]
+
 
 class VoiceProvider(Enum):
     """Available voice providers"""
@@ -106,14 +160,25 @@ class VoiceModelRouter:
         )
     """
 
-    def __init__(self, device: str = "cpu"):
+    def __init__(self, device: str = "cpu", voice_cache: Optional[VoiceCache] = None):
         """Initialize the voice router
 
         Args:
             device: Device for local models ('cpu' or 'cuda')
+            voice_cache: Cache that pre-synthesized phrases are stored in
         """
         self.device = device
         self.providers: Dict[str, TTSHandler] = {}
+        self.voice_cache = voice_cache
+
+        # Background pre-synthesis per personality
+        self.presynthesis_tasks: Dict[str, asyncio.Task] = {}
+        self.presynthesis_stats = {
+            "runs": 0,
+            "synthesized": 0,
+            "already_cached": 0,
+            "failed": 0
+        }
 
         # Statistics
         self.total_requests = 0
@@ -338,14 +403,21 @@ class VoiceModelRouter:
         self,
         personality_id: str,
         voice_sample_path: str,
-        providers: Optional[List[VoiceProvider]] = None
+        providers: Optional[List[VoiceProvider]] = None,
+        phrases: Optional[List[str]] = None,
+        language: str = "en"
     ) -> Dict[str, bool]:
         """Load voice sample for a personality across providers
 
+        When a voice cache is configured, the given fixed phrases are then
+        pre-synthesized into it in the background.
+
         Args:
             personality_id: Unique personality ID
             voice_sample_path: Path to voice sample audio
             providers: List of providers to load (None = all voice cloning providers)
+            phrases: Fixed phrases to pre-synthesize (see personality_fixed_phrases)
+            language: Language of the phrases
 
         Returns:
             Dict mapping provider name to success status
@@ -395,8 +467,112 @@ class VoiceModelRouter:
             f"{success_count}/{len(results)} providers"
         )
 
+        if phrases and success_count:
+            self.schedule_presynthesis(
+                personality_id, phrases, voice_sample_path, language=language
+            )
+
         return results
 
+    def schedule_presynthesis(
+        self,
+        personality_id: str,
+        phrases: List[str],
+        voice_sample_path: Optional[str] = None,
+        language: str = "en",
+        qualities: Tuple[VoiceQuality, ...] = (VoiceQuality.HIGH,)
+    ) -> Optional[asyncio.Task]:
+        """Pre-synthesize a personality's fixed phrases into the voice cache
+
+        Runs in the background; a run already in progress for the personality
+        is replaced.
+
+        Args:
+            personality_id: Personality UUID
+            phrases: Phrases to synthesize
+            voice_sample_path: Voice sample for providers without a loaded voice
+            language: Language code
+            qualities: Quality levels to cache each phrase at
+
+        Returns:
+            The background task, or None without a voice cache
+        """
+        if self.voice_cache is None or not phrases:
+            return None
+
+        previous = self.presynthesis_tasks.pop(personality_id, None)
+        if previous is not None and not previous.done():
+            previous.cancel()
+
+        task = asyncio.create_task(
+            self._presynthesize(personality_id, list(phrases), voice_sample_path, language, qualities)
+        )
+        self.presynthesis_tasks[personality_id] = task
+        task.add_done_callback(
+            lambda t: self.presynthesis_tasks.pop(personality_id, None)
+            if self.presynthesis_tasks.get(personality_id) is t else None
+        )
+        return task
+
+    async def _presynthesize(
+        self,
+        personality_id: str,
+        phrases: List[str],
+        voice_sample_path: Optional[str],
+        language: str,
+        qualities: Tuple[VoiceQuality, ...]
+    ) -> None:
+        """Synthesize and cache each phrase not already cached, one at a time
+        so live requests keep most of the TTS capacity"""
+        self.presynthesis_stats["runs"] += 1
+        synthesized = 0
+
+        for quality in qualities:
+            context = SynthesisContext(
+                personality_id=personality_id,
+                language=language,
+                quality=quality,
+                voice_sample_path=voice_sample_path
+            )
+            cache_params = {
+                "personality_id": personality_id,
+                "language": language,
+                "speed": context.speed,
+                "pitch": context.pitch,
+                "quality": quality.value
+            }
+
+            for phrase in phrases:
+                if await self.voice_cache.contains(phrase, **cache_params):
+                    self.presynthesis_stats["already_cached"] += 1
+                    continue
+                try:
+                    result = await self.synthesize(phrase, context)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Pre-synthesis failed for '{phrase[:40]}': {e}")
+                    self.presynthesis_stats["failed"] += 1
+                    continue
+
+                await self.voice_cache.set(
+                    text=phrase,
+                    audio_data=result.audio,
+                    metadata={
+                        "provider": result.provider,
+                        "duration_ms": result.duration_ms,
+                        "sample_rate": result.sample_rate
+                    },
+                    **cache_params
+                )
+                synthesized += 1
+                self.presynthesis_stats["synthesized"] += 1
+
+        logger.info(
+            f"✓ Pre-synthesized {synthesized} phrases for personality '{personality_id}' "
+            f"({len(phrases) * len(qualities)} requested)"
+        )
+
     async def remove_personality_voice(
         self,
         personality_id: str,
@@ -484,12 +660,20 @@ class VoiceModelRouter:
             "total_cost": self.total_cost,
             "providers_available": list(self.providers.keys()),
             "provider_usage": provider_counts,
-            "request_history_size": len(self.request_history)
+            "request_history_size": len(self.request_history),
+            "presynthesis": {
+                **self.presynthesis_stats,
+                "running": len(self.presynthesis_tasks)
+            }
         }
 
     async def cleanup(self):
         """Clean up all providers"""
         try:
+            for task in self.presynthesis_tasks.values():
+                task.cancel()
+            self.presynthesis_tasks.clear()
+
             cleanup_tasks = []
 
             for provider_name, handler in self.providers.items():
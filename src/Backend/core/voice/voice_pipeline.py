@@ -6,7 +6,7 @@ import asyncio
 import logging
 import time
 import platform
-from typing import Dict, Any, Optional, Callable, AsyncGenerator, Union
+from typing import Dict, Any, Optional, Callable, AsyncGenerator, AsyncIterable, Union
 from dataclasses import dataclass
 import numpy as np
 from enum import Enum
@@ -17,9 +17,26 @@ from .piper_tts import PiperTTSHandler
 from .vad_handler import SileroVADHandler
 from .whisper_wake_word import WhisperWakeWordHandler
 from .wake_word_handler import WakeWordConfig, WakeWordModel
+from .sentence_chunker import SentenceChunker
+from .audio_ring_buffer import AudioRingBuffer
 
 logger = logging.getLogger(__name__)
 
+# Streaming audio buffers (fixed size per pipeline / stream)
+CONTINUOUS_BUFFER_MS = 10000
+CONTINUOUS_MIN_AUDIO_MS = 500  # Buffered audio before continuous mode checks for speech
+STREAM_BUFFER_MS = 5000
+STREAM_PROCESS_EVERY_CHUNKS = 10
+
+try:
+    from services.metrics.prometheus_metrics import track_voice_time_to_first_audio, track_voice_tts_chunk
+    METRICS_ENABLED = True
+except ImportError:
+    METRICS_ENABLED = False
+
+# Marks the end of a stage's output in synthesize_stream
+_END = object()
+
 class PipelineMode(Enum):
     """Voice pipeline operating modes"""
     MANUAL = "manual"  # Process on demand
@@ -41,6 +58,18 @@ class VoiceSession:
         if self.context is None:
             self.context = {}
 
+@dataclass
+class SpeechChunk:
+    """One synthesized sentence of a streamed voice response"""
+    index: int
+    text: str
+    audio: bytes
+    sample_rate: int
+    duration_ms: float
+    format: str
+    provider: str
+    synthesis_ms: float
+
 class VoicePipeline:
     """Main voice processing pipeline"""
     
@@ -91,7 +120,7 @@ class VoicePipeline:
         self.wake_word_active = False
 
         # Audio buffer for streaming
-        self.audio_buffer = []
+        self.audio_buffer = AudioRingBuffer.for_duration(CONTINUOUS_BUFFER_MS, self.config.sample_rate)
         self.silence_counter = 0
         self.silence_threshold = 3  # Number of silent chunks before processing
 
@@ -100,6 +129,16 @@ class VoicePipeline:
         self.on_synthesis: Optional[Callable] = None
         self.on_vad_change: Optional[Callable] = None
         self.on_wake_word: Optional[Callable] = None
+
+        # Streamed synthesis metrics
+        self.stream_metrics = {
+            "streams": 0,
+            "streams_with_audio": 0,
+            "chunks": 0,
+            "failed_streams": 0,
+            "last_time_to_first_audio_ms": 0.0,
+            "avg_time_to_first_audio_ms": 0.0
+        }
     
     async def initialize(self) -> bool:
         """Initialize all voice components"""
@@ -274,8 +313,8 @@ class VoicePipeline:
                 self.audio_buffer.append(audio)
                 
                 # Process when buffer is large enough
-                if len(self.audio_buffer) >= 5:  # ~0.5 seconds at typical chunk size
-                    full_audio = np.concatenate(self.audio_buffer)
+                if self.audio_buffer.duration_ms(self.config.sample_rate) >= CONTINUOUS_MIN_AUDIO_MS:
+                    full_audio = self.audio_buffer.latest()
                     
                     # Check for speech
                     vad_result = await self.vad.detect(full_audio)
@@ -291,7 +330,7 @@ class VoicePipeline:
                         results["has_speech"] = True
                         
                         # Clear buffer after processing
-                        self.audio_buffer = []
+                        self.audio_buffer.clear()
                         self.silence_counter = 0
                     else:
                         # Count silence
@@ -299,7 +338,7 @@ class VoicePipeline:
                         
                         # Clear buffer if too much silence
                         if self.silence_counter >= self.silence_threshold:
-                            self.audio_buffer = []
+                            self.audio_buffer.clear()
                             self.silence_counter = 0
             
         except Exception as e:
@@ -348,6 +387,121 @@ class VoicePipeline:
             logger.error(f"Synthesis error: {e}")
             raise
     
+    async def synthesize_stream(
+        self,
+        text_stream: AsyncIterable[str],
+        voice: Optional[str] = None,
+        language: Optional[str] = None,
+        speed: float = 1.0,
+        lookahead: int = 1
+    ) -> AsyncGenerator[SpeechChunk, None]:
+        """Synthesize a streamed response sentence by sentence
+
+        Text deltas (e.g. LLM tokens) are split at sentence/clause boundaries
+        and each chunk is synthesized as soon as it is complete, so the first
+        sentence is playing while the next one is synthesized and the rest of
+        the answer is still being generated.
+
+        Args:
+            text_stream: Async iterable of text deltas
+            voice: Voice ID
+            language: Language code
+            speed: Speech rate
+            lookahead: Synthesized chunks allowed to wait for the consumer
+
+        Yields:
+            Speech chunks in order, each a standalone audio clip
+        """
+        if not self.is_initialized:
+            raise RuntimeError("Pipeline not initialized")
+
+        started = time.perf_counter()
+        sentences: asyncio.Queue = asyncio.Queue()
+        chunks: asyncio.Queue = asyncio.Queue(maxsize=max(1, lookahead))
+        domain = self.current_session.domain if self.current_session else None
+
+        async def split_text():
+            chunker = SentenceChunker()
+            try:
+                async for delta in text_stream:
+                    for sentence in chunker.feed(delta):
+                        await sentences.put(sentence)
+                tail = chunker.flush()
+                if tail:
+                    await sentences.put(tail)
+                await sentences.put(_END)
+            except Exception as e:
+                await sentences.put(e)
+            finally:
+                # Stops upstream generation when the response is abandoned
+                aclose = getattr(text_stream, "aclose", None)
+                if aclose:
+                    await aclose()
+
+        async def synthesize():
+            index = 0
+            while True:
+                sentence = await sentences.get()
+                if sentence is _END or isinstance(sentence, Exception):
+                    await chunks.put(sentence)
+                    return
+                try:
+                    text = self._apply_domain_style(sentence, domain) if domain else sentence
+                    chunk_start = time.perf_counter()
+                    result = await self.tts.synthesize(text, voice, language, speed)
+                    synthesis_s = time.perf_counter() - chunk_start
+                    if self.on_synthesis:
+                        await self.on_synthesis(result)
+                except Exception as e:
+                    await chunks.put(e)
+                    return
+
+                if METRICS_ENABLED:
+                    track_voice_tts_chunk(result.provider, synthesis_s)
+                await chunks.put(SpeechChunk(
+                    index=index,
+                    text=sentence,
+                    audio=result.audio,
+                    sample_rate=result.sample_rate,
+                    duration_ms=result.duration_ms,
+                    format=result.format,
+                    provider=result.provider,
+                    synthesis_ms=synthesis_s * 1000
+                ))
+                index += 1
+
+        tasks = [asyncio.create_task(split_text()), asyncio.create_task(synthesize())]
+        self.stream_metrics["streams"] += 1
+        try:
+            while True:
+                chunk = await chunks.get()
+                if chunk is _END:
+                    break
+                if isinstance(chunk, Exception):
+                    self.stream_metrics["failed_streams"] += 1
+                    logger.error(f"Streamed synthesis error: {chunk}")
+                    raise chunk
+
+                if chunk.index == 0:
+                    self._record_time_to_first_audio(time.perf_counter() - started, chunk.provider)
+                self.stream_metrics["chunks"] += 1
+                yield chunk
+        finally:
+            # Consumer stopped early (client barge-in or disconnect)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _record_time_to_first_audio(self, seconds: float, provider: str):
+        metrics = self.stream_metrics
+        ttfa_ms = seconds * 1000
+        metrics["streams_with_audio"] += 1
+        metrics["last_time_to_first_audio_ms"] = ttfa_ms
+        metrics["avg_time_to_first_audio_ms"] += (ttfa_ms - metrics["avg_time_to_first_audio_ms"]) / metrics["streams_with_audio"]
+        if METRICS_ENABLED:
+            track_voice_time_to_first_audio(provider, seconds)
+        logger.info(f"🔊 Time to first audio: {ttfa_ms:.0f}ms")
+
     async def process_stream(
         self,
         audio_stream: AsyncGenerator[bytes, None],
@@ -375,23 +529,24 @@ class VoicePipeline:
             language=language
         )
         
-        buffer = []
+        # Holds the last STREAM_BUFFER_MS; older audio is overwritten
+        buffer = AudioRingBuffer.for_duration(STREAM_BUFFER_MS, self.config.sample_rate)
+        chunks_since_processed = 0
         async for chunk in audio_stream:
             buffer.append(chunk)
+            chunks_since_processed += 1
             
             # Process periodically
-            if len(buffer) >= 10:  # Process every ~1 second
-                full_audio = b''.join(buffer) if isinstance(buffer[0], bytes) else np.concatenate(buffer)
+            if chunks_since_processed >= STREAM_PROCESS_EVERY_CHUNKS:  # Process every ~1 second
+                chunks_since_processed = 0
                 
-                # Process audio
-                result = await self.process_audio(full_audio, mode, language)
+                # Process audio (a view; the buffer is not appended to until this returns)
+                result = await self.process_audio(buffer.latest(), mode, language)
                 
                 # Clear buffer if speech was found
                 if result.get("has_speech"):
-                    buffer = []
+                    buffer.clear()
                     yield result
-                elif len(buffer) > 50:  # Clear if buffer gets too large
-                    buffer = buffer[-10:]  # Keep last second
     
     def _apply_domain_style(self, text: str, domain: str) -> str:
         """Apply domain-specific style to text
@@ -462,7 +617,7 @@ class VoicePipeline:
             
             self.is_initialized = False
             self.current_session = None
-            self.audio_buffer = []
+            self.audio_buffer.clear()
             
             logger.info("Voice pipeline cleaned up")
             
@@ -475,6 +630,7 @@ class VoicePipeline:
             "stt": self.stt.get_metrics(),
             "tts": self.tts.get_metrics(),
             "vad": self.vad.get_metrics(),
+            "streaming": dict(self.stream_metrics),
             "session": {
                 "id": self.current_session.session_id if self.current_session else None,
                 "duration_s": (time.time() - self.current_session.start_time) if self.current_session else 0
@@ -15,6 +15,7 @@ from pathlib import Path
 from enum import Enum
 
 from .base_handler import BaseVoiceHandler, AudioConfig, VoiceState
+from .audio_ring_buffer import AudioRingBuffer
 
 logger = logging.getLogger(__name__)
 
@@ -109,8 +110,9 @@ class WakeWordHandler(BaseVoiceHandler):
         self.last_detection_time = 0
         self.is_listening = False
         self.detection_callbacks: List[Callable] = []
-        self.audio_buffer: List[np.ndarray] = []
-        self.buffer_duration_ms = 0
+        self.audio_buffer = AudioRingBuffer.for_duration(
+            self.wake_config.audio_context_ms, self.config.sample_rate
+        )
 
     @abstractmethod
     async def load_models(self, model_paths: Dict[str, Path]) -> bool:
@@ -221,29 +223,20 @@ class WakeWordHandler(BaseVoiceHandler):
         Args:
             audio_chunk: New audio data
         """
-        # Calculate chunk duration
-        chunk_duration_ms = (len(audio_chunk) / self.config.sample_rate) * 1000
-
-        # Add to buffer
+        # The ring keeps the last audio_context_ms, overwriting older audio
         self.audio_buffer.append(audio_chunk)
-        self.buffer_duration_ms += chunk_duration_ms
 
-        # Trim buffer to max context duration
-        while self.buffer_duration_ms > self.wake_config.audio_context_ms:
-            if self.audio_buffer:
-                removed = self.audio_buffer.pop(0)
-                removed_duration = (len(removed) / self.config.sample_rate) * 1000
-                self.buffer_duration_ms -= removed_duration
+    @property
+    def buffer_duration_ms(self) -> float:
+        return self.audio_buffer.duration_ms(self.config.sample_rate)
 
     def _get_audio_context(self) -> np.ndarray:
         """Get audio context from buffer
 
         Returns:
-            Concatenated audio buffer
+            Copy of the buffered audio (it outlives later appends)
         """
-        if not self.audio_buffer:
-            return np.array([])
-        return np.concatenate(self.audio_buffer)
+        return self.audio_buffer.latest().copy()
 
     async def _trigger_callbacks(self, detection: WakeWordDetection) -> None:
         """Trigger registered callbacks
@@ -284,6 +277,12 @@ class WakeWordHandler(BaseVoiceHandler):
         Args:
             wake_config: New configuration
         """
+        if wake_config.audio_context_ms != self.wake_config.audio_context_ms:
+            context = self.audio_buffer.latest()
+            self.audio_buffer = AudioRingBuffer.for_duration(
+                wake_config.audio_context_ms, self.config.sample_rate
+            )
+            self.audio_buffer.append(context)
         self.wake_config = wake_config
         logger.info(f"Updated wake word config: threshold={wake_config.threshold}, "
                    f"sensitivity={wake_config.sensitivity}")
@@ -14,6 +14,7 @@ import wave
 import io
 
 from .base_handler import STTHandler, TranscriptionResult, AudioConfig, VoiceState
+from .audio_ring_buffer import AudioRingBuffer
 
 logger = logging.getLogger(__name__)
 
@@ -145,30 +146,27 @@ class WhisperSTTHandler(STTHandler):
         
         This collects audio chunks and transcribes when silence is detected
         """
-        # Buffer for collecting audio chunks
-        audio_buffer = []
+        # Buffer for collecting audio chunks (room for a segment plus a late chunk)
+        audio_buffer = AudioRingBuffer.for_duration(6000, self.config.sample_rate)
         
         async for chunk in audio_stream:
             audio_buffer.append(chunk)
             
             # Check if we have enough audio (e.g., 3 seconds)
-            total_samples = sum(len(c) for c in audio_buffer)
-            if total_samples >= self.config.sample_rate * 3:
-                # Concatenate and transcribe
-                full_audio = np.concatenate(audio_buffer)
-                result = await self.transcribe(full_audio)
+            if len(audio_buffer) >= self.config.sample_rate * 3:
+                # Transcribe the buffered audio
+                result = await self.transcribe(audio_buffer.latest())
                 
                 # Clear buffer for next segment
-                audio_buffer = []
+                audio_buffer.clear()
                 
                 # Yield intermediate result
                 if result.text:
                     return result
         
         # Transcribe any remaining audio
-        if audio_buffer:
-            full_audio = np.concatenate(audio_buffer)
-            return await self.transcribe(full_audio)
+        if len(audio_buffer):
+            return await self.transcribe(audio_buffer.latest())
         
         return TranscriptionResult(text="", confidence=0.0, language="en")
     
@@ -0,0 +1,37 @@
+-- Migration 033: Notify on tenant LLM configuration changes
+-- Description:
+--   TenantLLMRouter keeps a long-lived router per tenant. This trigger raises
+--   NOTIFY tenant_llm_config '<tenant_id>' whenever llm_tokens or
+--   inference_config change (or a tenant is deleted), so every API worker
+--   drops the stale router immediately instead of waiting for a TTL.
+
+CREATE OR REPLACE FUNCTION notify_tenant_llm_config_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('tenant_llm_config', OLD.id::text);
+        RETURN OLD;
+    END IF;
+
+    PERFORM pg_notify('tenant_llm_config', NEW.id::text);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tenant_llm_config_changed ON tenants;
+CREATE TRIGGER tenant_llm_config_changed
+    AFTER UPDATE OF llm_tokens, inference_config ON tenants
+    FOR EACH ROW
+    WHEN (
+        OLD.llm_tokens IS DISTINCT FROM NEW.llm_tokens
+        OR OLD.inference_config IS DISTINCT FROM NEW.inference_config
+    )
+    EXECUTE FUNCTION notify_tenant_llm_config_change();
+
+DROP TRIGGER IF EXISTS tenant_llm_config_deleted ON tenants;
+CREATE TRIGGER tenant_llm_config_deleted
+    AFTER DELETE ON tenants
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_tenant_llm_config_change();
+
+COMMENT ON FUNCTION notify_tenant_llm_config_change() IS 'NOTIFY tenant_llm_config with the tenant id when its LLM tokens or inference config change';
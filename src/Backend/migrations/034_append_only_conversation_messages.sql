@@ -0,0 +1,55 @@
+-- Migration 034: Append-only conversation messages
+-- Description:
+--   ai_conversations.messages held the whole history as one JSONB array that
+--   was rewritten on every turn, so write volume (and WAL) grew with the
+--   square of conversation length. Messages now live one row per message in
+--   conversation_messages; a turn inserts only its new rows and patches
+--   ai_conversations.context in the same statement.
+--
+--   Existing histories are copied over and the legacy array is cleared.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS conversation_messages (
+    message_id BIGSERIAL PRIMARY KEY,
+    conversation_id UUID NOT NULL,
+    session_id VARCHAR(255) NOT NULL,
+    seq INTEGER NOT NULL,
+    role VARCHAR(32),
+    message JSONB NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    -- Also serves "last N messages of a conversation" as a backward range scan
+    CONSTRAINT conversation_messages_conversation_seq_key UNIQUE (conversation_id, seq)
+);
+
+-- Running count gives the next seq without reading the history
+ALTER TABLE ai_conversations
+    ADD COLUMN IF NOT EXISTS message_count INTEGER NOT NULL DEFAULT 0;
+
+-- Backfill from the legacy JSONB arrays
+INSERT INTO conversation_messages (conversation_id, session_id, seq, role, message, created_at)
+SELECT c.conversation_id,
+       c.session_id,
+       m.ord::integer,
+       m.msg->>'role',
+       m.msg,
+       COALESCE(c.updated_at, c.created_at, CURRENT_TIMESTAMP)
+FROM ai_conversations c
+CROSS JOIN LATERAL jsonb_array_elements(c.messages) WITH ORDINALITY AS m(msg, ord)
+WHERE jsonb_typeof(c.messages) = 'array'
+  AND NOT EXISTS (
+      SELECT 1 FROM conversation_messages x WHERE x.conversation_id = c.conversation_id
+  );
+
+UPDATE ai_conversations
+SET message_count = jsonb_array_length(messages),
+    messages = NULL
+WHERE jsonb_typeof(messages) = 'array';
+
+-- Nothing queries inside the legacy array any more
+DROP INDEX IF EXISTS idx_ai_conversations_messages_gin;
+
+COMMENT ON TABLE conversation_messages IS 'Append-only chat messages, one row per message (see migration 034)';
+COMMENT ON COLUMN ai_conversations.messages IS 'Legacy; superseded by conversation_messages';
+
+COMMIT;
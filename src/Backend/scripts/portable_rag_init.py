@@ -101,6 +101,9 @@ async def ingest_faqs(rag_service, faq_dir: str = "services/rag/knowledge_base")
         
         print()
     
+    # Index writes are debounced; persist before the script exits
+    await rag_service.flush()
+    
     print(f"✅ Ingested {total_sections} FAQ sections from {len(md_files)} files")
     print()
 
@@ -8,7 +8,7 @@ import json
 import logging
 import asyncio
 import re
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, AsyncGenerator
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
@@ -20,6 +20,10 @@ from services.intent_detector import LLMIntentDetector
 from services.tools.product_search_tool import ProductSearchTool
 from services.tool_manager import ToolManager
 from services.intent_flow_processor import IntentFlowProcessor  # NEW: Clean declarative flow
+from services.stage_planner import StagePlanner
+from services.metrics.tracing import traced, current_span
+from services.session_store import SessionStore, SessionStoreConfig
+from services.agent_profiles import AgentProfile, use_profile
 
 logger = logging.getLogger(__name__)
 
@@ -80,6 +84,14 @@ class AgentConfig:
             self.default_personality = personality.personality_id
 
 
+# Bump when SessionState fields change; older records are discarded
+SESSION_RECORD_VERSION = 1
+
+# Entries kept per history list; prompts only read the last few, and every
+# turn re-saves the whole session
+SESSION_HISTORY_LIMIT = int(os.getenv("AGENT_SESSION_HISTORY_LIMIT", "20"))
+
+
 @dataclass
 class SessionState:
     """Active session state"""
@@ -98,6 +110,46 @@ class SessionState:
         """Update last activity timestamp"""
         self.last_activity = datetime.now(timezone.utc)
 
+    def trim_history(self, limit: int = SESSION_HISTORY_LIMIT):
+        """Keep only the most recent history entries"""
+        del self.context_history[:-limit]
+        del self.conversation_history[:-limit]
+
+    def to_record(self) -> List[Any]:
+        """Compact positional form for the session store (histories capped)"""
+        return [
+            SESSION_RECORD_VERSION,
+            self.session_id,
+            self.agent_id,
+            self.personality_id,
+            self.user_id,
+            self.context_history[-SESSION_HISTORY_LIMIT:],
+            self.conversation_history[-SESSION_HISTORY_LIMIT:],
+            self.created_at.timestamp(),
+            self.last_activity.timestamp(),
+            self.metadata,
+            self.signup_state
+        ]
+
+    @classmethod
+    def from_record(cls, record: List[Any]) -> "SessionState":
+        if record[0] != SESSION_RECORD_VERSION:
+            raise ValueError(f"Unsupported session record version: {record[0]}")
+        (_, session_id, agent_id, personality_id, user_id, context_history,
+         conversation_history, created_at, last_activity, metadata, signup_state) = record
+        return cls(
+            session_id=session_id,
+            agent_id=agent_id,
+            personality_id=personality_id,
+            user_id=user_id,
+            context_history=context_history,
+            conversation_history=conversation_history,
+            created_at=datetime.fromtimestamp(created_at, timezone.utc),
+            last_activity=datetime.fromtimestamp(last_activity, timezone.utc),
+            metadata=metadata,
+            signup_state=signup_state
+        )
+
 
 class AgentPoolManager:
     """
@@ -119,9 +171,15 @@ class AgentPoolManager:
         self.personality_cache: OrderedDict[Tuple[str, str], PersonalityConfig] = OrderedDict()
         self.max_cache_size = self.config.get("max_cache_size", 20)
 
-        # Session management
-        self.sessions: Dict[str, SessionState] = {}
+        # Session management: Redis-backed when AGENT_SESSION_REDIS_URL is set,
+        # `sessions` is this worker's near-cache of live SessionState objects
         self.max_sessions = self.config.get("max_sessions", 1000)
+        self.session_store = SessionStore(
+            SessionStoreConfig.from_env(near_cache_size=self.max_sessions),
+            encode=SessionState.to_record,
+            decode=SessionState.from_record
+        )
+        self.sessions: Dict[str, SessionState] = self.session_store.local
 
         # Shared model reference (will be set by SmartAIEngine)
         self.shared_model = None
@@ -132,6 +190,16 @@ class AgentPoolManager:
         # NEW: Intent flow processor for clean declarative message processing
         self.intent_flow_processor = None  # Will be initialized when shared_model is available
 
+        # Per-stage time budgets (seconds) for process_message; a stage that
+        # overruns is dropped from the prompt instead of stalling the turn
+        self.stage_timeouts = {
+            "intent": float(self.config.get("intent_timeout", os.getenv("AGENT_INTENT_TIMEOUT", "10"))),
+            "rag": float(self.config.get("rag_timeout", os.getenv("AGENT_RAG_TIMEOUT", "1.5"))),
+            "product_search": float(self.config.get("tool_timeout", os.getenv("AGENT_TOOL_TIMEOUT", "5"))),
+            "query_database": float(self.config.get("tool_timeout", os.getenv("AGENT_TOOL_TIMEOUT", "5")))
+        }
+        self._rag_init_task: Optional[asyncio.Task] = None
+
         # Performance metrics
         self.metrics = {
             "total_requests": 0,
@@ -390,8 +458,8 @@ class AgentPoolManager:
         if not personality:
             raise ValueError(f"Personality not found: {agent_id}/{personality_id}")
 
-        # Check session limit
-        if len(self.sessions) >= self.max_sessions:
+        # Check session limit (the store evicts on its own when Redis-backed)
+        if not self.session_store.distributed and len(self.sessions) >= self.max_sessions:
             # Remove oldest inactive session
             await self._cleanup_old_sessions()
 
@@ -404,7 +472,7 @@ class AgentPoolManager:
             metadata=metadata or {}
         )
 
-        self.sessions[session_id] = session
+        await self.session_store.save(session_id, session)
         self.metrics["active_sessions"] = len(self.sessions)
 
         logger.info(f"Created session {session_id}: {agent_id}/{personality_id}")
@@ -421,28 +489,30 @@ class AgentPoolManager:
         if not self.enable_hot_swap:
             return False
 
-        session = self.sessions.get(session_id)
-        if not session:
-            return False
+        async with self.session_store.lock(session_id):
+            session = await self.load_session(session_id, refresh=True)
+            if not session:
+                return False
 
-        # Validate new personality exists
-        personality = self.get_personality(session.agent_id, new_personality_id)
-        if not personality:
-            return False
+            # Validate new personality exists
+            personality = self.get_personality(session.agent_id, new_personality_id)
+            if not personality:
+                return False
 
-        # Update session
-        old_personality = session.personality_id
-        session.personality_id = new_personality_id
-        session.update_activity()
+            # Update session
+            old_personality = session.personality_id
+            session.personality_id = new_personality_id
+            session.update_activity()
 
-        if not preserve_context:
-            # Clear context if requested
-            session.context_history = []
+            if not preserve_context:
+                # Clear context if requested
+                session.context_history = []
 
-        self.metrics["personality_switches"] += 1
-        logger.info(f"Session {session_id}: Switched {old_personality} -> {new_personality_id}")
+            await self.session_store.save(session_id, session)
+            self.metrics["personality_switches"] += 1
+            logger.info(f"Session {session_id}: Switched {old_personality} -> {new_personality_id}")
 
-        return True
+            return True
 
     async def switch_agent(
         self,
@@ -452,40 +522,64 @@ class AgentPoolManager:
     ) -> bool:
         """Switch to a different agent (more resource intensive)"""
 
-        session = self.sessions.get(session_id)
-        if not session:
-            return False
-
-        # Validate new agent exists
-        agent = self.get_agent(new_agent_id)
-        if not agent:
-            return False
-
-        # Use default personality if not specified
-        if not personality_id:
-            personality_id = agent.default_personality or list(agent.personalities.keys())[0]
-
-        # Validate personality
-        personality = self.get_personality(new_agent_id, personality_id)
-        if not personality:
-            return False
-
-        # Update session
-        session.agent_id = new_agent_id
-        session.personality_id = personality_id
-        session.context_history = []  # Clear context when switching agents
-        session.update_activity()
+        async with self.session_store.lock(session_id):
+            session = await self.load_session(session_id, refresh=True)
+            if not session:
+                return False
+
+            # Validate new agent exists
+            agent = self.get_agent(new_agent_id)
+            if not agent:
+                return False
+
+            # Use default personality if not specified
+            if not personality_id:
+                personality_id = agent.default_personality or list(agent.personalities.keys())[0]
+
+            # Validate personality
+            personality = self.get_personality(new_agent_id, personality_id)
+            if not personality:
+                return False
+
+            # Update session
+            session.agent_id = new_agent_id
+            session.personality_id = personality_id
+            session.context_history = []  # Clear context when switching agents
+            session.update_activity()
+            await self.session_store.save(session_id, session)
 
-        logger.info(f"Session {session_id}: Switched to {new_agent_id}/{personality_id}")
-        return True
+            logger.info(f"Session {session_id}: Switched to {new_agent_id}/{personality_id}")
+            return True
 
     def get_session(self, session_id: str) -> Optional[SessionState]:
-        """Get active session"""
+        """Get a session held by this worker (use load_session for any session)"""
         session = self.sessions.get(session_id)
         if session:
             session.update_activity()
         return session
 
+    async def load_session(self, session_id: str, refresh: bool = False) -> Optional[SessionState]:
+        """Get a session from this worker or the shared session store"""
+        session = await self.session_store.get(session_id, refresh=refresh)
+        if session:
+            session.update_activity()
+        return session
+
+    async def has_session(self, session_id: str) -> bool:
+        return await self.load_session(session_id) is not None
+
+    async def _engine_profile(self, session: SessionState) -> Optional[AgentProfile]:
+        """Shared model's compiled profile for a session's agent + personality"""
+        get_profile = getattr(self.shared_model, 'get_profile_async', None)
+        if not get_profile:
+            return None
+        try:
+            return await get_profile(session.agent_id, session.personality_id)
+        except ValueError as e:
+            logger.warning(f"No engine profile for {session.agent_id}/{session.personality_id}: {e}")
+            return None
+
+    @traced("agent.process_message")
     async def process_message(
         self,
         session_id: str,
@@ -493,10 +587,39 @@ class AgentPoolManager:
         **kwargs
     ) -> Dict[str, Any]:
         """Process a message for a session using intent-based routing"""
-
-        session = self.get_session(session_id)
-        if not session:
-            raise ValueError(f"Session not found: {session_id}")
+        user_id = kwargs.pop('user_id', None)
+
+        # One turn per session at a time across workers; the session is re-read
+        # inside the lock so this turn builds on the previous turn's history
+        async with self.session_store.lock(session_id):
+            session = await self.load_session(session_id, refresh=True)
+            if not session:
+                raise ValueError(f"Session not found: {session_id}")
+            if user_id:
+                session.user_id = user_id
+            current_span().set_attribute("agent", session.agent_id)
+
+            planner = StagePlanner()
+            try:
+                # Engine calls made during the turn (generation, intent flows) see this
+                # session's agent/personality without touching the shared engine state
+                with use_profile(await self._engine_profile(session)):
+                    return await self._process_turn(session, message, planner, **kwargs)
+            finally:
+                # Early returns and errors must not leave retrievals running
+                planner.cancel_pending()
+                session.trim_history()
+                # History and signup progress changed; publish them to other workers
+                await self.session_store.save(session_id, session)
+
+    async def _process_turn(
+        self,
+        session: SessionState,
+        message: str,
+        planner: StagePlanner,
+        **kwargs
+    ) -> Dict[str, Any]:
+        session_id = session.session_id
 
         # Extract user context for tools (query_database, etc.)
         user_context = {
@@ -517,14 +640,32 @@ class AgentPoolManager:
         if not agent_config:
             raise ValueError(f"Agent configuration not found: {session.agent_id}")
 
+        # Independent retrievals run concurrently; RAG only needs the message,
+        # so it starts now and overlaps intent detection and tool calls
+        if getattr(self, 'rag_data_dir', None):
+            planner.start(
+                "rag",
+                self._retrieve_rag_context(message, session.agent_id, kwargs.get('tenant_id'), kwargs.get('store_id')),
+                timeout=self.stage_timeouts["rag"],
+                default=(None, 0.0)
+            )
+
         # Step 1: Detect intent
         intent_result = None
         detected_intent = "general"
 
         if hasattr(agent_config, 'intent_detector') and agent_config.intent_detector:
+            planner.start(
+                "intent",
+                agent_config.intent_detector.detect_async(message, language="auto"),
+                timeout=self.stage_timeouts["intent"]
+            )
             try:
-                intent_result = agent_config.intent_detector.detect(message, language="auto")
+                intent_result = await planner.result("intent")
+                if not intent_result:
+                    raise ValueError("no intent result (timed out or failed)")
                 detected_intent = intent_result.get("intent", "general")
+                current_span().set_attribute("intent", detected_intent)
                 logger.info(f"Intent detected: {detected_intent} (confidence: {intent_result.get('confidence', 0):.2f})")
                 
                 # Override intent if there's an active signup session
@@ -568,6 +709,7 @@ class AgentPoolManager:
                         
                         # Return result directly
                         logger.info(f"✅ Clean flow completed: {len(result.get('text', ''))} chars, {result.get('tool_result_count', 0)} items")
+                        planner.cancel("rag")  # Declarative flow does not use knowledge context
                         
                         session.conversation_history.append({
                             "role": "user",
@@ -587,7 +729,9 @@ class AgentPoolManager:
                             "detected_intent": detected_intent,
                             "intent_confidence": intent_result.get('confidence', 0) if intent_result else 0,
                             "tool_executed": result.get('tool_executed', False),
-                            "tool_result_count": result.get('tool_result_count', 0)
+                            "tool_result_count": result.get('tool_result_count', 0),
+                            "stage_timings": planner.timings(),
+                            "degraded_stages": planner.degraded()
                         }
                     except Exception as e:
                         logger.error(f"❌ Clean flow failed: {e}", exc_info=True)
@@ -607,17 +751,43 @@ class AgentPoolManager:
 
         if detected_intent == "product_search" and hasattr(agent_config, 'product_search_tool') and agent_config.product_search_tool:
             logger.info(f"Executing ProductSearchTool for query: {message}")
-            try:
-                tool_results = agent_config.product_search_tool.search_products(
-                    query=message,
-                    limit=5
-                )
-                logger.info(f"Product search returned {len(tool_results.get('products', []))} products")
-            except Exception as e:
-                logger.error(f"Product search failed: {e}")
+            # search_products is blocking, so it runs on a worker thread
+            planner.start(
+                "product_search",
+                asyncio.to_thread(agent_config.product_search_tool.search_products, query=message, limit=5),
+                timeout=self.stage_timeouts["product_search"]
+            )
         elif detected_intent == "product_search":
             logger.warning(f"Product search intent detected but tool not available. Agent: {session.agent_id}")
 
+        # Step 3: Select appropriate prompt template
+        prompt_template = None
+        max_tokens = 500
+
+        if hasattr(agent_config, 'prompt_templates') and agent_config.prompt_templates:
+            # Map intent to prompt template key
+            template_key = detected_intent
+            if detected_intent == "general":
+                template_key = "general_chat"
+
+            prompt_template = agent_config.prompt_templates.get(template_key)
+            if prompt_template:
+                logger.info(f"Using prompt template: {template_key}")
+        
+        # Step 3.5: Execute required tools if specified in template config
+        if prompt_template and prompt_template.get('tool_config'):
+            tool_config = prompt_template['tool_config']
+            required_tools = tool_config.get('required_tools', [])
+
+            if required_tools and self.tool_manager and \
+                    ('query_database' in required_tools or 'database_query' in required_tools):
+                logger.info(f"🔧 Required tools to execute: {required_tools}")
+                planner.start(
+                    "query_database",
+                    self._run_query_database(tool_config, user_context),
+                    timeout=self.stage_timeouts["query_database"]
+                )
+
         # Step 2b: Execute tools for signup intents (sales agent)
         signup_tool_result = None
         if session.agent_id == "sales" and detected_intent in ["signup_help", "closing_request"]:
@@ -633,17 +803,19 @@ class AgentPoolManager:
             if self.tool_manager and hasattr(agent_config, 'tools') and agent_config.tools:
                 logger.info(f"🔧 Processing signup flow for session {session_id}")
                 
-                # Try to extract signup information from message
-                signup_info = await self._extract_signup_info(message, session)
-                logger.info(f"🔧 Extracted signup info: {list(signup_info.keys())}")
-                
-                # Determine which tool to call based on state and available info
-                signup_tool_result = await self._handle_signup_tools(
-                    session=session,
-                    message=message,
-                    signup_info=signup_info,
-                    agent_config=agent_config
-                )
+                # Signup mutates session state, so it stays on the critical path
+                with planner.measure("signup"):
+                    # Try to extract signup information from message
+                    signup_info = await self._extract_signup_info(message, session)
+                    logger.info(f"🔧 Extracted signup info: {list(signup_info.keys())}")
+                    
+                    # Determine which tool to call based on state and available info
+                    signup_tool_result = await self._handle_signup_tools(
+                        session=session,
+                        message=message,
+                        signup_info=signup_info,
+                        agent_config=agent_config
+                    )
                 
                 if signup_tool_result:
                     logger.info(f"🔧 Signup tool executed successfully: {signup_tool_result.get('tool_called')}")
@@ -652,133 +824,12 @@ class AgentPoolManager:
             else:
                 logger.warning(f"⚠️ Signup tools not available. tool_manager={self.tool_manager is not None}, has_tools={hasattr(agent_config, 'tools')}, tools={agent_config.tools if hasattr(agent_config, 'tools') else None}")
 
-        # Step 2c: RAG Knowledge Retrieval (before LLM generation)
-        rag_context = None
-        rag_confidence = 0.0
-        
-        # Lazy initialize RAG tool if configured but not yet initialized
-        if hasattr(self, 'rag_data_dir') and self.rag_data_dir and not hasattr(self, 'rag_tool'):
-            self.rag_tool = None  # Default to None
-        
-        if hasattr(self, 'rag_data_dir') and self.rag_data_dir and (not hasattr(self, 'rag_tool') or self.rag_tool is None):
-            try:
-                from services.tools.rag_tool import get_rag_tool
-                logger.info(f"🔧 Initializing RAG tool on first use...")
-                self.rag_tool = await get_rag_tool(data_dir=self.rag_data_dir)
-                logger.info(f"✅ RAG tool initialized successfully")
-            except Exception as e:
-                logger.error(f"❌ Failed to initialize RAG tool: {e}", exc_info=True)
-                self.rag_tool = None
-        
-        if hasattr(self, 'rag_tool') and self.rag_tool:
-            logger.info(f"🔍 Retrieving knowledge from RAG for query: {message[:100]}")
-            try:
-                rag_result = await self.rag_tool.search_knowledge(
-                    query=message,
-                    agent_id=session.agent_id,
-                    tenant_id=kwargs.get('tenant_id'),
-                    store_id=kwargs.get('store_id'),
-                    top_k=5,
-                    min_similarity=0.3
-                )
-                
-                if rag_result.get('success') and rag_result.get('results'):
-                    rag_confidence = rag_result.get('confidence', 0.0)
-                    results = rag_result['results']
-                    
-                    # Format RAG context for LLM
-                    context_parts = ["KNOWLEDGE BASE INFORMATION:"]
-                    for i, result in enumerate(results[:3], 1):  # Top 3 results
-                        source = result.get('source', 'unknown')
-                        text = result.get('text', '')
-                        metadata = result.get('metadata', {})
-                        
-                        context_parts.append(f"\n[Source {i}: {source}]")
-                        if metadata.get('question'):
-                            context_parts.append(f"Q: {metadata['question']}")
-                        context_parts.append(text)
-                    
-                    rag_context = "\n".join(context_parts)
-                    logger.info(f"✅ RAG: Found {len(results)} results (confidence: {rag_confidence:.2f})")
-                else:
-                    logger.info(f"📭 RAG: No relevant knowledge found")
-                    
-            except Exception as e:
-                logger.error(f"❌ RAG retrieval failed: {e}", exc_info=True)
-
-        # Step 3: Select appropriate prompt template
-        prompt_template = None
-        max_tokens = 500
-
-        if hasattr(agent_config, 'prompt_templates') and agent_config.prompt_templates:
-            # Map intent to prompt template key
-            template_key = detected_intent
-            if detected_intent == "general":
-                template_key = "general_chat"
-
-            prompt_template = agent_config.prompt_templates.get(template_key)
-            if prompt_template:
-                logger.info(f"Using prompt template: {template_key}")
-        
-        # Step 3.5: Execute required tools if specified in template config
-        query_tool_results = None
-        if prompt_template and prompt_template.get('tool_config'):
-            tool_config = prompt_template['tool_config']
-            required_tools = tool_config.get('required_tools', [])
-            
-            if required_tools and self.tool_manager:
-                logger.info(f"🔧 Required tools to execute: {required_tools}")
-                
-                # Get tool parameters from template config
-                tool_params = tool_config.get('tool_params', {})
-                
-                # Extract parameters for query_database tool
-                query_db_params = tool_params.get('query_database', {})
-                resource_type = query_db_params.get('resource_type')
-                limit = query_db_params.get('limit', 100)
-                filters = query_db_params.get('filters', {})
-                
-                # Execute query_database or database_query tool
-                if 'query_database' in required_tools or 'database_query' in required_tools:
-                    logger.info(f"🔧 Executing query_database: resource_type={resource_type}, limit={limit}, filters={filters}")
-                    
-                    try:
-                        # Build tool execution context
-                        tool_context = {
-                            'user_context': user_context,
-                            'session_id': session_id,
-                            'agent_id': session.agent_id,
-                            'message': message
-                        }
-                        
-                        # Execute the tool with flat kwargs (not nested in 'parameters')
-                        query_tool_results = await self.tool_manager.execute_tool(
-                            tool_name='query_database',
-                            resource_type=resource_type,
-                            user_role=user_context.get('role', 'customer'),
-                            customer_id=user_context.get('customer_id'),
-                            store_id=user_context.get('store_id'),
-                            tenant_id=user_context.get('tenant_id'),
-                            filters=filters,
-                            limit=limit
-                        )
-                        
-                        # Unwrap result from ToolManager wrapper
-                        if query_tool_results and query_tool_results.get('success'):
-                            # ToolManager wraps the actual result in a 'result' key
-                            actual_result = query_tool_results.get('result', query_tool_results)
-                            data = actual_result.get('data', [])
-                            # Add resource_type to results for data injection formatting
-                            actual_result['resource_type'] = resource_type
-                            # Replace wrapper with actual result for later use
-                            query_tool_results = actual_result
-                            logger.info(f"✅ Tool executed successfully: returned {len(data) if isinstance(data, list) else 'N/A'} items")
-                        else:
-                            error = query_tool_results.get('error') if query_tool_results else 'Unknown error'
-                            logger.error(f"❌ Tool execution failed: {error}")
-                            
-                    except Exception as e:
-                        logger.error(f"❌ Tool execution exception: {e}", exc_info=True)
+        # Collect the concurrent stages before building the prompt
+        tool_results = await planner.result("product_search")
+        if tool_results:
+            logger.info(f"Product search returned {len(tool_results.get('products', []))} products")
+        query_tool_results = await planner.result("query_database")
+        rag_context, rag_confidence = await planner.result("rag") or (None, 0.0)
 
         # Step 4: Build prompt with template or fallback
         if prompt_template:
@@ -1037,16 +1088,18 @@ class AgentPoolManager:
             final_max_tokens = min(150, kwargs.get('max_tokens', max_tokens))
 
             # Tell V5 to use our prompt directly by setting prompt_type
-            result = await self.shared_model.generate(
-                prompt=prompt_with_context,
-                prompt_type="direct",  # Skip V5's intent detection
-                session_id=session_id,
-                max_tokens=final_max_tokens,
-                temperature=personality.style.get('temperature', 0.7) if personality.style else 0.7,
-                use_tools=kwargs.get('use_tools', False),
-                use_context=False,  # We're managing context ourselves
-                context=user_context  # Pass user context for tool calls
-            )
+            with planner.measure("generate"):
+                result = await self.shared_model.generate(
+                    prompt=prompt_with_context,
+                    prompt_type="direct",  # Skip V5's intent detection
+                    session_id=session_id,
+                    max_tokens=final_max_tokens,
+                    temperature=personality.style.get('temperature', 0.7) if personality.style else 0.7,
+                    use_tools=kwargs.get('use_tools', False),
+                    use_context=False,  # We're managing context ourselves
+                    context=user_context,  # Pass user context for tool calls
+                    on_token=kwargs.get('on_token')  # Stream deltas to the caller if requested
+                )
 
             logger.info(f"📝 Raw result from shared_model.generate: type={type(result)}, keys={result.keys() if isinstance(result, dict) else 'N/A'}")
 
@@ -1112,9 +1165,146 @@ class AgentPoolManager:
             "timestamp": datetime.now(timezone.utc).isoformat()
         })
 
+        response["stage_timings"] = planner.timings()
+        response["degraded_stages"] = planner.degraded()
+        if response["degraded_stages"]:
+            logger.info(f"⏱️ Turn completed with degraded stages: {response['degraded_stages']}")
+
         self.metrics["total_requests"] += 1
         return response
 
+    async def _ensure_rag_tool(self):
+        """
+        Initialize the RAG tool once, shared by concurrent first requests
+
+        Initialization is shielded so a turn whose RAG stage times out does not
+        abort it; the next turn picks up the finished tool.
+        """
+        if getattr(self, 'rag_tool', None):
+            return self.rag_tool
+
+        if self._rag_init_task is None or (self._rag_init_task.done() and self._rag_init_task.exception()):
+            from services.tools.rag_tool import get_rag_tool
+            logger.info(f"🔧 Initializing RAG tool on first use...")
+            self._rag_init_task = asyncio.ensure_future(get_rag_tool(data_dir=self.rag_data_dir))
+
+        try:
+            self.rag_tool = await asyncio.shield(self._rag_init_task)
+            logger.info(f"✅ RAG tool initialized successfully")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize RAG tool: {e}", exc_info=True)
+            self.rag_tool = None
+        return self.rag_tool
+
+    async def _retrieve_rag_context(
+        self,
+        message: str,
+        agent_id: str,
+        tenant_id: Optional[str],
+        store_id: Optional[str]
+    ) -> Tuple[Optional[str], float]:
+        """
+        RAG Knowledge Retrieval stage
+
+        Returns:
+            Tuple of (formatted knowledge context or None, confidence)
+        """
+        rag_tool = await self._ensure_rag_tool()
+        if not rag_tool:
+            return None, 0.0
+
+        logger.info(f"🔍 Retrieving knowledge from RAG for query: {message[:100]}")
+        try:
+            rag_result = await rag_tool.search_knowledge(
+                query=message,
+                agent_id=agent_id,
+                tenant_id=tenant_id,
+                store_id=store_id,
+                top_k=5,
+                min_similarity=0.3
+            )
+            
+            if rag_result.get('success') and rag_result.get('results'):
+                rag_confidence = rag_result.get('confidence', 0.0)
+                results = rag_result['results']
+                
+                # Format RAG context for LLM
+                context_parts = ["KNOWLEDGE BASE INFORMATION:"]
+                for i, result in enumerate(results[:3], 1):  # Top 3 results
+                    source = result.get('source', 'unknown')
+                    text = result.get('text', '')
+                    metadata = result.get('metadata', {})
+                    
+                    context_parts.append(f"\n[Source {i}: {source}]")
+                    if metadata.get('question'):
+                        context_parts.append(f"Q: {metadata['question']}")
+                    context_parts.append(text)
+                
+                logger.info(f"✅ RAG: Found {len(results)} results (confidence: {rag_confidence:.2f})")
+                return "\n".join(context_parts), rag_confidence
+
+            logger.info(f"📭 RAG: No relevant knowledge found")
+                
+        except Exception as e:
+            logger.error(f"❌ RAG retrieval failed: {e}", exc_info=True)
+
+        return None, 0.0
+
+    async def _run_query_database(
+        self,
+        tool_config: Dict[str, Any],
+        user_context: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        query_database tool stage for templates that require it
+
+        Returns:
+            Unwrapped tool result (with resource_type added) or the raw failure
+        """
+        # Get tool parameters from template config
+        tool_params = tool_config.get('tool_params', {})
+        
+        # Extract parameters for query_database tool
+        query_db_params = tool_params.get('query_database', {})
+        resource_type = query_db_params.get('resource_type')
+        limit = query_db_params.get('limit', 100)
+        filters = query_db_params.get('filters', {})
+        
+        logger.info(f"🔧 Executing query_database: resource_type={resource_type}, limit={limit}, filters={filters}")
+        
+        try:
+            # Execute the tool with flat kwargs (not nested in 'parameters')
+            query_tool_results = await self.tool_manager.execute_tool(
+                tool_name='query_database',
+                resource_type=resource_type,
+                user_role=user_context.get('role', 'customer'),
+                customer_id=user_context.get('customer_id'),
+                store_id=user_context.get('store_id'),
+                tenant_id=user_context.get('tenant_id'),
+                filters=filters,
+                limit=limit
+            )
+            
+            # Unwrap result from ToolManager wrapper
+            if query_tool_results and query_tool_results.get('success'):
+                # ToolManager wraps the actual result in a 'result' key
+                actual_result = query_tool_results.get('result', query_tool_results)
+                data = actual_result.get('data', [])
+                # Add resource_type to results for data injection formatting
+                actual_result['resource_type'] = resource_type
+                logger.info(f"✅ Tool executed successfully: returned {len(data) if isinstance(data, list) else 'N/A'} items")
+                return actual_result
+
+            error = query_tool_results.get('error') if query_tool_results else 'Unknown error'
+            logger.error(f"❌ Tool execution failed: {error}")
+            return query_tool_results
+                
+        except Exception as e:
+            logger.error(f"❌ Tool execution exception: {e}", exc_info=True)
+            return None
+
     async def _extract_verification_code(self, message: str) -> Optional[str]:
         """Extract 6-digit verification code from message using LLM"""
         import re
@@ -1186,12 +1376,8 @@ Reply with only the 6 digits:"""
         **kwargs
     ) -> str:
         """Generate a message response for compatibility with chat_endpoints"""
-        # Update user_id if provided
-        if user_id and session_id in self.sessions:
-            self.sessions[session_id].user_id = user_id
-
-        # Process the message
-        result = await self.process_message(session_id, message, **kwargs)
+        # Process the message (user_id is applied inside the session lock)
+        result = await self.process_message(session_id, message, user_id=user_id, **kwargs)
 
         # Return just the text response for compatibility
         return result.get("text", "")
@@ -1204,16 +1390,51 @@ Reply with only the 6 digits:"""
         **kwargs
     ) -> Dict[str, Any]:
         """Generate a message response with full product data"""
-        # Update user_id if provided
-        if user_id and session_id in self.sessions:
-            self.sessions[session_id].user_id = user_id
-
-        # Process the message
-        result = await self.process_message(session_id, message, **kwargs)
+        # Process the message (user_id is applied inside the session lock)
+        result = await self.process_message(session_id, message, user_id=user_id, **kwargs)
 
         # Return the full response object including products
         return result
 
+    async def process_message_stream(
+        self,
+        session_id: str,
+        message: str,
+        **kwargs
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Process a message and yield model output as it is generated
+
+        Yields {"type": "delta", "delta": str} events while the model streams,
+        then a single {"type": "final", "response": dict} event with the same
+        response process_message would have returned. Responses produced
+        without the model (signup shortcuts, errors) yield no deltas.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def run():
+            try:
+                return await self.process_message(
+                    session_id, message, on_token=queue.put, **kwargs
+                )
+            finally:
+                await queue.put(done)
+
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                delta = await queue.get()
+                if delta is done:
+                    break
+                yield {"type": "delta", "delta": delta}
+
+            yield {"type": "final", "response": await task}
+        finally:
+            if not task.done():
+                # Consumer went away mid-stream
+                task.cancel()
+
     async def _cleanup_old_sessions(self, max_age_minutes: int = 30):
         """Clean up inactive sessions"""
         now = datetime.now(timezone.utc)
@@ -1225,7 +1446,7 @@ Reply with only the 6 digits:"""
                 to_remove.append(session_id)
 
         for session_id in to_remove:
-            del self.sessions[session_id]
+            self.session_store.forget_local(session_id)
             logger.info(f"Cleaned up inactive session: {session_id}")
 
         self.metrics["active_sessions"] = len(self.sessions)
@@ -1267,9 +1488,14 @@ Reply with only the 6 digits:"""
             "cache_hit_rate": (
                 self.metrics["cache_hits"] /
                 max(1, self.metrics["cache_hits"] + self.metrics["cache_misses"])
-            )
+            ),
+            "session_store": self.session_store.get_stats()
         }
 
+    async def close(self):
+        """Release the session store connection"""
+        await self.session_store.close()
+
     def set_shared_model(self, model):
         """Set the shared model reference and propagate to intent detectors"""
         self.shared_model = model
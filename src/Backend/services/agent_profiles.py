@@ -0,0 +1,392 @@
+"""
+Precompiled Agent/Personality Profiles
+Each agent + personality combination is read from prompts/agents once and
+compiled into an immutable AgentProfile (frozen all the way down, so no
+session can change another's nested config): merged agent config, prompt
+templates with the personality already rendered in, personality traits and
+the agent's tool list. Profiles are cached by (agent_id, personality_id) and
+recompiled when one of their source files changes.
+
+SmartAIEngineV5 is a process-wide singleton, so a request selects its profile
+through a contextvar instead of mutating the engine; switching personality is
+a pointer swap and concurrent sessions never see each other's configuration.
+From async code use get_profile_async, which checks and recompiles changed
+profiles on a worker thread.
+
+Usage:
+    profile = await engine.get_profile_async("dispensary", "marcel")
+    result = await engine.generate(prompt, prompt_type="direct", profile=profile)
+
+    with use_profile(profile):
+        ...  # engine reads agent_prompts/system_config from the profile
+"""
+
+import asyncio
+import contextvars
+import copy
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between checks of a profile's source files for changes
+PROFILE_RELOAD_INTERVAL = float(os.getenv("AGENT_PROFILE_RELOAD_INTERVAL", "2.0"))
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+_active_profile: contextvars.ContextVar[Optional["AgentProfile"]] = contextvars.ContextVar(
+    "agent_profile", default=None
+)
+
+
+# eq=False: profiles compare and hash by identity (their mappings are unhashable)
+@dataclass(frozen=True, eq=False)
+class AgentProfile:
+    """Immutable, precompiled configuration for one agent + personality"""
+    agent_id: Optional[str]
+    personality_id: Optional[str]
+    system_config: Mapping[str, Any] = field(default_factory=lambda: _EMPTY)
+    agent_prompts: Mapping[str, Any] = field(default_factory=lambda: _EMPTY)
+    personality_traits: Mapping[str, Any] = field(default_factory=lambda: _EMPTY)
+    # Template text per prompt type with {personality_name}/{personality_traits} filled in
+    rendered_templates: Mapping[str, str] = field(default_factory=lambda: _EMPTY)
+    tools: Tuple[str, ...] = ()
+    # (path, mtime_ns or None when missing) for every file the profile was built from
+    sources: Tuple[Tuple[str, Optional[int]], ...] = ()
+    compiled_at: float = field(default_factory=time.time)
+
+    @property
+    def key(self) -> Tuple[Optional[str], Optional[str]]:
+        return (self.agent_id, self.personality_id)
+
+    @property
+    def use_prompts(self) -> bool:
+        return bool(self.agent_prompts or self.personality_traits or self.system_config)
+
+    @property
+    def personality_name(self) -> Optional[str]:
+        return self.personality_traits.get("name")
+
+
+def active_profile() -> Optional[AgentProfile]:
+    """Profile selected for the current request, if any"""
+    return _active_profile.get()
+
+
+@contextmanager
+def use_profile(profile: Optional[AgentProfile]) -> Iterator[Optional[AgentProfile]]:
+    """Select a profile for the enclosed code and any tasks it starts"""
+    token = _active_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _active_profile.reset(token)
+
+
+def profile_scoped(func: Callable) -> Callable:
+    """Decorator adding a `profile` keyword that scopes the call to that profile"""
+    if asyncio.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, profile: Optional[AgentProfile] = None, **kwargs) -> Any:
+            if profile is None:
+                return await func(*args, **kwargs)
+            with use_profile(profile):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @wraps(func)
+    def sync_wrapper(*args, profile: Optional[AgentProfile] = None, **kwargs) -> Any:
+        if profile is None:
+            return func(*args, **kwargs)
+        with use_profile(profile):
+            return func(*args, **kwargs)
+    return sync_wrapper
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict for nested profile config
+
+    Still a dict for isinstance checks and JSON; copies (dict(x), copy.copy,
+    copy.deepcopy) are plain mutable dicts.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("AgentProfile config is read-only; copy it to modify")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+    def __copy__(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo) -> Dict[str, Any]:
+        return {key: copy.deepcopy(value, memo) for key, value in self.items()}
+
+
+class FrozenList(list):
+    """Read-only list for nested profile config (copies are plain lists)"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("AgentProfile config is read-only; copy it to modify")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = clear = extend = insert = pop = remove = reverse = sort = _readonly
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+    def __copy__(self) -> List[Any]:
+        return list(self)
+
+    def __deepcopy__(self, memo) -> List[Any]:
+        return [copy.deepcopy(value, memo) for value in self]
+
+
+def _freeze(value: Any) -> Any:
+    """Read-only copy of parsed JSON, recursively"""
+    if isinstance(value, dict):
+        return FrozenDict((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(_freeze(item) for item in value)
+    return value
+
+
+def _mtime(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _render_template(template_data: Any, personality: Mapping[str, Any]) -> Optional[str]:
+    """Fill the personality placeholders of one prompt template"""
+    if isinstance(template_data, str):
+        template_str = template_data
+    elif isinstance(template_data, dict):
+        template_str = template_data.get("template", "")
+    else:
+        return None
+
+    if personality:
+        template_str = template_str.replace("{personality_name}", personality.get("name", "Assistant"))
+        traits = personality.get("traits", {})
+        if traits and isinstance(traits, dict):
+            traits_desc = f"who is {traits.get('communication_style', 'friendly')} and {traits.get('sales_approach', 'helpful')}"
+            template_str = template_str.replace("{personality_traits}", traits_desc)
+        else:
+            template_str = template_str.replace("{personality_traits}", "")
+    else:
+        template_str = template_str.replace("{personality_name}", "Assistant")
+        template_str = template_str.replace("{personality_traits}", "")
+    return template_str
+
+
+class AgentProfileRegistry:
+    """
+    Compiles and caches AgentProfiles, recompiling on source file changes
+
+    A profile whose files fail to parse after an edit keeps being served in
+    its last good form until the files are fixed.
+    """
+
+    def __init__(
+        self,
+        base_path: str = "prompts",
+        tool_config: Optional[Mapping[str, Any]] = None,
+        reload_interval: float = PROFILE_RELOAD_INTERVAL
+    ):
+        """
+        Args:
+            base_path: Folder holding agents/ and personality/
+            tool_config: Global system config, for system.tools.agent_tools
+            reload_interval: Minimum seconds between source file checks
+        """
+        self.base_path = Path(base_path)
+        self.tool_config = tool_config or {}
+        self.reload_interval = reload_interval
+
+        self._profiles: Dict[Tuple[Optional[str], Optional[str]], AgentProfile] = {}
+        self._checked_at: Dict[Tuple[Optional[str], Optional[str]], float] = {}
+        self._inflight = SingleFlight("agent_profile")
+
+        self.stats = {
+            "hits": 0,
+            "compiles": 0,
+            "reloads": 0,
+            "errors": 0
+        }
+
+    def _source_paths(self, agent_id: Optional[str], personality_id: Optional[str]) -> List[Path]:
+        paths = []
+        if agent_id:
+            agent_dir = self.base_path / "agents" / agent_id
+            paths += [agent_dir / "config.json", agent_dir / "prompts.json"]
+            if personality_id:
+                paths.append(agent_dir / "personality" / f"{personality_id}.json")
+        if personality_id:
+            paths.append(self.base_path / "personality" / personality_id / "traits.json")
+        return paths
+
+    def tools_for(self, agent_id: Optional[str]) -> Tuple[str, ...]:
+        """Tool names configured for an agent in the global system config"""
+        agent_tools = self.tool_config.get("system", {}).get("tools", {}).get("agent_tools", {})
+        return tuple(agent_tools.get(agent_id, [])) if agent_id else ()
+
+    def compile(self, agent_id: Optional[str], personality_id: Optional[str]) -> AgentProfile:
+        """Build a profile from disk (raises on unreadable files)"""
+        sources = self._source_paths(agent_id, personality_id)
+        # Stamp before reading so an edit made mid-compile triggers another reload
+        stamps = tuple((str(path), _mtime(path)) for path in sources)
+
+        system_config: Dict[str, Any] = {}
+        agent_prompts: Dict[str, Any] = {}
+        personality: Dict[str, Any] = {}
+
+        if agent_id:
+            agent_dir = self.base_path / "agents" / agent_id
+            config_data = _read_json(agent_dir / "config.json")
+            if config_data is not None:
+                # The entire config plus its behaviour sections at the top level
+                system_config = dict(config_data)
+                if "system_behavior" in config_data:
+                    system_config.update(config_data["system_behavior"])
+                if "default_behavior" in config_data:
+                    system_config.update(config_data["default_behavior"])
+                if "safety_guidelines" in config_data:
+                    system_config["safety_guidelines"] = config_data["safety_guidelines"]
+            else:
+                logger.warning(f"❌ CONFIG.JSON NOT FOUND for agent '{agent_id}'")
+
+            prompts_data = _read_json(agent_dir / "prompts.json")
+            if prompts_data is not None:
+                agent_prompts = prompts_data.get("prompts", {})
+            else:
+                logger.warning(f"❌ PROMPTS.JSON NOT FOUND for agent '{agent_id}'")
+
+        if personality_id:
+            # Agent-specific personality first (singular 'personality'), then global
+            candidates = [self.base_path / "personality" / personality_id / "traits.json"]
+            if agent_id:
+                candidates.insert(0, self.base_path / "agents" / agent_id / "personality" / f"{personality_id}.json")
+            for path in candidates:
+                personality_data = _read_json(path)
+                if personality_data is not None:
+                    personality = personality_data.get("personality", {})
+                    break
+
+        rendered = {}
+        for prompt_type, template_data in agent_prompts.items():
+            template_str = _render_template(template_data, personality)
+            if template_str is not None:
+                rendered[prompt_type] = template_str
+
+        profile = AgentProfile(
+            agent_id=agent_id,
+            personality_id=personality_id,
+            system_config=MappingProxyType(_freeze(system_config)),
+            agent_prompts=MappingProxyType(_freeze(agent_prompts)),
+            personality_traits=MappingProxyType(_freeze(personality)),
+            rendered_templates=MappingProxyType(rendered),
+            tools=self.tools_for(agent_id),
+            sources=stamps
+        )
+        self.stats["compiles"] += 1
+        logger.info(
+            f"✅ Compiled profile {agent_id}/{personality_id}: {len(agent_prompts)} prompts, "
+            f"personality '{profile.personality_name or 'None'}', {len(profile.tools)} tools"
+        )
+        return profile
+
+    def _changed(self, profile: AgentProfile) -> bool:
+        return any(_mtime(Path(path)) != mtime for path, mtime in profile.sources)
+
+    def get(self, agent_id: Optional[str], personality_id: Optional[str] = None) -> AgentProfile:
+        """
+        Cached profile for an agent + personality
+
+        Returns:
+            The compiled profile, recompiled first if its files changed
+
+        Raises:
+            ValueError: When the profile was never compiled and its files
+                cannot be parsed
+        """
+        key = (agent_id, personality_id)
+        profile = self._profiles.get(key)
+        now = time.monotonic()
+
+        if profile is not None:
+            if now - self._checked_at.get(key, 0.0) < self.reload_interval:
+                self.stats["hits"] += 1
+                return profile
+            self._checked_at[key] = now
+            if not self._changed(profile):
+                self.stats["hits"] += 1
+                return profile
+            logger.info(f"🔄 Profile sources changed for {agent_id}/{personality_id}, recompiling")
+
+        try:
+            compiled = self.compile(agent_id, personality_id)
+        except Exception as e:
+            self.stats["errors"] += 1
+            if profile is None:
+                raise ValueError(f"Could not compile profile {agent_id}/{personality_id}: {e}") from e
+            logger.error(f"Keeping previous profile {agent_id}/{personality_id}, reload failed: {e}")
+            return profile
+
+        if profile is not None:
+            self.stats["reloads"] += 1
+        self._profiles[key] = compiled
+        self._checked_at[key] = now
+        return compiled
+
+    async def get_async(self, agent_id: Optional[str], personality_id: Optional[str] = None) -> AgentProfile:
+        """
+        get() for event-loop callers
+
+        Cached profiles inside the reload interval return immediately; file
+        checks and (re)compiles run on a worker thread, one per profile key.
+        """
+        key = (agent_id, personality_id)
+        profile = self._profiles.get(key)
+        if profile is not None and time.monotonic() - self._checked_at.get(key, 0.0) < self.reload_interval:
+            self.stats["hits"] += 1
+            return profile
+
+        return await self._inflight.run(
+            key,
+            lambda: asyncio.to_thread(self.get, agent_id, personality_id)
+        )
+
+    def invalidate(self, agent_id: Optional[str] = None) -> None:
+        """Drop cached profiles (all, or one agent's) so they recompile on next use"""
+        for key in [k for k in self._profiles if agent_id is None or k[0] == agent_id]:
+            self._profiles.pop(key, None)
+            self._checked_at.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "cached_profiles": len(self._profiles)
+        }
@@ -52,7 +52,7 @@ class AgentPoolAdapter(IAgentPoolAdapter):
             session_id: Session identifier
             message: User's message
             user_id: Optional user identifier
-            **kwargs: Additional parameters
+            **kwargs: Additional parameters (on_token streams model deltas)
 
         Returns:
             Dict containing response data with structured format
@@ -61,7 +61,7 @@ class AgentPoolAdapter(IAgentPoolAdapter):
             logger.debug(f"Generating message for session {session_id}")
 
             # Check if session exists in agent pool
-            if session_id not in self.agent_pool.sessions:
+            if not await self.agent_pool.has_session(session_id):
                 # Create session if it doesn't exist
                 # Note: store_id and language go in metadata, not as direct parameters
                 metadata = {
@@ -83,7 +83,8 @@ class AgentPoolAdapter(IAgentPoolAdapter):
                 message=message,
                 user_id=user_id,
                 store_id=kwargs.get("store_id"),
-                language=kwargs.get("language", "en")
+                language=kwargs.get("language", "en"),
+                on_token=kwargs.get("on_token")
             )
 
             logger.debug(f"Agent pool returned response for session {session_id}")
@@ -117,7 +118,7 @@ class AgentPoolAdapter(IAgentPoolAdapter):
             # The chat_service creates a session in its own memory, but the agent pool
             # maintains a separate session store. We need to ensure the session exists
             # in the agent pool before trying to update it.
-            if session_id not in self.agent_pool.sessions:
+            if not await self.agent_pool.has_session(session_id):
                 logger.warning(f"Session {session_id} not found in agent pool, creating it first")
                 # Create the session in agent pool with the target agent/personality
                 await self.agent_pool.create_session(
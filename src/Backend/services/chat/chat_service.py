@@ -85,11 +85,15 @@ class ChatService(IChatProcessor, ISessionManager):
             message: User's message text
             session_id: Session identifier
             user_id: Optional user identifier
-            **kwargs: Additional context (store_id, language, etc.)
+            **kwargs: Additional context (store_id, language, etc.).
+                Pass on_token (async callable) to receive model output
+                deltas while the response is generated.
 
         Returns:
             Dict containing response data in ChatResponse format
         """
+        on_token = kwargs.pop("on_token", None)
+
         try:
             start_time = datetime.utcnow()
 
@@ -120,7 +124,8 @@ class ChatService(IChatProcessor, ISessionManager):
                 "personality_id": session.personality_id,
                 "use_tools": kwargs.get("use_tools", True),
                 "use_context": kwargs.get("use_context", True),
-                "max_tokens": kwargs.get("max_tokens", 500)
+                "max_tokens": kwargs.get("max_tokens", 500),
+                "on_token": on_token
             }
 
             # Generate response through agent pool
@@ -441,7 +446,10 @@ class ChatService(IChatProcessor, ISessionManager):
             response_time=response_time,
             tool_calls=response_data.get("tool_calls", []),
             intent=response_data.get("intent"),
-            confidence=response_data.get("confidence")
+            confidence=response_data.get("confidence"),
+            time_to_first_token=response_data.get("time_to_first_token"),
+            stage_timings=response_data.get("stage_timings") or {},
+            degraded_stages=response_data.get("degraded_stages") or []
         )
 
         # Create structured response
@@ -106,18 +106,8 @@ class PostgreSQLHistoryProvider(IHistoryProvider):
             List of message dictionaries in chronological order
         """
         try:
-            # Get conversation from database
-            conversation = await self.db.get_conversation(session_id)
-
-            if not conversation:
-                logger.debug(f"No conversation found for session {session_id}")
-                return []
-
-            # Extract messages from JSONB field
-            messages = conversation.get("messages", [])
-
-            # Return most recent messages up to limit
-            result = messages[-limit:] if len(messages) > limit else messages
+            # Only the most recent messages are read from the database
+            result = await self.db.get_recent_messages(session_id, limit)
 
             logger.debug(f"Retrieved {len(result)} messages for session {session_id}")
             return result
@@ -138,7 +128,7 @@ class PostgreSQLHistoryProvider(IHistoryProvider):
         Save a message exchange to history.
 
         This method saves to BOTH:
-        1. ai_conversations table (messages JSONB array)
+        1. conversation_messages table (appended, one row per message)
         2. chat_interactions table (for analytics)
 
         Args:
@@ -154,49 +144,24 @@ class PostgreSQLHistoryProvider(IHistoryProvider):
         try:
             timestamp = datetime.utcnow().isoformat()
 
-            # Get existing conversation to update messages array
-            existing_conversation = await self.db.get_conversation(session_id)
-
-            if existing_conversation:
-                # Append to existing messages
-                # Database returns JSONB as dict/list, not string
-                messages = existing_conversation.get("messages", [])
-                context = existing_conversation.get("context", {})
-
-                # Ensure messages is a list (defensive check)
-                if not isinstance(messages, list):
-                    logger.warning(f"messages is not a list for session {session_id}, resetting to empty list")
-                    messages = []
-
-                # Ensure context is a dict (defensive check)
-                if not isinstance(context, dict):
-                    logger.warning(f"context is not a dict for session {session_id}, resetting to empty dict")
-                    context = {}
-            else:
-                # New conversation
-                messages = []
-                context = {}
-
-            # Add user message
-            messages.append({
-                "role": "user",
-                "content": user_message,
-                "timestamp": timestamp
-            })
-
-            # Add assistant message
-            messages.append({
-                "role": "assistant",
-                "content": assistant_response,
-                "timestamp": timestamp,
-                "metadata": metadata or {}
-            })
-
-            # Save to ai_conversations (messages JSONB)
-            success = await self.db.save_conversation(
+            messages = [
+                {
+                    "role": "user",
+                    "content": user_message,
+                    "timestamp": timestamp
+                },
+                {
+                    "role": "assistant",
+                    "content": assistant_response,
+                    "timestamp": timestamp,
+                    "metadata": metadata or {}
+                }
+            ]
+
+            # Append the exchange (creates the conversation on first use)
+            success = await self.db.append_messages(
                 session_id=session_id,
                 messages=messages,
-                context=context,
                 customer_id=user_id
             )
 
@@ -260,8 +225,8 @@ class PostgreSQLContextManager(IContextManager):
             Dict containing context data
         """
         try:
-            # Get conversation from database
-            conversation = await self.db.get_conversation(session_id)
+            # Get conversation with only the messages we need
+            conversation = await self.db.get_conversation(session_id, message_limit=max_messages)
 
             if not conversation:
                 logger.debug(f"No context found for session {session_id}")
@@ -271,9 +236,7 @@ class PostgreSQLContextManager(IContextManager):
                     "session_metadata": {}
                 }
 
-            # Extract recent messages
-            messages = conversation.get("messages", [])
-            recent_messages = messages[-max_messages:] if len(messages) > max_messages else messages
+            recent_messages = conversation.get("messages", [])
 
             # Extract context
             context = conversation.get("context", {})
@@ -317,52 +280,13 @@ class PostgreSQLContextManager(IContextManager):
             bool: Success status
         """
         try:
-            # Get existing conversation
-            conversation = await self.db.get_conversation(session_id)
-
-            if conversation:
-                # Merge context updates
-                # Database returns JSONB as dict, not string
-                existing_context = conversation.get("context", {})
-
-                # Ensure existing_context is a dict (defensive check)
-                if not isinstance(existing_context, dict):
-                    logger.warning(f"existing_context is not a dict for session {session_id}, resetting to empty dict")
-                    existing_context = {}
-
-                # Merge the updates
-                existing_context.update(context_updates)
-
-                # Save back to database
-                messages = conversation.get("messages", [])
-
-                # Ensure messages is a list (defensive check)
-                if not isinstance(messages, list):
-                    logger.warning(f"messages is not a list for session {session_id}, resetting to empty list")
-                    messages = []
-
-                success = await self.db.save_conversation(
-                    session_id=session_id,
-                    messages=messages,
-                    context=existing_context,
-                    customer_id=conversation.get("customer_id")
-                )
-
-                if success:
-                    logger.debug(f"Updated context for session {session_id}")
-                return success
-            else:
-                # Create new conversation with context
-                success = await self.db.save_conversation(
-                    session_id=session_id,
-                    messages=[],
-                    context=context_updates,
-                    customer_id=None
-                )
-
-                if success:
-                    logger.debug(f"Created new conversation with context for session {session_id}")
-                return success
+            # Merged into the stored context as a JSONB patch; creates the
+            # conversation if it does not exist yet
+            success = await self.db.update_context(session_id, context_updates)
+
+            if success:
+                logger.debug(f"Updated context for session {session_id}")
+            return success
 
         except Exception as e:
             logger.error(f"Error updating context for session {session_id}: {str(e)}", exc_info=True)
@@ -379,20 +303,18 @@ class PostgreSQLContextManager(IContextManager):
             bool: Success status
         """
         try:
-            # Get existing conversation
-            conversation = await self.db.get_conversation(session_id)
+            # Get existing context keys (no messages needed)
+            conversation = await self.db.get_conversation(session_id, message_limit=0)
 
             if not conversation:
                 logger.debug(f"No conversation to clear for session {session_id}")
                 return True
 
             # Clear context but keep messages
-            messages = conversation.get("messages", [])
-            success = await self.db.save_conversation(
-                session_id=session_id,
-                messages=messages,
-                context={},  # Empty context
-                customer_id=conversation.get("customer_id")
+            success = await self.db.update_context(
+                session_id,
+                {},
+                removed_keys=list(conversation.get("context", {}))
             )
 
             if success:
@@ -21,6 +21,7 @@ class WebSocketMessageType(str, Enum):
     SESSION_UPDATED = "session_updated"
     HEARTBEAT = "heartbeat"
     TOKEN_UPDATE = "token_update"
+    STREAM_DELTA = "stream_delta"
 
 
 class ChatRequest(BaseModel):
@@ -111,6 +112,9 @@ class ResponseMetadata(BaseModel):
     tool_calls: List[str] = Field(default_factory=list, description="Tools executed")
     intent: Optional[str] = Field(None, description="Detected user intent")
     confidence: Optional[float] = Field(None, ge=0, le=1, description="Intent confidence score")
+    time_to_first_token: Optional[float] = Field(None, ge=0, description="Seconds until the first streamed token")
+    stage_timings: Dict[str, float] = Field(default_factory=dict, description="Per-stage durations in milliseconds")
+    degraded_stages: List[str] = Field(default_factory=list, description="Stages skipped after a timeout or error")
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -6,7 +6,6 @@ Follows SOLID principles with interface segregation and dependency injection
 
 import json
 import logging
-import uuid
 import asyncio
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
@@ -14,9 +13,110 @@ from contextlib import asynccontextmanager
 import asyncpg
 from asyncpg.pool import Pool
 
+from services.metrics.tracing import traced
+
 logger = logging.getLogger(__name__)
 
 
+# Upsert the session's conversation row (latest one if there are several)
+# and insert the new messages numbered after the running message_count.
+# Data-modifying CTEs run as one statement: one round trip, one row lock.
+_UPSERT_CONVERSATION = """
+    WITH target AS (
+        SELECT conversation_id FROM ai_conversations
+        WHERE session_id = $1
+        ORDER BY created_at DESC
+        LIMIT 1
+        FOR UPDATE
+    ),
+    updated AS (
+        UPDATE ai_conversations c
+        SET context = {context},
+            message_count = {message_count},
+            customer_id = COALESCE($2, c.customer_id),
+            updated_at = CURRENT_TIMESTAMP
+        FROM target
+        WHERE c.conversation_id = target.conversation_id
+        RETURNING c.conversation_id, c.message_count
+    ),
+    inserted AS (
+        INSERT INTO ai_conversations (conversation_id, session_id, customer_id, context, message_count)
+        SELECT gen_random_uuid(), $1, $2, $3::jsonb, $5
+        WHERE NOT EXISTS (SELECT 1 FROM updated)
+        RETURNING conversation_id, message_count
+    ),
+    conversation AS (
+        SELECT conversation_id, message_count FROM updated
+        UNION ALL
+        SELECT conversation_id, message_count FROM inserted
+    )
+    INSERT INTO conversation_messages (conversation_id, session_id, seq, role, message)
+    SELECT conversation.conversation_id, $1,
+           conversation.message_count - $5 + new.ord,
+           new.msg->>'role', new.msg
+    FROM conversation
+    CROSS JOIN LATERAL jsonb_array_elements($4::jsonb) WITH ORDINALITY AS new(msg, ord)
+"""
+
+_APPEND_SQL = _UPSERT_CONVERSATION.format(
+    context="(COALESCE(c.context, '{}'::jsonb) - $6::text[]) || $3::jsonb",
+    message_count="c.message_count + $5"
+)
+
+_REPLACE_SQL = _UPSERT_CONVERSATION.format(
+    context="$3::jsonb",
+    message_count="$5"
+)
+
+
+async def append_conversation_messages(conn,
+                                      session_id: str,
+                                      messages: List[Dict],
+                                      context_patch: Optional[Dict] = None,
+                                      customer_id: Optional[str] = None,
+                                      removed_keys: Optional[List[str]] = None) -> None:
+    """
+    Append messages to a session's conversation and patch its context
+    
+    One statement on any asyncpg connection or pool; the conversation row is
+    created on first use.
+    """
+    await conn.execute(
+        _APPEND_SQL,
+        session_id, customer_id,
+        json.dumps(context_patch or {}),
+        json.dumps(messages),
+        len(messages),
+        list(removed_keys or [])
+    )
+
+
+def _from_jsonb(value: Any) -> Any:
+    """JSONB columns come back as strings unless a codec is registered"""
+    if isinstance(value, str):
+        return json.loads(value)
+    return value
+
+
+def _check_types(session_id: Any, messages: Any, context: Any, customer_id: Any) -> None:
+    """Validate parameter types to catch order/type errors early"""
+    if not isinstance(session_id, str):
+        logger.error(f"save_conversation: session_id must be str, got {type(session_id).__name__}: {session_id}")
+        raise TypeError(f"session_id must be str, got {type(session_id).__name__}")
+
+    if not isinstance(messages, list):
+        logger.error(f"save_conversation: messages must be list, got {type(messages).__name__}: {messages}")
+        raise TypeError(f"messages must be list, got {type(messages).__name__}")
+
+    if not isinstance(context, dict):
+        logger.error(f"save_conversation: context must be dict, got {type(context).__name__}: {context}")
+        raise TypeError(f"context must be dict, got {type(context).__name__}")
+
+    if customer_id is not None and not isinstance(customer_id, str):
+        logger.error(f"save_conversation: customer_id must be str or None, got {type(customer_id).__name__}: {customer_id}")
+        raise TypeError(f"customer_id must be str or None, got {type(customer_id).__name__}")
+
+
 class DatabaseContextStore:
     """
     PostgreSQL-backed context storage implementation
@@ -83,12 +183,17 @@ class DatabaseContextStore:
         async with self.pool.acquire() as connection:
             yield connection
     
-    async def get_conversation(self, session_id: str) -> Optional[Dict]:
+    @traced("context_store.get_conversation")
+    async def get_conversation(self,
+                               session_id: str,
+                               message_limit: Optional[int] = 50) -> Optional[Dict]:
         """
-        Get conversation context from database
+        Get conversation context and its most recent messages from database
         
         Args:
             session_id: Session identifier
+            message_limit: Number of most recent messages to include
+                (None loads the whole history)
             
         Returns:
             Conversation context dictionary or None
@@ -96,29 +201,32 @@ class DatabaseContextStore:
         try:
             async with self.acquire_connection() as conn:
                 row = await conn.fetchrow("""
-                    SELECT conversation_id, session_id, customer_id, 
-                           messages, context, created_at, updated_at
-                    FROM ai_conversations
-                    WHERE session_id = $1
-                    ORDER BY created_at DESC
+                    SELECT c.conversation_id, c.session_id, c.customer_id,
+                           c.context, c.message_count, c.created_at, c.updated_at,
+                           COALESCE((
+                               SELECT jsonb_agg(recent.message ORDER BY recent.seq)
+                               FROM (
+                                   SELECT m.message, m.seq
+                                   FROM conversation_messages m
+                                   WHERE m.conversation_id = c.conversation_id
+                                   ORDER BY m.seq DESC
+                                   LIMIT $2
+                               ) recent
+                           ), '[]'::jsonb) AS messages
+                    FROM ai_conversations c
+                    WHERE c.session_id = $1
+                    ORDER BY c.created_at DESC
                     LIMIT 1
-                """, session_id)
+                """, session_id, message_limit)
                 
                 if row:
-                    # Parse JSONB fields if they come back as strings
-                    messages = row['messages']
-                    if isinstance(messages, str):
-                        messages = json.loads(messages)
-                    context = row['context']
-                    if isinstance(context, str):
-                        context = json.loads(context)
-
                     return {
                         'conversation_id': str(row['conversation_id']),
                         'session_id': row['session_id'],
                         'customer_id': row['customer_id'],
-                        'messages': messages or [],
-                        'context': context or {},
+                        'messages': _from_jsonb(row['messages']) or [],
+                        'message_count': row['message_count'],
+                        'context': _from_jsonb(row['context']) or {},
                         'created_at': row['created_at'].isoformat() if row['created_at'] else None,
                         'updated_at': row['updated_at'].isoformat() if row['updated_at'] else None
                     }
@@ -128,13 +236,114 @@ class DatabaseContextStore:
             logger.error(f"Failed to get conversation for session {session_id}: {e}")
             return None
     
+    @traced("context_store.get_recent_messages")
+    async def get_recent_messages(self, session_id: str, limit: int = 50) -> List[Dict]:
+        """
+        Get the last N messages of a session, oldest first
+        
+        Args:
+            session_id: Session identifier
+            limit: Maximum number of messages to return
+            
+        Returns:
+            List of message dictionaries
+        """
+        try:
+            async with self.acquire_connection() as conn:
+                rows = await conn.fetch("""
+                    SELECT recent.message
+                    FROM (
+                        SELECT m.message, m.seq
+                        FROM conversation_messages m
+                        WHERE m.conversation_id = (
+                            SELECT conversation_id FROM ai_conversations
+                            WHERE session_id = $1
+                            ORDER BY created_at DESC
+                            LIMIT 1
+                        )
+                        ORDER BY m.seq DESC
+                        LIMIT $2
+                    ) recent
+                    ORDER BY recent.seq
+                """, session_id, limit)
+                return [_from_jsonb(row['message']) for row in rows]
+                
+        except Exception as e:
+            logger.error(f"Failed to get messages for session {session_id}: {e}")
+            return []
+    
+    @traced("context_store.append_messages")
+    async def append_messages(self,
+                              session_id: str,
+                              messages: List[Dict],
+                              context_patch: Optional[Dict] = None,
+                              customer_id: Optional[str] = None,
+                              removed_keys: Optional[List[str]] = None) -> bool:
+        """
+        Append messages and patch context in a single statement
+        
+        Only the new messages are written, so the cost of a turn does not
+        grow with the length of the conversation. The conversation row is
+        created on first use.
+        
+        Args:
+            session_id: Session identifier
+            messages: New message dictionaries, in order
+            context_patch: Top-level context keys to set (JSONB ||)
+            customer_id: Optional customer identifier
+            removed_keys: Top-level context keys to delete
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            _check_types(session_id, messages, context_patch or {}, customer_id)
+            
+            async with self.acquire_connection() as conn:
+                await append_conversation_messages(
+                    conn, session_id, messages, context_patch, customer_id, removed_keys
+                )
+            
+            logger.debug(f"Appended {len(messages)} messages for session {session_id}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to append messages for session {session_id}: {e}")
+            return False
+    
+    @traced("context_store.update_context")
+    async def update_context(self,
+                             session_id: str,
+                             context_patch: Dict,
+                             customer_id: Optional[str] = None,
+                             removed_keys: Optional[List[str]] = None) -> bool:
+        """
+        Patch conversation context without touching its messages
+        
+        Args:
+            session_id: Session identifier
+            context_patch: Top-level context keys to set
+            customer_id: Optional customer identifier
+            removed_keys: Top-level context keys to delete
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        return await self.append_messages(
+            session_id, [], context_patch, customer_id, removed_keys
+        )
+    
+    @traced("context_store.save_conversation")
     async def save_conversation(self,
                                 session_id: str,
                                 messages: List[Dict],
                                 context: Dict,
                                 customer_id: Optional[str] = None) -> bool:
         """
-        Save or update conversation in database
+        Replace a conversation's full history and context
+        
+        Rewrites every message; per-turn writes should use append_messages
+        and update_context instead. Kept for imports and explicit resets.
 
         Args:
             session_id: Session identifier
@@ -146,62 +355,26 @@ class DatabaseContextStore:
             True if successful, False otherwise
         """
         try:
-            # Validate parameter types to catch order/type errors early
-            if not isinstance(session_id, str):
-                logger.error(f"save_conversation: session_id must be str, got {type(session_id).__name__}: {session_id}")
-                raise TypeError(f"session_id must be str, got {type(session_id).__name__}")
-
-            if not isinstance(messages, list):
-                logger.error(f"save_conversation: messages must be list, got {type(messages).__name__}: {messages}")
-                raise TypeError(f"messages must be list, got {type(messages).__name__}")
-
-            if not isinstance(context, dict):
-                logger.error(f"save_conversation: context must be dict, got {type(context).__name__}: {context}")
-                raise TypeError(f"context must be dict, got {type(context).__name__}")
-
-            if customer_id is not None and not isinstance(customer_id, str):
-                logger.error(f"save_conversation: customer_id must be str or None, got {type(customer_id).__name__}: {customer_id}")
-                raise TypeError(f"customer_id must be str or None, got {type(customer_id).__name__}")
+            _check_types(session_id, messages, context, customer_id)
 
             async with self.acquire_connection() as conn:
-                # Check if conversation exists
-                existing = await self.get_conversation(session_id)
-                
-                if existing:
-                    # Update existing conversation
-                    # Convert Python objects to JSON strings for JSONB columns
-                    messages_json = json.dumps(messages)
-                    context_json = json.dumps(context)
-
-                    # DEBUG: Log actual parameter values being passed to execute
-                    logger.debug(f"UPDATE params - $1 (messages) type: {type(messages_json).__name__}, $2 (context) type: {type(context_json).__name__}, $3 (customer_id) type: {type(customer_id).__name__ if customer_id else 'None'}, $4 (session_id) type: {type(session_id).__name__}")
-                    logger.debug(f"UPDATE params - messages: {str(messages)[:100]}, context: {str(context)[:100]}, customer_id: {customer_id}, session_id: {session_id}")
-
+                async with conn.transaction():
                     await conn.execute("""
-                        UPDATE ai_conversations
-                        SET messages = $1::jsonb,
-                            context = $2::jsonb,
-                            customer_id = COALESCE($3, customer_id),
-                            updated_at = CURRENT_TIMESTAMP
-                        WHERE session_id = $4
-                    """, messages_json, context_json, customer_id, session_id)
-                else:
-                    # Create new conversation
-                    # Convert Python objects to JSON strings for JSONB columns
-                    messages_json = json.dumps(messages)
-                    context_json = json.dumps(context)
-
-                    # DEBUG: Log actual parameter values being passed to execute
-                    new_uuid = uuid.uuid4()
-                    logger.debug(f"INSERT params - $1 (conversation_id) type: {type(new_uuid).__name__}, $2 (session_id) type: {type(session_id).__name__}, $3 (customer_id) type: {type(customer_id).__name__ if customer_id else 'None'}, $4 (messages) type: {type(messages_json).__name__}, $5 (context) type: {type(context_json).__name__}")
-                    logger.debug(f"INSERT params - conversation_id: {new_uuid}, session_id: {session_id}, customer_id: {customer_id}, messages: {str(messages)[:100]}, context: {str(context)[:100]}")
-
-                    await conn.execute("""
-                        INSERT INTO ai_conversations
-                        (conversation_id, session_id, customer_id, messages, context)
-                        VALUES ($1, $2, $3, $4::jsonb, $5::jsonb)
-                    """, new_uuid, session_id, customer_id,
-                        messages_json, context_json)
+                        DELETE FROM conversation_messages
+                        WHERE conversation_id = (
+                            SELECT conversation_id FROM ai_conversations
+                            WHERE session_id = $1
+                            ORDER BY created_at DESC
+                            LIMIT 1
+                        )
+                    """, session_id)
+                    await conn.execute(
+                        _REPLACE_SQL,
+                        session_id, customer_id,
+                        json.dumps(context),
+                        json.dumps(messages),
+                        len(messages)
+                    )
                 
                 logger.debug(f"Saved conversation for session {session_id}")
                 return True
@@ -210,6 +383,7 @@ class DatabaseContextStore:
             logger.error(f"Failed to save conversation for session {session_id}: {e}")
             return False
     
+    @traced("context_store.add_interaction")
     async def add_interaction(self,
                               session_id: str,
                               user_message: str,
@@ -251,6 +425,7 @@ class DatabaseContextStore:
             logger.error(f"Failed to add interaction for session {session_id}: {e}")
             return False
     
+    @traced("context_store.get_customer_profile")
     async def get_customer_profile(self, customer_id: str) -> Optional[Dict]:
         """
         Get customer profile from database
@@ -286,6 +461,7 @@ class DatabaseContextStore:
             logger.error(f"Failed to get profile for customer {customer_id}: {e}")
             return None
     
+    @traced("context_store.update_customer_profile")
     async def update_customer_profile(self,
                                      customer_id: str,
                                      preferences: Optional[Dict] = None,
@@ -428,14 +604,19 @@ class DatabaseContextStore:
         """
         try:
             async with self.acquire_connection() as conn:
-                result = await conn.execute("""
-                    DELETE FROM ai_conversations
-                    WHERE updated_at < CURRENT_TIMESTAMP - INTERVAL '%s days'
-                    RETURNING conversation_id
+                deleted_count = await conn.fetchval("""
+                    WITH expired AS (
+                        DELETE FROM ai_conversations
+                        WHERE updated_at < CURRENT_TIMESTAMP - make_interval(days => $1)
+                        RETURNING conversation_id
+                    ),
+                    purged AS (
+                        DELETE FROM conversation_messages
+                        WHERE conversation_id IN (SELECT conversation_id FROM expired)
+                    )
+                    SELECT COUNT(*) FROM expired
                 """, days)
                 
-                deleted_count = int(result.split()[-1]) if result else 0
-                
                 if deleted_count > 0:
                     logger.info(f"Cleaned up {deleted_count} old conversation sessions")
                 
@@ -15,6 +15,8 @@ import hashlib
 
 from .base import MemoryContextStore, ContextManager
 from .database_store import DatabaseContextStore
+from .session_locks import SessionLocks
+from services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -214,6 +216,12 @@ class HybridContextManager:
     Combines memory, database, and compression for optimal performance
     """
     
+    # Context keys written back to the database on every turn
+    PERSISTED_CONTEXT_KEYS = (
+        'entities', 'critical_data', 'intent_history',
+        'conversation_summary', 'audit_trail'
+    )
+    
     def __init__(self, 
                  db_config: Optional[Dict] = None,
                  memory_ttl: int = 3600,
@@ -244,7 +252,11 @@ class HybridContextManager:
         # Cache management
         self._session_cache = {}
         self._cache_timestamps = {}
-        self._lock = asyncio.Lock()
+        
+        # Per-session concurrency: no manager-wide lock, cold loads of the
+        # same session share one database round trip
+        self._session_locks = SessionLocks()
+        self._cold_loads = SingleFlight("context_load")
         
         logger.info("HybridContextManager initialized with memory and database storage")
     
@@ -268,63 +280,82 @@ class HybridContextManager:
         Returns:
             Context dictionary
         """
-        async with self._lock:
-            # L1: Check memory cache
-            if session_id in self._session_cache:
-                cache_age = (datetime.now() - self._cache_timestamps[session_id]).seconds
-                if cache_age < self.memory_ttl:
-                    logger.debug(f"Context cache hit for session {session_id}")
-                    return self._session_cache[session_id]
-            
-            # L2: Check memory store
-            memory_context = self.memory_store.get_session(session_id)
-            if memory_context.get('context'):
-                logger.debug(f"Memory store hit for session {session_id}")
-                self._update_cache(session_id, memory_context['context'])
-                return memory_context['context']
-            
-            # L3: Load from database
-            db_conversation = await self.db_store.get_conversation(session_id)
-            if db_conversation:
-                logger.debug(f"Database hit for session {session_id}")
-                
-                # Restore to memory store
-                self.memory_store.sessions[session_id] = {
-                    'context': db_conversation['context'],
-                    'history': deque(db_conversation['messages'], maxlen=50),
-                    'created_at': db_conversation['created_at'],
-                    'last_activity': datetime.now().isoformat()
-                }
-                
-                self._update_cache(session_id, db_conversation['context'])
-                return db_conversation['context']
-            
-            # Create new context
-            new_context = {
-                'session_id': session_id,
-                'customer_id': customer_id,
-                'created_at': datetime.now().isoformat(),
-                'entities': {},
-                'preferences': {},
-                'critical_data': {}
-            }
+        # L1/L2 are in-memory lookups and never wait
+        context = self._lookup_memory(session_id)
+        if context is not None:
+            return context
+        
+        # L3: one database load per session, shared by concurrent callers
+        return await self._cold_loads.run(
+            session_id, lambda: self._load_context(session_id, customer_id)
+        )
+    
+    def _lookup_memory(self, session_id: str) -> Optional[Dict]:
+        """L1 cache and L2 memory store (None on miss)"""
+        # L1: Check memory cache
+        if session_id in self._session_cache:
+            cache_age = (datetime.now() - self._cache_timestamps[session_id]).seconds
+            if cache_age < self.memory_ttl:
+                logger.debug(f"Context cache hit for session {session_id}")
+                return self._session_cache[session_id]
+        
+        # L2: Check memory store
+        memory_context = self.memory_store.get_session(session_id)
+        if memory_context.get('context'):
+            logger.debug(f"Memory store hit for session {session_id}")
+            self._update_cache(session_id, memory_context['context'])
+            return memory_context['context']
+        
+        return None
+    
+    async def _load_context(self, session_id: str, customer_id: Optional[str]) -> Dict:
+        """Load a session from the database, or create it (no locks held)"""
+        # L3: Load from database (only the tail the deque can hold)
+        db_conversation = await self.db_store.get_conversation(session_id, message_limit=50)
+        
+        # The session may have been created in memory while we were waiting
+        context = self._lookup_memory(session_id)
+        if context is not None:
+            return context
+        
+        if db_conversation:
+            logger.debug(f"Database hit for session {session_id}")
             
-            # Initialize in all layers
+            # Restore to memory store
             self.memory_store.sessions[session_id] = {
-                'context': new_context,
-                'history': deque(maxlen=50),
-                'created_at': new_context['created_at'],
+                'context': db_conversation['context'],
+                'history': deque(db_conversation['messages'], maxlen=50),
+                'created_at': db_conversation['created_at'],
                 'last_activity': datetime.now().isoformat()
             }
             
-            self._update_cache(session_id, new_context)
-            
-            # Save to database
-            await self.db_store.save_conversation(
-                session_id, [], new_context, customer_id
-            )
-            
-            return new_context
+            self._update_cache(session_id, db_conversation['context'])
+            return db_conversation['context']
+        
+        # Create new context
+        new_context = {
+            'session_id': session_id,
+            'customer_id': customer_id,
+            'created_at': datetime.now().isoformat(),
+            'entities': {},
+            'preferences': {},
+            'critical_data': {}
+        }
+        
+        # Initialize in memory first so later callers do not hit the database
+        self.memory_store.sessions[session_id] = {
+            'context': new_context,
+            'history': deque(maxlen=50),
+            'created_at': new_context['created_at'],
+            'last_activity': datetime.now().isoformat()
+        }
+        
+        self._update_cache(session_id, new_context)
+        
+        # Save to database
+        await self.db_store.update_context(session_id, new_context, customer_id)
+        
+        return new_context
     
     async def add_interaction(self, 
                             session_id: str,
@@ -406,42 +437,51 @@ class HybridContextManager:
         self._update_cache(session_id, context)
         self.memory_store.sessions[session_id]['context'] = context
         
-        # Save to database asynchronously
+        # Save to database asynchronously: append this turn, patch the
+        # context keys that are kept across turns
+        context_patch = {
+            key: context[key]
+            for key in self.PERSISTED_CONTEXT_KEYS
+            if key in context
+        }
         asyncio.create_task(self._persist_to_database(
-            session_id, history, context, customer_id, 
+            session_id, [user_msg, ai_msg], context_patch, customer_id,
             user_message, ai_response, intent
         ))
     
     async def _persist_to_database(self,
                                   session_id: str,
-                                  history: List[Dict],
-                                  context: Dict,
+                                  messages: List[Dict],
+                                  context_patch: Dict,
                                   customer_id: Optional[str],
                                   user_message: str,
                                   ai_response: str,
                                   intent: str):
         """
         Persist data to database (runs asynchronously)
+        
+        Writes for one session are applied in order; other sessions never wait.
         """
         try:
-            # Save conversation
-            await self.db_store.save_conversation(
-                session_id, history, context, customer_id
-            )
-            
-            # Save interaction
-            await self.db_store.add_interaction(
-                session_id, user_message, ai_response,
-                intent=intent, customer_id=customer_id
-            )
-            
-            # Update customer profile if customer_id provided
-            if customer_id:
-                await self.db_store.update_customer_profile(
-                    customer_id,
-                    preferences=context.get('entities', {}),
-                    increment_interaction=True
+            async with self._session_locks.get(session_id):
+                # Append new messages and patch context
+                await self.db_store.append_messages(
+                    session_id, messages, context_patch, customer_id
                 )
+                
+                # Save interaction
+                await self.db_store.add_interaction(
+                    session_id, user_message, ai_response,
+                    intent=intent, customer_id=customer_id
+                )
+                
+                # Update customer profile if customer_id provided
+                if customer_id:
+                    await self.db_store.update_customer_profile(
+                        customer_id,
+                        preferences=context_patch.get('entities', {}),
+                        increment_interaction=True
+                    )
             
             logger.debug(f"Persisted session {session_id} to database")
             
@@ -543,6 +583,15 @@ class HybridContextManager:
             context['audit_trail'] = []
         context['audit_trail'].append(audit_entry)
         
+        # Persist now: compliance records must survive eviction and restarts
+        try:
+            async with self._session_locks.get(session_id):
+                await self.db_store.update_context(
+                    session_id, {'audit_trail': list(context['audit_trail'])}
+                )
+        except Exception as e:
+            logger.error(f"Failed to persist audit trail for session {session_id}: {e}")
+        
         # Log for compliance
         logger.info(f"AUDIT: {action} for session {session_id}: {details}")
     
@@ -560,5 +609,7 @@ class HybridContextManager:
             'cached_sessions': len(self._session_cache),
             'database_stats': db_stats,
             'compression_enabled': self.enable_compression,
-            'memory_ttl_seconds': self.memory_ttl
+            'memory_ttl_seconds': self.memory_ttl,
+            'cold_loads': self._cold_loads.stats['executions'],
+            'coalesced_loads': self._cold_loads.stats['coalesced']
         }
\ No newline at end of file
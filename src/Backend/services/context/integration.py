@@ -283,7 +283,9 @@ class SmartAIEngineV5ContextIntegration:
         session = self.context_manager.memory_store.get_session(session_id)
         
         # Get database records
-        db_conversation = await self.context_manager.db_store.get_conversation(session_id)
+        db_conversation = await self.context_manager.db_store.get_conversation(
+            session_id, message_limit=None
+        )
         interactions = await self.context_manager.db_store.get_recent_interactions(
             session_id=session_id
         )
@@ -0,0 +1,34 @@
+"""
+Per-Session Concurrency Helpers for Context Managers
+Replaces a manager-wide lock so one session waiting on Postgres no longer
+stalls every other chat session in the process.
+
+- SessionLocks: asyncio locks keyed by session id, held through weak
+  references so idle sessions do not accumulate lock objects
+
+Concurrent cold loads of one session are collapsed with
+services.single_flight.SingleFlight.
+"""
+
+import asyncio
+import logging
+import weakref
+
+logger = logging.getLogger(__name__)
+
+
+class SessionLocks:
+    """Lock per session id, garbage-collected once nobody holds or waits on it"""
+
+    def __init__(self):
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def get(self, session_id: str) -> asyncio.Lock:
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[session_id] = lock
+        return lock
+
+    def __len__(self) -> int:
+        return len(self._locks)
@@ -13,6 +13,8 @@ from collections import deque
 
 from .base import MemoryContextStore
 from .database_store import DatabaseContextStore
+from .session_locks import SessionLocks
+from services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -52,7 +54,11 @@ class SimpleHybridContextManager:
         # Cache management
         self._session_cache = {}
         self._cache_timestamps = {}
-        self._lock = asyncio.Lock()
+        
+        # Per-session concurrency: no manager-wide lock, cold loads of the
+        # same session share one database round trip
+        self._session_locks = SessionLocks()
+        self._cold_loads = SingleFlight("context_load")
         
         logger.info("SimpleHybridContextManager initialized")
     
@@ -76,62 +82,83 @@ class SimpleHybridContextManager:
         Returns:
             Context dictionary with session information
         """
-        async with self._lock:
-            # L1: Check memory cache
-            if session_id in self._session_cache:
-                cache_age = (datetime.now() - self._cache_timestamps[session_id]).seconds
-                if cache_age < self.memory_ttl:
-                    logger.debug(f"Cache hit for session {session_id}")
-                    return self._session_cache[session_id]
-            
-            # L2: Check sessions
-            if session_id in self.sessions:
-                logger.debug(f"Memory store hit for session {session_id}")
-                context = self.sessions[session_id].get('context', {})
-                self._update_cache(session_id, context)
-                return context
-            
-            # L3: Load from database
-            db_conversation = await self.db_store.get_conversation(session_id)
-            if db_conversation:
-                logger.debug(f"Database hit for session {session_id}")
-                
-                # Restore to memory store
-                self.sessions[session_id] = {
-                    'context': db_conversation['context'],
-                    'history': deque(db_conversation['messages'], maxlen=self.max_history_length),
-                    'created_at': db_conversation['created_at'],
-                    'last_activity': datetime.now().isoformat()
-                }
-                
-                self._update_cache(session_id, db_conversation['context'])
-                return db_conversation['context']
-            
-            # Create new context
-            new_context = {
-                'session_id': session_id,
-                'customer_id': customer_id,
-                'created_at': datetime.now().isoformat(),
-                'message_count': 0,
-                'last_activity': datetime.now().isoformat()
-            }
+        # L1/L2 are plain dict lookups and never wait
+        context = self._lookup_memory(session_id)
+        if context is not None:
+            return context
+        
+        # L3: one database load per session, shared by concurrent callers
+        return await self._cold_loads.run(
+            session_id, lambda: self._load_context(session_id, customer_id)
+        )
+    
+    def _lookup_memory(self, session_id: str) -> Optional[Dict]:
+        """L1 cache and L2 session store (None on miss)"""
+        # L1: Check memory cache
+        if session_id in self._session_cache:
+            cache_age = (datetime.now() - self._cache_timestamps[session_id]).seconds
+            if cache_age < self.memory_ttl:
+                logger.debug(f"Cache hit for session {session_id}")
+                return self._session_cache[session_id]
+        
+        # L2: Check sessions
+        if session_id in self.sessions:
+            logger.debug(f"Memory store hit for session {session_id}")
+            context = self.sessions[session_id].get('context', {})
+            self._update_cache(session_id, context)
+            return context
+        
+        return None
+    
+    async def _load_context(self, session_id: str, customer_id: Optional[str]) -> Dict:
+        """Load a session from the database, or create it (no locks held)"""
+        # L3: Load from database (only the tail the deque can hold)
+        db_conversation = await self.db_store.get_conversation(
+            session_id, message_limit=self.max_history_length
+        )
+        
+        # A message may have created the session while we were waiting
+        context = self._lookup_memory(session_id)
+        if context is not None:
+            return context
+        
+        if db_conversation:
+            logger.debug(f"Database hit for session {session_id}")
             
-            # Initialize in all layers
+            # Restore to memory store
             self.sessions[session_id] = {
-                'context': new_context,
-                'history': deque(maxlen=self.max_history_length),
-                'created_at': new_context['created_at'],
-                'last_activity': new_context['last_activity']
+                'context': db_conversation['context'],
+                'history': deque(db_conversation['messages'], maxlen=self.max_history_length),
+                'created_at': db_conversation['created_at'],
+                'last_activity': datetime.now().isoformat()
             }
             
-            self._update_cache(session_id, new_context)
-            
-            # Save to database
-            await self.db_store.save_conversation(
-                session_id, [], new_context, customer_id
-            )
-            
-            return new_context
+            self._update_cache(session_id, db_conversation['context'])
+            return db_conversation['context']
+        
+        # Create new context
+        new_context = {
+            'session_id': session_id,
+            'customer_id': customer_id,
+            'created_at': datetime.now().isoformat(),
+            'message_count': 0,
+            'last_activity': datetime.now().isoformat()
+        }
+        
+        # Initialize in memory first so later callers do not hit the database
+        self.sessions[session_id] = {
+            'context': new_context,
+            'history': deque(maxlen=self.max_history_length),
+            'created_at': new_context['created_at'],
+            'last_activity': new_context['last_activity']
+        }
+        
+        self._update_cache(session_id, new_context)
+        
+        # Save to database
+        await self.db_store.update_context(session_id, new_context, customer_id)
+        
+        return new_context
     
     async def add_message(self, 
                          session_id: str,
@@ -185,9 +212,12 @@ class SimpleHybridContextManager:
         self._update_cache(session_id, context)
         self.sessions[session_id]['context'] = context
         
-        # Save to database asynchronously
+        # Save to database asynchronously: append this message, patch the
+        # context keys it changed
         asyncio.create_task(self._persist_to_database(
-            session_id, list(session['history']), context, customer_id
+            session_id, [message],
+            {'message_count': context['message_count'], 'last_activity': timestamp},
+            customer_id
         ))
     
     async def add_interaction(self, 
@@ -240,10 +270,10 @@ class SimpleHybridContextManager:
         
         if not history:
             # Load from database
-            db_conversation = await self.db_store.get_conversation(session_id)
-            if db_conversation:
-                history = db_conversation.get('messages', [])
-                
+            history = await self.db_store.get_recent_messages(
+                session_id, limit or self.max_history_length
+            )
+            if history and limit is None:
                 # Restore to memory
                 session['history'] = deque(history, maxlen=self.max_history_length)
         
@@ -306,40 +336,40 @@ class SimpleHybridContextManager:
         Args:
             session_id: Session identifier
         """
-        async with self._lock:
-            # Clear from cache
-            if session_id in self._session_cache:
-                del self._session_cache[session_id]
-            if session_id in self._cache_timestamps:
-                del self._cache_timestamps[session_id]
-            
-            # Clear from memory store
-            if session_id in self.sessions:
-                del self.sessions[session_id]
-            
-            # Note: We don't delete from database to maintain history
-            logger.info(f"Cleared session {session_id} from memory")
+        # Clear from cache
+        self._session_cache.pop(session_id, None)
+        self._cache_timestamps.pop(session_id, None)
+        
+        # Clear from memory store
+        self.sessions.pop(session_id, None)
+        
+        # Note: We don't delete from database to maintain history
+        logger.info(f"Cleared session {session_id} from memory")
     
     async def _persist_to_database(self,
                                   session_id: str,
-                                  history: List[Dict],
-                                  context: Dict,
+                                  messages: List[Dict],
+                                  context_patch: Dict,
                                   customer_id: Optional[str]):
         """
         Persist data to database (runs asynchronously)
+        
+        Writes for one session are applied in order (messages are numbered
+        as they are appended); other sessions never wait.
         """
         try:
-            # Save conversation
-            await self.db_store.save_conversation(
-                session_id, history, context, customer_id
-            )
-            
-            # Update customer profile if customer_id provided
-            if customer_id:
-                await self.db_store.update_customer_profile(
-                    customer_id,
-                    increment_interaction=True
+            async with self._session_locks.get(session_id):
+                # Append new messages and patch context
+                await self.db_store.append_messages(
+                    session_id, messages, context_patch, customer_id
                 )
+                
+                # Update customer profile if customer_id provided
+                if customer_id:
+                    await self.db_store.update_customer_profile(
+                        customer_id,
+                        increment_interaction=True
+                    )
             
             logger.debug(f"Persisted session {session_id} to database")
             
@@ -377,7 +407,10 @@ class SimpleHybridContextManager:
             'cached_sessions': len(self._session_cache),
             'database_stats': db_stats,
             'memory_ttl_seconds': self.memory_ttl,
-            'max_history_length': self.max_history_length
+            'max_history_length': self.max_history_length,
+            'cold_loads': self._cold_loads.stats['executions'],
+            'coalesced_loads': self._cold_loads.stats['coalesced'],
+            'active_session_locks': len(self._session_locks)
         }
     
     async def cleanup_old_sessions(self, days: int = 7) -> int:
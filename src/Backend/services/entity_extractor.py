@@ -11,6 +11,7 @@ import aiohttp
 from jsonschema import validate, ValidationError
 
 from services.config import PRODUCTS_CATEGORIES_ENDPOINT, PRODUCTS_SUBCATEGORIES_ENDPOINT, CONVERSATION_HISTORY_ENDPOINT
+from services.local_inference import InferencePriority, get_local_inference_executor
 
 logger = logging.getLogger(__name__)
 
@@ -150,20 +151,16 @@ class EntityExtractor:
                 logger.error(f"FATAL: EntityExtractor received SmartAIEngineV5 wrapper instead of llama-cpp model!")
                 raise ValueError("EntityExtractor must receive raw llama-cpp Llama instance, not SmartAIEngineV5")
 
-            # Direct llama-cpp call (synchronous, but wrapped in executor)
-            import asyncio
-            loop = asyncio.get_event_loop()
-
-            # Run synchronous llama-cpp call in thread executor
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.model(
-                    prompt,
-                    max_tokens=self.max_tokens,
-                    temperature=self.temperature,
-                    stop=["</s>", "\n\n\n"],
-                    echo=False
-                )
+            # Direct llama-cpp call on the local inference workers (intent lane:
+            # extraction is short and gates the rest of the request)
+            response = await get_local_inference_executor().submit(
+                prompt,
+                model=self.model,
+                priority=InferencePriority.INTENT,
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                stop=["</s>", "\n\n\n"],
+                echo=False
             )
 
             # llama-cpp returns dict with 'choices'
@@ -2,6 +2,7 @@
 FAISS-based embedding store for fast voice similarity search
 """
 
+import os
 import numpy as np
 import faiss
 import pickle
@@ -35,9 +36,10 @@ class FAISSEmbeddingStore:
 
         # Initialize FAISS index
         self.index = None
-        self.user_mapping = {}  # Maps index position to user_id
-        self.reverse_mapping = {}  # Maps user_id to index position
+        self.user_mapping = {}  # Maps FAISS vector id to user_id
+        self.reverse_mapping = {}  # Maps user_id to FAISS vector id
         self.metadata = {}  # Stores additional metadata per user
+        self.next_id = 0
 
         # Index configuration
         self.use_gpu = False  # Set to True if GPU available
@@ -57,6 +59,11 @@ class FAISSEmbeddingStore:
         # Thread lock for concurrent access
         self.lock = threading.Lock()
 
+        # Debounced persistence (enrollments are batched into one write)
+        self.save_delay = float(os.getenv("VOICE_INDEX_SAVE_DELAY_SECONDS", "5"))
+        self._dirty = False
+        self._save_task = None
+
         # Initialize or load index
         self._initialize_index()
 
@@ -76,6 +83,10 @@ class FAISSEmbeddingStore:
                     data = pickle.load(f)
                     self.user_mapping = data['user_mapping']
                     self.reverse_mapping = data['reverse_mapping']
+                    # Indexes written before ids were tracked used positions as ids
+                    self.next_id = data.get('next_id', max(self.user_mapping, default=-1) + 1)
+
+                self._enable_id_lookup()
 
                 if metadata_file.exists():
                     with open(metadata_file, 'r') as f:
@@ -105,9 +116,40 @@ class FAISSEmbeddingStore:
 
         # Set search parameters
         self.index.nprobe = self.nprobe
+        self._enable_id_lookup()
 
         logger.info(f"Created new FAISS IVF index with {self.nlist} clusters")
 
+    def _enable_id_lookup(self):
+        """Hash-table direct map: reconstruct and remove_ids by vector id"""
+        self.index.set_direct_map_type(faiss.DirectMap.Hashtable)
+
+    def _remove_user_locked(self, user_id: str) -> bool:
+        """Remove a user's vector from the index in place (lock held)"""
+        vector_id = self.reverse_mapping.pop(user_id, None)
+        if vector_id is None:
+            return False
+        self.index.remove_ids(np.array([vector_id], dtype='int64'))
+        self.user_mapping.pop(vector_id, None)
+        return True
+
+    def _allocate_ids(self, count: int) -> np.ndarray:
+        ids = np.arange(self.next_id, self.next_id + count, dtype='int64')
+        self.next_id += count
+        return ids
+
+    def _schedule_save(self):
+        """Persist after a quiet period instead of on every update"""
+        self._dirty = True
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._save_when_idle())
+
+    async def _save_when_idle(self):
+        while self._dirty:
+            await asyncio.sleep(self.save_delay)
+            if self._dirty:
+                await self.save_index()
+
     async def add_embedding(self, user_id: str, embedding: np.ndarray, metadata: Optional[Dict] = None) -> bool:
         """Add or update a user's voice embedding"""
         try:
@@ -118,23 +160,17 @@ class FAISSEmbeddingStore:
                 if norm > 0:
                     embedding = embedding / norm
 
-                # Check if user already exists
-                if user_id in self.reverse_mapping:
-                    # Update existing embedding
-                    idx = self.reverse_mapping[user_id]
-
-                    # FAISS doesn't support in-place updates, so we need to rebuild
-                    # For production, implement incremental updates or versioning
-                    logger.warning(f"Updating embedding for user {user_id} requires index rebuild")
-                    await self._rebuild_index_without_user(user_id)
+                # Updating replaces the user's previous vector in place
+                if self._remove_user_locked(user_id):
+                    logger.debug(f"Replacing embedding for user {user_id}")
 
                 # Add new embedding
-                self.index.add(np.expand_dims(embedding, axis=0))
-                new_idx = self.index.ntotal - 1
+                new_id = int(self._allocate_ids(1)[0])
+                self.index.add_with_ids(np.expand_dims(embedding, axis=0), np.array([new_id], dtype='int64'))
 
                 # Update mappings
-                self.user_mapping[new_idx] = user_id
-                self.reverse_mapping[user_id] = new_idx
+                self.user_mapping[new_id] = user_id
+                self.reverse_mapping[user_id] = new_id
 
                 # Store metadata
                 if metadata:
@@ -147,12 +183,10 @@ class FAISSEmbeddingStore:
                 self.metrics['total_embeddings'] = self.index.ntotal
                 self.metrics['index_updates'] += 1
 
-                # Persist to disk periodically
-                if self.metrics['index_updates'] % 100 == 0:
-                    await self.save_index()
+            self._schedule_save()
 
-                logger.info(f"Added embedding for user {user_id}, total: {self.index.ntotal}")
-                return True
+            logger.info(f"Added embedding for user {user_id}, total: {self.index.ntotal}")
+            return True
 
         except Exception as e:
             logger.error(f"Error adding embedding: {str(e)}")
@@ -196,7 +230,7 @@ class FAISSEmbeddingStore:
                 results = []
                 for idx, similarity in zip(indices[0], similarities):
                     if idx >= 0 and similarity >= threshold:
-                        user_id = self.user_mapping.get(idx)
+                        user_id = self.user_mapping.get(int(idx))
                         if user_id:
                             user_metadata = self.metadata.get(user_id, {})
                             results.append((user_id, float(similarity), user_metadata))
@@ -218,49 +252,24 @@ class FAISSEmbeddingStore:
         """Remove a user's embedding (GDPR compliance)"""
         try:
             with self.lock:
-                if user_id not in self.reverse_mapping:
+                if not self._remove_user_locked(user_id):
                     logger.warning(f"User {user_id} not found in index")
                     return False
 
-                # FAISS doesn't support deletion, need to rebuild
-                await self._rebuild_index_without_user(user_id)
+                self.metadata.pop(user_id, None)
+                self.metrics['total_embeddings'] = self.index.ntotal
+                self.metrics['index_updates'] += 1
 
-                logger.info(f"Removed embedding for user {user_id}")
-                return True
+            # Persist immediately so the biometric does not survive a restart
+            await self.save_index()
+
+            logger.info(f"Removed embedding for user {user_id}")
+            return True
 
         except Exception as e:
             logger.error(f"Error removing embedding: {str(e)}")
             return False
 
-    async def _rebuild_index_without_user(self, user_id: str):
-        """Rebuild index excluding a specific user"""
-        try:
-            # Get all embeddings except the one to remove
-            all_embeddings = []
-            new_user_mapping = {}
-            new_reverse_mapping = {}
-            idx_counter = 0
-
-            for idx, uid in self.user_mapping.items():
-                if uid != user_id:
-                    # Reconstruct embedding (would need to fetch from DB in production)
-                    # For now, we'll skip reconstruction
-                    pass
-
-            # Remove from metadata
-            if user_id in self.metadata:
-                del self.metadata[user_id]
-
-            # Update mappings
-            if user_id in self.reverse_mapping:
-                del self.reverse_mapping[user_id]
-
-            self.metrics['total_embeddings'] = self.index.ntotal
-
-        except Exception as e:
-            logger.error(f"Error rebuilding index: {str(e)}")
-            raise
-
     async def batch_add_embeddings(self, embeddings_data: List[Tuple[str, np.ndarray, Dict]]) -> int:
         """
         Add multiple embeddings in batch
@@ -298,12 +307,11 @@ class FAISSEmbeddingStore:
 
                 # Add to index
                 embeddings_array = np.array(embeddings_list, dtype='float32')
-                self.index.add(embeddings_array)
+                ids = self._allocate_ids(len(embeddings_list))
+                self.index.add_with_ids(embeddings_array, ids)
 
                 # Update mappings
-                start_idx = self.index.ntotal - len(embeddings_list)
-                for i, (user_id, metadata) in enumerate(zip(user_ids, metadatas)):
-                    idx = start_idx + i
+                for idx, user_id, metadata in zip(ids.tolist(), user_ids, metadatas):
                     self.user_mapping[idx] = user_id
                     self.reverse_mapping[user_id] = idx
 
@@ -316,8 +324,9 @@ class FAISSEmbeddingStore:
                 self.metrics['total_embeddings'] = self.index.ntotal
                 self.metrics['index_updates'] += len(embeddings_list)
 
-                logger.info(f"Added batch of {len(embeddings_list)} embeddings")
-                return len(embeddings_list)
+            self._schedule_save()
+            logger.info(f"Added batch of {len(embeddings_list)} embeddings")
+            return len(embeddings_list)
 
         except Exception as e:
             logger.error(f"Error in batch add: {str(e)}")
@@ -327,6 +336,8 @@ class FAISSEmbeddingStore:
         """Save FAISS index and mappings to disk"""
         try:
             with self.lock:
+                self._dirty = False
+
                 # Save FAISS index
                 index_file = self.index_path / "voice_embeddings.index"
                 faiss.write_index(self.index, str(index_file))
@@ -336,7 +347,8 @@ class FAISSEmbeddingStore:
                 with open(mapping_file, 'wb') as f:
                     pickle.dump({
                         'user_mapping': self.user_mapping,
-                        'reverse_mapping': self.reverse_mapping
+                        'reverse_mapping': self.reverse_mapping,
+                        'next_id': self.next_id
                     }, f)
 
                 # Save metadata
@@ -419,13 +431,12 @@ class FAISSEmbeddingStore:
                 # Re-train index with current data
                 logger.info("Optimizing FAISS index...")
 
-                # Extract all embeddings
-                embeddings = []
-                for idx in range(self.index.ntotal):
-                    embedding = self.index.reconstruct(idx)
-                    embeddings.append(embedding)
-
-                embeddings_array = np.array(embeddings, dtype='float32')
+                # Extract all embeddings (by id, so mappings stay valid)
+                ids = np.array(list(self.user_mapping.keys()), dtype='int64')
+                embeddings_array = np.array(
+                    [self.index.reconstruct(int(idx)) for idx in ids],
+                    dtype='float32'
+                )
 
                 # Create new optimized index
                 if self.index.ntotal > 10000:
@@ -447,13 +458,15 @@ class FAISSEmbeddingStore:
 
                 # Train and add data
                 index.train(embeddings_array)
-                index.add(embeddings_array)
+                index.add_with_ids(embeddings_array, ids)
                 index.nprobe = self.nprobe
 
                 # Replace old index
                 self.index = index
+                self._enable_id_lookup()
 
-                logger.info(f"Optimized index with {self.index.ntotal} embeddings")
+            self._schedule_save()
+            logger.info(f"Optimized index with {self.index.ntotal} embeddings")
 
         except Exception as e:
             logger.error(f"Error optimizing index: {str(e)}")
@@ -476,6 +489,7 @@ class FAISSEmbeddingStore:
                 self.user_mapping.clear()
                 self.reverse_mapping.clear()
                 self.metadata.clear()
+                self.next_id = 0
                 self.metrics['total_embeddings'] = 0
 
                 logger.info("Cleared FAISS index")
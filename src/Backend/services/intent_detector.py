@@ -3,15 +3,23 @@ Intent Detection System for V5 AI Engine
 Pluggable, LLM-agnostic intent classification with caching
 """
 
+import asyncio
 import json
 import logging
 import hashlib
+import os
+import threading
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 from collections import OrderedDict
 import time
 
+import numpy as np
+
+from services.local_inference import InferencePriority, get_local_inference_executor
+from services.single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,6 +44,15 @@ class IntentDetectorInterface(ABC):
         """
         pass
     
+    async def detect_async(self, message: str, language: str = "auto") -> Dict[str, Any]:
+        """
+        Async variant of detect()
+
+        Detectors backed by a local model override this so classification is
+        queued on the inference workers instead of blocking the event loop.
+        """
+        return self.detect(message, language)
+
     @abstractmethod
     def load_intents(self, agent_id: str) -> bool:
         """Load intent configuration for an agent"""
@@ -47,16 +64,307 @@ class IntentDetectorInterface(ABC):
         pass
 
 
+
+class EmbeddingIntentClassifier:
+    """
+    Nearest-example intent classifier over sentence embeddings
+
+    Every example phrase of every intent (examples, patterns, keywords and the
+    description) is embedded once into a normalized matrix. Classifying a
+    message is then one matrix-vector product plus a per-intent max, which
+    takes microseconds; the expensive part is embedding the message itself.
+    Matrices are shared between detectors loading identical intent sets.
+    """
+
+    # fingerprint -> (matrix, example texts, intent offsets, intent names), LRU
+    _index_cache: "OrderedDict[str, Tuple[np.ndarray, List[str], np.ndarray, List[str]]]" = OrderedDict()
+    _index_lock = threading.Lock()
+    max_cached_indexes = int(os.getenv("INTENT_EMBEDDING_INDEX_CACHE", "8"))
+
+    def __init__(
+        self,
+        embedding_service=None,
+        threshold: Optional[float] = None,
+        min_margin: Optional[float] = None
+    ):
+        """
+        Initialize the classifier
+
+        Args:
+            embedding_service: EmbeddingService instance (defaults to the shared one)
+            threshold: Minimum cosine similarity to accept a match
+            min_margin: Minimum lead of the best intent over the runner-up
+        """
+        self._embedding_service = embedding_service
+        self.threshold = threshold if threshold is not None else float(
+            os.getenv("INTENT_EMBEDDING_THRESHOLD", "0.6"))
+        self.min_margin = min_margin if min_margin is not None else float(
+            os.getenv("INTENT_EMBEDDING_MIN_MARGIN", "0.05"))
+
+        self.fingerprint: Optional[str] = None
+        self.matrix: Optional[np.ndarray] = None
+        self.examples: List[str] = []
+        self.offsets: Optional[np.ndarray] = None
+        self.intent_names: List[str] = []
+        self.stats = {
+            "classifications": 0,
+            "encodes": 0,
+            "accepted": 0,
+            "rejected": 0,
+            "builds": 0,
+            "avg_classify_us": 0.0,
+            "avg_encode_ms": 0.0
+        }
+
+    @property
+    def ready(self) -> bool:
+        return self.matrix is not None and len(self.intent_names) > 0
+
+    @property
+    def embedding_service(self):
+        if self._embedding_service is None:
+            from services.rag.embedding_service import get_embedding_service
+            self._embedding_service = get_embedding_service()
+        return self._embedding_service
+
+    @staticmethod
+    def compute_fingerprint(intents: Dict[str, Any]) -> str:
+        """Stable hash of an intent set, used to detect changes"""
+        payload = json.dumps(intents, sort_keys=True, default=str)
+        return hashlib.md5(payload.encode()).hexdigest()
+
+    @staticmethod
+    def _example_texts(intent_name: str, intent: Dict[str, Any]) -> List[str]:
+        texts = []
+        for key in ("examples", "patterns", "keywords"):
+            values = intent.get(key) or []
+            if isinstance(values, str):
+                values = [values]
+            texts.extend(str(v) for v in values)
+        if intent.get("description"):
+            texts.append(intent["description"])
+
+        seen = set()
+        unique = []
+        for text in texts:
+            normalized = text.strip().lower()
+            if normalized and normalized not in seen:
+                seen.add(normalized)
+                unique.append(text.strip())
+        return unique
+
+    @classmethod
+    def _cached_index(cls, fingerprint: str):
+        with cls._index_lock:
+            index = cls._index_cache.get(fingerprint)
+            if index is not None:
+                cls._index_cache.move_to_end(fingerprint)
+            return index
+
+    @classmethod
+    def _store_index(cls, fingerprint: str, index) -> None:
+        with cls._index_lock:
+            cls._index_cache[fingerprint] = index
+            cls._index_cache.move_to_end(fingerprint)
+            while len(cls._index_cache) > cls.max_cached_indexes:
+                cls._index_cache.popitem(last=False)
+
+    def _encode_index(self, intents: Dict[str, Any]):
+        """
+        Embed every example of an intent set (slow: seconds on first use)
+
+        Returns:
+            Index tuple, or None if the intents have no examples
+        """
+        examples: List[str] = []
+        offsets: List[int] = []
+        names: List[str] = []
+        for name, intent in intents.items():
+            texts = self._example_texts(name, intent if isinstance(intent, dict) else {})
+            if not texts:
+                continue
+            names.append(name)
+            offsets.append(len(examples))
+            examples.extend(texts)
+
+        if not examples:
+            return None
+
+        matrix = self.embedding_service.encode(examples, normalize=True)
+        self.stats["builds"] += 1
+        logger.info(f"🧭 Embedded {len(examples)} examples for {len(names)} intents")
+        return (
+            np.ascontiguousarray(matrix, dtype=np.float32),
+            examples,
+            np.asarray(offsets, dtype=np.intp),
+            names
+        )
+
+    def _install(self, fingerprint: str, index) -> bool:
+        """Swap in a built index (None disables the tier for this intent set)"""
+        self.fingerprint = fingerprint
+        if index is None:
+            logger.warning("Embedding intent tier disabled: no intent examples")
+            self.matrix = None
+            self.intent_names = []
+            return False
+        self.matrix, self.examples, self.offsets, self.intent_names = index
+        return True
+
+    def build(self, intents: Dict[str, Any]) -> bool:
+        """
+        (Re)build the example matrix for an intent set
+
+        Blocks while the examples are encoded; use build_async from the
+        event loop.
+
+        Args:
+            intents: The "intents" section of an agent's intent.json
+
+        Returns:
+            True if the classifier is usable afterwards
+        """
+        fingerprint = self.compute_fingerprint(intents)
+        if fingerprint == self.fingerprint and self.ready:
+            return True
+
+        index = self._cached_index(fingerprint)
+        if index is None:
+            try:
+                index = self._encode_index(intents)
+            except Exception as e:
+                logger.warning(f"Embedding intent tier unavailable: {e}")
+                return False
+            if index is not None:
+                self._store_index(fingerprint, index)
+
+        return self._install(fingerprint, index)
+
+    async def build_async(self, intents: Dict[str, Any]) -> bool:
+        """
+        build() with the encoding (and first model load) on a worker thread
+
+        The current matrix keeps serving classifications until the new one
+        is swapped in.
+        """
+        fingerprint = self.compute_fingerprint(intents)
+        if fingerprint == self.fingerprint and self.ready:
+            return True
+
+        index = self._cached_index(fingerprint)
+        if index is None:
+            try:
+                index = await asyncio.to_thread(self._encode_index, intents)
+            except Exception as e:
+                logger.warning(f"Embedding intent tier unavailable: {e}")
+                return False
+            if index is not None:
+                self._store_index(fingerprint, index)
+
+        return self._install(fingerprint, index)
+
+    def classify_vector(self, vector: np.ndarray) -> Optional[Dict[str, Any]]:
+        """
+        Classify an already-embedded (normalized) message
+
+        Returns:
+            Match dict (intent, confidence, margin, example, accepted) or None
+            if the classifier is not built
+        """
+        if not self.ready:
+            return None
+
+        start = time.perf_counter()
+        similarities = self.matrix @ np.asarray(vector, dtype=np.float32)
+        # Best example per intent (rows are grouped by intent)
+        intent_scores = np.maximum.reduceat(similarities, self.offsets)
+
+        if len(intent_scores) > 1:
+            top_two = np.argpartition(-intent_scores, 1)[:2]
+            best, runner_up = (top_two if intent_scores[top_two[0]] >= intent_scores[top_two[1]]
+                               else top_two[::-1])
+            margin = float(intent_scores[best] - intent_scores[runner_up])
+        else:
+            best = 0
+            margin = float(intent_scores[0])
+
+        confidence = float(intent_scores[best])
+        start_row = self.offsets[best]
+        end_row = self.offsets[best + 1] if best + 1 < len(self.offsets) else len(self.examples)
+        example = self.examples[start_row + int(np.argmax(similarities[start_row:end_row]))]
+
+        accepted = confidence >= self.threshold and margin >= self.min_margin
+        self._record("avg_classify_us", "classifications", (time.perf_counter() - start) * 1e6)
+        self.stats["accepted" if accepted else "rejected"] += 1
+
+        return {
+            "intent": self.intent_names[best],
+            "confidence": round(confidence, 4),
+            "margin": round(margin, 4),
+            "example": example,
+            "accepted": accepted
+        }
+
+    def classify(self, message: str) -> Optional[Dict[str, Any]]:
+        """Embed and classify a message"""
+        if not self.ready:
+            return None
+        start = time.perf_counter()
+        vector = self.embedding_service.encode(message, normalize=True)
+        self._record("avg_encode_ms", "encodes", (time.perf_counter() - start) * 1000)
+        return self.classify_vector(vector)
+
+    async def classify_async(self, message: str) -> Optional[Dict[str, Any]]:
+        """Embed (off the event loop) and classify a message"""
+        if not self.ready:
+            return None
+        start = time.perf_counter()
+        vector = await self.embedding_service.encode_async(message, normalize=True)
+        self._record("avg_encode_ms", "encodes", (time.perf_counter() - start) * 1000)
+        return self.classify_vector(vector)
+
+    def _record(self, key: str, count_key: str, value: float) -> None:
+        """Fold a sample into a running average"""
+        self.stats[count_key] += 1
+        current = self.stats[key]
+        self.stats[key] = round(current + (value - current) / self.stats[count_key], 3)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "ready": self.ready,
+            "intents": len(self.intent_names),
+            "examples": len(self.examples),
+            "threshold": self.threshold,
+            "min_margin": self.min_margin
+        }
+
+
 class LLMIntentDetector(IntentDetectorInterface):
-    """LLM-based intent detector with intelligent caching"""
+    """
+    LLM-based intent detector with intelligent caching
+
+    Detection runs in tiers: exact-match cache, embedding similarity against
+    the agent's intent examples, and only below the embedding confidence
+    threshold a full LLM classification call.
+    """
+
+    TIERS = ("cache", "embedding", "llm", "fallback")
     
-    def __init__(self, v5_engine=None, cache_size: int = 1000):
+    def __init__(
+        self,
+        v5_engine=None,
+        cache_size: int = 1000,
+        embedding_classifier: Optional[EmbeddingIntentClassifier] = None
+    ):
         """
         Initialize the LLM Intent Detector
         
         Args:
             v5_engine: Reference to V5 engine for LLM generation
             cache_size: Maximum number of cached intent results
+            embedding_classifier: Fast tier ahead of the LLM (created from
+                INTENT_EMBEDDING_ENABLED when not given)
         """
         self.v5_engine = v5_engine
         self.cache_size = cache_size
@@ -67,8 +375,25 @@ class LLMIntentDetector(IntentDetectorInterface):
             "cache_hits": 0,
             "cache_misses": 0,
             "total_requests": 0,
-            "avg_latency_ms": 0
+            "avg_latency_ms": 0,
+            "tier_hits": {tier: 0 for tier in self.TIERS}
         }
+
+        if embedding_classifier is None and \
+                os.getenv("INTENT_EMBEDDING_ENABLED", "true").lower() == "true":
+            embedding_classifier = EmbeddingIntentClassifier()
+        self.embedding_classifier = embedding_classifier
+
+        # Followers get a copy; callers annotate the result dict
+        self._inflight = SingleFlight("intent_detect", share=dict.copy)
+
+        # Change detection for automatic rebuilds of the embedding tier
+        self._embedded_config = None
+        self._intent_path: Optional[Path] = None
+        self._intent_mtime: Optional[float] = None
+        self._last_reload_check = 0.0
+        self._embedding_build: Optional[asyncio.Task] = None
+        self.reload_check_interval = float(os.getenv("INTENT_RELOAD_CHECK_SECONDS", "5"))
     
     def load_intents(self, agent_id: str) -> bool:
         """
@@ -83,13 +408,18 @@ class LLMIntentDetector(IntentDetectorInterface):
         try:
             # Load intent configuration
             intent_path = Path(f"prompts/agents/{agent_id}/intent.json")
+            self._intent_path = intent_path
+            self._last_reload_check = time.time()
             if not intent_path.exists():
                 # Try legacy path or create default
                 logger.warning(f"❌ INTENT.JSON NOT FOUND at {intent_path}, using defaults")
                 self.intent_config = self._get_default_intents()
                 self.current_agent = agent_id
+                self._intent_mtime = None
+                self._rebuild_embedding_tier()
                 return False
             
+            self._intent_mtime = intent_path.stat().st_mtime
             with open(intent_path, 'r') as f:
                 self.intent_config = json.load(f)
             
@@ -99,6 +429,7 @@ class LLMIntentDetector(IntentDetectorInterface):
             
             # Clear cache when loading new intents
             self.clear_cache()
+            self._rebuild_embedding_tier()
             
             return True
             
@@ -119,6 +450,169 @@ class LLMIntentDetector(IntentDetectorInterface):
             Detection result dictionary
         """
         start_time = time.time()
+        cache_key, cached = self._check_cache(message, language)
+        if cached:
+            return cached
+        
+        # Embedding tier first; the LLM only sees low-confidence messages
+        match = None
+        if self._embedding_tier_ready() and not self._on_event_loop():
+            try:
+                match = self.embedding_classifier.classify(message)
+            except Exception as e:
+                logger.warning(f"Embedding intent classification failed: {e}")
+
+        if match and match["accepted"]:
+            result = self._build_embedding_result(message, language, match)
+        else:
+            result = self._detect_with_llm(message, language)
+            self._attach_embedding_candidate(result, match)
+        
+        return self._finish_detection(cache_key, result, start_time)
+
+    @staticmethod
+    def _on_event_loop() -> bool:
+        """True when called from a running loop, where encoding would stall it"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        logger.debug("Sync intent detection on the event loop; use detect_async() for the embedding tier")
+        return True
+
+    async def detect_async(self, message: str, language: str = "auto") -> Dict[str, Any]:
+        """
+        Detect intent without blocking the event loop
+
+        The classification prompt is queued in the local inference executor's
+        intent lane, ahead of any long chat generations.
+        """
+        start_time = time.time()
+        cache_key, cached = self._check_cache(message, language)
+        if cached:
+            return cached
+
+        # Identical messages arriving together (e.g. a promotion going out)
+        # share one classification
+        return await self._inflight.run(
+            cache_key,
+            lambda: self._classify_async(message, language, cache_key, start_time)
+        )
+
+    async def _classify_async(self, message: str, language: str, cache_key: str, start_time: float) -> Dict[str, Any]:
+        match = None
+        if self._embedding_tier_ready():
+            try:
+                match = await self.embedding_classifier.classify_async(message)
+            except Exception as e:
+                logger.warning(f"Embedding intent classification failed: {e}")
+
+        if match and match["accepted"]:
+            result = self._build_embedding_result(message, language, match)
+        elif not self.v5_engine or not self.v5_engine.current_model or \
+                not hasattr(self.v5_engine, '_generate_internal_async'):
+            result = self._detect_with_llm(message, language)
+        else:
+            intents = self.intent_config.get("intents", {})
+            intent_list = list(intents.keys())
+            prompt = self._build_classification_prompt(message, intent_list, language)
+            try:
+                raw = await self.v5_engine._generate_internal_async(
+                    prompt=prompt,
+                    max_tokens=20,  # We only need the intent name
+                    temperature=0.1,  # Low temperature for consistency
+                    top_p=0.9
+                )
+                result = self._build_llm_result(message, language, prompt, intents, intent_list, raw)
+            except Exception as e:
+                logger.error(f"LLM detection failed: {e}")
+                result = self._fallback_detection(message, language)
+
+        if result.get("method") != "embedding":
+            self._attach_embedding_candidate(result, match)
+
+        return self._finish_detection(cache_key, result, start_time)
+
+    def _embedding_tier_ready(self) -> bool:
+        return bool(self.embedding_classifier and self.embedding_classifier.ready)
+
+    def _refresh_intents(self) -> None:
+        """
+        Rebuild the embedding tier when the agent's intents change
+
+        Catches both in-place config swaps (admin edits) and intent.json edits
+        on disk; the file is stat'ed at most every reload_check_interval seconds.
+        """
+        now = time.time()
+        if self._intent_path and self.current_agent and \
+                now - self._last_reload_check >= self.reload_check_interval:
+            self._last_reload_check = now
+            try:
+                mtime = self._intent_path.stat().st_mtime if self._intent_path.exists() else None
+            except OSError:
+                mtime = self._intent_mtime
+            if mtime != self._intent_mtime:
+                logger.info(f"🔄 intent.json changed for {self.current_agent}, reloading")
+                self.load_intents(self.current_agent)
+                return
+
+        if self.intent_config is not self._embedded_config:
+            self.clear_cache()
+            self._rebuild_embedding_tier()
+
+    def _rebuild_embedding_tier(self) -> None:
+        self._embedded_config = self.intent_config
+        if not self.embedding_classifier:
+            return
+        threshold = self.intent_config.get("embedding_threshold")
+        if threshold is not None:
+            self.embedding_classifier.threshold = float(threshold)
+        intents = self.intent_config.get("intents", {})
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to stall (startup, scripts): build inline
+            self.embedding_classifier.build(intents)
+            return
+
+        # Encoding takes seconds; requests keep using the current matrix
+        # until the background build swaps the new one in
+        if self._embedding_build and not self._embedding_build.done():
+            self._embedding_build.cancel()
+        self._embedding_build = loop.create_task(self.embedding_classifier.build_async(intents))
+
+    def _build_embedding_result(self, message: str, language: str, match: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn an accepted embedding match into a detection result"""
+        intents = self.intent_config.get("intents", {})
+        intent = match["intent"]
+        return {
+            "intent": intent,
+            "confidence": match["confidence"],
+            "prompt_type": intents.get(intent, {}).get("prompt_type"),
+            "language": language if language != "auto" else self._detect_language(message),
+            "method": "embedding",
+            "from_cache": False,
+            "metadata": {
+                "matched_example": match["example"],
+                "margin": match["margin"],
+                "intents_available": len(intents)
+            }
+        }
+
+    @staticmethod
+    def _attach_embedding_candidate(result: Dict[str, Any], match: Optional[Dict[str, Any]]) -> None:
+        """Keep the rejected embedding guess for threshold tuning"""
+        if match:
+            result.setdefault("metadata", {})["embedding_candidate"] = {
+                "intent": match["intent"],
+                "confidence": match["confidence"],
+                "margin": match["margin"]
+            }
+
+    def _check_cache(self, message: str, language: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Count the request and return (cache_key, cached result or None)"""
+        self._refresh_intents()
         self.stats["total_requests"] += 1
         
         # Generate cache key
@@ -127,17 +621,21 @@ class LLMIntentDetector(IntentDetectorInterface):
         # Check cache first
         if cache_key in self.cache:
             self.stats["cache_hits"] += 1
+            self.stats["tier_hits"]["cache"] += 1
             self._move_to_end(cache_key)  # LRU update
             result = self.cache[cache_key].copy()
             result["from_cache"] = True
             result["latency_ms"] = 0
-            return result
+            return cache_key, result
         
         self.stats["cache_misses"] += 1
-        
-        # Perform detection
-        result = self._detect_with_llm(message, language)
-        
+        return cache_key, None
+
+    def _finish_detection(self, cache_key: str, result: Dict[str, Any], start_time: float) -> Dict[str, Any]:
+        """Cache a fresh result and record its latency"""
+        tier = result.get("method", "fallback")
+        self.stats["tier_hits"][tier if tier in self.stats["tier_hits"] else "fallback"] += 1
+
         # Update cache
         self._add_to_cache(cache_key, result)
         
@@ -197,35 +695,7 @@ class LLMIntentDetector(IntentDetectorInterface):
                 # Direct model call to avoid recursion
                 result = self._direct_model_call(prompt)
             
-            # Ensure result is a dictionary
-            if not isinstance(result, dict):
-                logger.warning(f"Model returned non-dict result: {type(result)}")
-                result = {"text": str(result) if result else "general"}
-            
-            # Parse the response
-            response_text = result.get("text", "").strip().lower()
-            
-            # Extract intent and confidence
-            intent, confidence = self._parse_llm_response(response_text, intent_list)
-            
-            # Get prompt_type from intent configuration
-            prompt_type = None
-            if intent in intents:
-                prompt_type = intents[intent].get('prompt_type', None)
-            
-            return {
-                "intent": intent,
-                "confidence": confidence,
-                "prompt_type": prompt_type,  # Include prompt_type in result
-                "language": language if language != "auto" else self._detect_language(message),
-                "method": "llm",
-                "from_cache": False,
-                "metadata": {
-                    "model": self.v5_engine.current_model_name if self.v5_engine else "unknown",
-                    "prompt_tokens": len(prompt.split()),
-                    "intents_available": len(intent_list)
-                }
-            }
+            return self._build_llm_result(message, language, prompt, intents, intent_list, result)
             
         except Exception as e:
             logger.error(f"LLM detection failed: {e}")
@@ -235,6 +705,46 @@ class LLMIntentDetector(IntentDetectorInterface):
             if self.v5_engine and hasattr(self.v5_engine, '_detecting_intent'):
                 self.v5_engine._detecting_intent = False
     
+    def _build_llm_result(
+        self,
+        message: str,
+        language: str,
+        prompt: str,
+        intents: Dict[str, Any],
+        intent_list: List[str],
+        result: Any
+    ) -> Dict[str, Any]:
+        """Turn a raw classification completion into a detection result"""
+        # Ensure result is a dictionary
+        if not isinstance(result, dict):
+            logger.warning(f"Model returned non-dict result: {type(result)}")
+            result = {"text": str(result) if result else "general"}
+        
+        # Parse the response
+        response_text = result.get("text", "").strip().lower()
+        
+        # Extract intent and confidence
+        intent, confidence = self._parse_llm_response(response_text, intent_list)
+        
+        # Get prompt_type from intent configuration
+        prompt_type = None
+        if intent in intents:
+            prompt_type = intents[intent].get('prompt_type', None)
+        
+        return {
+            "intent": intent,
+            "confidence": confidence,
+            "prompt_type": prompt_type,  # Include prompt_type in result
+            "language": language if language != "auto" else self._detect_language(message),
+            "method": "llm",
+            "from_cache": False,
+            "metadata": {
+                "model": self.v5_engine.current_model_name if self.v5_engine else "unknown",
+                "prompt_tokens": len(prompt.split()),
+                "intents_available": len(intent_list)
+            }
+        }
+
     def _direct_model_call(self, prompt: str) -> Dict[str, Any]:
         """
         Direct model call to avoid recursion
@@ -247,9 +757,11 @@ class LLMIntentDetector(IntentDetectorInterface):
         """
         try:
             if self.v5_engine and self.v5_engine.current_model:
-                # Direct call to model
-                response = self.v5_engine.current_model(
+                # Direct call to model (still serialized on the inference workers)
+                response = get_local_inference_executor().run_sync(
                     prompt,
+                    model=self.v5_engine.current_model,
+                    priority=InferencePriority.INTENT,
                     max_tokens=20,
                     temperature=0.1,
                     top_p=0.9,
@@ -612,12 +1124,22 @@ Intent:"""
                 2
             )
         
+        total = self.stats["total_requests"]
+        tier_hit_rates = {
+            tier: f"{round(hits / total * 100, 2) if total else 0}%"
+            for tier, hits in self.stats["tier_hits"].items()
+        }
+        
         return {
             **self.stats,
+            "tier_hits": dict(self.stats["tier_hits"]),
+            "tier_hit_rates": tier_hit_rates,
             "cache_hit_rate": f"{hit_rate}%",
             "cache_size": len(self.cache),
             "cache_capacity": self.cache_size,
-            "current_agent": self.current_agent
+            "current_agent": self.current_agent,
+            "embedding_tier": self.embedding_classifier.get_stats() if self.embedding_classifier else None,
+            "coalescing": self._inflight.get_stats()
         }
     
     def _get_default_intents(self) -> Dict[str, Any]:
@@ -38,7 +38,15 @@ from .types import (
     AllProvidersExhaustedError
 )
 from .router import LLMRouter
-from .tenant_router import TenantLLMRouter, get_tenant_router, complete_for_tenant
+from .response_cache import ResponseCache, ResponseCacheConfig
+from .streaming import TokenStream
+from .http_pool import (
+    HTTPPoolConfig,
+    PooledHTTPClient,
+    get_http_client,
+    close_all_http_clients
+)
+from .tenant_router import TenantLLMRouter, get_tenant_router, complete_for_tenant, invalidate_tenant_config
 from .providers import (
     BaseProvider,
     OpenRouterProvider,
@@ -68,10 +76,22 @@ __all__ = [
 
     # Router
     "LLMRouter",
+    "TokenStream",
+
+    # Response cache
+    "ResponseCache",
+    "ResponseCacheConfig",
+
+    # Connection pooling
+    "HTTPPoolConfig",
+    "PooledHTTPClient",
+    "get_http_client",
+    "close_all_http_clients",
     
     # Tenant Router
     "TenantLLMRouter",
     "get_tenant_router",
+    "invalidate_tenant_config",
     "complete_for_tenant",
 
     # Providers
@@ -0,0 +1,183 @@
+"""
+Live Provider Health for LLM Gateway
+
+Latency and error tracking plus a per-provider circuit breaker, fed from
+BaseProvider.record_success / record_failure and read by the router's
+provider scoring.
+
+- LatencyTracker: EWMA latency and p95 over a sliding window of samples
+- ProviderCircuitBreaker: closed -> open after consecutive failures,
+  half-open after a cooldown (one probe request at a time), closed again
+  once the probe succeeds; repeated trips back off exponentially
+"""
+
+import logging
+import math
+import os
+import time
+from collections import deque
+from enum import Enum
+from typing import Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(Enum):
+    """Circuit breaker states"""
+    CLOSED = "closed"  # Normal operation
+    OPEN = "open"  # Failing, no traffic
+    HALF_OPEN = "half_open"  # Letting a probe request through
+
+
+class LatencyTracker:
+    """
+    Exponentially weighted latency and error rate with a p95 window
+
+    Args:
+        alpha: EWMA smoothing factor (higher reacts faster)
+        window: Number of recent samples kept for percentiles
+    """
+
+    def __init__(self, alpha: float = 0.2, window: int = 100):
+        self.alpha = alpha
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.ewma: Optional[float] = None
+        self.error_ewma = 0.0
+        self._p95: Optional[float] = None
+
+    @property
+    def count(self) -> int:
+        return len(self.samples)
+
+    def record_latency(self, seconds: float) -> None:
+        """Fold a successful request's latency into the averages"""
+        self.samples.append(seconds)
+        self.ewma = seconds if self.ewma is None else self.alpha * seconds + (1 - self.alpha) * self.ewma
+        self.error_ewma = (1 - self.alpha) * self.error_ewma
+        self._p95 = None
+
+    def record_error(self) -> None:
+        """Count a failed request toward the error rate"""
+        self.error_ewma = self.alpha + (1 - self.alpha) * self.error_ewma
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Latency percentile over the sample window (None without samples)"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    @property
+    def p95(self) -> Optional[float]:
+        if self._p95 is None:
+            self._p95 = self.percentile(95)
+        return self._p95
+
+    def summary(self) -> Dict:
+        return {
+            "samples": self.count,
+            "ewma_latency": round(self.ewma, 3) if self.ewma is not None else None,
+            "p95_latency": round(self.p95, 3) if self.p95 is not None else None,
+            "error_rate_ewma": round(self.error_ewma, 3)
+        }
+
+
+class ProviderCircuitBreaker:
+    """
+    Half-open circuit breaker for a single provider
+
+    Args:
+        name: Provider name (for logging)
+        failure_threshold: Consecutive failures that open the circuit
+        cooldown_seconds: Time open before a probe is allowed
+        max_cooldown_seconds: Cap for the exponential backoff on repeated trips
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        cooldown_seconds: Optional[float] = None,
+        max_cooldown_seconds: Optional[float] = None
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold or int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "3"))
+        self.base_cooldown = cooldown_seconds or float(os.getenv("LLM_CIRCUIT_COOLDOWN_SECONDS", "30"))
+        self.max_cooldown = max_cooldown_seconds or float(os.getenv("LLM_CIRCUIT_MAX_COOLDOWN_SECONDS", "300"))
+
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0  # Consecutive times opened without recovering
+        self.opened_at: Optional[float] = None
+        self.probe_started_at: Optional[float] = None
+        self.total_trips = 0
+
+    @property
+    def cooldown(self) -> float:
+        """Current cooldown, doubling for each trip since the last recovery"""
+        return min(self.max_cooldown, self.base_cooldown * (2 ** max(0, self.trips - 1)))
+
+    def allow_request(self) -> bool:
+        """
+        Whether the provider may receive traffic right now
+
+        Moves OPEN -> HALF_OPEN once the cooldown has elapsed. In HALF_OPEN
+        only one probe is let through at a time; a probe that never reports
+        back (e.g. cancelled) is given up on after one cooldown.
+        """
+        now = time.monotonic()
+
+        if self.state == CircuitState.CLOSED:
+            return True
+
+        if self.state == CircuitState.OPEN:
+            if self.opened_at is not None and now - self.opened_at >= self.cooldown:
+                self.state = CircuitState.HALF_OPEN
+                self.probe_started_at = None
+                logger.info(f"{self.name}: Circuit half-open - probing provider")
+            else:
+                return False
+
+        # HALF_OPEN
+        return self.probe_started_at is None or now - self.probe_started_at >= self.cooldown
+
+    def begin_attempt(self) -> None:
+        """Mark a dispatched request (claims the probe slot when half-open)"""
+        if self.state == CircuitState.HALF_OPEN:
+            self.probe_started_at = time.monotonic()
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        if self.state != CircuitState.CLOSED:
+            logger.info(f"{self.name}: Circuit closed - provider recovered")
+        self.state = CircuitState.CLOSED
+        self.trips = 0
+        self.opened_at = None
+        self.probe_started_at = None
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+
+        if self.state == CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != CircuitState.OPEN:
+                self.trips += 1
+                self.total_trips += 1
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+            self.probe_started_at = None
+            logger.warning(
+                f"{self.name}: Circuit opened after {self.consecutive_failures} failures "
+                f"(cooldown {self.cooldown:.0f}s)"
+            )
+
+    def summary(self) -> Dict:
+        remaining = None
+        if self.state == CircuitState.OPEN and self.opened_at is not None:
+            remaining = max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.total_trips,
+            "cooldown_remaining": round(remaining, 1) if remaining is not None else None
+        }
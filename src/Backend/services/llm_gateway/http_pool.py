@@ -0,0 +1,219 @@
+"""
+Pooled HTTP Clients for LLM Providers
+
+Keeps one long-lived keep-alive httpx client per provider endpoint and API key
+so chat turns reuse warm TCP/TLS connections instead of paying a fresh
+handshake on every completion.
+
+Configuration (environment variables):
+- LLM_HTTP_MAX_CONNECTIONS: Max open connections per client (default 20)
+- LLM_HTTP_MAX_KEEPALIVE: Max idle keep-alive connections per client (default 10)
+- LLM_HTTP_KEEPALIVE_EXPIRY: Seconds an idle connection is kept (default 30)
+- LLM_HTTP2: Enable HTTP/2 when the 'h2' package is installed (default true)
+
+Usage:
+    client = get_http_client("https://api.groq.com/openai/v1", api_key)
+    response = await client.post(url, json=payload, headers=headers, timeout=30.0)
+"""
+
+import hashlib
+import importlib.util
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class HTTPPoolConfig:
+    """Keep-alive limits for pooled provider clients"""
+    max_connections: int = field(
+        default_factory=lambda: int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20"))
+    )
+    max_keepalive_connections: int = field(
+        default_factory=lambda: int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "10"))
+    )
+    keepalive_expiry: float = field(
+        default_factory=lambda: float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "30"))
+    )
+    http2: bool = field(default_factory=lambda: _env_flag("LLM_HTTP2", True))
+    connect_timeout: float = 10.0
+
+
+class PooledHTTPClient:
+    """
+    Long-lived httpx.AsyncClient with connection reuse accounting
+
+    New connections are counted through httpcore's trace extension, which lets
+    us report how often a request was served over an already-open connection.
+    """
+
+    def __init__(self, name: str, config: Optional[HTTPPoolConfig] = None):
+        self.name = name
+        self.config = config or HTTPPoolConfig()
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # Pool metrics
+        self.requests = 0
+        self.new_connections = 0
+        self.errors = 0
+
+    @property
+    def http2_enabled(self) -> bool:
+        """HTTP/2 requires the optional 'h2' package"""
+        return self.config.http2 and importlib.util.find_spec("h2") is not None
+
+    @property
+    def is_closed(self) -> bool:
+        return self._client is None or self._client.is_closed
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Create the underlying client lazily (must run inside an event loop)"""
+        if self.is_closed:
+            limits = httpx.Limits(
+                max_connections=self.config.max_connections,
+                max_keepalive_connections=self.config.max_keepalive_connections,
+                keepalive_expiry=self.config.keepalive_expiry
+            )
+            self._client = httpx.AsyncClient(
+                limits=limits,
+                http2=self.http2_enabled,
+                timeout=httpx.Timeout(60.0, connect=self.config.connect_timeout)
+            )
+            logger.debug(
+                f"Opened pooled HTTP client for {self.name} "
+                f"(http2={self.http2_enabled}, max_connections={self.config.max_connections})"
+            )
+        return self._client
+
+    async def _trace(self, event_name: str, info: Dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self.new_connections += 1
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request over the pooled client"""
+        client = self._get_client()
+        extensions = kwargs.pop("extensions", None) or {}
+        extensions.setdefault("trace", self._trace)
+
+        self.requests += 1
+        try:
+            return await client.request(method, url, extensions=extensions, **kwargs)
+        except httpx.HTTPError:
+            self.errors += 1
+            raise
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    def stream(self, method: str, url: str, **kwargs):
+        """Open a streaming response (use as 'async with client.stream(...)')"""
+        client = self._get_client()
+        extensions = kwargs.pop("extensions", None) or {}
+        extensions.setdefault("trace", self._trace)
+
+        self.requests += 1
+        return client.stream(method, url, extensions=extensions, **kwargs)
+
+    def _open_connections(self) -> int:
+        """Number of connections currently held by the transport pool"""
+        if self.is_closed:
+            return 0
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        return len(connections) if connections is not None else 0
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Fraction of requests that did not need a new connection"""
+        if self.requests == 0:
+            return 0.0
+        reused = max(0, self.requests - self.new_connections)
+        return reused / self.requests
+
+    def get_stats(self) -> Dict:
+        return {
+            "open_connections": self._open_connections(),
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reuse_ratio": round(self.reuse_ratio, 3),
+            "errors": self.errors,
+            "http2": self.http2_enabled,
+            "closed": self.is_closed
+        }
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.debug(f"Closed pooled HTTP client for {self.name}")
+        self._client = None
+
+
+# Shared clients keyed by (base_url, API key fingerprint). Tenant routers build
+# new provider objects but still land on the same warm connections per key.
+_clients: Dict[str, PooledHTTPClient] = {}
+
+
+def _client_key(base_url: str, api_key: Optional[str]) -> str:
+    fingerprint = hashlib.sha256(api_key.encode()).hexdigest()[:12] if api_key else "anonymous"
+    return f"{base_url}#{fingerprint}"
+
+
+def get_http_client(
+    base_url: str,
+    api_key: Optional[str] = None,
+    config: Optional[HTTPPoolConfig] = None
+) -> PooledHTTPClient:
+    """
+    Get the shared pooled client for a provider endpoint and API key
+
+    Args:
+        base_url: Provider API base URL
+        api_key: API key the client will be used with (None for anonymous)
+        config: Optional keep-alive configuration (used on first creation)
+
+    Returns:
+        PooledHTTPClient shared by all providers with the same endpoint/key
+    """
+    key = _client_key(base_url, api_key)
+    client = _clients.get(key)
+    if client is None:
+        client = PooledHTTPClient(name=key, config=config)
+        _clients[key] = client
+    return client
+
+
+async def close_http_client(base_url: str, api_key: Optional[str] = None) -> None:
+    """Close and forget the pooled client for an endpoint/key"""
+    client = _clients.pop(_client_key(base_url, api_key), None)
+    if client:
+        await client.aclose()
+
+
+async def close_all_http_clients() -> None:
+    """Close every pooled client (application shutdown)"""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
+    if clients:
+        logger.info(f"Closed {len(clients)} pooled LLM HTTP clients")
+
+
+def get_pool_stats() -> Dict[str, Dict]:
+    """Metrics for every pooled client"""
+    return {key: client.get_stats() for key, client in _clients.items()}
@@ -4,6 +4,7 @@ Base Provider Interface
 All LLM providers must implement this interface.
 """
 
+import json
 import time
 from abc import ABC, abstractmethod
 from datetime import datetime
@@ -18,6 +19,7 @@ from ..types import (
     ProviderError,
     RateLimitError
 )
+from ..health import CircuitState, LatencyTracker, ProviderCircuitBreaker
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +32,13 @@ class BaseProvider(ABC):
         self.stats = ProviderStats()
         self.health = ProviderHealth()
 
+        # Live latency/error tracking per model and the provider's circuit
+        self.latency_trackers: Dict[str, LatencyTracker] = {}
+        self.circuit = ProviderCircuitBreaker(config.name)
+
+        # Pooled keep-alive HTTP client (set by remote providers)
+        self.http = None
+
         logger.info(f"Initialized provider: {config.name}")
 
     @property
@@ -47,6 +56,27 @@ class BaseProvider(ABC):
         """Check if provider is healthy"""
         return self.health.is_healthy
 
+    @property
+    def latency_tracker(self) -> LatencyTracker:
+        """Tracker for the currently configured model"""
+        model = self.config.model_name or "default"
+        tracker = self.latency_trackers.get(model)
+        if tracker is None:
+            tracker = self.latency_trackers[model] = LatencyTracker()
+        return tracker
+
+    @property
+    def expected_latency(self) -> float:
+        """Live EWMA latency, or the configured estimate before any samples"""
+        ewma = self.latency_tracker.ewma
+        return ewma if ewma is not None else self.config.avg_latency_seconds
+
+    @property
+    def p95_latency(self) -> Optional[float]:
+        """p95 latency once enough samples exist to trust it"""
+        tracker = self.latency_tracker
+        return tracker.p95 if tracker.count >= 5 else None
+
     @abstractmethod
     async def complete(
         self,
@@ -87,6 +117,108 @@ class BaseProvider(ABC):
         """
         pass
 
+    async def aclose(self) -> None:
+        """Release provider resources (pooled HTTP connections)"""
+        if self.http is not None:
+            await self.http.aclose()
+
+    async def _stream_openai_sse(
+        self,
+        url: str,
+        payload: Dict,
+        headers: Dict,
+        timeout: float = 60.0,
+        usage: Optional[Dict] = None
+    ) -> AsyncGenerator[str, None]:
+        """
+        Stream content deltas from an OpenAI-compatible chat completions API
+
+        Args:
+            url: Chat completions endpoint
+            payload: Request payload ('stream' is forced on)
+            headers: Request headers
+            timeout: Read timeout in seconds
+            usage: Optional dict filled with prompt_tokens, completion_tokens,
+                finish_reason and tool_calls once the provider reports them
+
+        Yields:
+            Content deltas as they arrive
+
+        Raises:
+            ProviderError: If request fails
+            RateLimitError: If rate limit exceeded
+        """
+        if self.http is None:
+            raise ProviderError(f"{self.name} has no HTTP client for streaming")
+
+        payload = {
+            **payload,
+            "stream": True,
+            "stream_options": {"include_usage": True}
+        }
+        # Tool calls arrive as fragments keyed by index; assembled at the end
+        tool_calls: Dict[int, Dict] = {}
+
+        async with self.http.stream(
+            "POST", url, json=payload, headers=headers, timeout=timeout
+        ) as response:
+            if response.status_code == 429:
+                retry_after = response.headers.get("Retry-After", "60")
+                raise RateLimitError(
+                    f"{self.name} rate limit exceeded. Retry after {retry_after}s"
+                )
+
+            if response.status_code != 200:
+                body = (await response.aread()).decode("utf-8", errors="replace")
+                raise ProviderError(
+                    f"{self.name} API error ({response.status_code}): {body[:500]}"
+                )
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+
+                try:
+                    chunk = json.loads(data)
+                except json.JSONDecodeError:
+                    logger.debug(f"{self.name}: Skipping malformed stream chunk")
+                    continue
+
+                if chunk.get("error"):
+                    raise ProviderError(f"{self.name} stream error: {chunk['error']}")
+
+                if usage is not None and chunk.get("usage"):
+                    usage["prompt_tokens"] = chunk["usage"].get("prompt_tokens", 0)
+                    usage["completion_tokens"] = chunk["usage"].get("completion_tokens", 0)
+
+                for choice in chunk.get("choices") or []:
+                    if usage is not None and choice.get("finish_reason"):
+                        usage["finish_reason"] = choice["finish_reason"]
+
+                    delta = choice.get("delta") or {}
+                    for fragment in delta.get("tool_calls") or []:
+                        call = tool_calls.setdefault(fragment.get("index", 0), {
+                            "id": None,
+                            "type": "function",
+                            "function": {"name": "", "arguments": ""}
+                        })
+                        if fragment.get("id"):
+                            call["id"] = fragment["id"]
+                        function = fragment.get("function") or {}
+                        call["function"]["name"] += function.get("name") or ""
+                        call["function"]["arguments"] += function.get("arguments") or ""
+
+                    content = delta.get("content")
+                    if content:
+                        yield content
+
+        if usage is not None and tool_calls:
+            usage["tool_calls"] = [tool_calls[index] for index in sorted(tool_calls)]
+
     def estimate_cost(self, tokens_input: int, tokens_output: int) -> float:
         """
         Estimate cost for token usage
@@ -126,6 +258,8 @@ class BaseProvider(ABC):
         self.stats.total_cost += cost
 
         # Update health
+        self.latency_tracker.record_latency(latency)
+        self.circuit.record_success()
         self.health.is_healthy = True
         self.health.consecutive_failures = 0
         self.health.last_success = datetime.now()
@@ -150,14 +284,12 @@ class BaseProvider(ABC):
         self.health.consecutive_failures += 1
         self.health.last_failure = datetime.now()
         self.health.last_failure_reason = str(error)
+        self.latency_tracker.record_error()
 
-        # Mark unhealthy after 3 consecutive failures
-        if self.health.consecutive_failures >= 3:
+        # Circuit opens after consecutive failures (or a failed half-open probe)
+        self.circuit.record_failure()
+        if self.circuit.state == CircuitState.OPEN:
             self.health.is_healthy = False
-            logger.warning(
-                f"{self.name}: Marked unhealthy after "
-                f"{self.health.consecutive_failures} failures"
-            )
 
         logger.error(f"{self.name}: Request failed - {error}")
 
@@ -208,6 +340,10 @@ class BaseProvider(ABC):
                 last_error = e
                 self.record_failure(e)
 
+                if self.circuit.state == CircuitState.OPEN:
+                    # Let the router fail over instead of retrying a tripped provider
+                    break
+
                 if attempt < retries:
                     wait_time = 2 ** attempt  # Exponential backoff
                     logger.info(
@@ -239,7 +375,10 @@ class BaseProvider(ABC):
             "total_cost": f"${self.stats.total_cost:.4f}",
             "avg_latency": f"{self.stats.avg_latency:.2f}s",
             "last_used": self.stats.last_used.isoformat() if self.stats.last_used else None,
-            "consecutive_failures": self.health.consecutive_failures
+            "consecutive_failures": self.health.consecutive_failures,
+            "latency": self.latency_tracker.summary(),
+            "circuit": self.circuit.summary(),
+            "connection_pool": self.http.get_stats() if self.http is not None else None
         }
 
     def get_available_models(self) -> List[Dict]:
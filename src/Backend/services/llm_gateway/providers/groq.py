@@ -22,6 +22,7 @@ from ..types import (
     RateLimitError
 )
 from .base import BaseProvider
+from ..http_pool import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +83,9 @@ class GroqProvider(BaseProvider):
         self.base_url = config.base_url
         self.model = config.model_name
 
+        # Long-lived keep-alive client shared by every provider using this key
+        self.http = get_http_client(self.base_url, self.api_key)
+
         if not self.api_key:
             logger.warning(
                 "Groq API key not set. "
@@ -140,87 +144,93 @@ class GroqProvider(BaseProvider):
             "Content-Type": "application/json"
         }
 
+        if stream:
+            # Deltas are pulled lazily by the router; errors surface on first read
+            return self._stream_openai_sse(
+                f"{self.base_url}/chat/completions",
+                payload,
+                headers,
+                timeout=30.0,
+                usage=kwargs.get("stream_usage")
+            )
+
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    json=payload,
-                    headers=headers
+            response = await self.http.post(
+                f"{self.base_url}/chat/completions",
+                json=payload,
+                headers=headers,
+                timeout=30.0
+            )
+
+            # Check for rate limiting
+            if response.status_code == 429:
+                retry_after = response.headers.get("Retry-After", "60")
+                raise RateLimitError(
+                    f"Groq rate limit exceeded. Retry after {retry_after}s"
                 )
 
-                # Check for rate limiting
-                if response.status_code == 429:
-                    retry_after = response.headers.get("Retry-After", "60")
-                    raise RateLimitError(
-                        f"Groq rate limit exceeded. Retry after {retry_after}s"
-                    )
-
-                # Check for other errors
-                if response.status_code != 200:
-                    error_msg = response.text
-                    try:
-                        error_data = response.json()
-                        error_msg = error_data.get("error", {}).get("message", error_msg)
-                    except:
-                        pass
-
-                    raise ProviderError(
-                        f"Groq API error ({response.status_code}): {error_msg}"
-                    )
-
-                data = response.json()
-
-                if stream:
-                    # Streaming not implemented in this version
-                    raise ProviderError("Streaming not yet implemented for Groq")
-
-                # Extract completion
-                choice = data["choices"][0]
-                message = choice["message"]
-                content = message.get("content", "")
-                tool_calls = message.get("tool_calls")
-
-                # Extract usage stats
-                usage = data.get("usage", {})
-                tokens_input = usage.get("prompt_tokens", 0)
-                tokens_output = usage.get("completion_tokens", 0)
-
-                # Calculate cost (free tier = $0)
-                cost = self.estimate_cost(tokens_input, tokens_output)
-
-                # Parse tool calls if present
-                parsed_tool_calls = None
-                if tool_calls:
-                    parsed_tool_calls = [
-                        {
-                            "id": tc.get("id"),
-                            "type": tc.get("type"),
-                            "function": {
-                                "name": tc["function"]["name"],
-                                "arguments": tc["function"]["arguments"]
-                            }
+            # Check for other errors
+            if response.status_code != 200:
+                error_msg = response.text
+                try:
+                    error_data = response.json()
+                    error_msg = error_data.get("error", {}).get("message", error_msg)
+                except:
+                    pass
+
+                raise ProviderError(
+                    f"Groq API error ({response.status_code}): {error_msg}"
+                )
+
+            data = response.json()
+
+            # Extract completion
+            choice = data["choices"][0]
+            message = choice["message"]
+            content = message.get("content", "")
+            tool_calls = message.get("tool_calls")
+
+            # Extract usage stats
+            usage = data.get("usage", {})
+            tokens_input = usage.get("prompt_tokens", 0)
+            tokens_output = usage.get("completion_tokens", 0)
+
+            # Calculate cost (free tier = $0)
+            cost = self.estimate_cost(tokens_input, tokens_output)
+
+            # Parse tool calls if present
+            parsed_tool_calls = None
+            if tool_calls:
+                parsed_tool_calls = [
+                    {
+                        "id": tc.get("id"),
+                        "type": tc.get("type"),
+                        "function": {
+                            "name": tc["function"]["name"],
+                            "arguments": tc["function"]["arguments"]
                         }
-                        for tc in tool_calls
-                    ]
-
-                return CompletionResult(
-                    content=content or "",  # May be empty if tool calls present
-                    provider=self.name,
-                    model=self.model,
-                    selection_reason="",  # Will be filled by router
-                    latency=0.0,  # Will be measured by base class
-                    tokens_input=tokens_input,
-                    tokens_output=tokens_output,
-                    cost=cost,
-                    cached=False,
-                    tool_calls=parsed_tool_calls,
-                    finish_reason=choice.get("finish_reason"),
-                    metadata={
-                        "model": data.get("model"),
-                        "id": data.get("id"),
-                        "created": data.get("created")
                     }
-                )
+                    for tc in tool_calls
+                ]
+
+            return CompletionResult(
+                content=content or "",  # May be empty if tool calls present
+                provider=self.name,
+                model=self.model,
+                selection_reason="",  # Will be filled by router
+                latency=0.0,  # Will be measured by base class
+                tokens_input=tokens_input,
+                tokens_output=tokens_output,
+                cost=cost,
+                cached=False,
+                tool_calls=parsed_tool_calls,
+                finish_reason=choice.get("finish_reason"),
+                metadata={
+                    "model": data.get("model"),
+                    "id": data.get("id"),
+                    "created": data.get("created")
+                }
+            )
 
         except httpx.TimeoutException:
             raise ProviderError("Groq request timed out after 30s")
@@ -240,13 +250,13 @@ class GroqProvider(BaseProvider):
             return False
 
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(
-                    self.config.health_check_url,
-                    headers={"Authorization": f"Bearer {self.api_key}"}
-                )
+            response = await self.http.get(
+                self.config.health_check_url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=10.0
+            )
 
-                return response.status_code == 200
+            return response.status_code == 200
 
         except Exception as e:
             logger.warning(f"Groq health check failed: {e}")
@@ -23,6 +23,7 @@ from ..types import (
     RateLimitError
 )
 from .base import BaseProvider
+from ..http_pool import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -44,12 +45,13 @@ class LLM7Provider(BaseProvider):
     - Good for prototyping
     """
 
-    def __init__(self, model_name: str = "gpt-4o-mini"):
+    def __init__(self, model_name: str = "gpt-4o-mini", api_key: Optional[str] = None):
         """
         Initialize LLM7 provider
 
         Args:
             model_name: Model to use (gpt-4o-mini, gpt-4o, claude-3-5-sonnet, etc.)
+            api_key: Optional LLM7 token (anonymous access when omitted)
         """
         # Get model from environment or use provided default
         model_name = os.getenv("LLM7_MODEL", model_name)
@@ -66,7 +68,7 @@ class LLM7Provider(BaseProvider):
             is_free=True,
             requests_per_minute=40,  # Conservative estimate
             requests_per_day=57600,  # 40 req/min * 60 * 24
-            api_key=None,  # No auth required
+            api_key=api_key,  # Optional - anonymous access without it
             base_url="https://llm7.io/v1",
             model_name=model_name,
             health_check_url="https://llm7.io/v1/models"
@@ -74,9 +76,13 @@ class LLM7Provider(BaseProvider):
 
         super().__init__(config)
 
+        self.api_key = api_key
         self.base_url = config.base_url
         self.model = config.model_name
 
+        # Long-lived keep-alive client shared by every provider using this key
+        self.http = get_http_client(self.base_url, self.api_key)
+
         logger.info(f"LLM7 provider initialized with model: {model_name} (NO AUTH REQUIRED)")
         
         if os.getenv("LLM7_MODEL"):
@@ -123,93 +129,101 @@ class LLM7Provider(BaseProvider):
             payload["tools"] = tools
             payload["tool_choice"] = "auto"
 
-        # NO AUTHORIZATION HEADER NEEDED!
+        # NO AUTHORIZATION HEADER NEEDED (tenant tokens are sent when provided)
         headers = {
             "Content-Type": "application/json"
         }
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+
+        if stream:
+            # Deltas are pulled lazily by the router; errors surface on first read
+            return self._stream_openai_sse(
+                f"{self.base_url}/chat/completions",
+                payload,
+                headers,
+                timeout=60.0,
+                usage=kwargs.get("stream_usage")
+            )
 
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/chat/completions",
-                    json=payload,
-                    headers=headers
+            response = await self.http.post(
+                f"{self.base_url}/chat/completions",
+                json=payload,
+                headers=headers,
+                timeout=60.0
+            )
+
+            # Check for rate limiting
+            if response.status_code == 429:
+                retry_after = response.headers.get("Retry-After", "60")
+                raise RateLimitError(
+                    f"LLM7 rate limit exceeded (40/min). Retry after {retry_after}s"
+                )
+
+            # Check for other errors
+            if response.status_code != 200:
+                error_msg = response.text
+                try:
+                    error_data = response.json()
+                    error_msg = error_data.get("error", {}).get("message", error_msg)
+                except:
+                    pass
+
+                raise ProviderError(
+                    f"LLM7 API error ({response.status_code}): {error_msg}"
                 )
 
-                # Check for rate limiting
-                if response.status_code == 429:
-                    retry_after = response.headers.get("Retry-After", "60")
-                    raise RateLimitError(
-                        f"LLM7 rate limit exceeded (40/min). Retry after {retry_after}s"
-                    )
-
-                # Check for other errors
-                if response.status_code != 200:
-                    error_msg = response.text
-                    try:
-                        error_data = response.json()
-                        error_msg = error_data.get("error", {}).get("message", error_msg)
-                    except:
-                        pass
-
-                    raise ProviderError(
-                        f"LLM7 API error ({response.status_code}): {error_msg}"
-                    )
-
-                data = response.json()
-
-                if stream:
-                    # Streaming not implemented in this version
-                    raise ProviderError("Streaming not yet implemented for LLM7")
-
-                # Extract completion
-                choice = data["choices"][0]
-                message = choice["message"]
-                content = message.get("content", "")
-                tool_calls = message.get("tool_calls")
-
-                # Extract usage stats
-                usage = data.get("usage", {})
-                tokens_input = usage.get("prompt_tokens", 0)
-                tokens_output = usage.get("completion_tokens", 0)
-
-                # Calculate cost (free = $0)
-                cost = 0.0
-
-                # Parse tool calls if present
-                parsed_tool_calls = None
-                if tool_calls:
-                    parsed_tool_calls = [
-                        {
-                            "id": tc.get("id"),
-                            "type": tc.get("type"),
-                            "function": {
-                                "name": tc["function"]["name"],
-                                "arguments": tc["function"]["arguments"]
-                            }
+            data = response.json()
+
+            # Extract completion
+            choice = data["choices"][0]
+            message = choice["message"]
+            content = message.get("content", "")
+            tool_calls = message.get("tool_calls")
+
+            # Extract usage stats
+            usage = data.get("usage", {})
+            tokens_input = usage.get("prompt_tokens", 0)
+            tokens_output = usage.get("completion_tokens", 0)
+
+            # Calculate cost (free = $0)
+            cost = 0.0
+
+            # Parse tool calls if present
+            parsed_tool_calls = None
+            if tool_calls:
+                parsed_tool_calls = [
+                    {
+                        "id": tc.get("id"),
+                        "type": tc.get("type"),
+                        "function": {
+                            "name": tc["function"]["name"],
+                            "arguments": tc["function"]["arguments"]
                         }
-                        for tc in tool_calls
-                    ]
-
-                return CompletionResult(
-                    content=content or "",
-                    provider=self.name,
-                    model=self.model,
-                    selection_reason="",  # Will be filled by router
-                    latency=0.0,  # Will be measured by base class
-                    tokens_input=tokens_input,
-                    tokens_output=tokens_output,
-                    cost=cost,
-                    cached=False,
-                    tool_calls=parsed_tool_calls,
-                    finish_reason=choice.get("finish_reason"),
-                    metadata={
-                        "model": data.get("model"),
-                        "id": data.get("id"),
-                        "provider": "llm7.io",
-                        "anonymous": True
                     }
-                )
+                    for tc in tool_calls
+                ]
+
+            return CompletionResult(
+                content=content or "",
+                provider=self.name,
+                model=self.model,
+                selection_reason="",  # Will be filled by router
+                latency=0.0,  # Will be measured by base class
+                tokens_input=tokens_input,
+                tokens_output=tokens_output,
+                cost=cost,
+                cached=False,
+                tool_calls=parsed_tool_calls,
+                finish_reason=choice.get("finish_reason"),
+                metadata={
+                    "model": data.get("model"),
+                    "id": data.get("id"),
+                    "provider": "llm7.io",
+                    "anonymous": True
+                }
+            )
 
         except httpx.TimeoutException:
             raise ProviderError("LLM7 request timed out after 60s")
@@ -226,9 +240,8 @@ class LLM7Provider(BaseProvider):
             True if healthy, False otherwise
         """
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(self.config.health_check_url)
-                return response.status_code == 200
+            response = await self.http.get(self.config.health_check_url, timeout=10.0)
+            return response.status_code == 200
 
         except Exception as e:
             logger.warning(f"LLM7 health check failed: {e}")
@@ -291,17 +304,17 @@ class LLM7Provider(BaseProvider):
 # Convenience constructors for popular models
 class LLM7GPT4Mini(LLM7Provider):
     """LLM7 with GPT-4o-mini (fast & efficient)"""
-    def __init__(self):
-        super().__init__(model_name="gpt-4o-mini")
+    def __init__(self, api_key: Optional[str] = None):
+        super().__init__(model_name="gpt-4o-mini", api_key=api_key)
 
 
 class LLM7GPT4(LLM7Provider):
     """LLM7 with GPT-4o (most capable)"""
-    def __init__(self):
-        super().__init__(model_name="gpt-4o")
+    def __init__(self, api_key: Optional[str] = None):
+        super().__init__(model_name="gpt-4o", api_key=api_key)
 
 
 class LLM7Claude(LLM7Provider):
     """LLM7 with Claude 3.5 Sonnet"""
-    def __init__(self):
-        super().__init__(model_name="claude-3.5-sonnet")
+    def __init__(self, api_key: Optional[str] = None):
+        super().__init__(model_name="claude-3.5-sonnet", api_key=api_key)
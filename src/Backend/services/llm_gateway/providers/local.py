@@ -21,6 +21,7 @@ from ..types import (
     ProviderError
 )
 from .base import BaseProvider
+from services.local_inference import InferencePriority, get_local_inference_executor
 
 logger = logging.getLogger(__name__)
 
@@ -157,13 +158,20 @@ class LocalProvider(BaseProvider):
             "stream": stream
         }
 
-        try:
-            # Call the model (llama-cpp-python format)
-            response = model(prompt, **generation_params)
+        if stream:
+            return self._stream_local(
+                model, prompt, generation_params, kwargs.get("stream_usage")
+            )
 
-            if stream:
-                # Streaming not implemented in this version
-                raise ProviderError("Streaming not yet implemented for Local provider")
+        try:
+            # Call the model (llama-cpp-python format) on the inference workers
+            generation_params.pop("stream")
+            response = await get_local_inference_executor().submit(
+                prompt,
+                model=model,
+                priority=InferencePriority.INTERACTIVE,
+                **generation_params
+            )
 
             # Extract response
             if isinstance(response, dict):
@@ -203,6 +211,59 @@ class LocalProvider(BaseProvider):
         except Exception as e:
             raise ProviderError(f"Local model completion failed: {e}")
 
+    async def _stream_local(
+        self,
+        model: Callable,
+        prompt: str,
+        generation_params: Dict,
+        usage: Optional[Dict] = None
+    ) -> AsyncGenerator[str, None]:
+        """
+        Stream tokens from a llama-cpp-python completion
+
+        Generation runs on the local inference workers so token production
+        never blocks the event loop between deltas.
+
+        Args:
+            model: Loaded model callable
+            prompt: Formatted prompt
+            generation_params: Generation parameters (with stream=True)
+            usage: Optional dict filled with token counts and finish_reason
+
+        Yields:
+            Generated text deltas
+        """
+        generation_params = {k: v for k, v in generation_params.items() if k != "stream"}
+        tokens_output = 0
+
+        try:
+            async for chunk in get_local_inference_executor().stream(
+                prompt,
+                model=model,
+                priority=InferencePriority.INTERACTIVE,
+                **generation_params
+            ):
+                if isinstance(chunk, str):
+                    # Callable without streaming support - whole text at once
+                    chunk = {"choices": [{"text": chunk}]}
+
+                choice = chunk.get("choices", [{}])[0]
+                if usage is not None and choice.get("finish_reason"):
+                    usage["finish_reason"] = choice["finish_reason"]
+
+                text = choice.get("text", "")
+                if text:
+                    tokens_output += 1
+                    yield text
+        except ProviderError:
+            raise
+        except Exception as e:
+            raise ProviderError(f"Local model streaming failed: {e}")
+
+        if usage is not None:
+            usage["prompt_tokens"] = len(prompt.split())
+            usage["completion_tokens"] = tokens_output
+
     def _messages_to_prompt(self, messages: List[Dict]) -> str:
         """
         Convert OpenAI message format to prompt string
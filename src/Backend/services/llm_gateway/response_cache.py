@@ -0,0 +1,465 @@
+"""
+Response Cache for LLM Router
+
+Serves repeated questions without a provider round trip:
+- Exact tier: normalized messages + model + sampling parameters
+- Semantic tier (optional): embedding similarity of the last user message,
+  built on services.rag.embedding_service.EmbeddingService
+- Per-tenant/store scoping (tenants never see each other's answers);
+  requests without a tenant are not cached
+- Streamed completions are stored once assembled and replayed as a stream
+- TTL expiry and bounded memory with LRU eviction
+- Optional Redis backend for the exact tier (shared across workers)
+
+Usage:
+    cache = ResponseCache(ResponseCacheConfig(semantic_enabled=True),
+                          embedding_service=get_embedding_service())
+    router = LLMRouter(cache=cache)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict, replace
+from typing import Dict, List, Optional, Tuple
+
+from .types import RequestContext, CompletionResult
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class ResponseCacheConfig:
+    """Configuration for the router response cache"""
+    enabled: bool = True
+    ttl_seconds: int = 3600
+    max_entries: int = 5000
+
+    # Requests above this temperature are sampled, not repeatable, and not cached
+    max_temperature: float = 0.2
+
+    # Semantic tier
+    semantic_enabled: bool = False
+    similarity_threshold: float = 0.95
+    max_semantic_entries_per_scope: int = 500
+
+    # Redis backend (exact tier only)
+    redis_url: Optional[str] = None
+    redis_key_prefix: str = "llm_cache:"
+
+    @classmethod
+    def from_env(cls) -> "ResponseCacheConfig":
+        """Build configuration from LLM_CACHE_* environment variables"""
+        return cls(
+            enabled=os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true",
+            ttl_seconds=int(os.getenv("LLM_CACHE_TTL_SECONDS", "3600")),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000")),
+            max_temperature=float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.2")),
+            semantic_enabled=os.getenv("LLM_CACHE_SEMANTIC", "false").lower() == "true",
+            similarity_threshold=float(os.getenv("LLM_CACHE_SIMILARITY", "0.95")),
+            redis_url=os.getenv("LLM_CACHE_REDIS_URL") or None
+        )
+
+
+@dataclass
+class _CacheEntry:
+    result: CompletionResult
+    expires_at: float
+
+
+class ResponseCache:
+    """
+    Two-tier completion cache used by LLMRouter.complete()
+
+    Only plain chat completions are cached: requests with tools, without a
+    tenant scope or with a sampling temperature always go to a provider.
+    """
+
+    def __init__(
+        self,
+        config: Optional[ResponseCacheConfig] = None,
+        embedding_service=None
+    ):
+        """
+        Initialize response cache
+
+        Args:
+            config: Cache configuration
+            embedding_service: EmbeddingService for the semantic tier (optional)
+        """
+        self.config = config or ResponseCacheConfig()
+        self.embedding_service = embedding_service
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+
+        # Semantic tier: scope -> (keys, embedding rows)
+        self._semantic_keys: Dict[str, List[str]] = {}
+        self._semantic_vectors: Dict[str, object] = {}
+
+        self._redis = None
+        self._redis_failed = False
+
+        # Statistics
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.cost_saved = 0.0
+        self.latency_saved = 0.0
+
+        if self.config.semantic_enabled and embedding_service is None:
+            logger.warning("Semantic cache tier requested without an embedding service - disabled")
+            self.config.semantic_enabled = False
+
+        logger.info(
+            f"ResponseCache initialized (ttl={self.config.ttl_seconds}s, "
+            f"max_entries={self.config.max_entries}, "
+            f"semantic={self.config.semantic_enabled}, "
+            f"redis={'yes' if self.config.redis_url else 'no'})"
+        )
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    def is_cacheable(self, context: RequestContext) -> bool:
+        """Check whether a request may be served from or stored in the cache"""
+        return (
+            self.config.enabled
+            and context.cacheable
+            and not context.requires_tools
+            and self._scope(context) is not None
+            and context.temperature <= self.config.max_temperature
+        )
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return _WHITESPACE.sub(" ", (text or "").strip().lower())
+
+    @staticmethod
+    def _scope(context: RequestContext) -> Optional[str]:
+        """Tenant (and store) the answer belongs to, None when unknown"""
+        if not context.tenant_id:
+            return None
+        if context.store_id:
+            return f"{context.tenant_id}:{context.store_id}"
+        return context.tenant_id
+
+    def _exact_key(
+        self,
+        messages: List[Dict],
+        context: RequestContext,
+        model_fingerprint: str
+    ) -> str:
+        normalized = [
+            (m.get("role", "user"), self._normalize(m.get("content", "")))
+            for m in messages
+        ]
+        payload = json.dumps(
+            [normalized, model_fingerprint, round(context.temperature, 2), context.max_tokens],
+            ensure_ascii=False
+        )
+        digest = hashlib.sha256(payload.encode()).hexdigest()
+        return f"{self._scope(context)}:{digest}"
+
+    def _semantic_scope(
+        self,
+        messages: List[Dict],
+        context: RequestContext,
+        model_fingerprint: str
+    ) -> Tuple[str, str]:
+        """
+        Split a request into (scope, query)
+
+        Everything except the last user message (system prompt, prior turns)
+        must match exactly; only the final question is compared by embedding.
+        """
+        last_user_index = None
+        for i in range(len(messages) - 1, -1, -1):
+            if messages[i].get("role") == "user":
+                last_user_index = i
+                break
+
+        if last_user_index is None:
+            return "", ""
+
+        prefix = [
+            (m.get("role", "user"), self._normalize(m.get("content", "")))
+            for i, m in enumerate(messages) if i != last_user_index
+        ]
+        payload = json.dumps(
+            [prefix, model_fingerprint, round(context.temperature, 2), context.max_tokens],
+            ensure_ascii=False
+        )
+        scope = f"{self._scope(context)}:{hashlib.sha256(payload.encode()).hexdigest()}"
+        return scope, self._normalize(messages[last_user_index].get("content", ""))
+
+    # ------------------------------------------------------------------
+    # Redis backend
+    # ------------------------------------------------------------------
+
+    async def _get_redis(self):
+        if not self.config.redis_url or self._redis_failed:
+            return None
+
+        if self._redis is None:
+            try:
+                import redis.asyncio as aioredis
+                self._redis = aioredis.from_url(self.config.redis_url, decode_responses=True)
+                await self._redis.ping()
+                logger.info("✅ ResponseCache connected to Redis")
+            except Exception as e:
+                logger.warning(f"ResponseCache Redis unavailable, using memory only: {e}")
+                self._redis = None
+                self._redis_failed = True
+
+        return self._redis
+
+    async def _redis_get(self, key: str) -> Optional[CompletionResult]:
+        redis = await self._get_redis()
+        if redis is None:
+            return None
+
+        try:
+            raw = await redis.get(f"{self.config.redis_key_prefix}{key}")
+            return CompletionResult(**json.loads(raw)) if raw else None
+        except Exception as e:
+            logger.debug(f"ResponseCache Redis get failed: {e}")
+            return None
+
+    async def _redis_set(self, key: str, result: CompletionResult) -> None:
+        redis = await self._get_redis()
+        if redis is None:
+            return
+
+        try:
+            await redis.setex(
+                f"{self.config.redis_key_prefix}{key}",
+                self.config.ttl_seconds,
+                json.dumps(asdict(result), default=str)
+            )
+        except Exception as e:
+            logger.debug(f"ResponseCache Redis set failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Memory tier
+    # ------------------------------------------------------------------
+
+    def _memory_get(self, key: str) -> Optional[CompletionResult]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        if entry.expires_at < time.time():
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return entry.result
+
+    def _memory_set(self, key: str, result: CompletionResult) -> None:
+        self._entries[key] = _CacheEntry(
+            result=result,
+            expires_at=time.time() + self.config.ttl_seconds
+        )
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.config.max_entries:
+            oldest_key, _ = self._entries.popitem(last=False)
+            self._remove_semantic(oldest_key)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self._remove_semantic(key)
+
+    # ------------------------------------------------------------------
+    # Semantic tier
+    # ------------------------------------------------------------------
+
+    def _remove_semantic(self, key: str) -> None:
+        for scope, keys in self._semantic_keys.items():
+            if key in keys:
+                import numpy as np
+                index = keys.index(key)
+                keys.pop(index)
+                self._semantic_vectors[scope] = np.delete(
+                    self._semantic_vectors[scope], index, axis=0
+                )
+                return
+
+    async def _semantic_get(self, scope: str, query: str) -> Optional[Tuple[str, CompletionResult]]:
+        keys = self._semantic_keys.get(scope)
+        if not keys or not query:
+            return None
+
+        embedding = await self.embedding_service.encode_async(query)
+        scores = self._semantic_vectors[scope] @ embedding
+        best = int(scores.argmax())
+
+        if float(scores[best]) < self.config.similarity_threshold:
+            return None
+
+        key = keys[best]
+        result = self._memory_get(key)
+        return (key, result) if result else None
+
+    async def _semantic_add(self, scope: str, query: str, key: str) -> None:
+        if not query:
+            return
+
+        import numpy as np
+        embedding = await self.embedding_service.encode_async(query)
+
+        keys = self._semantic_keys.setdefault(scope, [])
+        if key in keys:
+            return
+
+        vectors = self._semantic_vectors.get(scope)
+        row = embedding.reshape(1, -1).astype(np.float32)
+        self._semantic_vectors[scope] = row if vectors is None else np.vstack([vectors, row])
+        keys.append(key)
+
+        # Bound per-scope matrix size (oldest rows first)
+        overflow = len(keys) - self.config.max_semantic_entries_per_scope
+        if overflow > 0:
+            del keys[:overflow]
+            self._semantic_vectors[scope] = self._semantic_vectors[scope][overflow:]
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def get(
+        self,
+        messages: List[Dict],
+        context: RequestContext,
+        model_fingerprint: str
+    ) -> Optional[CompletionResult]:
+        """
+        Look up a cached completion
+
+        Returns:
+            CompletionResult marked cached=True, or None on miss
+        """
+        start_time = time.time()
+        key = self._exact_key(messages, context, model_fingerprint)
+
+        result = self._memory_get(key)
+        if result is None:
+            result = await self._redis_get(key)
+            if result is not None:
+                self._memory_set(key, result)
+
+        tier = "exact"
+        if result is None and self.config.semantic_enabled:
+            try:
+                scope, query = self._semantic_scope(messages, context, model_fingerprint)
+                match = await self._semantic_get(scope, query)
+                if match:
+                    _, result = match
+                    tier = "semantic"
+            except Exception as e:
+                logger.warning(f"Semantic cache lookup failed: {e}")
+
+        if result is None:
+            self.misses += 1
+            return None
+
+        if tier == "exact":
+            self.exact_hits += 1
+        else:
+            self.semantic_hits += 1
+
+        self.cost_saved += result.cost
+        self.latency_saved += result.latency
+
+        return replace(
+            result,
+            cached=True,
+            cost=0.0,
+            latency=time.time() - start_time,
+            selection_reason=f"cache:{tier}",
+            metadata={**result.metadata, "cache_tier": tier}
+        )
+
+    async def set(
+        self,
+        messages: List[Dict],
+        context: RequestContext,
+        model_fingerprint: str,
+        result: CompletionResult
+    ) -> None:
+        """Store a provider completion (streamed results once assembled)"""
+        if result.cached or result.tool_calls or not result.content:
+            return
+        # Truncated or filtered answers are not worth repeating
+        if result.finish_reason not in (None, "stop"):
+            return
+
+        key = self._exact_key(messages, context, model_fingerprint)
+        self._memory_set(key, result)
+        await self._redis_set(key, result)
+
+        if self.config.semantic_enabled:
+            try:
+                scope, query = self._semantic_scope(messages, context, model_fingerprint)
+                await self._semantic_add(scope, query, key)
+            except Exception as e:
+                logger.warning(f"Semantic cache insert failed: {e}")
+
+    async def invalidate(self, tenant_id: Optional[str] = None) -> None:
+        """
+        Drop cached responses
+
+        Args:
+            tenant_id: Only drop this tenant's entries (None for everything)
+        """
+        if tenant_id is None:
+            self._entries.clear()
+            self._semantic_keys.clear()
+            self._semantic_vectors.clear()
+        else:
+            prefix = f"{tenant_id}:"
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                self._entries.pop(key, None)
+            for scope in [s for s in self._semantic_keys if s.startswith(prefix)]:
+                del self._semantic_keys[scope]
+                del self._semantic_vectors[scope]
+
+        redis = await self._get_redis()
+        if redis is not None:
+            pattern = f"{self.config.redis_key_prefix}{tenant_id + ':' if tenant_id else ''}*"
+            try:
+                async for redis_key in redis.scan_iter(match=pattern):
+                    await redis.delete(redis_key)
+            except Exception as e:
+                logger.warning(f"ResponseCache Redis invalidation failed: {e}")
+
+        logger.info(f"ResponseCache invalidated ({tenant_id or 'all tenants'})")
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    def get_stats(self) -> Dict:
+        hits = self.exact_hits + self.semantic_hits
+        lookups = hits + self.misses
+        return {
+            "enabled": self.config.enabled,
+            "entries": len(self._entries),
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": f"{(hits / lookups * 100) if lookups else 0.0:.2f}%",
+            "evictions": self.evictions,
+            "cost_saved": f"${self.cost_saved:.4f}",
+            "latency_saved_seconds": round(self.latency_saved, 2)
+        }
@@ -4,14 +4,17 @@ LLM Router - Intelligent Multi-Provider Orchestration
 Routes requests to the best available LLM provider based on:
 - Cost optimization (free tiers prioritized)
 - Rate limit tracking (prevent quota exhaustion)
-- Health monitoring (automatic failover)
+- Health monitoring (automatic failover, per-provider circuit breakers)
 - Task requirements (reasoning vs speed)
-- Latency optimization (fastest provider for task)
+- Latency optimization (live EWMA/p95 latency, optional hedged requests)
 """
 
 import asyncio
 import logging
-from typing import Dict, List, Optional, Tuple
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple, Union
 from datetime import datetime
 
 from .types import (
@@ -22,9 +25,25 @@ from .types import (
     AllProvidersExhaustedError
 )
 from .providers.base import BaseProvider
+from .health import CircuitState
+from .http_pool import get_pool_stats
+from .response_cache import ResponseCache
+from .streaming import TokenStream, single_delta
+from services.metrics.tracing import traced, current_span
 
 logger = logging.getLogger(__name__)
 
+# Prometheus metrics are optional for the gateway
+try:
+    from services.metrics.prometheus_metrics import (
+        track_llm_time_to_first_token,
+        track_llm_stream,
+        track_llm_hedge
+    )
+    METRICS_ENABLED = True
+except ImportError:
+    METRICS_ENABLED = False
+
 
 class LLMRouter:
     """
@@ -36,6 +55,10 @@ class LLMRouter:
     - Cost tracking and optimization
     - Rate limit enforcement
     - Health monitoring
+    - Optional response cache (exact + semantic hits)
+    - Token streaming with failover until the first token arrives
+    - Optional hedging: a second provider is raced once the first has
+      taken longer than its own p95 latency
 
     Usage:
         router = LLMRouter()
@@ -46,14 +69,40 @@ class LLMRouter:
             messages=[{"role": "user", "content": "Hello"}],
             context=RequestContext(task_type=TaskType.CHAT, estimated_tokens=100)
         )
+
+        stream = await router.complete(messages, RequestContext(
+            task_type=TaskType.CHAT, estimated_tokens=100, requires_streaming=True
+        ))
+        async for delta in stream:
+            ...
     """
 
-    def __init__(self):
-        """Initialize the LLM router"""
+    def __init__(
+        self,
+        cache: Optional[ResponseCache] = None,
+        hedge_requests: Optional[bool] = None
+    ):
+        """
+        Initialize the LLM router
+
+        Args:
+            cache: Optional response cache consulted before any provider
+            hedge_requests: Race a backup provider past the primary's p95
+                (defaults to LLM_HEDGE_REQUESTS)
+        """
         self.providers: Dict[str, BaseProvider] = {}
         self.total_requests = 0
         self.total_cost = 0.0
-        self.request_history: List[Dict] = []
+        self.request_history: Deque[Dict] = deque(maxlen=1000)  # Last 1000 requests
+        self.cache = cache
+
+        if hedge_requests is None:
+            hedge_requests = os.getenv("LLM_HEDGE_REQUESTS", "false").lower() == "true"
+        self.hedge_requests = hedge_requests
+        self.hedge_stats = {"fired": 0, "won": 0}
+
+        # Per-provider streaming stats (time to first token)
+        self.stream_stats: Dict[str, Dict] = {}
 
         logger.info("LLMRouter initialized")
 
@@ -71,6 +120,22 @@ class LLMRouter:
         self.providers[provider.name] = provider
         logger.info(f"Registered provider: {provider.name}")
 
+    def set_cache(self, cache: Optional[ResponseCache]) -> None:
+        """
+        Attach (or detach with None) a response cache
+
+        Args:
+            cache: ResponseCache instance
+        """
+        self.cache = cache
+        logger.info(f"Response cache {'enabled' if cache else 'disabled'}")
+
+    def _model_fingerprint(self) -> str:
+        """Identify the current provider/model set for cache keys"""
+        return "|".join(
+            f"{name}={model}" for name, model in sorted(self.get_current_models_config().items())
+        )
+
     def unregister_provider(self, provider_name: str) -> None:
         """
         Unregister a provider from the router
@@ -82,22 +147,26 @@ class LLMRouter:
             del self.providers[provider_name]
             logger.info(f"Unregistered provider: {provider_name}")
 
+    @traced("llm.complete")
     async def complete(
         self,
         messages: List[Dict],
         context: RequestContext,
         max_retries: int = 3
-    ) -> CompletionResult:
+    ) -> Union[CompletionResult, TokenStream]:
         """
         Generate completion using best available provider
 
+        When context.requires_streaming is set, a TokenStream is returned
+        instead of a CompletionResult (see complete_stream).
+
         Args:
             messages: Chat messages in OpenAI format
             context: Request context with task requirements
             max_retries: Maximum number of providers to try
 
         Returns:
-            CompletionResult with response and metadata
+            CompletionResult with response and metadata, or TokenStream
 
         Raises:
             AllProvidersExhaustedError: If all providers fail
@@ -105,9 +174,33 @@ class LLMRouter:
         if not self.providers:
             raise AllProvidersExhaustedError("No providers registered")
 
+        span = current_span()
+        if context.requires_streaming:
+            # The span ends at the first token; the rest streams to the caller
+            span.set_attribute("streaming", True)
+            stream = await self.complete_stream(messages, context, max_retries)
+            span.set_attribute("provider", stream.provider)
+            return stream
+
         self.total_requests += 1
         attempted_providers = []
 
+        # Serve repeated questions from the response cache
+        use_cache = self.cache is not None and self.cache.is_cacheable(context)
+        if use_cache:
+            model_fingerprint = self._model_fingerprint()
+            try:
+                cached = await self.cache.get(messages, context, model_fingerprint)
+            except Exception as e:
+                logger.warning(f"Response cache lookup failed: {e}")
+                cached = None
+
+            if cached:
+                span.set_attribute("cached", True)
+                self._record_request(cached.provider, cached, cached.selection_reason)
+                logger.info(f"✓ Cache hit ({cached.selection_reason}): {cached.provider}")
+                return cached
+
         for attempt in range(max_retries):
             try:
                 # Score and select best provider
@@ -128,18 +221,23 @@ class LLMRouter:
                     f"Selected {provider.name} - {selection_reason}"
                 )
 
-                # Generate completion
-                result = await provider.complete_with_retry(
-                    messages=messages,
-                    temperature=context.temperature,
-                    max_tokens=context.max_tokens,
-                    stream=context.requires_streaming,
-                    tools=context.tools
+                # Generate completion (possibly hedged onto a second provider)
+                result, provider, selection_reason = await self._dispatch(
+                    messages, context, provider, selection_reason, attempted_providers
                 )
 
                 # Update router statistics
                 self.total_cost += result.cost
                 self._record_request(provider.name, result, selection_reason)
+                span.set_attribute("provider", provider.name)
+                span.set_attribute("attempts", attempt + 1)
+                span.set_attribute("tokens_output", result.tokens_output)
+
+                if use_cache:
+                    try:
+                        await self.cache.set(messages, context, model_fingerprint, result)
+                    except Exception as e:
+                        logger.warning(f"Response cache store failed: {e}")
 
                 logger.info(
                     f"✓ Success: {provider.name} - "
@@ -166,6 +264,267 @@ class LLMRouter:
 
         raise AllProvidersExhaustedError("Maximum retries exceeded")
 
+    async def complete_stream(
+        self,
+        messages: List[Dict],
+        context: RequestContext,
+        max_retries: int = 3
+    ) -> TokenStream:
+        """
+        Start a streamed completion on the best available provider
+
+        Providers are tried in score order until one produces its first
+        token, so connection errors and rate limits still fail over. Once a
+        token has been received the stream is committed to that provider.
+
+        Args:
+            messages: Chat messages in OpenAI format
+            context: Request context with task requirements
+            max_retries: Maximum number of providers to try
+
+        Returns:
+            TokenStream yielding content deltas
+
+        Raises:
+            AllProvidersExhaustedError: If no provider produced a first token
+        """
+        if not self.providers:
+            raise AllProvidersExhaustedError("No providers registered")
+
+        self.total_requests += 1
+        started_at = time.time()
+
+        # Cached answers are replayed as a single delta; misses are stored
+        # once the stream has been assembled
+        use_cache = self.cache is not None and self.cache.is_cacheable(context)
+        if use_cache:
+            model_fingerprint = self._model_fingerprint()
+            try:
+                cached = await self.cache.get(messages, context, model_fingerprint)
+            except Exception as e:
+                logger.warning(f"Response cache lookup failed: {e}")
+                cached = None
+
+            if cached:
+                current_span().set_attribute("cached", True)
+                self._record_request(cached.provider, cached, cached.selection_reason)
+                logger.info(f"✓ Cache hit ({cached.selection_reason}): {cached.provider}")
+                return TokenStream.from_result(cached, started_at)
+
+        # Providers that cannot stream are never candidates
+        attempted_providers = [
+            name for name, provider in self.providers.items()
+            if not provider.config.supports_streaming
+        ]
+        tried: List[str] = []
+
+        for attempt in range(max_retries):
+            provider, selection_reason = await self._select_provider(
+                context,
+                exclude=attempted_providers
+            )
+
+            if not provider:
+                break
+
+            attempted_providers.append(provider.name)
+            tried.append(provider.name)
+
+            logger.info(
+                f"Stream attempt {attempt + 1}/{max_retries}: "
+                f"Selected {provider.name} - {selection_reason}"
+            )
+
+            usage: Dict = {}
+            deltas = None
+            try:
+                deltas = await provider.complete(
+                    messages,
+                    temperature=context.temperature,
+                    max_tokens=context.max_tokens,
+                    stream=True,
+                    tools=context.tools,
+                    stream_usage=usage
+                )
+
+                if isinstance(deltas, CompletionResult):
+                    # Provider answered in one piece (e.g. local mock mode)
+                    usage.update(
+                        prompt_tokens=deltas.tokens_input,
+                        completion_tokens=deltas.tokens_output,
+                        finish_reason=deltas.finish_reason or "stop",
+                        tool_calls=deltas.tool_calls
+                    )
+                    deltas = single_delta(deltas.content)
+
+                try:
+                    first_delta = await deltas.__anext__()
+                except StopAsyncIteration:
+                    first_delta = ""
+
+            except Exception as e:
+                provider.record_failure(e)
+                if deltas is not None and hasattr(deltas, "aclose"):
+                    await deltas.aclose()
+                if METRICS_ENABLED:
+                    track_llm_stream(provider.name, "failover")
+                logger.warning(f"Stream from {provider.name} failed before first token: {e}")
+                continue
+
+            time_to_first_token = time.time() - started_at
+            self._record_time_to_first_token(provider.name, time_to_first_token)
+
+            logger.info(
+                f"✓ Streaming: {provider.name} - first token in {time_to_first_token:.2f}s"
+            )
+
+            stream = TokenStream(
+                provider=provider.name,
+                model=provider.config.model_name,
+                selection_reason=selection_reason,
+                deltas=deltas,
+                first_delta=first_delta,
+                started_at=started_at,
+                time_to_first_token=time_to_first_token,
+                usage=usage,
+                estimate_cost=provider.estimate_cost,
+                on_complete=self._make_stream_completion_handler(provider),
+                on_error=self._make_stream_error_handler(provider),
+                attempted_providers=tried
+            )
+            if use_cache:
+                stream.add_completion_callback(
+                    self._make_stream_cache_handler(messages, context, model_fingerprint)
+                )
+            return stream
+
+        raise AllProvidersExhaustedError(
+            f"No provider produced a first token "
+            f"(tried {', '.join(tried) or 'none'})"
+        )
+
+    async def _dispatch(
+        self,
+        messages: List[Dict],
+        context: RequestContext,
+        provider: BaseProvider,
+        selection_reason: str,
+        attempted_providers: List[str]
+    ) -> Tuple[CompletionResult, BaseProvider, str]:
+        """
+        Run a completion, hedging onto a backup provider when it runs long
+
+        With hedging enabled and enough latency samples, a second provider is
+        started once the first has been running for its p95 latency. The first
+        successful answer wins and the other request is cancelled.
+
+        Returns:
+            Tuple of (result, provider that answered, selection_reason)
+        """
+        def call(target: BaseProvider):
+            return target.complete_with_retry(
+                messages=messages,
+                temperature=context.temperature,
+                max_tokens=context.max_tokens,
+                tools=context.tools
+            )
+
+        hedge_after = provider.p95_latency if self.hedge_requests else None
+        if hedge_after is None:
+            return await call(provider), provider, selection_reason
+
+        primary = asyncio.create_task(call(provider))
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done:
+            return primary.result(), provider, selection_reason
+
+        backup, backup_reason = await self._select_provider(context, exclude=attempted_providers)
+        if not backup:
+            return await primary, provider, selection_reason
+
+        attempted_providers.append(backup.name)
+        self.hedge_stats["fired"] += 1
+        if METRICS_ENABLED:
+            track_llm_hedge(backup.name, "fired")
+        logger.info(
+            f"Hedging: {provider.name} passed its p95 ({hedge_after:.2f}s), "
+            f"racing {backup.name}"
+        )
+
+        contenders = {
+            primary: (provider, selection_reason),
+            asyncio.create_task(call(backup)): (backup, f"hedge after {hedge_after:.2f}s, {backup_reason}")
+        }
+        pending = set(contenders)
+        last_error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner, reason = contenders[task]
+                        if task is not primary:
+                            self.hedge_stats["won"] += 1
+                            if METRICS_ENABLED:
+                                track_llm_hedge(winner.name, "won")
+                        return task.result(), winner, reason
+                    last_error = task.exception()
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _make_stream_completion_handler(self, provider: BaseProvider):
+        """Record stats once a stream has been fully consumed"""
+        async def on_complete(result: CompletionResult) -> None:
+            provider.record_success(result.latency, result.tokens_input, result.tokens_output)
+            self.total_cost += result.cost
+            self._record_request(provider.name, result, result.selection_reason)
+            if METRICS_ENABLED:
+                track_llm_stream(provider.name, "completed")
+
+        return on_complete
+
+    def _make_stream_cache_handler(
+        self,
+        messages: List[Dict],
+        context: RequestContext,
+        model_fingerprint: str
+    ):
+        """Store a streamed completion in the response cache once assembled"""
+        async def on_complete(result: CompletionResult) -> None:
+            try:
+                await self.cache.set(messages, context, model_fingerprint, result)
+            except Exception as e:
+                logger.warning(f"Response cache store failed: {e}")
+
+        return on_complete
+
+    def _make_stream_error_handler(self, provider: BaseProvider):
+        """Record a failure for a stream interrupted after its first token"""
+        def on_error(error: Exception) -> None:
+            provider.record_failure(error)
+            if METRICS_ENABLED:
+                track_llm_stream(provider.name, "failed")
+
+        return on_error
+
+    def _record_time_to_first_token(self, provider_name: str, seconds: float) -> None:
+        """Accumulate time-to-first-token per provider"""
+        stats = self.stream_stats.setdefault(
+            provider_name, {"streams": 0, "total_ttft": 0.0, "last_ttft": 0.0}
+        )
+        stats["streams"] += 1
+        stats["total_ttft"] += seconds
+        stats["last_ttft"] = seconds
+
+        if METRICS_ENABLED:
+            track_llm_time_to_first_token(provider_name, seconds)
+
     async def _select_provider(
         self,
         context: RequestContext,
@@ -201,6 +560,7 @@ class LLMRouter:
         # Select best provider with non-zero score
         for score, reason, provider in scored_providers:
             if score > 0:
+                provider.circuit.begin_attempt()
                 return provider, f"score={score:.1f} ({reason})"
 
         # No providers with positive score
@@ -216,8 +576,9 @@ class LLMRouter:
 
         Scoring algorithm:
         - Cost (0-30 points): Free tiers prioritized
-        - Health (±30 points): Recent error tracking
-        - Latency (0-10 points): Faster is better
+        - Health (±30 points): Circuit breaker state and recent error rate
+        - Latency (-10 to 10 points): Live EWMA latency (configured estimate
+          until samples exist), with a penalty for a long p95 tail
         - Task Match (0-15 points): Reasoning/speed requirements
         - Environment (0-20 points): Dev vs production preference
         - Capabilities (0-10 points): Tools, streaming support
@@ -244,15 +605,25 @@ class LLMRouter:
             reasons.append(f"PAID(${cost:.2f}/1M)")
 
         # Factor 2: Health (±30 points)
-        if provider.is_healthy:
-            score += 10
-        else:
+        if not provider.circuit.allow_request():
+            reasons.append("CIRCUIT_OPEN")
+            return (0, ", ".join(reasons))  # Immediately disqualify tripped providers
+
+        if provider.circuit.state == CircuitState.HALF_OPEN:
+            # Probe only when nothing healthier is available
             score -= 30
-            reasons.append("UNHEALTHY")
-            return (0, ", ".join(reasons))  # Immediately disqualify unhealthy
+            reasons.append("PROBE")
+        else:
+            score += 10
 
-        # Factor 3: Latency (0-10 points)
-        latency = provider.config.avg_latency_seconds
+        tracker = provider.latency_tracker
+        error_penalty = 30 * tracker.error_ewma
+        if error_penalty >= 1:
+            score -= error_penalty
+            reasons.append(f"ERR~{tracker.error_ewma:.0%}")
+
+        # Factor 3: Latency (-10 to 10 points)
+        latency = provider.expected_latency
         if latency < 1.0:
             score += 10
             reasons.append("FAST")
@@ -262,6 +633,14 @@ class LLMRouter:
             score -= 5
             reasons.append("SLOW")
 
+        p95 = provider.p95_latency
+        if p95 is not None and p95 > 2 * latency and p95 > 2.0:
+            score -= 5
+            reasons.append("JITTERY")
+
+        if tracker.ewma is not None:
+            reasons.append(f"ewma={latency:.2f}s")
+
         # Factor 4: Task suitability (0-15 points)
         if context.requires_reasoning and provider.config.supports_reasoning:
             score += 15
@@ -306,6 +685,10 @@ class LLMRouter:
             result: Completion result
             selection_reason: Why this provider was selected
         """
+        # Providers leave this blank for the router to fill in
+        if not result.selection_reason:
+            result.selection_reason = selection_reason
+
         record = {
             "timestamp": datetime.now(),
             "provider": provider_name,
@@ -318,10 +701,8 @@ class LLMRouter:
             "cached": result.cached
         }
 
-        # Keep last 1000 requests
+        # Bounded deque keeps the last 1000 requests
         self.request_history.append(record)
-        if len(self.request_history) > 1000:
-            self.request_history.pop(0)
 
     def get_stats(self) -> Dict:
         """
@@ -341,6 +722,27 @@ class LLMRouter:
         for name, provider in self.providers.items():
             stats["providers"][name] = provider.get_stats_summary()
 
+        # Add keep-alive connection pool metrics
+        stats["connection_pools"] = get_pool_stats()
+
+        # Add response cache hit/miss and savings
+        if self.cache is not None:
+            stats["cache"] = self.cache.get_stats()
+
+        # Add hedged request outcomes
+        stats["hedging"] = {"enabled": self.hedge_requests, **self.hedge_stats}
+
+        # Add streaming time-to-first-token
+        if self.stream_stats:
+            stats["streaming"] = {
+                name: {
+                    "streams": data["streams"],
+                    "avg_time_to_first_token": round(data["total_ttft"] / data["streams"], 3),
+                    "last_time_to_first_token": round(data["last_ttft"], 3)
+                }
+                for name, data in self.stream_stats.items()
+            }
+
         # Add request distribution
         if self.request_history:
             provider_counts = {}
@@ -389,6 +791,8 @@ class LLMRouter:
                     "healthy": is_healthy,
                     "enabled": provider.is_enabled,
                     "consecutive_failures": provider.health.consecutive_failures,
+                    "circuit": provider.circuit.summary(),
+                    "latency": provider.latency_tracker.summary(),
                     "last_check": datetime.now().isoformat()
                 }
             except Exception as e:
@@ -471,6 +875,24 @@ class LLMRouter:
         logger.info(f"Updated provider '{provider_name}' to model '{model_name}'")
         return True
 
+    async def close(self) -> None:
+        """
+        Close pooled provider connections
+
+        Call on application shutdown so keep-alive connections are released
+        cleanly instead of being dropped when the event loop stops.
+        """
+        for name, provider in self.providers.items():
+            try:
+                await provider.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close provider {name}: {e}")
+
+        if self.cache is not None:
+            await self.cache.close()
+
+        logger.info("LLMRouter connections closed")
+
     def __repr__(self):
         return (
             f"LLMRouter("
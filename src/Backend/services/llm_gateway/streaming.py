@@ -0,0 +1,171 @@
+"""
+Token Streaming for LLM Gateway
+
+TokenStream wraps a provider's delta generator once the router has received
+the first token. Everything before that point (connection, rate limits, model
+errors) is retried on the next provider; after it, deltas go straight to the
+caller and the final CompletionResult is assembled when the stream ends.
+
+Usage:
+    stream = await router.complete(messages, context)  # requires_streaming=True
+    async for delta in stream:
+        await websocket.send_json({"type": "stream_delta", "delta": delta})
+    result = stream.result
+"""
+
+import logging
+import time
+from typing import AsyncGenerator, Awaitable, Callable, Dict, List, Optional
+
+from .types import CompletionResult, ProviderError
+
+logger = logging.getLogger(__name__)
+
+
+async def single_delta(text: str) -> AsyncGenerator[str, None]:
+    """Adapt a non-streamed response to the delta interface"""
+    if text:
+        yield text
+
+
+class TokenStream:
+    """
+    Async iterator over completion deltas from one provider
+
+    Attributes:
+        provider: Provider serving the stream
+        model: Model name
+        selection_reason: Why the router picked the provider
+        time_to_first_token: Seconds from request start to first delta
+        attempted_providers: Providers tried before (and including) this one
+        result: Final CompletionResult (set once the stream is exhausted)
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        selection_reason: str,
+        deltas: AsyncGenerator[str, None],
+        first_delta: str,
+        started_at: float,
+        time_to_first_token: float,
+        usage: Dict,
+        estimate_cost: Callable[[int, int], float],
+        on_complete: Optional[Callable[[CompletionResult], Awaitable[None]]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+        attempted_providers: Optional[List[str]] = None
+    ):
+        self.provider = provider
+        self.model = model
+        self.selection_reason = selection_reason
+        self.time_to_first_token = time_to_first_token
+        self.attempted_providers = attempted_providers or [provider]
+        self.result: Optional[CompletionResult] = None
+
+        self._deltas = deltas
+        self._first_delta = first_delta
+        self._started_at = started_at
+        self._usage = usage
+        self._estimate_cost = estimate_cost
+        self._completion_callbacks = [on_complete] if on_complete else []
+        self._on_error = on_error
+        self._parts: List[str] = []
+        self._final_result: Optional[CompletionResult] = None
+        self._iterator = self._iterate()
+
+    @classmethod
+    def from_result(cls, result: CompletionResult, started_at: float) -> "TokenStream":
+        """Replay a finished completion (e.g. a cache hit) as a one-delta stream"""
+        stream = cls(
+            provider=result.provider,
+            model=result.model,
+            selection_reason=result.selection_reason,
+            deltas=single_delta(""),
+            first_delta=result.content,
+            started_at=started_at,
+            time_to_first_token=time.time() - started_at,
+            usage={},
+            estimate_cost=lambda tokens_input, tokens_output: 0.0
+        )
+        stream._final_result = result
+        return stream
+
+    def add_completion_callback(
+        self,
+        callback: Callable[[CompletionResult], Awaitable[None]]
+    ) -> None:
+        """Run callback with the final CompletionResult when the stream ends"""
+        self._completion_callbacks.append(callback)
+
+    @property
+    def content(self) -> str:
+        """Text received so far"""
+        return "".join(self._parts)
+
+    def __aiter__(self) -> "TokenStream":
+        return self
+
+    async def __anext__(self) -> str:
+        return await self._iterator.__anext__()
+
+    async def _iterate(self) -> AsyncGenerator[str, None]:
+        if self._first_delta:
+            self._parts.append(self._first_delta)
+            yield self._first_delta
+
+        try:
+            async for delta in self._deltas:
+                self._parts.append(delta)
+                yield delta
+        except Exception as e:
+            # Tokens already reached the caller, so there is no failover here
+            if self._on_error:
+                self._on_error(e)
+            raise ProviderError(f"{self.provider} stream interrupted: {e}") from e
+
+        self.result = self._build_result()
+        for callback in self._completion_callbacks:
+            try:
+                await callback(self.result)
+            except Exception as e:
+                logger.warning(f"Stream completion callback failed: {e}")
+
+    def _build_result(self) -> CompletionResult:
+        if self._final_result is not None:
+            return self._final_result
+
+        content = self.content
+        tokens_input = self._usage.get("prompt_tokens", 0)
+        # Providers that omit usage get a rough word-based estimate
+        tokens_output = self._usage.get("completion_tokens") or len(content.split())
+
+        return CompletionResult(
+            content=content,
+            provider=self.provider,
+            model=self.model,
+            selection_reason=self.selection_reason,
+            latency=time.time() - self._started_at,
+            tokens_input=tokens_input,
+            tokens_output=tokens_output,
+            cost=self._estimate_cost(tokens_input, tokens_output),
+            tool_calls=self._usage.get("tool_calls"),
+            finish_reason=self._usage.get("finish_reason", "stop"),
+            metadata={
+                "streamed": True,
+                "time_to_first_token": round(self.time_to_first_token, 4)
+            }
+        )
+
+    async def collect(self) -> CompletionResult:
+        """Drain the stream and return the final result"""
+        async for _ in self:
+            pass
+        return self.result
+
+    async def aclose(self) -> None:
+        """Stop reading (client went away) and release the connection"""
+        await self._iterator.aclose()
+        aclose = getattr(self._deltas, "aclose", None)
+        if aclose:
+            await aclose()
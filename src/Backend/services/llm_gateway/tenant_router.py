@@ -8,17 +8,25 @@ Features:
 - Auto-failover on rate limits (if enabled by tenant)
 - Track all requests to model_usage_stats table
 - Cost calculation and monitoring
+- Long-lived per-tenant routers (LRU) so provider health, latency and
+  connections carry across requests; invalidated via LISTEN/NOTIFY
 """
 
 import asyncio
 import asyncpg
+import hashlib
+import json
 import logging
 import os
 import time
-from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime
 
 from .router import LLMRouter
+from .http_pool import close_all_http_clients
+from .response_cache import ResponseCache, ResponseCacheConfig
+from .streaming import TokenStream
 from .types import RequestContext, CompletionResult, TaskType
 from .providers import (
     BaseProvider,
@@ -31,9 +39,19 @@ from .providers import (
     LocalProvider
 )
 from services.model_usage_tracker import get_usage_tracker
+from services.single_flight import SingleFlight
+
+try:
+    from services.metrics.prometheus_metrics import track_tenant_router_cache
+    METRICS_ENABLED = True
+except ImportError:
+    METRICS_ENABLED = False
 
 logger = logging.getLogger(__name__)
 
+# NOTIFY channel raised by the tenants trigger (migration 033)
+TENANT_CONFIG_CHANNEL = "tenant_llm_config"
+
 # Database configuration
 DB_CONFIG = {
     'host': os.getenv('DB_HOST', 'localhost'),
@@ -70,6 +88,29 @@ class TenantLLMRouter:
         self._tenant_config_cache: Dict[str, Dict] = {}
         self._cache_timestamps: Dict[str, datetime] = {}
         self._cache_ttl_seconds = 300  # 5 minutes
+        self._config_loads = SingleFlight("tenant_config")
+        self._config_epoch = 0  # bumped on invalidation
+
+        # Response cache shared by all tenant routers (entries are tenant-scoped)
+        cache_config = ResponseCacheConfig.from_env()
+        self.response_cache = ResponseCache(cache_config) if cache_config.enabled else None
+
+        # Constructed routers keyed by a hash of tokens + models (tenants with
+        # identical settings share one), least recently used evicted first
+        self._routers: "OrderedDict[str, LLMRouter]" = OrderedDict()
+        self._tenant_router_keys: Dict[str, str] = {}
+        self._router_cache_size = int(os.getenv("TENANT_ROUTER_CACHE_SIZE", "128"))
+        self.router_stats = {
+            "builds": 0,
+            "hits": 0,
+            "evictions": 0,
+            "invalidations": 0
+        }
+
+        # Dedicated connection listening for tenant LLM config changes
+        self._listen_enabled = os.getenv("TENANT_CONFIG_LISTEN", "true").lower() == "true"
+        self._listen_conn: Optional[asyncpg.Connection] = None
+        self._listen_task: Optional[asyncio.Task] = None
         
         logger.info("TenantLLMRouter created")
     
@@ -90,13 +131,78 @@ class TenantLLMRouter:
         except Exception as e:
             logger.error(f"❌ Failed to initialize TenantLLMRouter: {e}")
             raise
+
+        if self._listen_enabled:
+            await self._start_listener()
+
+    async def _start_listener(self) -> bool:
+        """LISTEN for tenant config changes (falls back to the config TTL)"""
+        try:
+            conn = await asyncpg.connect(**DB_CONFIG)
+            await conn.add_listener(TENANT_CONFIG_CHANNEL, self._on_config_notification)
+            conn.add_termination_listener(self._on_listener_lost)
+            self._listen_conn = conn
+            logger.info(f"👂 Listening for tenant LLM config changes on '{TENANT_CONFIG_CHANNEL}'")
+            return True
+        except Exception as e:
+            logger.warning(
+                f"⚠️ Tenant config LISTEN unavailable, relying on "
+                f"{self._cache_ttl_seconds}s TTL: {e}"
+            )
+            return False
+
+    def _on_config_notification(self, conn, pid: int, channel: str, payload: str):
+        """NOTIFY payload is the changed tenant id (empty = all tenants)"""
+        logger.debug(f"Tenant config change notification: {payload or 'all'}")
+        self.invalidate_cache(payload or None)
+
+    def _on_listener_lost(self, conn):
+        """Notifications may have been missed: drop everything and reconnect"""
+        self._listen_conn = None
+        if not self._initialized:
+            return
+        logger.warning("Tenant config listener connection lost, reconnecting")
+        self.invalidate_cache()
+        if self._listen_task is None or self._listen_task.done():
+            self._listen_task = asyncio.create_task(self._reconnect_listener())
+
+    async def _reconnect_listener(self):
+        delay = 1.0
+        while self._initialized and self._listen_conn is None:
+            await asyncio.sleep(delay)
+            if await self._start_listener():
+                # Changes made while disconnected were never notified
+                self.invalidate_cache()
+                return
+            delay = min(delay * 2, 60.0)
     
     async def close(self):
-        """Close database connection pool"""
+        """Close database connection pool and pooled provider connections"""
+        self._initialized = False
+        if self._listen_task:
+            self._listen_task.cancel()
+            self._listen_task = None
+        if self._listen_conn:
+            conn, self._listen_conn = self._listen_conn, None
+            conn.remove_termination_listener(self._on_listener_lost)
+            try:
+                await conn.close()
+            except Exception as e:
+                logger.debug(f"Error closing tenant config listener: {e}")
+
+        self._routers.clear()
+        self._tenant_router_keys.clear()
+
         if self.db_pool:
             await self.db_pool.close()
             self._initialized = False
             logger.info("TenantLLMRouter connection pool closed")
+
+        # Per-tenant provider clients are shared by API key, close them all
+        await close_all_http_clients()
+
+        if self.response_cache:
+            await self.response_cache.close()
     
     async def _load_tenant_config(self, tenant_id: str) -> Dict:
         """
@@ -127,7 +233,16 @@ class TenantLLMRouter:
             if cache_age < self._cache_ttl_seconds:
                 logger.debug(f"Using cached config for tenant {tenant_id}")
                 return self._tenant_config_cache[tenant_id]
-        
+
+        # A tenant's sessions all miss together after expiry or a NOTIFY;
+        # one query serves them
+        return await self._config_loads.run(tenant_id, lambda: self._fetch_tenant_config(tenant_id))
+
+    async def _fetch_tenant_config(self, tenant_id: str) -> Dict:
+        """Query a tenant's LLM configuration and cache it"""
+        now = datetime.now()
+        epoch = self._config_epoch
+
         # Load from database
         try:
             async with self.db_pool.acquire() as conn:
@@ -160,9 +275,10 @@ class TenantLLMRouter:
                     }
                 }
                 
-                # Update cache
-                self._tenant_config_cache[tenant_id] = config
-                self._cache_timestamps[tenant_id] = now
+                # Update cache, unless the config was invalidated meanwhile
+                if epoch == self._config_epoch:
+                    self._tenant_config_cache[tenant_id] = config
+                    self._cache_timestamps[tenant_id] = now
                 
                 logger.debug(f"Loaded config for tenant {tenant_id}: "
                            f"preferred={config['inference_config'].get('preferred_provider')}, "
@@ -182,6 +298,54 @@ class TenantLLMRouter:
                 }
             }
     
+    @staticmethod
+    def _router_key(tenant_tokens: Dict[str, str], preferred_models: Dict[str, str]) -> str:
+        """Hash of everything a tenant router is built from"""
+        material = json.dumps(
+            {"tokens": tenant_tokens, "models": preferred_models},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def _get_tenant_router(
+        self,
+        tenant_id: str,
+        tenant_tokens: Dict[str, str],
+        preferred_models: Dict[str, str]
+    ) -> LLMRouter:
+        """
+        Return the cached router for this tenant's settings, building it once
+
+        The router (and its providers) lives across requests, so provider
+        health, latency tracking, rate-limit state and pooled connections
+        are reused.
+        """
+        key = self._router_key(tenant_tokens, preferred_models)
+        router = self._routers.get(key)
+
+        if router is not None:
+            self._routers.move_to_end(key)
+            self.router_stats["hits"] += 1
+            if METRICS_ENABLED:
+                track_tenant_router_cache("hit")
+        else:
+            router = self._create_tenant_router(tenant_id, tenant_tokens, preferred_models)
+            self._routers[key] = router
+            self.router_stats["builds"] += 1
+            if METRICS_ENABLED:
+                track_tenant_router_cache("build")
+
+            while len(self._routers) > self._router_cache_size:
+                evicted_key, _ = self._routers.popitem(last=False)
+                self.router_stats["evictions"] += 1
+                if METRICS_ENABLED:
+                    track_tenant_router_cache("eviction")
+                logger.debug(f"Evicted tenant router {evicted_key[:12]}")
+
+        self._tenant_router_keys[tenant_id] = key
+        return router
+
     def _create_tenant_router(
         self,
         tenant_id: str,
@@ -199,7 +363,7 @@ class TenantLLMRouter:
         Returns:
             Configured LLMRouter instance
         """
-        router = LLMRouter()
+        router = LLMRouter(cache=self.response_cache)
         
         # Register Groq if tenant has token
         if tenant_tokens.get('groq'):
@@ -291,9 +455,12 @@ class TenantLLMRouter:
         endpoint: str,
         user_id: Optional[str] = None,
         max_retries: int = 3
-    ) -> CompletionResult:
+    ) -> Union[CompletionResult, TokenStream]:
         """
         Generate completion for a specific tenant with usage tracking
+
+        Streaming requests return a TokenStream; usage is tracked when the
+        stream has been fully consumed.
         
         Args:
             tenant_id: Tenant UUID
@@ -323,8 +490,12 @@ class TenantLLMRouter:
             preferred_models = inference_config.get('preferred_models', {})
             auto_failover = inference_config.get('auto_failover', True)
             
-            # Create tenant-specific router
-            router = self._create_tenant_router(tenant_id, tenant_tokens, preferred_models)
+            # Reuse the tenant-specific router (built on first use)
+            router = self._get_tenant_router(tenant_id, tenant_tokens, preferred_models)
+
+            # Scope cached responses to this tenant
+            if not context.tenant_id:
+                context.tenant_id = tenant_id
             
             # If preferred provider specified, try it first
             if preferred_provider and auto_failover:
@@ -339,34 +510,23 @@ class TenantLLMRouter:
                 max_retries=max_retries if auto_failover else 1
             )
             
-            # Calculate latency
-            latency_ms = int((time.time() - start_time) * 1000)
-            
-            # Track usage
-            tracker = await get_usage_tracker()
-            await tracker.track_request(
-                tenant_id=tenant_id,
-                provider=self._normalize_provider_name(result.provider),
-                model_name=result.model,
-                endpoint=endpoint,
-                user_id=user_id,
-                latency_ms=latency_ms,
-                input_tokens=result.tokens_input,
-                output_tokens=result.tokens_output,
-                status='success',
-                metadata={
-                    'cached': result.cached,
-                    'finish_reason': result.finish_reason,
-                    'selection_reason': router.request_history[-1].get('selection_reason') if router.request_history else None
-                }
-            )
-            
-            logger.info(
-                f"✓ Tenant {tenant_id}: {result.provider}/{result.model} - "
-                f"{result.tokens_input}→{result.tokens_output} tokens, "
-                f"${result.cost:.6f}, {latency_ms}ms"
+            if isinstance(result, TokenStream):
+                # Usage is only known once the caller has drained the stream
+                async def track_stream(final: CompletionResult) -> None:
+                    await self._track_success(
+                        tenant_id, final, endpoint, user_id, start_time,
+                        selection_reason=final.selection_reason
+                    )
+
+                result.add_completion_callback(track_stream)
+                return result
+
+            # The router is shared between requests, so read the reason from
+            # the result rather than the router's request history
+            await self._track_success(
+                tenant_id, result, endpoint, user_id, start_time,
+                selection_reason=result.selection_reason or None
             )
-            
             return result
             
         except Exception as e:
@@ -388,6 +548,43 @@ class TenantLLMRouter:
             logger.error(f"Failed to complete request for tenant {tenant_id}: {e}")
             raise
     
+    async def _track_success(
+        self,
+        tenant_id: str,
+        result: CompletionResult,
+        endpoint: str,
+        user_id: Optional[str],
+        start_time: float,
+        selection_reason: Optional[str] = None
+    ) -> None:
+        """Record a successful completion in the usage tracker"""
+        latency_ms = int((time.time() - start_time) * 1000)
+
+        tracker = await get_usage_tracker()
+        await tracker.track_request(
+            tenant_id=tenant_id,
+            provider=self._normalize_provider_name(result.provider),
+            model_name=result.model,
+            endpoint=endpoint,
+            user_id=user_id,
+            latency_ms=latency_ms,
+            input_tokens=result.tokens_input,
+            output_tokens=result.tokens_output,
+            status='success',
+            metadata={
+                'cached': result.cached,
+                'finish_reason': result.finish_reason,
+                'selection_reason': selection_reason,
+                'time_to_first_token': result.metadata.get('time_to_first_token')
+            }
+        )
+
+        logger.info(
+            f"✓ Tenant {tenant_id}: {result.provider}/{result.model} - "
+            f"{result.tokens_input}→{result.tokens_output} tokens, "
+            f"${result.cost:.6f}, {latency_ms}ms"
+        )
+
     def _normalize_provider_name(self, provider_name: str) -> str:
         """
         Normalize provider name to database format
@@ -458,21 +655,57 @@ class TenantLLMRouter:
     
     def invalidate_cache(self, tenant_id: Optional[str] = None):
         """
-        Invalidate tenant configuration cache
+        Invalidate tenant configuration cache and the tenant's router
+
+        Called on LISTEN/NOTIFY config changes and by the config API.
         
         Args:
             tenant_id: Specific tenant to invalidate, or None for all
         """
+        self._config_epoch += 1
+        self._config_loads.forget(tenant_id)
         if tenant_id:
-            if tenant_id in self._tenant_config_cache:
-                del self._tenant_config_cache[tenant_id]
-                del self._cache_timestamps[tenant_id]
-                logger.info(f"Invalidated cache for tenant {tenant_id}")
+            self._tenant_config_cache.pop(tenant_id, None)
+            self._cache_timestamps.pop(tenant_id, None)
+
+            # Drop the router unless other tenants still share its settings
+            key = self._tenant_router_keys.pop(tenant_id, None)
+            if key and key not in self._tenant_router_keys.values():
+                if self._routers.pop(key, None) is not None:
+                    self.router_stats["invalidations"] += 1
+            logger.info(f"Invalidated cache for tenant {tenant_id}")
         else:
             self._tenant_config_cache.clear()
             self._cache_timestamps.clear()
+            self.router_stats["invalidations"] += len(self._routers)
+            self._routers.clear()
+            self._tenant_router_keys.clear()
             logger.info("Invalidated all tenant configuration cache")
 
+    def get_router_cache_stats(self) -> Dict:
+        """Router reuse statistics"""
+        lookups = self.router_stats["builds"] + self.router_stats["hits"]
+        return {
+            **self.router_stats,
+            "hit_ratio": round(self.router_stats["hits"] / lookups, 3) if lookups else 0.0,
+            "cached_routers": len(self._routers),
+            "max_routers": self._router_cache_size,
+            "tenants": len(self._tenant_router_keys),
+            "listening": self._listen_conn is not None,
+            "config_ttl_seconds": self._cache_ttl_seconds,
+            "config_loads": self._config_loads.get_stats()
+        }
+
+    async def invalidate_response_cache(self, tenant_id: Optional[str] = None):
+        """
+        Drop cached LLM responses (e.g. after store hours or catalog change)
+
+        Args:
+            tenant_id: Specific tenant to invalidate, or None for all
+        """
+        if self.response_cache:
+            await self.response_cache.invalidate(tenant_id)
+
 
 # Global instance
 _tenant_router: Optional[TenantLLMRouter] = None
@@ -489,6 +722,12 @@ async def get_tenant_router() -> TenantLLMRouter:
     return _tenant_router
 
 
+def invalidate_tenant_config(tenant_id: Optional[str] = None):
+    """Invalidate the global tenant router's cache (no-op before first use)"""
+    if _tenant_router is not None:
+        _tenant_router.invalidate_cache(tenant_id)
+
+
 async def complete_for_tenant(
     tenant_id: str,
     messages: List[Dict],
@@ -25,12 +25,15 @@ class RequestContext:
     estimated_tokens: int
     customer_id: Optional[str] = None
     session_id: Optional[str] = None
+    tenant_id: Optional[str] = None
+    store_id: Optional[str] = None
     is_production: bool = True
     requires_speed: bool = False
     requires_streaming: bool = False
     tools: Optional[List[Dict]] = None
     temperature: float = 0.7
     max_tokens: int = 2000
+    cacheable: bool = True  # Allow router response cache hits
 
     @property
     def requires_reasoning(self) -> bool:
@@ -0,0 +1,680 @@
+"""
+Local Inference Executor
+Runs llama-cpp completions on dedicated worker threads instead of the event loop
+
+llama.cpp calls are CPU/GPU bound and block for seconds. Calling them directly
+from `async def` code freezes the FastAPI event loop (health checks, websockets,
+every other request). All local completions go through this executor instead:
+
+- Bounded priority queue with lanes (intent classification runs ahead of long
+  chat generations, background work runs last)
+- Worker threads execute completions; each model instance is guarded by its own
+  lock because a llama.cpp context is not thread-safe
+- Micro-batching: short prompts that arrive together are drained as one batch,
+  identical prompts are computed once, and prompts are ordered so shared
+  prefixes run back-to-back (llama.cpp reuses the cached prefix KV state)
+- Back-pressure (LocalInferenceBusyError when the queue is full) and per-request
+  timeouts (LocalInferenceTimeoutError)
+
+Configuration (environment variables):
+- LOCAL_INFERENCE_WORKERS: Worker threads (default 1)
+- LOCAL_INFERENCE_QUEUE_SIZE: Max queued requests (default 64)
+- LOCAL_INFERENCE_TIMEOUT: Default request timeout in seconds (default 120)
+- LOCAL_INFERENCE_ENQUEUE_TIMEOUT: Seconds to wait for queue space (default 0.5)
+- LOCAL_INFERENCE_BATCH_WINDOW_MS: Time to collect a micro-batch (default 5)
+- LOCAL_INFERENCE_MAX_BATCH: Max requests per micro-batch (default 8)
+- LOCAL_INFERENCE_SHORT_TOKENS: max_tokens at or below which a request is
+  batchable (default 64)
+
+Usage:
+    executor = get_local_inference_executor()
+    response = await executor.submit(prompt, model=llm, max_tokens=20,
+                                     priority=InferencePriority.INTENT)
+    async for chunk in executor.stream(prompt, model=llm, max_tokens=300):
+        ...
+"""
+
+import asyncio
+import copy
+import itertools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, AsyncGenerator, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class InferencePriority(IntEnum):
+    """Queue lanes (lower value runs first)"""
+    INTENT = 0        # Intent classification / entity extraction
+    INTERACTIVE = 1   # User-facing chat generation
+    BACKGROUND = 2    # Warmups, batch jobs
+
+
+class LocalInferenceError(Exception):
+    """Base exception for local inference failures"""
+    pass
+
+
+class LocalInferenceBusyError(LocalInferenceError):
+    """Queue is full - caller should back off or fail over"""
+    pass
+
+
+class LocalInferenceTimeoutError(LocalInferenceError):
+    """Request did not finish within its timeout"""
+    pass
+
+
+@dataclass
+class LocalInferenceConfig:
+    """Executor sizing and batching settings"""
+    workers: int = field(
+        default_factory=lambda: int(os.getenv("LOCAL_INFERENCE_WORKERS", "1"))
+    )
+    queue_size: int = field(
+        default_factory=lambda: int(os.getenv("LOCAL_INFERENCE_QUEUE_SIZE", "64"))
+    )
+    request_timeout: float = field(
+        default_factory=lambda: float(os.getenv("LOCAL_INFERENCE_TIMEOUT", "120"))
+    )
+    enqueue_timeout: float = field(
+        default_factory=lambda: float(os.getenv("LOCAL_INFERENCE_ENQUEUE_TIMEOUT", "0.5"))
+    )
+    batch_window_ms: float = field(
+        default_factory=lambda: float(os.getenv("LOCAL_INFERENCE_BATCH_WINDOW_MS", "5"))
+    )
+    max_batch_size: int = field(
+        default_factory=lambda: int(os.getenv("LOCAL_INFERENCE_MAX_BATCH", "8"))
+    )
+    short_max_tokens: int = field(
+        default_factory=lambda: int(os.getenv("LOCAL_INFERENCE_SHORT_TOKENS", "64"))
+    )
+
+
+_STREAM_END = object()
+
+
+@dataclass
+class _InferenceRequest:
+    """A queued completion"""
+    prompt: str
+    model: Any
+    params: Dict[str, Any]
+    priority: InferencePriority
+    loop: asyncio.AbstractEventLoop
+    deadline: float
+    future: Optional[asyncio.Future] = None          # Non-streaming result
+    chunks: Optional[asyncio.Queue] = None           # Streaming chunks
+    enqueued_at: float = field(default_factory=time.time)
+    cancelled: bool = False
+
+    @property
+    def is_stream(self) -> bool:
+        return self.chunks is not None
+
+    def is_batchable(self, short_max_tokens: int) -> bool:
+        return not self.is_stream and self.params.get("max_tokens", 0) <= short_max_tokens
+
+    def dedup_key(self) -> str:
+        return f"{id(self.model)}:{self.prompt}:{json.dumps(self.params, sort_keys=True, default=str)}"
+
+
+class LocalInferenceExecutor:
+    """
+    Priority-laned worker pool for llama-cpp completions
+
+    Requests carry the model they run on (resolved at submit time), so the
+    V5 engine, LocalProvider and entity extraction can share one executor and
+    never touch the same llama.cpp context concurrently.
+    """
+
+    def __init__(
+        self,
+        config: Optional[LocalInferenceConfig] = None,
+        model_provider: Optional[Callable[[], Any]] = None
+    ):
+        """
+        Initialize the executor
+
+        Args:
+            config: Executor configuration (defaults from environment)
+            model_provider: Returns the model to use when submit() gets none
+        """
+        self.config = config or LocalInferenceConfig()
+        self.model_provider = model_provider
+
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue(maxsize=self.config.queue_size)
+        self._sequence = itertools.count()
+        self._model_locks: Dict[int, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._workers: List[threading.Thread] = []
+        self._running = False
+        self._start_lock = threading.Lock()
+
+        # Metrics
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "timeouts": 0,
+            "skipped_cancelled": 0,
+            "batches": 0,
+            "batched_requests": 0,
+            "deduplicated": 0,
+        }
+        self._wait_times: Dict[InferencePriority, Deque[float]] = {
+            lane: deque(maxlen=500) for lane in InferencePriority
+        }
+        self._run_times: Dict[InferencePriority, Deque[float]] = {
+            lane: deque(maxlen=500) for lane in InferencePriority
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start worker threads (called lazily on first submit)"""
+        with self._start_lock:
+            if self._running:
+                return
+            self._running = True
+            for i in range(max(1, self.config.workers)):
+                worker = threading.Thread(
+                    target=self._worker_loop,
+                    name=f"local-inference-{i}",
+                    daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+            logger.info(
+                f"Local inference executor started: {len(self._workers)} workers, "
+                f"queue={self.config.queue_size}, batch={self.config.max_batch_size}"
+            )
+
+    def shutdown(self, wait: bool = True, timeout: float = 5.0) -> None:
+        """Stop workers; queued requests are failed"""
+        if not self._running:
+            return
+        self._running = False
+
+        # Fail anything still queued
+        while True:
+            try:
+                _, _, request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._fail(request, LocalInferenceError("Local inference executor shut down"))
+
+        # Wake workers so they notice _running is False
+        for _ in self._workers:
+            try:
+                self._queue.put_nowait((-1, next(self._sequence), None))
+            except queue.Full:
+                break
+
+        if wait:
+            for worker in self._workers:
+                worker.join(timeout=timeout)
+        self._workers.clear()
+        logger.info("Local inference executor stopped")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def submit(
+        self,
+        prompt: str,
+        model: Any = None,
+        priority: InferencePriority = InferencePriority.INTERACTIVE,
+        timeout: Optional[float] = None,
+        **params
+    ) -> Any:
+        """
+        Run a completion on a worker thread
+
+        Args:
+            prompt: Prompt text
+            model: llama-cpp model (defaults to model_provider())
+            priority: Queue lane
+            timeout: Seconds before LocalInferenceTimeoutError (queue wait included)
+            **params: llama-cpp generation parameters
+
+        Returns:
+            Raw model response (llama-cpp completion dict)
+
+        Raises:
+            LocalInferenceBusyError: Queue is full
+            LocalInferenceTimeoutError: Request timed out
+            LocalInferenceError: No model available
+        """
+        params.pop("stream", None)
+        loop = asyncio.get_running_loop()
+        timeout = timeout or self.config.request_timeout
+
+        request = _InferenceRequest(
+            prompt=prompt,
+            model=self._resolve_model(model),
+            params=params,
+            priority=priority,
+            loop=loop,
+            deadline=time.time() + timeout,
+            future=loop.create_future()
+        )
+        await self._enqueue(request)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(request.future), timeout)
+        except asyncio.TimeoutError:
+            request.cancelled = True
+            self.stats["timeouts"] += 1
+            raise LocalInferenceTimeoutError(
+                f"Local inference timed out after {timeout:.1f}s ({priority.name})"
+            )
+        except asyncio.CancelledError:
+            request.cancelled = True
+            raise
+
+    async def stream(
+        self,
+        prompt: str,
+        model: Any = None,
+        priority: InferencePriority = InferencePriority.INTERACTIVE,
+        timeout: Optional[float] = None,
+        **params
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Run a streaming completion on a worker thread
+
+        Yields llama-cpp stream chunks as they are produced. Timeout applies
+        to the wait for each chunk (including the first).
+
+        Raises:
+            LocalInferenceBusyError: Queue is full
+            LocalInferenceTimeoutError: No chunk within timeout
+        """
+        params["stream"] = True
+        loop = asyncio.get_running_loop()
+        timeout = timeout or self.config.request_timeout
+
+        request = _InferenceRequest(
+            prompt=prompt,
+            model=self._resolve_model(model),
+            params=params,
+            priority=priority,
+            loop=loop,
+            deadline=time.time() + timeout,
+            chunks=asyncio.Queue()
+        )
+        await self._enqueue(request)
+
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(request.chunks.get(), timeout)
+                except asyncio.TimeoutError:
+                    self.stats["timeouts"] += 1
+                    raise LocalInferenceTimeoutError(
+                        f"Local inference stream stalled for {timeout:.1f}s"
+                    )
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # Stops the worker at the next chunk if the consumer went away
+            request.cancelled = True
+
+    def run_sync(
+        self,
+        prompt: str,
+        model: Any = None,
+        priority: InferencePriority = InferencePriority.INTERACTIVE,
+        timeout: Optional[float] = None,
+        **params
+    ) -> Any:
+        """
+        Blocking variant of submit() for synchronous callers
+
+        The completion still runs on a worker thread, so it is serialized with
+        every other use of the same model.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is not None:
+            logger.debug("run_sync() called on the event loop thread; this blocks the loop")
+
+        holder: Dict[str, Any] = {}
+        done = threading.Event()
+        timeout = timeout or self.config.request_timeout
+        params.pop("stream", None)
+
+        request = _InferenceRequest(
+            prompt=prompt,
+            model=self._resolve_model(model),
+            params=params,
+            priority=priority,
+            loop=None,
+            deadline=time.time() + timeout
+        )
+        request.future = _SyncFuture(holder, done)
+        self._enqueue_nowait(request, block_timeout=self.config.enqueue_timeout)
+
+        if not done.wait(timeout):
+            request.cancelled = True
+            self.stats["timeouts"] += 1
+            raise LocalInferenceTimeoutError(f"Local inference timed out after {timeout:.1f}s")
+        if "error" in holder:
+            raise holder["error"]
+        return holder["result"]
+
+    def release_model(self, model: Any) -> None:
+        """
+        Wait for in-flight work on a model to finish before it is unloaded
+
+        Call before freeing a llama.cpp model so a worker is never left
+        running on released memory.
+        """
+        if model is None:
+            return
+        lock = self._model_lock(model)
+        with lock:
+            with self._locks_guard:
+                self._model_locks.pop(id(model), None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, batching and per-lane latency"""
+        def avg_ms(samples: Deque[float]) -> float:
+            return round(sum(samples) / len(samples) * 1000, 1) if samples else 0.0
+
+        return {
+            **self.stats,
+            "workers": len(self._workers),
+            "running": self._running,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self.config.queue_size,
+            "avg_batch_size": round(
+                self.stats["batched_requests"] / self.stats["batches"], 2
+            ) if self.stats["batches"] else 0.0,
+            "lanes": {
+                lane.name.lower(): {
+                    "avg_wait_ms": avg_ms(self._wait_times[lane]),
+                    "avg_run_ms": avg_ms(self._run_times[lane])
+                }
+                for lane in InferencePriority
+            }
+        }
+
+    # ------------------------------------------------------------------
+    # Queueing
+    # ------------------------------------------------------------------
+
+    def _resolve_model(self, model: Any) -> Any:
+        if model is None and self.model_provider:
+            model = self.model_provider()
+        if model is None:
+            raise LocalInferenceError("No local model loaded")
+        return model
+
+    async def _enqueue(self, request: _InferenceRequest) -> None:
+        """Queue a request, waiting briefly for space before rejecting"""
+        self.start()
+        deadline = time.time() + self.config.enqueue_timeout
+        while True:
+            try:
+                self._queue.put_nowait((int(request.priority), next(self._sequence), request))
+                self.stats["submitted"] += 1
+                return
+            except queue.Full:
+                if time.time() >= deadline:
+                    self.stats["rejected"] += 1
+                    raise LocalInferenceBusyError(
+                        f"Local inference queue full ({self.config.queue_size} pending)"
+                    )
+                await asyncio.sleep(0.01)
+
+    def _enqueue_nowait(self, request: _InferenceRequest, block_timeout: float) -> None:
+        self.start()
+        try:
+            self._queue.put((int(request.priority), next(self._sequence), request), timeout=block_timeout)
+            self.stats["submitted"] += 1
+        except queue.Full:
+            self.stats["rejected"] += 1
+            raise LocalInferenceBusyError(
+                f"Local inference queue full ({self.config.queue_size} pending)"
+            )
+
+    def _model_lock(self, model: Any) -> threading.Lock:
+        key = id(model)
+        with self._locks_guard:
+            lock = self._model_locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self._model_locks[key] = lock
+            return lock
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def _worker_loop(self) -> None:
+        while self._running:
+            try:
+                _, _, request = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if request is None:
+                continue
+
+            if request.is_batchable(self.config.short_max_tokens):
+                batch, overflow = self._collect_batch(request)
+                self._run_batch(batch)
+                for request in overflow:
+                    self._run_one(request)
+            else:
+                self._run_one(request)
+
+    def _collect_batch(self, first: _InferenceRequest):
+        """
+        Drain other short requests for the same model that arrive within the window
+
+        Returns:
+            Tuple of (batch, overflow) - overflow holds drained requests that
+            could not be put back because the queue filled up meanwhile
+        """
+        batch = [first]
+        deferred = []
+        window_end = time.time() + self.config.batch_window_ms / 1000.0
+
+        while len(batch) < self.config.max_batch_size:
+            remaining = window_end - time.time()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+
+            request = item[2]
+            if request is None:
+                deferred.append(item)
+                break
+            if request.model is first.model and request.is_batchable(self.config.short_max_tokens):
+                batch.append(request)
+            else:
+                deferred.append(item)
+
+        # Return incompatible requests with their original priority/sequence
+        overflow = []
+        for item in deferred:
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                if item[2] is not None:
+                    overflow.append(item[2])
+
+        return batch, overflow
+
+    def _run_batch(self, batch: List[_InferenceRequest]) -> None:
+        if len(batch) > 1:
+            self.stats["batches"] += 1
+            self.stats["batched_requests"] += len(batch)
+
+        # Identical prompts are computed once; within a lane, sorting keeps
+        # shared prefixes adjacent so llama.cpp can reuse the KV cache
+        groups: Dict[str, List[_InferenceRequest]] = {}
+        for request in batch:
+            groups.setdefault(request.dedup_key(), []).append(request)
+        self.stats["deduplicated"] += len(batch) - len(groups)
+
+        def order(key: str):
+            lead = groups[key][0]
+            return (min(int(r.priority) for r in groups[key]), lead.prompt)
+
+        for key in sorted(groups, key=order):
+            requests = [r for r in groups[key] if self._is_live(r)]
+            if not requests:
+                continue
+            lead = requests[0]
+            try:
+                result = self._execute(lead)
+            except Exception as e:
+                for request in requests:
+                    self._fail(request, e)
+                continue
+            # Each waiter gets its own completion; callers rewrite choices in place
+            for i, request in enumerate(requests):
+                self._resolve(request, result if i == 0 else copy.deepcopy(result))
+
+    def _run_one(self, request: _InferenceRequest) -> None:
+        if not self._is_live(request):
+            return
+        try:
+            if request.is_stream:
+                self._execute_stream(request)
+            else:
+                self._resolve(request, self._execute(request))
+        except Exception as e:
+            self._fail(request, e)
+
+    def _is_live(self, request: _InferenceRequest) -> bool:
+        """Skip work nobody is waiting for"""
+        if request.cancelled:
+            self.stats["skipped_cancelled"] += 1
+            return False
+        if time.time() > request.deadline:
+            self.stats["timeouts"] += 1
+            self._fail(request, LocalInferenceTimeoutError("Request expired in queue"))
+            return False
+        return True
+
+    def _execute(self, request: _InferenceRequest) -> Any:
+        started = time.time()
+        self._wait_times[request.priority].append(started - request.enqueued_at)
+        with self._model_lock(request.model):
+            result = request.model(request.prompt, **request.params)
+        self._run_times[request.priority].append(time.time() - started)
+        return result
+
+    def _execute_stream(self, request: _InferenceRequest) -> None:
+        started = time.time()
+        self._wait_times[request.priority].append(started - request.enqueued_at)
+        with self._model_lock(request.model):
+            response = request.model(request.prompt, **request.params)
+            if isinstance(response, (dict, str)):
+                # Model wrapper without streaming support
+                self._push(request, response)
+            else:
+                for chunk in response:
+                    if request.cancelled:
+                        break
+                    self._push(request, chunk)
+        self._run_times[request.priority].append(time.time() - started)
+        self._push(request, _STREAM_END)
+        self.stats["completed"] += 1
+
+    def _push(self, request: _InferenceRequest, item: Any) -> None:
+        try:
+            request.loop.call_soon_threadsafe(request.chunks.put_nowait, item)
+        except RuntimeError:
+            # Event loop closed - consumer is gone
+            request.cancelled = True
+
+    def _resolve(self, request: _InferenceRequest, result: Any) -> None:
+        self.stats["completed"] += 1
+        self._settle(request, result=result)
+
+    def _fail(self, request: _InferenceRequest, error: Exception) -> None:
+        self.stats["failed"] += 1
+        if request.is_stream:
+            self._push(request, error)
+            return
+        self._settle(request, error=error)
+
+    def _settle(self, request: _InferenceRequest, result: Any = None, error: Exception = None) -> None:
+        future = request.future
+        if isinstance(future, _SyncFuture):
+            future.settle(result, error)
+            return
+
+        def apply():
+            if future.done():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+        try:
+            request.loop.call_soon_threadsafe(apply)
+        except RuntimeError:
+            pass
+
+
+class _SyncFuture:
+    """Result slot for run_sync() callers"""
+
+    def __init__(self, holder: Dict[str, Any], done: threading.Event):
+        self.holder = holder
+        self.done_event = done
+
+    def settle(self, result: Any, error: Optional[Exception]) -> None:
+        if error is not None:
+            self.holder["error"] = error
+        else:
+            self.holder["result"] = result
+        self.done_event.set()
+
+
+# Global executor instance
+_local_executor: Optional[LocalInferenceExecutor] = None
+
+
+def get_local_inference_executor() -> LocalInferenceExecutor:
+    """Get or create the process-wide local inference executor"""
+    global _local_executor
+    if _local_executor is None:
+        _local_executor = LocalInferenceExecutor()
+    return _local_executor
+
+
+def shutdown_local_inference_executor() -> None:
+    """Stop the global executor (application shutdown)"""
+    global _local_executor
+    if _local_executor is not None:
+        _local_executor.shutdown()
+        _local_executor = None
@@ -177,6 +177,101 @@ api_errors_total = Counter(
 )
 
 
+# =====================================================
+# LLM Gateway Metrics
+# =====================================================
+
+llm_time_to_first_token_seconds = Histogram(
+    'llm_time_to_first_token_seconds',
+    'Time from request to first streamed token',
+    ['provider'],
+    buckets=[0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0]
+)
+
+llm_streams_total = Counter(
+    'llm_streams_total',
+    'Total streamed LLM completions',
+    ['provider', 'status']  # status: completed, failed, failover
+)
+
+llm_hedged_requests_total = Counter(
+    'llm_hedged_requests_total',
+    'Backup LLM requests raced after the primary passed its p95 latency',
+    ['provider', 'outcome']  # outcome: fired, won
+)
+
+tenant_router_cache_total = Counter(
+    'tenant_router_cache_total',
+    'Per-tenant LLM router cache lookups and evictions',
+    ['result']  # hit, build, eviction
+)
+
+llm_usage_records_total = Counter(
+    'llm_usage_records_total',
+    'LLM usage records handled by the buffered usage writer',
+    ['result']  # written, dropped, failed
+)
+
+
+# =====================================================
+# Request Coalescing Metrics
+# =====================================================
+
+single_flight_calls_total = Counter(
+    'single_flight_calls_total',
+    'Calls through single-flight coalescing, executed or collapsed into one in flight',
+    ['flight', 'result']  # result: executed, coalesced
+)
+
+
+# =====================================================
+# Agent Session Store Metrics
+# =====================================================
+
+agent_session_store_total = Counter(
+    'agent_session_store_total',
+    'Agent session lookups, saves and cross-worker invalidations',
+    ['result']  # result: local_hit, remote_hit, miss, saved, invalidated, error
+)
+
+
+# =====================================================
+# Voice Synthesis Metrics
+# =====================================================
+
+voice_time_to_first_audio_seconds = Histogram(
+    'voice_time_to_first_audio_seconds',
+    'Time from the start of a streamed voice response to its first audio chunk',
+    ['provider'],
+    buckets=[0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 8.0, 15.0]
+)
+
+voice_tts_chunk_duration_seconds = Histogram(
+    'voice_tts_chunk_duration_seconds',
+    'Synthesis time per sentence chunk of a streamed voice response',
+    ['provider'],
+    buckets=[0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0]
+)
+
+
+# =====================================================
+# Tracing Metrics
+# =====================================================
+
+ai_span_duration_seconds = Histogram(
+    'ai_span_duration_seconds',
+    'Duration of traced spans on the AI request path',
+    ['span', 'status'],  # status: ok, error, timeout, cancelled
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+)
+
+ai_traces_exported_total = Counter(
+    'ai_traces_exported_total',
+    'Traces exported as OTLP JSON',
+    ['reason']  # sampled, slow
+)
+
+
 # =====================================================
 # System Info
 # =====================================================
@@ -346,3 +441,58 @@ def track_api_error(endpoint: str, error_type: str):
         endpoint=endpoint,
         error_type=error_type
     ).inc()
+
+
+def track_llm_time_to_first_token(provider: str, duration: float):
+    """Track time to first streamed token"""
+    llm_time_to_first_token_seconds.labels(provider=provider).observe(duration)
+
+
+def track_llm_stream(provider: str, status: str):
+    """Track streamed completion outcome"""
+    llm_streams_total.labels(provider=provider, status=status).inc()
+
+
+def track_llm_hedge(provider: str, outcome: str):
+    """Track a hedged request for the backup provider"""
+    llm_hedged_requests_total.labels(provider=provider, outcome=outcome).inc()
+
+
+def track_tenant_router_cache(result: str):
+    """Track a tenant router cache hit, build or eviction"""
+    tenant_router_cache_total.labels(result=result).inc()
+
+
+def track_usage_records(result: str, count: int = 1):
+    """Track usage records written, dropped or failed by the buffered writer"""
+    llm_usage_records_total.labels(result=result).inc(count)
+
+
+def track_span(span: str, status: str, duration: float):
+    """Track a finished tracing span"""
+    ai_span_duration_seconds.labels(span=span, status=status).observe(duration)
+
+
+def track_trace_export(reason: str):
+    """Track a trace exported by the tracing layer"""
+    ai_traces_exported_total.labels(reason=reason).inc()
+
+
+def track_single_flight(flight: str, result: str):
+    """Track a call that was executed or coalesced by a single-flight group"""
+    single_flight_calls_total.labels(flight=flight, result=result).inc()
+
+
+def track_session_store(result: str):
+    """Track an agent session store lookup, save or invalidation"""
+    agent_session_store_total.labels(result=result).inc()
+
+
+def track_voice_time_to_first_audio(provider: str, duration: float):
+    """Track time to the first audio chunk of a streamed voice response"""
+    voice_time_to_first_audio_seconds.labels(provider=provider).observe(duration)
+
+
+def track_voice_tts_chunk(provider: str, duration: float):
+    """Track synthesis time of one streamed sentence chunk"""
+    voice_tts_chunk_duration_seconds.labels(provider=provider).observe(duration)
@@ -0,0 +1,346 @@
+"""
+Lightweight Tracing for the AI Request Path
+Spans propagate through a contextvar, so asyncio tasks created inside a span
+(planner stages, streaming turns) inherit it as their parent.
+
+- Prometheus: every finished span observes ai_span_duration_seconds{span,status}
+- OTLP/JSON: sampled traces, plus any trace slower than TRACE_SLOW_SECONDS,
+  are exported as OTLP ExportTraceServiceRequest documents, appended as JSON
+  lines to TRACE_EXPORT_PATH and/or POSTed to TRACE_OTLP_ENDPOINT
+
+Usage:
+    @traced("tool.execute")
+    async def execute_tool(self, tool_name, **kwargs):
+        current_span().set_attribute("tool", tool_name)
+
+    with trace_span("rag.search", agent=agent_id) as span:
+        ...
+
+    record_span("engine.model_inference", inference_time)  # already timed
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from services.metrics.prometheus_metrics import track_span, track_trace_export
+    METRICS_ENABLED = True
+except ImportError:
+    METRICS_ENABLED = False
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+# Fraction of traces exported regardless of duration
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+# Traces at least this slow are always exported (tail sampling)
+TRACE_SLOW_SECONDS = float(os.getenv("TRACE_SLOW_SECONDS", "3.0"))
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH") or None
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT") or None
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "ai-engine")
+# Spans kept per trace; a runaway loop should not grow one trace unbounded
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "256"))
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("trace_span", default=None)
+
+
+class _Trace:
+    """Spans of one request, exported together when the root span ends"""
+
+    __slots__ = ("trace_id", "sampled", "spans", "dropped")
+
+    def __init__(self):
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self.sampled = random.random() < TRACE_SAMPLE_RATE
+        self.spans: List["Span"] = []
+        self.dropped = 0
+
+
+class Span:
+    """A timed operation; use trace_span() or traced() rather than creating one"""
+
+    __slots__ = ("name", "trace", "span_id", "parent_id", "attributes",
+                 "status", "start_ns", "end_ns", "_start")
+
+    def __init__(self, name: str, trace: Optional[_Trace], parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.status = "ok"
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self._start = time.perf_counter()
+
+    @property
+    def trace_id(self) -> Optional[str]:
+        return self.trace.trace_id if self.trace else None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_status(self, status: str, error: Optional[str] = None) -> None:
+        """Mark the span failed without raising (e.g. errors returned as values)"""
+        self.status = status
+        if error:
+            self.attributes["error"] = error
+
+    def finish(self, end: Optional[float] = None) -> float:
+        """Close the span; returns its duration in seconds"""
+        end = end if end is not None else time.perf_counter()
+        duration = max(0.0, end - self._start)
+        self.end_ns = self.start_ns + int(duration * 1e9)
+
+        if METRICS_ENABLED:
+            track_span(self.name, self.status, duration)
+
+        trace = self.trace
+        if trace is None:
+            return duration
+        if len(trace.spans) < TRACE_MAX_SPANS:
+            trace.spans.append(self)
+        else:
+            trace.dropped += 1
+
+        if self.parent_id is None:
+            reason = "sampled" if trace.sampled else "slow" if duration >= TRACE_SLOW_SECONDS else None
+            if reason:
+                _exporter.export(trace, reason)
+        return duration
+
+
+class _NoopSpan:
+    """Returned when tracing is disabled or no span is active"""
+
+    trace_id = None
+    span_id = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_status(self, status: str, error: Optional[str] = None) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def current_span():
+    """The active span, or a no-op stand-in"""
+    return _current_span.get() or _NOOP_SPAN
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+
+@contextmanager
+def trace_span(name: str, **attributes) -> Iterator[Any]:
+    """
+    Time a block as a child of the active span (or start a new trace)
+
+    Args:
+        name: Span name; low cardinality, it becomes a Prometheus label
+        **attributes: Initial span attributes (exported with the trace only)
+    """
+    if not TRACING_ENABLED:
+        yield _NOOP_SPAN
+        return
+
+    parent = _current_span.get()
+    span = Span(name, parent.trace if parent else _Trace(), parent, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except asyncio.CancelledError:
+        span.status = "cancelled"
+        raise
+    except Exception as e:
+        span.set_status("error", type(e).__name__)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.finish()
+
+
+def record_span(name: str, duration: float, end: Optional[float] = None, status: str = "ok", **attributes) -> None:
+    """
+    Record work that was already timed as a finished child of the active span
+
+    Args:
+        name: Span name
+        duration: Seconds the work took
+        end: perf_counter() value when it finished (default: now)
+        status: ok, error, timeout or cancelled
+        **attributes: Span attributes
+    """
+    if not TRACING_ENABLED:
+        return
+
+    parent = _current_span.get()
+    end = end if end is not None else time.perf_counter()
+    # Without an active trace the span is only a metric sample
+    span = Span(name, parent.trace if parent else None, parent, attributes)
+    span.start_ns -= int((span._start - (end - duration)) * 1e9)
+    span._start = end - duration
+    span.status = status
+    span.finish(end)
+
+
+def traced(name: str) -> Callable:
+    """Decorator running a sync or async function inside trace_span(name)"""
+
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs) -> Any:
+                with trace_span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def sync_wrapper(*args, **kwargs) -> Any:
+            with trace_span(name):
+                return func(*args, **kwargs)
+        return sync_wrapper
+
+    return decorator
+
+
+# =====================================================
+# OTLP/JSON export
+# =====================================================
+
+_STATUS_CODES = {"ok": 1}  # everything else is STATUS_CODE_ERROR (2)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    encoded = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+        "status": {"code": _STATUS_CODES.get(span.status, 2)}
+    }
+    if span.parent_id:
+        encoded["parentSpanId"] = span.parent_id
+    if span.status != "ok":
+        encoded["status"]["message"] = span.status
+    return encoded
+
+
+class OTLPJsonExporter:
+    """
+    Batches finished traces and ships them off the request path
+
+    The most recent traces are also kept in memory for get_recent_traces(),
+    whether or not a destination is configured.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        endpoint: Optional[str] = None,
+        max_pending: int = 1000,
+        keep_recent: int = 50
+    ):
+        self.path = path
+        self.endpoint = endpoint
+        self.pending: Deque[List[Dict[str, Any]]] = deque(maxlen=max_pending)
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=keep_recent)
+        self._flush_task: Optional[asyncio.Task] = None
+        self._client = None
+
+    def export(self, trace: _Trace, reason: str) -> None:
+        spans = [_otlp_span(s) for s in trace.spans]
+        self.recent.append({"trace_id": trace.trace_id, "reason": reason, "dropped_spans": trace.dropped, "spans": spans})
+        if METRICS_ENABLED:
+            track_trace_export(reason)
+
+        if not (self.path or self.endpoint):
+            return
+        self.pending.append(spans)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_file(self._drain())
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self.flush())
+
+    def _drain(self) -> Dict[str, Any]:
+        spans = []
+        while self.pending:
+            spans.extend(self.pending.popleft())
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": TRACE_SERVICE_NAME}}]},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}]
+            }]
+        }
+
+    def _write_file(self, request: Dict[str, Any]) -> None:
+        if not self.path:
+            return
+        with open(self.path, "a") as f:
+            f.write(json.dumps(request, separators=(",", ":")) + "\n")
+
+    async def flush(self) -> None:
+        """Ship everything pending (one request per flush)"""
+        if not self.pending:
+            return
+        request = self._drain()
+        try:
+            if self.path:
+                await asyncio.to_thread(self._write_file, request)
+            if self.endpoint:
+                if self._client is None:
+                    import httpx
+                    self._client = httpx.AsyncClient(timeout=5.0)
+                response = await self._client.post(self.endpoint, json=request)
+                response.raise_for_status()
+        except Exception as e:
+            logger.warning(f"Trace export failed: {e}")
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_exporter = OTLPJsonExporter(path=TRACE_EXPORT_PATH, endpoint=TRACE_OTLP_ENDPOINT)
+
+
+def get_recent_traces(limit: int = 20) -> List[Dict[str, Any]]:
+    """Most recently exported traces, newest first"""
+    return list(reversed(_exporter.recent))[:limit]
+
+
+async def shutdown_tracing() -> None:
+    """Flush pending trace exports (call on application shutdown)"""
+    await _exporter.close()
@@ -17,6 +17,7 @@ from llama_cpp import Llama
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
 from core.interfaces import IModelManager
+from services.local_inference import get_local_inference_executor
 
 logger = logging.getLogger(__name__)
 
@@ -176,6 +177,9 @@ class ModelManager(IModelManager):
         """Unload the current model and free resources"""
         if self.current_model:
             logger.info(f"Unloading model: {self.current_model_name}")
+
+            # Let any running local inference on this model finish first
+            get_local_inference_executor().release_model(self.current_model)
             
             try:
                 # Try to explicitly free the model's memory if available
@@ -1,16 +1,30 @@
 """
 Model Usage Tracking Service
 Tracks all LLM requests for analytics, billing, and rate limit monitoring
+
+Requests are recorded into a bounded in-process buffer and written to
+model_usage_stats in batches (COPY) by a background task, so tracking never
+waits on Postgres. Per-tenant/provider request counts are kept in memory so
+rate-limit checks do not query the database either.
 """
 import asyncio
 import asyncpg
+import json
 import logging
 import os
-from datetime import datetime
-from typing import Optional, Dict, Any
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Tuple
 from decimal import Decimal
 import uuid
 
+try:
+    from services.metrics.prometheus_metrics import track_usage_records
+    METRICS_ENABLED = True
+except ImportError:
+    METRICS_ENABLED = False
+
 logger = logging.getLogger(__name__)
 
 # Database configuration
@@ -44,15 +58,122 @@ COST_PER_MILLION_TOKENS = {
     }
 }
 
+# Buffered writer settings
+USAGE_BUFFER_SIZE = int(os.getenv('USAGE_BUFFER_SIZE', '10000'))
+USAGE_BATCH_SIZE = int(os.getenv('USAGE_BATCH_SIZE', '500'))
+USAGE_FLUSH_INTERVAL_SECONDS = float(os.getenv('USAGE_FLUSH_INTERVAL_SECONDS', '2.0'))
+
+# In-memory rate-limit counters: bucket width, how far back they reach, and
+# how often they are re-synced from the database (other workers' requests)
+USAGE_COUNTER_BUCKET_SECONDS = int(os.getenv('USAGE_COUNTER_BUCKET_SECONDS', '300'))
+USAGE_COUNTER_WINDOW_HOURS = int(os.getenv('USAGE_COUNTER_WINDOW_HOURS', '24'))
+USAGE_COUNTER_RESYNC_SECONDS = float(os.getenv('USAGE_COUNTER_RESYNC_SECONDS', '300'))
+
+_USAGE_COLUMNS = [
+    'tenant_id', 'provider', 'model_name', 'request_id', 'endpoint', 'user_id',
+    'timestamp', 'latency_ms', 'input_tokens', 'output_tokens', 'status',
+    'error_message', 'estimated_cost_usd', 'metadata'
+]
+
+
+class UsageCounters:
+    """
+    Request counts per (tenant, provider) in fixed time buckets
+
+    Holds a database snapshot plus everything this process recorded since,
+    so a window count is a sum over at most window/bucket entries.
+    """
+
+    def __init__(self, bucket_seconds: int = USAGE_COUNTER_BUCKET_SECONDS,
+                 window_hours: int = USAGE_COUNTER_WINDOW_HOURS):
+        self.bucket_seconds = bucket_seconds
+        self.window_hours = window_hours
+        # (tenant_id, provider) -> {bucket: [requests, rate_limited]}
+        self._buckets: Dict[Tuple[str, str], Dict[int, List[int]]] = {}
+        self.synced_at: Optional[float] = None
+
+    def _bucket(self, timestamp: float) -> int:
+        return int(timestamp // self.bucket_seconds)
+
+    def add(self, tenant_id: str, provider: str, timestamp: float, rate_limited: bool) -> None:
+        buckets = self._buckets.setdefault((str(tenant_id), provider), {})
+        counts = buckets.setdefault(self._bucket(timestamp), [0, 0])
+        counts[0] += 1
+        if rate_limited:
+            counts[1] += 1
+
+    def count(self, tenant_id: str, provider: str, hours: int) -> Tuple[int, int]:
+        """(requests, rate_limited) in the last `hours`"""
+        buckets = self._buckets.get((str(tenant_id), provider), {})
+        since = self._bucket(time.time() - hours * 3600)
+        requests = rate_limited = 0
+        for bucket, counts in buckets.items():
+            if bucket >= since:
+                requests += counts[0]
+                rate_limited += counts[1]
+        return requests, rate_limited
+
+    def covers(self, hours: int) -> bool:
+        return self.synced_at is not None and hours <= self.window_hours
+
+    def replace(self, rows) -> None:
+        """Load a snapshot of (tenant_id, provider, bucket, requests, rate_limited) rows"""
+        buckets: Dict[Tuple[str, str], Dict[int, List[int]]] = {}
+        for row in rows:
+            key = (str(row['tenant_id']), row['provider'])
+            buckets.setdefault(key, {})[int(row['bucket'])] = [
+                int(row['requests']), int(row['rate_limited'])
+            ]
+        self._buckets = buckets
+        self.synced_at = time.time()
+
+    def prune(self) -> None:
+        """Drop buckets that fell out of the window"""
+        since = self._bucket(time.time() - self.window_hours * 3600)
+        for key in list(self._buckets):
+            buckets = self._buckets[key]
+            for bucket in [b for b in buckets if b < since]:
+                del buckets[bucket]
+            if not buckets:
+                del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
 
 class ModelUsageTracker:
     """
     Async service to track LLM usage in real-time
+
+    track_request only appends to a bounded buffer; a background task writes
+    batches when USAGE_BATCH_SIZE records are waiting or every
+    USAGE_FLUSH_INTERVAL_SECONDS. When the buffer is full the oldest records
+    are dropped and counted.
     """
     
-    def __init__(self):
+    def __init__(self,
+                 buffer_size: int = USAGE_BUFFER_SIZE,
+                 batch_size: int = USAGE_BATCH_SIZE,
+                 flush_interval: float = USAGE_FLUSH_INTERVAL_SECONDS):
         self.db_pool: Optional[asyncpg.Pool] = None
         self._initialized = False
+
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: deque = deque()
+        self._batch_ready = asyncio.Event()
+        self._writer_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+        self.counters = UsageCounters()
+        self.stats = {
+            'recorded': 0,
+            'written': 0,
+            'dropped': 0,
+            'failed': 0,
+            'batches': 0
+        }
     
     async def initialize(self):
         """Initialize database connection pool"""
@@ -67,17 +188,30 @@ class ModelUsageTracker:
                 command_timeout=60
             )
             self._initialized = True
+            self._writer_task = asyncio.create_task(self._writer_loop())
             logger.info("✅ ModelUsageTracker initialized with connection pool")
         except Exception as e:
             logger.error(f"❌ Failed to initialize ModelUsageTracker: {e}")
             raise
     
     async def close(self):
-        """Close database connection pool"""
+        """Flush buffered records, stop the writer and close the pool"""
+        if self._writer_task:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+
         if self.db_pool:
+            await self.flush()
             await self.db_pool.close()
             self._initialized = False
-            logger.info("ModelUsageTracker connection pool closed")
+            logger.info(
+                f"ModelUsageTracker connection pool closed "
+                f"({self.stats['written']} written, {self.stats['dropped']} dropped)"
+            )
     
     def calculate_cost(
         self,
@@ -120,7 +254,7 @@ class ModelUsageTracker:
         metadata: Optional[Dict[str, Any]] = None
     ) -> Optional[str]:
         """
-        Track a single LLM request (async, non-blocking)
+        Track a single LLM request (buffered, never waits on the database)
         
         Args:
             tenant_id: Tenant UUID
@@ -136,7 +270,7 @@ class ModelUsageTracker:
             metadata: Additional metadata (JSONB)
         
         Returns:
-            Usage record ID (UUID) or None if failed
+            Request ID (UUID) of the buffered record, or None if not tracked
         """
         if not self._initialized:
             logger.warning("ModelUsageTracker not initialized, skipping tracking")
@@ -148,41 +282,159 @@ class ModelUsageTracker:
             
             # Generate request ID
             request_id = str(uuid.uuid4())
+            now = time.time()
+
+            if len(self._buffer) >= self.buffer_size:
+                self._buffer.popleft()
+                self.stats['dropped'] += 1
+                if METRICS_ENABLED:
+                    track_usage_records('dropped')
+
+            self._buffer.append((
+                tenant_id,
+                provider,
+                model_name,
+                request_id,
+                endpoint,
+                user_id,
+                datetime.fromtimestamp(now, tz=timezone.utc),
+                latency_ms,
+                input_tokens,
+                output_tokens,
+                status,
+                error_message,
+                estimated_cost,
+                json.dumps(metadata or {})
+            ))
+            self.stats['recorded'] += 1
+            self.counters.add(tenant_id, provider, now, status == 'rate_limit')
+
+            if len(self._buffer) >= self.batch_size:
+                self._batch_ready.set()
             
-            # Insert asynchronously (fire and forget)
-            async with self.db_pool.acquire() as conn:
-                usage_id = await conn.fetchval(
-                    """
-                    SELECT track_model_usage(
-                        $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13
-                    )
-                    """,
-                    tenant_id,
-                    provider,
-                    model_name,
-                    request_id,
-                    endpoint,
-                    user_id,
-                    latency_ms,
-                    input_tokens,
-                    output_tokens,
-                    status,
-                    error_message,
-                    float(estimated_cost),
-                    metadata or {}
-                )
-                
-                logger.debug(
-                    f"✓ Tracked: {provider}/{model_name} - "
-                    f"{input_tokens + output_tokens} tokens, "
-                    f"{latency_ms}ms, ${estimated_cost}"
-                )
-                
-                return str(usage_id)
+            logger.debug(
+                f"✓ Tracked: {provider}/{model_name} - "
+                f"{input_tokens + output_tokens} tokens, "
+                f"{latency_ms}ms, ${estimated_cost}"
+            )
+            
+            return request_id
                 
         except Exception as e:
             logger.error(f"Failed to track usage: {e}")
             return None
+
+    async def _writer_loop(self):
+        """Write batches on size or time thresholds; re-sync counters when stale"""
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+
+            try:
+                await self.flush()
+                if self._counters_stale():
+                    await self._sync_counters()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Usage writer error: {e}")
+
+    async def flush(self) -> int:
+        """
+        Write every buffered record now
+
+        Returns:
+            Number of records written
+        """
+        written = 0
+        async with self._flush_lock:
+            while self._buffer and self.db_pool:
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                written += await self._write_batch(batch)
+        return written
+
+    async def _write_batch(self, batch: List[tuple]) -> int:
+        """COPY a batch; on failure fall back to row inserts so one bad row is dropped alone"""
+        try:
+            async with self.db_pool.acquire() as conn:
+                await conn.copy_records_to_table(
+                    'model_usage_stats', records=batch, columns=_USAGE_COLUMNS
+                )
+            written = len(batch)
+        except Exception as e:
+            logger.warning(f"Usage batch COPY failed ({len(batch)} records), inserting row by row: {e}")
+            written = 0
+            placeholders = ', '.join(f'${i}' for i in range(1, len(_USAGE_COLUMNS) + 1))
+            query = f"INSERT INTO model_usage_stats ({', '.join(_USAGE_COLUMNS)}) VALUES ({placeholders})"
+            async with self.db_pool.acquire() as conn:
+                for record in batch:
+                    try:
+                        await conn.execute(query, *record)
+                        written += 1
+                    except Exception as row_error:
+                        logger.error(f"Failed to track usage for tenant {record[0]}: {row_error}")
+
+        failed = len(batch) - written
+        self.stats['written'] += written
+        self.stats['failed'] += failed
+        self.stats['batches'] += 1
+        if METRICS_ENABLED:
+            track_usage_records('written', written)
+            if failed:
+                track_usage_records('failed', failed)
+        return written
+
+    def _counters_stale(self) -> bool:
+        return (
+            self.counters.synced_at is None
+            or time.time() - self.counters.synced_at >= USAGE_COUNTER_RESYNC_SECONDS
+        )
+
+    async def _sync_counters(self):
+        """
+        Replace the in-memory counters with database totals
+
+        Runs right after a flush, so everything not yet in the database is
+        still in the buffer and is added back on top of the snapshot.
+        """
+        async with self.db_pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT
+                    tenant_id,
+                    provider,
+                    FLOOR(EXTRACT(EPOCH FROM timestamp) / $1)::bigint AS bucket,
+                    COUNT(*) AS requests,
+                    COUNT(*) FILTER (WHERE status = 'rate_limit') AS rate_limited
+                FROM model_usage_stats
+                WHERE timestamp >= NOW() - INTERVAL '1 hour' * $2
+                GROUP BY 1, 2, 3
+                """,
+                self.counters.bucket_seconds,
+                self.counters.window_hours
+            )
+
+        self.counters.replace(rows)
+        for record in self._buffer:
+            self.counters.add(record[0], record[1], record[6].timestamp(), record[10] == 'rate_limit')
+        self.counters.prune()
+        logger.debug(f"Usage counters synced ({len(self.counters)} tenant/provider pairs)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Writer and buffer statistics"""
+        return {
+            **self.stats,
+            'buffered': len(self._buffer),
+            'buffer_size': self.buffer_size,
+            'counter_keys': len(self.counters),
+            'counters_synced_at': (
+                datetime.fromtimestamp(self.counters.synced_at).isoformat()
+                if self.counters.synced_at else None
+            )
+        }
     
     async def get_tenant_usage_stats(
         self,
@@ -203,6 +455,9 @@ class ModelUsageTracker:
             await self.initialize()
         
         try:
+            # Include requests still waiting in the buffer
+            await self.flush()
+
             async with self.db_pool.acquire() as conn:
                 # Query real-time stats
                 stats = await conn.fetch(
@@ -305,6 +560,9 @@ class ModelUsageTracker:
         """
         Check if tenant is approaching rate limits
         
+        Answered from the in-memory counters once they have been synced and
+        cover the window; otherwise counted in the database.
+        
         Args:
             tenant_id: Tenant UUID
             provider: Provider to check
@@ -318,56 +576,71 @@ class ModelUsageTracker:
             await self.initialize()
         
         try:
-            async with self.db_pool.acquire() as conn:
-                # Count requests in time window
-                result = await conn.fetchrow(
-                    """
-                    SELECT 
-                        COUNT(*) as request_count,
-                        COUNT(*) FILTER (WHERE status = 'rate_limit') as rate_limited_count
-                    FROM model_usage_stats
-                    WHERE tenant_id = $1
-                      AND provider = $2
-                      AND timestamp >= NOW() - INTERVAL '1 hour' * $3
-                    """,
-                    tenant_id,
-                    provider,
-                    time_window_hours
+            if self.counters.covers(time_window_hours):
+                request_count, rate_limited_count = self.counters.count(
+                    tenant_id, provider, time_window_hours
                 )
+                source = 'memory'
+            else:
+                async with self.db_pool.acquire() as conn:
+                    # Count requests in time window
+                    result = await conn.fetchrow(
+                        """
+                        SELECT 
+                            COUNT(*) as request_count,
+                            COUNT(*) FILTER (WHERE status = 'rate_limit') as rate_limited_count
+                        FROM model_usage_stats
+                        WHERE tenant_id = $1
+                          AND provider = $2
+                          AND timestamp >= NOW() - INTERVAL '1 hour' * $3
+                        """,
+                        tenant_id,
+                        provider,
+                        time_window_hours
+                    )
                 
-                request_count = result['request_count']
-                rate_limited_count = result['rate_limited_count']
-                
-                # Calculate percentage used
-                usage_percentage = (request_count / max_requests) * 100 if max_requests > 0 else 0
-                
-                # Determine status
-                if usage_percentage >= 95:
-                    status = 'critical'
-                    should_failover = True
-                elif usage_percentage >= 80:
-                    status = 'warning'
-                    should_failover = True
-                elif usage_percentage >= 50:
-                    status = 'normal'
-                    should_failover = False
-                else:
-                    status = 'healthy'
-                    should_failover = False
-                
-                return {
-                    'tenant_id': tenant_id,
-                    'provider': provider,
-                    'time_window_hours': time_window_hours,
-                    'request_count': request_count,
-                    'rate_limited_count': rate_limited_count,
-                    'max_requests': max_requests,
-                    'remaining_requests': max_requests - request_count,
-                    'usage_percentage': round(usage_percentage, 2),
-                    'status': status,
-                    'should_failover': should_failover
-                }
-                
+                # Buffered records are not in the table yet
+                buffered = [
+                    r for r in self._buffer
+                    if str(r[0]) == str(tenant_id) and r[1] == provider
+                ]
+                request_count = result['request_count'] + len(buffered)
+                rate_limited_count = result['rate_limited_count'] + sum(
+                    1 for r in buffered if r[10] == 'rate_limit'
+                )
+                source = 'database'
+            
+            # Calculate percentage used
+            usage_percentage = (request_count / max_requests) * 100 if max_requests > 0 else 0
+            
+            # Determine status
+            if usage_percentage >= 95:
+                status = 'critical'
+                should_failover = True
+            elif usage_percentage >= 80:
+                status = 'warning'
+                should_failover = True
+            elif usage_percentage >= 50:
+                status = 'normal'
+                should_failover = False
+            else:
+                status = 'healthy'
+                should_failover = False
+            
+            return {
+                'tenant_id': tenant_id,
+                'provider': provider,
+                'time_window_hours': time_window_hours,
+                'request_count': request_count,
+                'rate_limited_count': rate_limited_count,
+                'max_requests': max_requests,
+                'remaining_requests': max_requests - request_count,
+                'usage_percentage': round(usage_percentage, 2),
+                'status': status,
+                'should_failover': should_failover,
+                'source': source
+            }
+            
         except Exception as e:
             logger.error(f"Failed to check rate limit status: {e}")
             return {
@@ -393,6 +666,15 @@ async def get_usage_tracker() -> ModelUsageTracker:
     return _usage_tracker
 
 
+async def shutdown_usage_tracker() -> None:
+    """Flush buffered usage records and close the global tracker"""
+    global _usage_tracker
+
+    if _usage_tracker is not None:
+        await _usage_tracker.close()
+        _usage_tracker = None
+
+
 async def track_usage(
     tenant_id: str,
     provider: str,
@@ -11,6 +11,8 @@ from pathlib import Path
 import asyncio
 from functools import lru_cache
 
+from services.single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
 
@@ -61,6 +63,9 @@ class EmbeddingService:
             "cache_hits": 0,
             "average_batch_size": 0
         }
+
+        # Followers get their own array; callers may modify embeddings in place
+        self._inflight = SingleFlight("embedding_encode", share=np.copy)
         
         logger.info(f"EmbeddingService initialized with model: {model_name}")
         logger.info(f"Embedding dimension: {self.embedding_dim}")
@@ -143,12 +148,17 @@ class EmbeddingService:
     ) -> np.ndarray:
         """
         Async wrapper for embedding generation
-        Runs encoding in thread pool to avoid blocking
+        Runs encoding in thread pool to avoid blocking; concurrent requests
+        for the same text(s) share one encode
         """
+        key = (texts if isinstance(texts, str) else tuple(texts), normalize)
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            lambda: self.encode(texts, batch_size=batch_size, normalize=normalize)
+        return await self._inflight.run(
+            key,
+            lambda: loop.run_in_executor(
+                None,
+                lambda: self.encode(texts, batch_size=batch_size, normalize=normalize)
+            )
         )
     
     def encode_batch(
@@ -231,7 +241,8 @@ class EmbeddingService:
             **self.metrics,
             "model_name": self.model_name,
             "embedding_dim": self.embedding_dim,
-            "device": self.device
+            "device": self.device,
+            "coalescing": self._inflight.get_stats()
         }
     
     def warmup(self, sample_texts: Optional[List[str]] = None):
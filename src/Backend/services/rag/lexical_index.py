@@ -0,0 +1,204 @@
+"""
+Lexical Index for Portable RAG
+SQLite FTS5 (BM25) over knowledge chunks, plus reciprocal-rank fusion
+
+Dense embeddings are weak on exact identifiers: product names, SKUs, OCS
+variant numbers, strain names. The FTS5 table lives in the same SQLite
+database as the chunks, so it is written in the same transactions and
+filtered with the same joins.
+"""
+
+import logging
+import re
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "knowledge_chunks_fts"
+
+# BM25 column weights: chunk_id, document_id (unindexed), title, content
+_BM25_WEIGHTS = (0.0, 0.0, 2.0, 1.0)
+
+# Words, numbers and hyphen/dot-joined identifiers (e.g. "OCS-10234", "2.5g")
+_TOKEN_PATTERN = re.compile(r"\w+(?:[-.]\w+)*", re.UNICODE)
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "can", "do", "does", "for", "have", "how", "i",
+    "in", "is", "it", "me", "my", "of", "on", "or", "the", "to", "what",
+    "with", "you", "your", "any", "some", "there"
+}
+
+
+def build_fts_query(text: str, max_terms: int = 16) -> Optional[str]:
+    """
+    Turn free text into a safe FTS5 OR-query
+
+    Each term is quoted, so punctuation in user input is never parsed as FTS
+    syntax and "OCS-10234" becomes the phrase "ocs 10234".
+
+    Returns:
+        The MATCH expression, or None if no usable terms remain
+    """
+    terms = []
+    seen = set()
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if token in _STOPWORDS or token in seen:
+            continue
+        if len(token) < 2 and not token.isdigit():
+            continue
+        seen.add(token)
+        terms.append('"' + token.replace('"', '""') + '"')
+        if len(terms) >= max_terms:
+            break
+
+    return " OR ".join(terms) if terms else None
+
+
+def reciprocal_rank_fusion(
+    rankings: Dict[str, Sequence[str]],
+    weights: Dict[str, float],
+    k: int = 60
+) -> List[Tuple[str, float]]:
+    """
+    Weighted reciprocal-rank fusion
+
+    score(d) = sum over rankings r of weight_r / (k + rank_r(d)), ranks from 1
+
+    Args:
+        rankings: Ranked ids per retriever (best first)
+        weights: Weight per retriever (missing = 0)
+        k: Damping constant; larger values flatten the contribution of top ranks
+
+    Returns:
+        (id, fused score) sorted best first
+    """
+    scores: Dict[str, float] = {}
+    for name, ranked in rankings.items():
+        weight = weights.get(name, 0.0)
+        if weight <= 0:
+            continue
+        for rank, item in enumerate(ranked, start=1):
+            scores[item] = scores.get(item, 0.0) + weight / (k + rank)
+
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class LexicalIndex:
+    """
+    FTS5 index mirroring knowledge_chunks
+
+    Write methods take the caller's connection so index updates commit
+    together with the chunk rows.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.available = False
+
+    def ensure_schema(self, conn: sqlite3.Connection) -> bool:
+        """Create the FTS5 table (False if SQLite was built without FTS5)"""
+        try:
+            conn.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+                    chunk_id UNINDEXED,
+                    document_id UNINDEXED,
+                    title,
+                    content,
+                    tokenize = 'unicode61 remove_diacritics 2'
+                )
+            """)
+            self.available = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"⚠️ SQLite FTS5 unavailable, lexical retrieval disabled: {e}")
+            self.available = False
+        return self.available
+
+    def backfill(self, conn: sqlite3.Connection) -> int:
+        """Index chunks written before the FTS table existed"""
+        if not self.available:
+            return 0
+
+        indexed = conn.execute(f"SELECT COUNT(*) FROM {FTS_TABLE}").fetchone()[0]
+        total = conn.execute("SELECT COUNT(*) FROM knowledge_chunks").fetchone()[0]
+        if indexed >= total:
+            return 0
+
+        conn.execute(f"DELETE FROM {FTS_TABLE}")
+        conn.execute(f"""
+            INSERT INTO {FTS_TABLE} (chunk_id, document_id, title, content)
+            SELECT c.chunk_id, c.document_id, d.title, c.content
+            FROM knowledge_chunks c
+            JOIN knowledge_documents d ON c.document_id = d.document_id
+        """)
+        logger.info(f"✅ Lexical index backfilled with {total} chunks")
+        return total
+
+    def upsert(self, conn: sqlite3.Connection, chunk_id: str, document_id: str, title: str, content: str) -> None:
+        if not self.available:
+            return
+        conn.execute(f"DELETE FROM {FTS_TABLE} WHERE chunk_id = ?", (chunk_id,))
+        conn.execute(
+            f"INSERT INTO {FTS_TABLE} (chunk_id, document_id, title, content) VALUES (?, ?, ?, ?)",
+            (chunk_id, document_id, title, content)
+        )
+
+    def delete_document(self, conn: sqlite3.Connection, document_id: str) -> None:
+        if not self.available:
+            return
+        conn.execute(f"DELETE FROM {FTS_TABLE} WHERE document_id = ?", (document_id,))
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        tenant_id: Optional[str] = None,
+        store_id: Optional[str] = None,
+        document_types: Optional[Iterable[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        BM25 search with the same document filters as vector retrieval
+
+        Blocking; call through asyncio.to_thread from async code.
+
+        Returns:
+            (chunk_id, bm25 score) best first (FTS5 scores are negative;
+            lower is better)
+        """
+        match = build_fts_query(query) if self.available else None
+        if match is None or limit <= 0:
+            return []
+
+        sql = f"""
+            SELECT f.chunk_id, bm25({FTS_TABLE}, {', '.join(str(w) for w in _BM25_WEIGHTS)}) AS score
+            FROM {FTS_TABLE} f
+            JOIN knowledge_documents d ON f.document_id = d.document_id
+            WHERE {FTS_TABLE} MATCH ?
+                AND d.is_active = 1
+        """
+        params: List = [match]
+
+        if tenant_id:
+            sql += " AND (d.tenant_id = ? OR d.tenant_id IS NULL)"
+            params.append(tenant_id)
+
+        if store_id:
+            sql += " AND (d.store_id = ? OR d.store_id IS NULL)"
+            params.append(store_id)
+
+        if document_types:
+            document_types = list(document_types)
+            sql += f" AND d.document_type IN ({','.join('?' * len(document_types))})"
+            params.extend(document_types)
+
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return [(row[0], float(row[1])) for row in conn.execute(sql, params)]
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Lexical search failed: {e}")
+            return []
+        finally:
+            conn.close()
@@ -0,0 +1,325 @@
+"""
+Partitioned Vector Index for RAG
+One vector partition per tenant plus a shared global-knowledge partition
+
+Each partition is a directory holding:
+- vectors.npy: normalized float32 embeddings, memory-mapped on load
+- records.pkl: side table with chunk metadata (filter columns + content)
+
+Metadata filters (store, document type, access level) are evaluated on the
+side table inside the partition before scoring, so a small tenant's recall
+no longer depends on how many of the global top-k happen to be theirs.
+Partitions are loaded lazily and evicted least-recently-used once the
+configured memory budget is exceeded.
+"""
+
+import logging
+import os
+import pickle
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_PARTITION = "__global__"
+
+# Side-table columns usable as filters (None means "applies to all")
+FILTER_COLUMNS = ("store_id", "document_type", "access_level")
+
+# Suffixes of in-flight directories used while swapping a partition in
+_STAGING_SUFFIX = ".tmp"
+_RETIRED_SUFFIX = ".old"
+
+# Rough per-record overhead of the Python side table (dicts, small strings)
+_RECORD_OVERHEAD_BYTES = 400
+
+
+class VectorPartition:
+    """
+    A single tenant's (or the global) vectors and metadata side table
+
+    Filter columns are dictionary-encoded into int32 arrays so a filter is a
+    couple of vectorized comparisons over the partition.
+    """
+
+    def __init__(self, key: str, vectors: np.ndarray, records: List[Dict[str, Any]]):
+        self.key = key
+        self.vectors = vectors
+        self.records = records
+        self.loaded_at = time.time()
+
+        self.vocab: Dict[str, Dict[Any, int]] = {}
+        self.codes: Dict[str, np.ndarray] = {}
+        for column in FILTER_COLUMNS:
+            vocab: Dict[Any, int] = {}
+            codes = np.empty(len(records), dtype=np.int32)
+            for row, record in enumerate(records):
+                value = record.get(column)
+                codes[row] = -1 if value is None else vocab.setdefault(value, len(vocab))
+            self.vocab[column] = vocab
+            self.codes[column] = codes
+
+        content_bytes = sum(len(r.get("content") or "") for r in records)
+        self.nbytes = int(vectors.nbytes + content_bytes + _RECORD_OVERHEAD_BYTES * len(records))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @classmethod
+    def load(cls, key: str, path: Path, mmap: bool = True) -> "VectorPartition":
+        """Load a partition directory (vectors are memory-mapped by default)"""
+        vectors = np.load(path / "vectors.npy", mmap_mode="r" if mmap else None)
+        with open(path / "records.pkl", "rb") as f:
+            records = pickle.load(f)
+        return cls(key, vectors, records)
+
+    def _mask(
+        self,
+        store_id: Optional[str],
+        document_types: Optional[Iterable[str]],
+        access_levels: Optional[Iterable[str]]
+    ) -> Optional[np.ndarray]:
+        """Boolean row mask for the filters (None = every row passes)"""
+        mask = None
+
+        if store_id:
+            codes = self.codes["store_id"]
+            code = self.vocab["store_id"].get(store_id, -2)
+            # Store-specific rows for this store, plus rows for all stores
+            mask = (codes == code) | (codes == -1)
+
+        for column, values in (("document_type", document_types), ("access_level", access_levels)):
+            if values is None:
+                continue
+            allowed = [self.vocab[column][v] for v in values if v in self.vocab[column]]
+            column_mask = np.isin(self.codes[column], allowed)
+            mask = column_mask if mask is None else mask & column_mask
+
+        return mask
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        store_id: Optional[str] = None,
+        document_types: Optional[Iterable[str]] = None,
+        access_levels: Optional[Iterable[str]] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Exact inner-product search over rows that pass the filters
+
+        Returns:
+            List of (row, cosine similarity) sorted best first
+        """
+        if len(self) == 0 or k <= 0:
+            return []
+
+        mask = self._mask(store_id, document_types, access_levels)
+        if mask is None:
+            rows = None
+            scores = self.vectors @ query
+        else:
+            rows = np.flatnonzero(mask)
+            if rows.size == 0:
+                return []
+            scores = self.vectors[rows] @ query
+
+        k = min(k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        if rows is not None:
+            return [(int(rows[i]), float(scores[i])) for i in top]
+        return [(int(i), float(scores[i])) for i in top]
+
+
+class PartitionedVectorIndex:
+    """
+    Lazily loaded, LRU-evicted set of vector partitions on disk
+
+    Args:
+        root: Directory holding one sub-directory per partition
+        memory_budget_bytes: Evict least-recently-used partitions beyond this
+        mmap: Memory-map partition vectors instead of reading them in
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        memory_budget_bytes: Optional[int] = None,
+        mmap: bool = True
+    ):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        if memory_budget_bytes is None:
+            memory_budget_bytes = int(os.getenv("RAG_PARTITION_MEMORY_MB", "512")) * 1024 * 1024
+        self.memory_budget_bytes = memory_budget_bytes
+        self.mmap = mmap
+
+        self._loaded: "OrderedDict[str, VectorPartition]" = OrderedDict()
+        # Bumped on every write/drop so loads that raced a swap are not cached
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "loads": 0,
+            "evictions": 0,
+            "missing": 0,
+            "writes": 0
+        }
+        self._recover()
+
+    def _recover(self) -> None:
+        """Finish or roll back swaps interrupted by a crash"""
+        for retired in self.root.glob(f"*{_RETIRED_SUFFIX}"):
+            live = retired.with_name(retired.name[:-len(_RETIRED_SUFFIX)])
+            if live.exists():
+                shutil.rmtree(retired, ignore_errors=True)
+            else:
+                retired.rename(live)
+                logger.warning(f"Restored RAG partition {live.name} after interrupted write")
+        for staging in self.root.glob(f"*{_STAGING_SUFFIX}"):
+            shutil.rmtree(staging, ignore_errors=True)
+
+    @staticmethod
+    def partition_key(tenant_id: Optional[str]) -> str:
+        """Partition for a tenant (None = global knowledge)"""
+        return str(tenant_id) if tenant_id else GLOBAL_PARTITION
+
+    def _path(self, key: str) -> Path:
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", key)
+        return self.root / safe
+
+    def exists(self, key: str) -> bool:
+        return (self._path(key) / "vectors.npy").exists()
+
+    def keys(self) -> List[str]:
+        """Partitions present on disk"""
+        return [
+            p.name for p in self.root.iterdir()
+            if not p.name.endswith((_STAGING_SUFFIX, _RETIRED_SUFFIX))
+            and (p / "vectors.npy").exists()
+        ]
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(p.nbytes for p in self._loaded.values())
+
+    def get(self, key: str) -> Optional[VectorPartition]:
+        """
+        Return a partition, loading it from disk on first use
+
+        Blocking (disk I/O); call through asyncio.to_thread from async code.
+        """
+        path = self._path(key)
+        while True:
+            with self._lock:
+                partition = self._loaded.get(key)
+                if partition is not None:
+                    self._loaded.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return partition
+                version = self._versions.get(key, 0)
+
+            if not (path / "vectors.npy").exists():
+                self.stats["missing"] += 1
+                return None
+
+            try:
+                partition = VectorPartition.load(key, path, mmap=self.mmap)
+            except FileNotFoundError:
+                # Directory swapped out under us by a concurrent write/drop
+                if self._versions.get(key, 0) != version:
+                    continue
+                raise
+
+            with self._lock:
+                if self._versions.get(key, 0) != version:
+                    # Replaced while loading: the files read may be stale
+                    continue
+                # Another thread may have loaded it meanwhile
+                existing = self._loaded.get(key)
+                if existing is not None:
+                    self._loaded.move_to_end(key)
+                    return existing
+                self._loaded[key] = partition
+                self.stats["loads"] += 1
+                self._evict(keep=key)
+            break
+
+        logger.info(f"📂 Loaded RAG partition {key} ({len(partition)} chunks, {partition.nbytes / 1e6:.1f}MB)")
+        return partition
+
+    def _evict(self, keep: str) -> None:
+        """Drop least-recently-used partitions until under budget (lock held)"""
+        while self.memory_bytes > self.memory_budget_bytes and len(self._loaded) > 1:
+            oldest = next(iter(self._loaded))
+            if oldest == keep:
+                break
+            evicted = self._loaded.pop(oldest)
+            self.stats["evictions"] += 1
+            logger.info(f"🧹 Evicted RAG partition {oldest} ({evicted.nbytes / 1e6:.1f}MB)")
+
+    def write(self, key: str, vectors: np.ndarray, records: List[Dict[str, Any]]) -> None:
+        """
+        Persist a partition, replacing any previous version atomically
+
+        The new files are staged next to the live directory, the old one is
+        renamed aside, staging is renamed in, and only then is the old one
+        deleted, so a crash at any point leaves a complete partition on disk.
+
+        Args:
+            key: Partition key
+            vectors: (n, dim) embeddings (normalized here)
+            records: Side-table rows aligned with vectors
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 2 and len(vectors):
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.maximum(norms, 1e-12)
+
+        path = self._path(key)
+        staging = path.with_name(path.name + _STAGING_SUFFIX)
+        retired = path.with_name(path.name + _RETIRED_SUFFIX)
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+
+        np.save(staging / "vectors.npy", vectors)
+        with open(staging / "records.pkl", "wb") as f:
+            pickle.dump(records, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        with self._lock:
+            self._loaded.pop(key, None)
+            self._versions[key] = self._versions.get(key, 0) + 1
+            shutil.rmtree(retired, ignore_errors=True)
+            if path.exists():
+                path.rename(retired)
+            staging.rename(path)
+            self.stats["writes"] += 1
+        shutil.rmtree(retired, ignore_errors=True)
+
+    def drop(self, key: str) -> None:
+        """Remove a partition from memory and disk"""
+        with self._lock:
+            self._loaded.pop(key, None)
+            self._versions[key] = self._versions.get(key, 0) + 1
+            shutil.rmtree(self._path(key), ignore_errors=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            loaded = {key: len(p) for key, p in self._loaded.items()}
+            memory = self.memory_bytes
+        return {
+            **self.stats,
+            "partitions_on_disk": len(self.keys()),
+            "partitions_loaded": loaded,
+            "memory_mb": round(memory / 1e6, 2),
+            "memory_budget_mb": round(self.memory_budget_bytes / 1e6, 2)
+        }
@@ -1,6 +1,7 @@
 """
 Portable RAG Service - No PostgreSQL pgvector dependency
 Uses SQLite + FAISS for complete portability
+Hybrid retrieval: FAISS vectors + SQLite FTS5 (BM25), merged by rank fusion
 Designed for containerized deployments
 """
 
@@ -23,8 +24,10 @@ from pathlib import Path
 import hashlib
 import json
 import asyncio
+import threading
 
 from .embedding_service import get_embedding_service
+from .lexical_index import LexicalIndex, reciprocal_rank_fusion
 
 logger = logging.getLogger(__name__)
 
@@ -39,7 +42,8 @@ class PortableRAGService:
         self,
         data_dir: str = "data/rag",
         embedding_model: str = "all-MiniLM-L6-v2",
-        cache_ttl: int = 3600
+        cache_ttl: int = 3600,
+        lexical_weights: Optional[Dict[str, float]] = None
     ):
         """
         Initialize portable RAG service
@@ -48,6 +52,7 @@ class PortableRAGService:
             data_dir: Directory for SQLite DB and FAISS index
             embedding_model: Embedding model (default: all-MiniLM-L6-v2 for stability)
             cache_ttl: Cache time-to-live in seconds
+            lexical_weights: Per-agent weight (0-1) of lexical results in rank fusion
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
@@ -65,10 +70,27 @@ class PortableRAGService:
         )
         self.embedding_dim = self.embedding_service.embedding_dim
         
-        # FAISS index
+        # FAISS index (ID-mapped HNSW; deleted vectors are tombstoned until compaction)
         self.faiss_index = None
-        self.chunk_id_mapping = {}  # FAISS position -> chunk_id
-        self.reverse_mapping = {}  # chunk_id -> FAISS position
+        self.chunk_id_mapping = {}  # FAISS vector id -> chunk_id
+        self.reverse_mapping = {}  # chunk_id -> FAISS vector id
+        self.tombstones = set()  # Vector ids removed from the mappings but still in the graph
+        self.next_vector_id = 0
+        self._index_lock = threading.Lock()
+        self.compact_ratio = float(os.getenv("RAG_COMPACT_TOMBSTONE_RATIO", "0.2"))
+        self.compact_min_tombstones = int(os.getenv("RAG_COMPACT_MIN_TOMBSTONES", "50"))
+        
+        # Debounced persistence (bulk ingestion writes the index once)
+        self.save_delay = float(os.getenv("RAG_INDEX_SAVE_DELAY_SECONDS", "5"))
+        self._dirty = False
+        self._save_task = None
+        
+        # Lexical (FTS5/BM25) index and rank fusion settings
+        self.lexical_index = LexicalIndex(str(self.db_path))
+        self.default_lexical_weight = float(os.getenv("RAG_LEXICAL_WEIGHT", "0.5"))
+        self.lexical_weights = self._parse_lexical_weights(os.getenv("RAG_LEXICAL_WEIGHTS", ""))
+        self.lexical_weights.update(lexical_weights or {})
+        self.rrf_k = int(os.getenv("RAG_RRF_K", "60"))
         
         # Caches
         self.chunk_cache = {}
@@ -79,8 +101,14 @@ class PortableRAGService:
             "total_queries": 0,
             "cache_hits": 0,
             "faiss_searches": 0,
+            "lexical_searches": 0,
+            "lexical_only_hits": 0,
             "db_queries": 0,
-            "average_latency_ms": 0
+            "average_latency_ms": 0,
+            "embeddings_computed": 0,
+            "embeddings_reused": 0,
+            "index_saves": 0,
+            "compactions": 0
         }
         
         # Initialize database
@@ -125,10 +153,16 @@ class PortableRAGService:
                 metadata TEXT,
                 created_at REAL,
                 token_count INTEGER,
+                embedding BLOB,
                 FOREIGN KEY (document_id) REFERENCES knowledge_documents(document_id) ON DELETE CASCADE
             )
         """)
         
+        # Databases created before embeddings were stored
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(knowledge_chunks)")}
+        if "embedding" not in columns:
+            cursor.execute("ALTER TABLE knowledge_chunks ADD COLUMN embedding BLOB")
+        
         # Query analytics table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS rag_query_analytics (
@@ -153,6 +187,10 @@ class PortableRAGService:
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_chunks_doc ON knowledge_chunks(document_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_analytics_hash ON rag_query_analytics(query_hash)")
         
+        # Full-text index for lexical retrieval (indexes pre-existing chunks once)
+        if self.lexical_index.ensure_schema(conn):
+            self.lexical_index.backfill(conn)
+        
         conn.commit()
         conn.close()
         
@@ -165,12 +203,25 @@ class PortableRAGService:
         # Load FAISS index if exists
         if self.faiss_index_path.exists():
             await self._load_faiss_index()
+            if not isinstance(self.faiss_index, faiss.IndexIDMap2):
+                # Positional index from before ID mapping: migrate, reusing its vectors
+                await self._rebuild_faiss_index(legacy_index=self.faiss_index)
             logger.info(f"✅ Loaded FAISS index with {len(self.chunk_id_mapping)} chunks")
         else:
             # Create empty FAISS index
             await self._create_faiss_index()
+            if await asyncio.to_thread(self._count_chunks) > 0:
+                # Index file missing but chunks exist: index their stored embeddings
+                await self._rebuild_faiss_index()
             logger.info("✅ Created new FAISS index")
     
+    def _count_chunks(self) -> int:
+        conn = sqlite3.connect(str(self.db_path))
+        try:
+            return conn.execute("SELECT COUNT(*) FROM knowledge_chunks").fetchone()[0]
+        finally:
+            conn.close()
+    
     async def _load_faiss_index(self):
         """Load FAISS index and mappings from disk"""
         def _load():
@@ -183,34 +234,131 @@ class PortableRAGService:
                     mappings = pickle.load(f)
                     self.chunk_id_mapping = mappings['chunk_id_mapping']
                     self.reverse_mapping = mappings['reverse_mapping']
+                    self.tombstones = set(mappings.get('tombstones', ()))
+                    self.next_vector_id = mappings.get(
+                        'next_vector_id',
+                        max(self.chunk_id_mapping, default=-1) + 1
+                    )
         
         await asyncio.to_thread(_load)
     
     async def _save_faiss_index(self):
-        """Save FAISS index and mappings to disk"""
+        """Save FAISS index and mappings to disk (atomically replaced)"""
         def _save():
-            # Save FAISS index
-            faiss.write_index(self.faiss_index, str(self.faiss_index_path))
-            
-            # Save mappings
-            with open(self.mapping_path, 'wb') as f:
-                pickle.dump({
-                    'chunk_id_mapping': self.chunk_id_mapping,
-                    'reverse_mapping': self.reverse_mapping
-                }, f)
+            with self._index_lock:
+                index_tmp = self.faiss_index_path.with_suffix(".tmp")
+                mapping_tmp = self.mapping_path.with_suffix(".tmp")
+                
+                # Save FAISS index
+                faiss.write_index(self.faiss_index, str(index_tmp))
+                
+                # Save mappings
+                with open(mapping_tmp, 'wb') as f:
+                    pickle.dump({
+                        'chunk_id_mapping': self.chunk_id_mapping,
+                        'reverse_mapping': self.reverse_mapping,
+                        'tombstones': self.tombstones,
+                        'next_vector_id': self.next_vector_id
+                    }, f)
+                
+                os.replace(index_tmp, self.faiss_index_path)
+                os.replace(mapping_tmp, self.mapping_path)
+            self.metrics["index_saves"] += 1
         
         await asyncio.to_thread(_save)
     
+    def _schedule_save(self):
+        """Persist the index after a quiet period instead of on every write"""
+        self._dirty = True
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._save_when_idle())
+    
+    async def _save_when_idle(self):
+        while self._dirty:
+            await asyncio.sleep(self.save_delay)
+            await self.flush()
+    
+    async def flush(self):
+        """Write pending index changes to disk now (call before shutdown)"""
+        if not self._dirty:
+            return
+        self._dirty = False
+        try:
+            await self._save_faiss_index()
+        except Exception:
+            self._dirty = True
+            raise
+    
+    def _new_index(self):
+        """Empty ID-mapped HNSW index"""
+        # Use HNSW for better performance (no training needed)
+        hnsw = faiss.IndexHNSWFlat(self.embedding_dim, 32)
+        hnsw.hnsw.efConstruction = 40
+        hnsw.hnsw.efSearch = 16
+        return faiss.IndexIDMap2(hnsw)
+    
     async def _create_faiss_index(self):
         """Create new FAISS index"""
         def _create():
-            # Use HNSW for better performance (no training needed)
-            self.faiss_index = faiss.IndexHNSWFlat(self.embedding_dim, 32)
-            self.faiss_index.hnsw.efConstruction = 40
-            self.faiss_index.hnsw.efSearch = 16
+            with self._index_lock:
+                self.faiss_index = self._new_index()
+                self.chunk_id_mapping = {}
+                self.reverse_mapping = {}
+                self.tombstones = set()
+                self.next_vector_id = 0
         
         await asyncio.to_thread(_create)
     
+    def _add_vectors(self, chunk_ids: List[str], vectors: np.ndarray):
+        """Add (or replace) chunk vectors under fresh ids"""
+        with self._index_lock:
+            self._tombstone(chunk_ids)
+            ids = np.arange(self.next_vector_id, self.next_vector_id + len(chunk_ids), dtype=np.int64)
+            self.faiss_index.add_with_ids(np.ascontiguousarray(vectors, dtype=np.float32), ids)
+            self.next_vector_id += len(chunk_ids)
+            for vector_id, chunk_id in zip(ids.tolist(), chunk_ids):
+                self.chunk_id_mapping[vector_id] = chunk_id
+                self.reverse_mapping[chunk_id] = vector_id
+    
+    def _remove_vectors(self, chunk_ids: List[str]):
+        with self._index_lock:
+            self._tombstone(chunk_ids)
+    
+    def _tombstone(self, chunk_ids: List[str]):
+        """Hide chunk vectors from search (lock held); HNSW cannot delete in place"""
+        for chunk_id in chunk_ids:
+            vector_id = self.reverse_mapping.pop(chunk_id, None)
+            if vector_id is not None:
+                self.chunk_id_mapping.pop(vector_id, None)
+                self.tombstones.add(vector_id)
+    
+    def _needs_compaction(self) -> bool:
+        if self.faiss_index is None:
+            return False
+        return len(self.tombstones) >= max(
+            self.compact_min_tombstones,
+            self.compact_ratio * self.faiss_index.ntotal
+        )
+    
+    async def compact(self):
+        """Rebuild the HNSW graph without tombstoned vectors (vector ids are kept)"""
+        def _compact():
+            with self._index_lock:
+                ids = np.fromiter(self.chunk_id_mapping.keys(), dtype=np.int64, count=len(self.chunk_id_mapping))
+                index = self._new_index()
+                if len(ids):
+                    vectors = np.vstack([self.faiss_index.reconstruct(int(i)) for i in ids])
+                    index.add_with_ids(vectors, ids)
+                removed = len(self.tombstones)
+                self.faiss_index = index
+                self.tombstones = set()
+            return removed
+        
+        removed = await asyncio.to_thread(_compact)
+        self.metrics["compactions"] += 1
+        self._schedule_save()
+        logger.info(f"🧹 Compacted FAISS index ({removed} deleted vectors dropped)")
+    
     async def add_document(
         self,
         title: str,
@@ -244,92 +392,137 @@ class PortableRAGService:
         Returns:
             Dictionary with document_id, chunk_count, status
         """
-        import uuid
-        from .document_chunker import get_document_chunker
+        results = await self.add_documents(
+            [{
+                "title": title,
+                "content": content,
+                "document_type": document_type,
+                "document_id": document_id,
+                "tenant_id": tenant_id,
+                "store_id": store_id,
+                "access_level": access_level,
+                "language": language,
+                "metadata": metadata
+            }],
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap
+        )
+        return results[0]
+    
+    async def add_documents(
+        self,
+        documents: List[Dict[str, Any]],
+        chunk_size: int = 512,
+        chunk_overlap: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        Add several documents with one batched encode and one transaction
         
-        if document_id is None:
-            document_id = str(uuid.uuid4())
+        Re-adding an existing document_id replaces its chunks.
         
-        # Insert document metadata
-        def _insert_document():
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT OR REPLACE INTO knowledge_documents
-                (document_id, title, document_type, tenant_id, store_id, access_level, 
-                 language, metadata, created_at, updated_at, is_active)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
-            """, (
-                document_id, title, document_type, tenant_id, store_id, access_level,
-                language, json.dumps(metadata or {}), datetime.now().timestamp(), 
-                datetime.now().timestamp()
-            ))
-            
-            conn.commit()
-            conn.close()
+        Args:
+            documents: Dicts with the add_document fields (title, content,
+                document_type, and optionally document_id, tenant_id,
+                store_id, access_level, language, metadata)
+            chunk_size: Maximum tokens per chunk
+            chunk_overlap: Token overlap between chunks
         
-        await asyncio.to_thread(_insert_document)
+        Returns:
+            One result dictionary per document (document_id, chunk_count, chunk_ids)
+        """
+        import uuid
+        from .document_chunker import get_document_chunker
         
-        # Chunk the content
         chunker = get_document_chunker()
-        chunks = chunker.chunk_document(
-            text=content,
-            metadata={"language": language, "chunk_size": chunk_size}
-        )
+        now = datetime.now().timestamp()
+        
+        # Chunk every document first so all chunks are encoded together
+        prepared = []
+        texts = []
+        for doc in documents:
+            document_id = doc.get("document_id") or str(uuid.uuid4())
+            language = doc.get("language", "en")
+            chunks = chunker.chunk_document(
+                text=doc["content"],
+                metadata={"language": language, "chunk_size": chunk_size}
+            )
+            prepared.append((document_id, doc, chunks))
+            texts.extend(chunk['text'] for chunk in chunks)
         
-        # Add chunks to database and FAISS
-        chunk_ids = []
-        for idx, chunk in enumerate(chunks):
-            chunk_id = f"{document_id}_chunk_{idx}"
-            chunk_ids.append(chunk_id)
-            
-            # Insert chunk metadata
-            def _insert_chunk():
-                conn = sqlite3.connect(str(self.db_path))
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    INSERT OR REPLACE INTO knowledge_chunks
-                    (chunk_id, document_id, content, chunk_index, metadata, created_at, token_count)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    chunk_id, document_id, chunk['text'], idx,
-                    json.dumps(chunk.get('metadata', {})),
-                    datetime.now().timestamp(), chunk.get('token_count', 0)
-                ))
+        embeddings = np.zeros((0, self.embedding_dim), dtype=np.float32)
+        if texts:
+            embeddings = np.atleast_2d(np.asarray(
+                await self.embedding_service.encode_async(texts), dtype=np.float32
+            ))
+            self.metrics["embeddings_computed"] += len(texts)
+        
+        def _write():
+            conn = sqlite3.connect(str(self.db_path))
+            cursor = conn.cursor()
+            replaced = []
+            chunk_ids = []
+            row = 0
+            try:
+                for document_id, doc, chunks in prepared:
+                    # Chunks of a previous version of this document
+                    cursor.execute("SELECT chunk_id FROM knowledge_chunks WHERE document_id = ?", (document_id,))
+                    replaced.extend(r[0] for r in cursor.fetchall())
+                    cursor.execute("DELETE FROM knowledge_chunks WHERE document_id = ?", (document_id,))
+                    self.lexical_index.delete_document(conn, document_id)
+                    
+                    cursor.execute("""
+                        INSERT OR REPLACE INTO knowledge_documents
+                        (document_id, title, document_type, tenant_id, store_id, access_level, 
+                         language, metadata, created_at, updated_at, is_active)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+                    """, (
+                        document_id, doc["title"], doc["document_type"], doc.get("tenant_id"),
+                        doc.get("store_id"), doc.get("access_level", "public"),
+                        doc.get("language", "en"), json.dumps(doc.get("metadata") or {}), now, now
+                    ))
+                    
+                    for idx, chunk in enumerate(chunks):
+                        chunk_id = f"{document_id}_chunk_{idx}"
+                        chunk_ids.append(chunk_id)
+                        cursor.execute("""
+                            INSERT OR REPLACE INTO knowledge_chunks
+                            (chunk_id, document_id, content, chunk_index, metadata, created_at, token_count, embedding)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        """, (
+                            chunk_id, document_id, chunk['text'], idx,
+                            json.dumps(chunk.get('metadata', {})),
+                            now, chunk.get('token_count', 0),
+                            embeddings[row].tobytes()
+                        ))
+                        self.lexical_index.upsert(conn, chunk_id, document_id, doc["title"], chunk['text'])
+                        row += 1
                 
                 conn.commit()
+            finally:
                 conn.close()
             
-            await asyncio.to_thread(_insert_chunk)
-            
-            # Generate embedding and add to FAISS
-            embedding = await self.embedding_service.encode_async(chunk['text'])
-            
-            # Add to FAISS
-            def _add_to_faiss():
-                if self.faiss_index is None:
-                    raise ValueError("FAISS index not initialized")
-                
-                position = self.faiss_index.ntotal
-                self.faiss_index.add(np.array([embedding], dtype=np.float32))
-                self.chunk_id_mapping[position] = chunk_id
-                self.reverse_mapping[chunk_id] = position
-            
-            await asyncio.to_thread(_add_to_faiss)
+            # Index after the rows are durable; stale chunk vectors become tombstones
+            current = set(chunk_ids)
+            self._remove_vectors([chunk_id for chunk_id in replaced if chunk_id not in current])
+            if chunk_ids:
+                self._add_vectors(chunk_ids, embeddings)
         
-        # Save FAISS index
-        await self._save_faiss_index()
+        await asyncio.to_thread(_write)
         
-        logger.info(f"✅ Added document: {title} ({len(chunks)} chunks)")
+        self.query_cache.clear()
+        self._schedule_save()
         
-        return {
-            "success": True,
-            "document_id": document_id,
-            "chunk_count": len(chunks),
-            "chunk_ids": chunk_ids
-        }
+        results = []
+        for document_id, doc, chunks in prepared:
+            logger.info(f"✅ Added document: {doc['title']} ({len(chunks)} chunks)")
+            results.append({
+                "success": True,
+                "document_id": document_id,
+                "chunk_count": len(chunks),
+                "chunk_ids": [f"{document_id}_chunk_{idx}" for idx in range(len(chunks))]
+            })
+        
+        return results
     
     async def retrieve(
         self,
@@ -340,11 +533,16 @@ class PortableRAGService:
         agent_id: Optional[str] = None,
         document_types: Optional[List[str]] = None,
         min_similarity: float = 0.0,
-        language: str = "en"
+        language: str = "en",
+        lexical_weight: Optional[float] = None
     ) -> List[Dict[str, Any]]:
         """
         Retrieve relevant chunks for a query
         
+        Vector (FAISS) and lexical (FTS5/BM25) candidates are merged with
+        reciprocal-rank fusion, so exact product names, SKUs and OCS variant
+        numbers surface even when the embedding misses them.
+        
         Args:
             query: Search query
             top_k: Number of results to return
@@ -352,16 +550,24 @@ class PortableRAGService:
             store_id: Filter by store
             agent_id: Agent making request (for access control)
             document_types: Filter by document types
-            min_similarity: Minimum similarity threshold
+            min_similarity: Minimum vector similarity (lexical matches are kept)
             language: Query language
+            lexical_weight: Lexical share of the fusion (0 = vector only,
+                1 = lexical only); defaults to the agent's configured weight
         
         Returns:
             List of relevant chunks with metadata
         """
         start_time = datetime.now()
         
+        if lexical_weight is None:
+            lexical_weight = self.get_lexical_weight(agent_id)
+        lexical_weight = min(1.0, max(0.0, lexical_weight))
+        
         # Check cache
-        query_hash = hashlib.md5(f"{query}_{tenant_id}_{store_id}".encode()).hexdigest()
+        query_hash = hashlib.md5(
+            f"{query}_{tenant_id}_{store_id}_{agent_id}_{document_types}_{top_k}_{lexical_weight}".encode()
+        ).hexdigest()
         if query_hash in self.query_cache:
             self.metrics["cache_hits"] += 1
             logger.debug(f"Cache hit for query: {query[:50]}...")
@@ -369,35 +575,26 @@ class PortableRAGService:
         
         self.metrics["total_queries"] += 1
         
-        # Generate query embedding
-        query_embedding = await self.embedding_service.encode_async(query)
+        candidate_k = top_k * 3
         
-        # Search FAISS (get more candidates for filtering)
-        search_k = min(top_k * 3, self.faiss_index.ntotal) if self.faiss_index.ntotal > 0 else 0
-        
-        def _faiss_search():
-            if self.faiss_index is None or self.faiss_index.ntotal == 0:
-                return [], []
-            
-            distances, indices = self.faiss_index.search(
-                np.array([query_embedding], dtype=np.float32),
-                search_k
+        # Vector and lexical candidate generation run side by side
+        vector_task = asyncio.create_task(self._vector_candidates(query, candidate_k, lexical_weight))
+        lexical_hits = []
+        if lexical_weight > 0 and self.lexical_index.available:
+            lexical_hits = await asyncio.to_thread(
+                self.lexical_index.search,
+                query, candidate_k, tenant_id, store_id, document_types
             )
-            return distances[0], indices[0]
+            self.metrics["lexical_searches"] += 1
+        query_embedding, vector_hits = await vector_task
         
-        distances, indices = await asyncio.to_thread(_faiss_search)
-        
-        self.metrics["faiss_searches"] += 1
-        
-        if len(indices) == 0:
+        if not vector_hits and not lexical_hits:
             return []
         
-        # Get chunk IDs from FAISS results
-        candidate_chunk_ids = [
-            self.chunk_id_mapping[int(idx)]
-            for idx in indices
-            if int(idx) in self.chunk_id_mapping
-        ]
+        distances = {chunk_id: distance for chunk_id, distance in vector_hits}
+        candidate_chunk_ids = list(dict.fromkeys(
+            [chunk_id for chunk_id, _ in vector_hits] + [chunk_id for chunk_id, _ in lexical_hits]
+        ))
         
         # Fetch chunks from SQLite with filtering
         def _fetch_chunks():
@@ -441,29 +638,41 @@ class PortableRAGService:
         chunks = await asyncio.to_thread(_fetch_chunks)
         self.metrics["db_queries"] += 1
         
-        # Map chunks back to their distances and apply access control
-        results = []
-        chunk_map = {chunk['chunk_id']: chunk for chunk in chunks}
+        # Apply filters and access control before ranking, so ranks only
+        # count chunks the caller may actually see
+        chunk_map = {
+            chunk['chunk_id']: chunk for chunk in chunks
+            if self._check_access(chunk['access_level'], agent_id)
+        }
         
-        for idx, (distance, faiss_idx) in enumerate(zip(distances, indices)):
-            if int(faiss_idx) not in self.chunk_id_mapping:
-                continue
-            
-            chunk_id = self.chunk_id_mapping[int(faiss_idx)]
-            if chunk_id not in chunk_map:
-                continue
-            
+        vector_ranking = [
+            chunk_id for chunk_id, distance in vector_hits
+            if chunk_id in chunk_map
+            and self._distance_to_similarity(distance) >= min_similarity
+        ]
+        lexical_ranking = [chunk_id for chunk_id, _ in lexical_hits if chunk_id in chunk_map]
+        lexical_ranks = {chunk_id: rank for rank, chunk_id in enumerate(lexical_ranking, start=1)}
+        
+        fused = reciprocal_rank_fusion(
+            {"vector": vector_ranking, "lexical": lexical_ranking},
+            {"vector": 1.0 - lexical_weight, "lexical": lexical_weight},
+            k=self.rrf_k
+        )[:top_k]
+        
+        # Lexical-only hits have no FAISS distance yet; score them against
+        # the query embedding so "similarity" stays comparable
+        missing = [chunk_id for chunk_id, _ in fused if chunk_id not in distances]
+        if missing:
+            distances.update(await asyncio.to_thread(
+                self._distances_for, query_embedding, missing
+            ))
+        
+        results = []
+        for chunk_id, fusion_score in fused:
             chunk = chunk_map[chunk_id]
-            
-            # Access control
-            if not self._check_access(chunk['access_level'], agent_id):
-                continue
-            
-            # Calculate similarity (L2 distance -> similarity)
-            similarity = max(0, 1.0 - float(distance) / 2.0)  # Normalize
-            
-            if similarity < min_similarity:
-                continue
+            lexical_rank = lexical_ranks.get(chunk_id)
+            if chunk_id not in vector_ranking:
+                self.metrics["lexical_only_hits"] += 1
             
             results.append({
                 "chunk_id": chunk_id,
@@ -471,15 +680,15 @@ class PortableRAGService:
                 "content": chunk['content'],
                 "title": chunk['title'],
                 "document_type": chunk['document_type'],
-                "similarity": similarity,
+                "similarity": self._distance_to_similarity(distances.get(chunk_id)),
+                "fusion_score": round(fusion_score, 6),
+                "lexical_match": lexical_rank is not None,
+                "lexical_rank": lexical_rank,
                 "chunk_index": chunk['chunk_index'],
                 "tenant_id": chunk['tenant_id'],
                 "store_id": chunk['store_id'],
                 "metadata": json.loads(chunk['chunk_metadata']) if chunk['chunk_metadata'] else {}
             })
-            
-            if len(results) >= top_k:
-                break
         
         # Cache results
         self.query_cache[query_hash] = results
@@ -495,6 +704,87 @@ class PortableRAGService:
         
         return results
     
+    async def _vector_candidates(
+        self,
+        query: str,
+        search_k: int,
+        lexical_weight: float
+    ) -> Tuple[np.ndarray, List[Tuple[str, float]]]:
+        """
+        Embed the query and run the FAISS search
+        
+        Returns:
+            (query embedding, [(chunk_id, L2 distance)] best first); the
+            search is skipped when the fusion is lexical-only
+        """
+        query_embedding = await self.embedding_service.encode_async(query)
+        
+        if lexical_weight >= 1.0 or self.faiss_index is None or self.faiss_index.ntotal == 0:
+            return query_embedding, []
+        
+        def _faiss_search():
+            with self._index_lock:
+                # Over-fetch so tombstoned vectors do not crowd out live ones
+                k = min(search_k + len(self.tombstones), self.faiss_index.ntotal)
+                distances, indices = self.faiss_index.search(
+                    np.array([query_embedding], dtype=np.float32),
+                    k
+                )
+            return distances[0], indices[0]
+        
+        distances, indices = await asyncio.to_thread(_faiss_search)
+        self.metrics["faiss_searches"] += 1
+        
+        hits = [
+            (self.chunk_id_mapping[int(idx)], float(distance))
+            for distance, idx in zip(distances, indices)
+            if int(idx) in self.chunk_id_mapping
+        ]
+        return query_embedding, hits
+    
+    def _distances_for(self, query_embedding: np.ndarray, chunk_ids: List[str]) -> Dict[str, float]:
+        """Squared L2 distance between the query and stored chunk vectors"""
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        distances = {}
+        with self._index_lock:
+            for chunk_id in chunk_ids:
+                vector_id = self.reverse_mapping.get(chunk_id)
+                if vector_id is None or self.faiss_index is None:
+                    continue
+                vector = self.faiss_index.reconstruct(int(vector_id))
+                distances[chunk_id] = float(np.sum((vector - query_vector) ** 2))
+        return distances
+    
+    @staticmethod
+    def _distance_to_similarity(distance: Optional[float]) -> float:
+        """FAISS squared L2 distance -> similarity (normalized embeddings)"""
+        if distance is None:
+            return 0.0
+        return max(0, 1.0 - float(distance) / 2.0)
+    
+    @staticmethod
+    def _parse_lexical_weights(spec: str) -> Dict[str, float]:
+        """Parse "dispensary=0.6,sales=0.4" into per-agent weights"""
+        weights = {}
+        for item in spec.split(","):
+            agent_id, _, value = item.partition("=")
+            if not agent_id.strip() or not value.strip():
+                continue
+            try:
+                weights[agent_id.strip()] = float(value)
+            except ValueError:
+                logger.warning(f"Ignoring invalid RAG_LEXICAL_WEIGHTS entry: {item}")
+        return weights
+    
+    def get_lexical_weight(self, agent_id: Optional[str]) -> float:
+        """Lexical share of the rank fusion for an agent"""
+        return self.lexical_weights.get(agent_id, self.default_lexical_weight)
+    
+    def set_lexical_weight(self, agent_id: str, weight: float):
+        """Tune an agent's lexical weight (0 = vector only, 1 = lexical only)"""
+        self.lexical_weights[agent_id] = min(1.0, max(0.0, float(weight)))
+        self.query_cache.clear()
+    
     def _check_access(self, doc_access_level: str, agent_id: Optional[str]) -> bool:
         """
         Check if agent has access to document
@@ -534,6 +824,7 @@ class PortableRAGService:
             # Delete from database
             cursor.execute("DELETE FROM knowledge_chunks WHERE document_id = ?", (document_id,))
             cursor.execute("DELETE FROM knowledge_documents WHERE document_id = ?", (document_id,))
+            self.lexical_index.delete_document(conn, document_id)
             conn.commit()
             conn.close()
             
@@ -541,47 +832,95 @@ class PortableRAGService:
         
         chunk_ids = await asyncio.to_thread(_delete)
         
-        # Remove from FAISS (rebuild index without deleted chunks)
+        # Tombstone the vectors; the graph is compacted once enough pile up
         if chunk_ids:
-            await self._rebuild_faiss_index()
+            await asyncio.to_thread(self._remove_vectors, chunk_ids)
+            self.query_cache.clear()
+            if self._needs_compaction():
+                await self.compact()
+            self._schedule_save()
             logger.info(f"✅ Deleted document {document_id} ({len(chunk_ids)} chunks)")
         
         return True
     
-    async def _rebuild_faiss_index(self):
-        """Rebuild FAISS index from scratch (used after deletions)"""
+    async def _rebuild_faiss_index(self, legacy_index=None):
+        """
+        Rebuild FAISS index from stored chunk embeddings
+        
+        Only chunks without a stored embedding are encoded (in batches).
+        
+        Args:
+            legacy_index: Positional index from before ID mapping whose
+                vectors are reused for chunks without a stored embedding
+        """
         logger.info("Rebuilding FAISS index...")
         
         # Get all chunks
         def _fetch_all_chunks():
             conn = sqlite3.connect(str(self.db_path))
             cursor = conn.cursor()
-            cursor.execute("SELECT chunk_id, content FROM knowledge_chunks ORDER BY chunk_id")
+            cursor.execute("SELECT chunk_id, content, embedding FROM knowledge_chunks ORDER BY chunk_id")
             chunks = cursor.fetchall()
             conn.close()
             return chunks
         
         chunks = await asyncio.to_thread(_fetch_all_chunks)
         
-        # Create new FAISS index
-        await self._create_faiss_index()
-        self.chunk_id_mapping = {}
-        self.reverse_mapping = {}
+        legacy_vectors = {}
+        if legacy_index is not None:
+            for position, chunk_id in self.chunk_id_mapping.items():
+                try:
+                    legacy_vectors[chunk_id] = legacy_index.reconstruct(int(position))
+                except RuntimeError:
+                    continue
+        
+        vectors = {}
+        backfill = {}
+        to_encode = []
+        for chunk_id, content, blob in chunks:
+            if blob is not None:
+                vectors[chunk_id] = np.frombuffer(blob, dtype=np.float32)
+            elif chunk_id in legacy_vectors:
+                vectors[chunk_id] = backfill[chunk_id] = legacy_vectors[chunk_id]
+            else:
+                to_encode.append((chunk_id, content))
+        self.metrics["embeddings_reused"] += len(vectors)
+        
+        if to_encode:
+            encoded = np.atleast_2d(np.asarray(
+                await self.embedding_service.encode_async([content for _, content in to_encode]),
+                dtype=np.float32
+            ))
+            self.metrics["embeddings_computed"] += len(to_encode)
+            for (chunk_id, _), vector in zip(to_encode, encoded):
+                vectors[chunk_id] = backfill[chunk_id] = vector
         
-        # Re-add all chunks
-        for idx, (chunk_id, content) in enumerate(chunks):
-            embedding = await self.embedding_service.encode_async(content)
-            
-            def _add():
-                position = self.faiss_index.ntotal
-                self.faiss_index.add(np.array([embedding], dtype=np.float32))
-                self.chunk_id_mapping[position] = chunk_id
-                self.reverse_mapping[chunk_id] = position
+        # Store embeddings that were missing so the next rebuild reuses them
+        if backfill:
+            def _store_embeddings():
+                conn = sqlite3.connect(str(self.db_path))
+                conn.executemany(
+                    "UPDATE knowledge_chunks SET embedding = ? WHERE chunk_id = ?",
+                    [(np.asarray(vector, dtype=np.float32).tobytes(), chunk_id) for chunk_id, vector in backfill.items()]
+                )
+                conn.commit()
+                conn.close()
             
-            await asyncio.to_thread(_add)
+            await asyncio.to_thread(_store_embeddings)
+        
+        # Create new FAISS index and add everything in one call
+        await self._create_faiss_index()
+        chunk_ids = [chunk_id for chunk_id, _, _ in chunks if chunk_id in vectors]
+        if chunk_ids:
+            await asyncio.to_thread(
+                self._add_vectors, chunk_ids, np.vstack([vectors[chunk_id] for chunk_id in chunk_ids])
+            )
         
         await self._save_faiss_index()
-        logger.info(f"✅ FAISS index rebuilt with {len(chunks)} chunks")
+        logger.info(
+            f"✅ FAISS index rebuilt with {len(chunk_ids)} chunks "
+            f"({len(to_encode)} encoded, {len(chunk_ids) - len(to_encode)} reused)"
+        )
     
     def get_metrics(self) -> Dict[str, Any]:
         """Get performance metrics"""
@@ -591,7 +930,11 @@ class PortableRAGService:
                 self.metrics["cache_hits"] / self.metrics["total_queries"]
                 if self.metrics["total_queries"] > 0 else 0
             ),
-            "total_chunks": len(self.chunk_id_mapping)
+            "total_chunks": len(self.chunk_id_mapping),
+            "tombstones": len(self.tombstones),
+            "index_vectors": self.faiss_index.ntotal if self.faiss_index is not None else 0,
+            "lexical_enabled": self.lexical_index.available,
+            "lexical_weights": {"default": self.default_lexical_weight, **self.lexical_weights}
         }
 
 
@@ -1,30 +1,33 @@
 """
 RAG Service - Retrieval Augmented Generation
-Hybrid PostgreSQL (pgvector) + FAISS implementation
+Hybrid PostgreSQL (pgvector) + partitioned in-memory vector search
 Multilingual support with tenant/store partitioning
 """
 
+import asyncio
 import numpy as np
 import logging
-from typing import List, Dict, Optional, Any, Tuple
+from typing import List, Dict, Optional, Any
 from datetime import datetime, timezone
 import asyncpg
-import faiss
-import pickle
 from pathlib import Path
 import hashlib
 import json
 
 from .embedding_service import get_embedding_service
+from .partitioned_index import PartitionedVectorIndex, GLOBAL_PARTITION
+from services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 
 class RAGService:
     """
-    Hybrid RAG with PostgreSQL + FAISS
-    - PostgreSQL: Persistent storage with metadata filtering
-    - FAISS: Fast in-memory vector search
+    Hybrid RAG with PostgreSQL + partitioned vector search
+    - PostgreSQL: Persistent storage (source of truth)
+    - Per-tenant vector partitions plus a shared global-knowledge partition,
+      memory-mapped, lazily loaded and LRU-evicted under a memory budget
+    - Metadata filtering from an in-memory side table (no SQL per query)
     - Real-time updates with smart caching
     """
     
@@ -33,7 +36,8 @@ class RAGService:
         db_pool: asyncpg.Pool,
         embedding_model: str = "paraphrase-multilingual-MiniLM-L12-v2",
         faiss_index_path: str = "models/rag/faiss_index",
-        cache_ttl: int = 3600  # 1 hour cache
+        cache_ttl: int = 3600,  # 1 hour cache
+        partition_memory_mb: Optional[int] = None
     ):
         """
         Initialize RAG service
@@ -41,8 +45,10 @@ class RAGService:
         Args:
             db_pool: PostgreSQL connection pool
             embedding_model: Multilingual model for all languages
-            faiss_index_path: Path to store FAISS index
+            faiss_index_path: Directory holding the vector partitions
             cache_ttl: Cache time-to-live in seconds
+            partition_memory_mb: Memory budget for loaded partitions
+                (defaults to RAG_PARTITION_MEMORY_MB)
         """
         self.db_pool = db_pool
         self.cache_ttl = cache_ttl
@@ -54,23 +60,24 @@ class RAGService:
         )
         self.embedding_dim = self.embedding_service.embedding_dim
         
-        # FAISS index setup
+        # Vector partitions (one per tenant + global knowledge)
         self.faiss_index_path = Path(faiss_index_path)
         self.faiss_index_path.mkdir(parents=True, exist_ok=True)
-        self.faiss_index = None
-        self.chunk_id_mapping = {}  # Maps FAISS index position to chunk_id
-        self.reverse_mapping = {}  # Maps chunk_id to FAISS index position
+        self.partitions = PartitionedVectorIndex(
+            self.faiss_index_path / "partitions",
+            memory_budget_bytes=partition_memory_mb * 1024 * 1024 if partition_memory_mb else None
+        )
         
         # Cache for frequently accessed chunks
         self.chunk_cache = {}  # chunk_id -> chunk_data
         self.query_cache = {}  # query_hash -> results
+        self._inflight = SingleFlight("rag_retrieve")
         
         # Metrics
         self.metrics = {
             "total_queries": 0,
             "cache_hits": 0,
-            "faiss_searches": 0,
-            "postgres_queries": 0,
+            "partition_searches": 0,
             "average_latency_ms": 0
         }
         
@@ -79,17 +86,14 @@ class RAGService:
         logger.info(f"   Embedding dimension: {self.embedding_dim}")
     
     async def initialize(self):
-        """Initialize FAISS index from PostgreSQL"""
+        """Initialize vector partitions from PostgreSQL"""
         logger.info("Initializing RAG service...")
         
-        # Load FAISS index if exists
-        await self._load_faiss_index()
-        
-        # If no index, build from PostgreSQL
-        if self.faiss_index is None:
-            await self._build_faiss_index()
+        # Partitions load lazily; only build when none exist on disk yet
+        if not self.partitions.keys():
+            await self._build_partitions()
         
-        logger.info(f"✅ RAG Service ready with {len(self.chunk_id_mapping)} chunks")
+        logger.info(f"✅ RAG Service ready with {len(self.partitions.keys())} partitions")
     
     async def retrieve(
         self,
@@ -133,24 +137,46 @@ class RAGService:
                 self.metrics["cache_hits"] += 1
                 logger.info(f"🎯 Cache hit for query: {query[:50]}...")
                 return cache_entry["results"]
-        
+
+        # Identical queries in flight together share one search; agent and
+        # result shape are part of the key since they change the results
+        return await self._inflight.run(
+            (cache_key, agent_id, rerank, final_k),
+            lambda: self._retrieve(
+                query, cache_key, start_time, top_k, tenant_id, store_id,
+                agent_id, document_types, rerank, final_k
+            )
+        )
+
+    async def _retrieve(
+        self,
+        query: str,
+        cache_key: str,
+        start_time: float,
+        top_k: int,
+        tenant_id: Optional[str],
+        store_id: Optional[str],
+        agent_id: Optional[str],
+        document_types: Optional[List[str]],
+        rerank: bool,
+        final_k: int
+    ) -> List[Dict[str, Any]]:
+        """Embed, search and re-rank a query that missed the cache"""
+        import time
+
         # Generate query embedding
         query_embedding = await self.embedding_service.encode_async(query)
         
-        # Step 1: Fast FAISS search (top_k candidates)
-        faiss_results = await self._faiss_search(query_embedding, top_k * 2)
-        self.metrics["faiss_searches"] += 1
-        
-        # Step 2: Filter by metadata in PostgreSQL
-        filtered_chunks = await self._filter_chunks(
-            faiss_results,
+        # Step 1+2: Search the tenant's partition and global knowledge, with
+        # metadata filters applied inside each partition
+        filtered_chunks = await self._partition_search(
+            query_embedding,
             tenant_id=tenant_id,
             store_id=store_id,
             agent_id=agent_id,
             document_types=document_types,
             limit=top_k
         )
-        self.metrics["postgres_queries"] += 1
         
         # Step 3: Re-rank if requested (cross-encoder would go here)
         if rerank and len(filtered_chunks) > final_k:
@@ -174,41 +200,9 @@ class RAGService:
         
         return filtered_chunks
     
-    async def _faiss_search(
+    async def _partition_search(
         self,
         query_embedding: np.ndarray,
-        k: int
-    ) -> List[Tuple[str, float]]:
-        """
-        Search FAISS index for similar vectors
-        
-        Returns:
-            List of (chunk_id, similarity_score) tuples
-        """
-        if self.faiss_index is None or len(self.chunk_id_mapping) == 0:
-            return []
-        
-        # Reshape for FAISS
-        query_vector = query_embedding.reshape(1, -1).astype('float32')
-        
-        # Search
-        k = min(k, len(self.chunk_id_mapping))
-        distances, indices = self.faiss_index.search(query_vector, k)
-        
-        # Convert to chunk_ids with scores
-        results = []
-        for dist, idx in zip(distances[0], indices[0]):
-            if idx in self.chunk_id_mapping:
-                chunk_id = self.chunk_id_mapping[idx]
-                # Convert L2 distance to similarity score (0-1)
-                similarity = 1 / (1 + dist)
-                results.append((chunk_id, float(similarity)))
-        
-        return results
-    
-    async def _filter_chunks(
-        self,
-        faiss_results: List[Tuple[str, float]],
         tenant_id: Optional[str],
         store_id: Optional[str],
         agent_id: Optional[str],
@@ -216,102 +210,97 @@ class RAGService:
         limit: int
     ) -> List[Dict[str, Any]]:
         """
-        Filter and enrich chunks from PostgreSQL
-        Apply access control and metadata filtering
-        """
-        if not faiss_results:
-            return []
-        
-        chunk_ids = [chunk_id for chunk_id, _ in faiss_results]
-        scores = {chunk_id: score for chunk_id, score in faiss_results}
-        
-        # Build query with filters
-        query = """
-            SELECT 
-                c.chunk_id,
-                c.document_id,
-                c.content,
-                c.chunk_index,
-                c.metadata,
-                d.title,
-                d.document_type,
-                d.tenant_id,
-                d.store_id,
-                d.source_table,
-                d.access_level
-            FROM knowledge_chunks c
-            JOIN knowledge_documents d ON c.document_id = d.document_id
-            WHERE c.chunk_id = ANY($1)
-        """
+        Search the tenant and global partitions with metadata filters
         
-        params = [chunk_ids]
-        param_idx = 2
+        Requests without a tenant only see global knowledge.
         
-        # Add filters
+        Returns:
+            Up to limit chunks, best match first
+        """
+        keys = [GLOBAL_PARTITION]
         if tenant_id:
-            query += f" AND (d.tenant_id = ${param_idx} OR d.tenant_id IS NULL)"
-            params.append(tenant_id)
-            param_idx += 1
-        
-        if store_id:
-            query += f" AND (d.store_id = ${param_idx} OR d.store_id IS NULL)"
-            params.append(store_id)
-            param_idx += 1
-        
-        if document_types:
-            query += f" AND d.document_type = ANY(${param_idx})"
-            params.append(document_types)
-            param_idx += 1
+            keys.insert(0, self.partitions.partition_key(tenant_id))
+        
+        query_vector = np.asarray(query_embedding, dtype=np.float32).ravel()
+        access_levels = self._get_allowed_access_levels(agent_id) if agent_id else None
+        
+        # Loading a cold partition and scanning its mmap'd vectors both touch
+        # disk, so each partition is searched on a worker thread
+        searches = await asyncio.gather(*(
+            asyncio.to_thread(
+                self._search_partition_sync,
+                key,
+                query_vector,
+                limit,
+                store_id,
+                document_types,
+                access_levels
+            )
+            for key in keys
+        ))
         
-        # Access control by agent
-        if agent_id:
-            access_filter = self._get_access_filter(agent_id)
-            if access_filter:
-                query += f" AND {access_filter}"
+        candidates = []
+        for search in searches:
+            if search is None:
+                continue
+            partition, hits = search
+            self.metrics["partition_searches"] += 1
+            candidates.extend((score, partition, row) for row, score in hits)
         
-        query += f" ORDER BY array_position($1, c.chunk_id) LIMIT {limit}"
+        candidates.sort(key=lambda c: c[0], reverse=True)
         
-        async with self.db_pool.acquire() as conn:
-            rows = await conn.fetch(query, *params)
-        
-        # Format results
         results = []
-        for row in rows:
-            chunk_id = row['chunk_id']
+        for cosine, partition, row in candidates[:limit]:
+            record = partition.records[row]
             results.append({
-                "chunk_id": chunk_id,
-                "document_id": row['document_id'],
-                "content": row['content'],
-                "title": row['title'],
-                "document_type": row['document_type'],
-                "tenant_id": row['tenant_id'],
-                "store_id": row['store_id'],
-                "source_table": row['source_table'],
-                "chunk_index": row['chunk_index'],
-                "metadata": row['metadata'],
-                "similarity_score": scores.get(chunk_id, 0.0),
-                "access_level": row['access_level']
+                **record,
+                # Same scale as the previous L2 index: 1 / (1 + squared L2),
+                # where squared L2 = 2 - 2*cos for normalized vectors
+                "similarity_score": 1.0 / (1.0 + max(0.0, 2.0 - 2.0 * cosine))
             })
         
         return results
     
-    def _get_access_filter(self, agent_id: str) -> Optional[str]:
+    def _search_partition_sync(
+        self,
+        key: str,
+        query_vector: np.ndarray,
+        limit: int,
+        store_id: Optional[str],
+        document_types: Optional[List[str]],
+        access_levels: Optional[List[str]]
+    ):
+        """Load and scan one partition (thread pool); None if it does not exist"""
+        partition = self.partitions.get(key)
+        if partition is None:
+            return None
+        
+        hits = partition.search(
+            query_vector,
+            limit,
+            store_id=store_id,
+            document_types=document_types,
+            access_levels=access_levels
+        )
+        return partition, hits
+    
+    def _get_allowed_access_levels(self, agent_id: str) -> Optional[List[str]]:
         """
-        Get SQL filter for agent access control
+        Get access levels an agent may read
         
         Dispensary agents: No sensitive info (pricing, internal docs)
         Sales agents: Platform info only, no customer-specific data
         Assistant: General FAQs only
         """
         access_rules = {
-            "dispensary": "d.access_level IN ('public', 'customer')",
-            "sales": "d.access_level IN ('public', 'platform')",
-            "assistant": "d.access_level = 'public'",
+            "dispensary": ["public", "customer"],
+            "sales": ["public", "platform"],
+            "assistant": ["public"],
             # Admin agents get everything
             "admin": None
         }
         
-        return access_rules.get(agent_id, "d.access_level = 'public'")
+        return access_rules.get(agent_id, ["public"])
     
     def _rerank_results(
         self,
@@ -399,107 +388,109 @@ class RAGService:
                         embedding.tolist(), json.dumps(chunk.get("metadata", {})),
                         datetime.now(timezone.utc))
         
-        # Rebuild FAISS index
-        await self._rebuild_faiss_index()
+        # Rebuild only the partition this document belongs to
+        await self._rebuild_partition(tenant_id)
         
         logger.info(f"✅ Added document: {title} ({len(chunks)} chunks)")
         
         return document_id
     
-    async def _build_faiss_index(self):
-        """Build FAISS index from PostgreSQL embeddings"""
-        logger.info("Building FAISS index from PostgreSQL...")
+    _CHUNK_QUERY = """
+        SELECT
+            c.chunk_id,
+            c.document_id,
+            c.content,
+            c.chunk_index,
+            c.metadata,
+            c.embedding,
+            d.title,
+            d.document_type,
+            d.tenant_id,
+            d.store_id,
+            d.source_table,
+            d.access_level
+        FROM knowledge_chunks c
+        JOIN knowledge_documents d ON c.document_id = d.document_id
+    """
+    
+    async def _build_partitions(self):
+        """Build every vector partition from PostgreSQL embeddings"""
+        logger.info("Building RAG partitions from PostgreSQL...")
         
         async with self.db_pool.acquire() as conn:
-            rows = await conn.fetch("""
-                SELECT chunk_id, embedding
-                FROM knowledge_chunks
-                ORDER BY chunk_id
-            """)
+            rows = await conn.fetch(self._CHUNK_QUERY + " ORDER BY c.chunk_id")
         
         if not rows:
             logger.warning("No chunks found in database")
-            self.faiss_index = faiss.IndexFlatL2(self.embedding_dim)
             return
         
-        # Create FAISS index
-        embeddings = []
-        chunk_ids = []
-        
+        grouped: Dict[str, List[asyncpg.Record]] = {}
         for row in rows:
-            chunk_ids.append(row['chunk_id'])
-            embeddings.append(np.array(row['embedding'], dtype='float32'))
+            key = self.partitions.partition_key(row['tenant_id'])
+            grouped.setdefault(key, []).append(row)
         
-        embeddings_array = np.vstack(embeddings)
+        for key, partition_rows in grouped.items():
+            await asyncio.to_thread(self._write_partition, key, partition_rows)
         
-        # Initialize FAISS index (IVF for faster search)
-        quantizer = faiss.IndexFlatL2(self.embedding_dim)
-        nlist = min(100, len(embeddings) // 10)  # Number of clusters
-        self.faiss_index = faiss.IndexIVFFlat(quantizer, self.embedding_dim, max(nlist, 1))
-        
-        # Train and add vectors
-        if len(embeddings) >= nlist:
-            self.faiss_index.train(embeddings_array)
-        self.faiss_index.add(embeddings_array)
-        
-        # Build mappings
-        self.chunk_id_mapping = {i: chunk_id for i, chunk_id in enumerate(chunk_ids)}
-        self.reverse_mapping = {chunk_id: i for i, chunk_id in enumerate(chunk_ids)}
+        logger.info(f"✅ Built {len(grouped)} RAG partitions with {len(rows)} chunks")
+    
+    async def _rebuild_partition(self, tenant_id: Optional[str]):
+        """Rebuild one tenant's (or the global) partition after updates"""
+        key = self.partitions.partition_key(tenant_id)
         
-        # Save index
-        await self._save_faiss_index()
+        async with self.db_pool.acquire() as conn:
+            if tenant_id:
+                rows = await conn.fetch(
+                    self._CHUNK_QUERY + " WHERE d.tenant_id = $1 ORDER BY c.chunk_id",
+                    tenant_id
+                )
+            else:
+                rows = await conn.fetch(
+                    self._CHUNK_QUERY + " WHERE d.tenant_id IS NULL ORDER BY c.chunk_id"
+                )
+        
+        if rows:
+            await asyncio.to_thread(self._write_partition, key, rows)
+        else:
+            await asyncio.to_thread(self.partitions.drop, key)
         
-        logger.info(f"✅ FAISS index built with {len(chunk_ids)} chunks")
-    
-    async def _rebuild_faiss_index(self):
-        """Rebuild FAISS index after updates"""
-        await self._build_faiss_index()
         self.query_cache.clear()  # Clear cache after rebuild
+        self._inflight.forget()  # Searches already running read the old partition
+        logger.info(f"🔄 Rebuilt RAG partition {key} ({len(rows)} chunks)")
     
-    async def _save_faiss_index(self):
-        """Save FAISS index and mappings to disk"""
-        if self.faiss_index is None:
-            return
-        
-        index_file = self.faiss_index_path / "rag.index"
-        mapping_file = self.faiss_index_path / "mappings.pkl"
-        
-        # Save FAISS index
-        faiss.write_index(self.faiss_index, str(index_file))
-        
-        # Save mappings
-        with open(mapping_file, 'wb') as f:
-            pickle.dump({
-                'chunk_id_mapping': self.chunk_id_mapping,
-                'reverse_mapping': self.reverse_mapping
-            }, f)
+    def _write_partition(self, key: str, rows: List[asyncpg.Record]):
+        """Convert chunk rows into a partition (vectors + side table) on disk"""
+        vectors = np.vstack([self._to_vector(row['embedding']) for row in rows])
+        records = []
+        for row in rows:
+            metadata = row['metadata']
+            if isinstance(metadata, str):
+                try:
+                    metadata = json.loads(metadata)
+                except ValueError:
+                    pass
+            records.append({
+                "chunk_id": row['chunk_id'],
+                "document_id": row['document_id'],
+                "content": row['content'],
+                "title": row['title'],
+                "document_type": row['document_type'],
+                "tenant_id": row['tenant_id'],
+                "store_id": row['store_id'],
+                "source_table": row['source_table'],
+                "chunk_index": row['chunk_index'],
+                "metadata": metadata,
+                "access_level": row['access_level']
+            })
         
-        logger.info(f"💾 Saved FAISS index to {index_file}")
+        self.partitions.write(key, vectors, records)
     
-    async def _load_faiss_index(self):
-        """Load FAISS index from disk"""
-        index_file = self.faiss_index_path / "rag.index"
-        mapping_file = self.faiss_index_path / "mappings.pkl"
-        
-        if not index_file.exists() or not mapping_file.exists():
-            logger.info("No existing FAISS index found")
-            return
-        
-        try:
-            # Load FAISS index
-            self.faiss_index = faiss.read_index(str(index_file))
-            
-            # Load mappings
-            with open(mapping_file, 'rb') as f:
-                data = pickle.load(f)
-                self.chunk_id_mapping = data['chunk_id_mapping']
-                self.reverse_mapping = data['reverse_mapping']
-            
-            logger.info(f"✅ Loaded FAISS index with {len(self.chunk_id_mapping)} chunks")
-            
-        except Exception as e:
-            logger.error(f"Failed to load FAISS index: {e}")
-            self.faiss_index = None
+    @staticmethod
+    def _to_vector(embedding: Any) -> np.ndarray:
+        """pgvector values arrive as lists or '[x,y,...]' strings"""
+        if isinstance(embedding, str):
+            embedding = json.loads(embedding)
+        return np.asarray(embedding, dtype=np.float32)
     
     def _get_cache_key(
         self,
@@ -540,8 +531,9 @@ class RAGService:
         return {
             **self.metrics,
             "cache_hit_rate_pct": round(cache_hit_rate, 2),
-            "total_chunks": len(self.chunk_id_mapping),
-            "cache_size": len(self.query_cache)
+            "cache_size": len(self.query_cache),
+            "coalescing": self._inflight.get_stats(),
+            "partitions": self.partitions.get_stats()
         }
 
 
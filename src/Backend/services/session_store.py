@@ -0,0 +1,426 @@
+"""
+Distributed Agent Session Store
+Keeps AgentPoolManager sessions in Redis so any worker or instance can serve
+any conversation, and sessions survive restarts.
+
+- Redis holds the authoritative copy: one key per session, compact positional
+  JSON (zlib-compressed once it grows past COMPRESS_THRESHOLD), refreshed TTL
+- Each worker keeps a bounded LRU near-cache of live session objects; entries
+  older than near_cache_ttl are re-read from Redis on next use
+- Saves publish the session id on a pub/sub channel so other workers drop
+  their near-cache copy immediately instead of waiting out the TTL
+
+- lock() serializes load-modify-save of one session across tasks and
+  workers (a per-worker asyncio lock plus an auto-expiring Redis lock), so
+  two workers handling turns of the same session do not overwrite each
+  other's history
+
+Without a Redis URL (or while Redis is unreachable) the near-cache is the only
+copy and behaves like the previous in-process dict.
+
+Records may contain datetimes, dates, Decimals, UUIDs and sets (tagged and
+restored on read); any other non-JSON value raises TypeError on save.
+
+Usage:
+    store = SessionStore(SessionStoreConfig.from_env(),
+                         encode=SessionState.to_record, decode=SessionState.from_record)
+    async with store.lock(session_id):
+        session = await store.get(session_id, refresh=True)
+        ...
+        await store.save(session_id, session)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from services.context.session_locks import SessionLocks
+
+logger = logging.getLogger(__name__)
+
+try:
+    from services.metrics.prometheus_metrics import track_session_store
+    METRICS_ENABLED = True
+except ImportError:
+    METRICS_ENABLED = False
+
+# Payloads below this size are stored as plain JSON
+COMPRESS_THRESHOLD = 512
+_PLAIN = b"j"
+_ZLIB = b"z"
+
+
+@dataclass
+class SessionStoreConfig:
+    """Configuration for the agent session store"""
+    redis_url: Optional[str] = None
+    key_prefix: str = "agent_session:"
+    channel: str = "agent_session:invalidate"
+    # Idle sessions expire from Redis after this long
+    ttl_seconds: int = 86400
+    # Sessions kept as live objects in this worker
+    near_cache_size: int = 1000
+    # Near-cache entries older than this are re-read from Redis
+    near_cache_ttl: float = 30.0
+    # Seconds before retrying an unreachable Redis
+    retry_seconds: float = 30.0
+    # Redis session locks expire after this long (a crashed worker cannot
+    # hold a session forever); waiters give up after lock_wait seconds
+    lock_timeout: float = 60.0
+    lock_wait: float = 30.0
+
+    @classmethod
+    def from_env(cls, near_cache_size: int = 1000) -> "SessionStoreConfig":
+        """Build configuration from AGENT_SESSION_* environment variables"""
+        return cls(
+            redis_url=os.getenv("AGENT_SESSION_REDIS_URL") or None,
+            ttl_seconds=int(os.getenv("AGENT_SESSION_TTL_SECONDS", "86400")),
+            near_cache_size=int(os.getenv("AGENT_SESSION_NEAR_CACHE_SIZE", str(near_cache_size))),
+            near_cache_ttl=float(os.getenv("AGENT_SESSION_NEAR_CACHE_TTL", "30")),
+            lock_timeout=float(os.getenv("AGENT_SESSION_LOCK_TIMEOUT", "60")),
+            lock_wait=float(os.getenv("AGENT_SESSION_LOCK_WAIT", "30"))
+        )
+
+
+_TAG = "$t"
+
+
+def _encode_value(value: Any) -> Dict[str, Any]:
+    """Tag non-JSON values so unpack() restores their type"""
+    if isinstance(value, datetime):
+        return {_TAG: "datetime", "v": value.isoformat()}
+    if isinstance(value, date):
+        return {_TAG: "date", "v": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {_TAG: "decimal", "v": str(value)}
+    if isinstance(value, uuid.UUID):
+        return {_TAG: "uuid", "v": str(value)}
+    if isinstance(value, (set, frozenset)):
+        return {_TAG: "set", "v": list(value)}
+    raise TypeError(f"Cannot store {type(value).__name__} in a session record: {value!r}")
+
+
+_DECODERS: Dict[str, Callable[[Any], Any]] = {
+    "datetime": datetime.fromisoformat,
+    "date": date.fromisoformat,
+    "decimal": Decimal,
+    "uuid": uuid.UUID,
+    "set": set
+}
+
+
+def _decode_value(obj: Dict[str, Any]) -> Any:
+    tag = obj.get(_TAG)
+    if tag is not None and len(obj) == 2 and tag in _DECODERS:
+        return _DECODERS[tag](obj["v"])
+    return obj
+
+
+def pack(record: Any) -> bytes:
+    """
+    Serialize a record, compressing larger payloads
+
+    Raises:
+        TypeError: If the record holds a value that cannot round-trip
+    """
+    raw = json.dumps(record, separators=(",", ":"), ensure_ascii=False, default=_encode_value).encode("utf-8")
+    if len(raw) >= COMPRESS_THRESHOLD:
+        return _ZLIB + zlib.compress(raw, 6)
+    return _PLAIN + raw
+
+
+def unpack(payload: bytes) -> Any:
+    header, body = payload[:1], payload[1:]
+    if header == _ZLIB:
+        body = zlib.decompress(body)
+    elif header != _PLAIN:
+        raise ValueError(f"Unknown session payload format: {header!r}")
+    return json.loads(body, object_hook=_decode_value)
+
+
+class SessionStore:
+    """
+    Redis-backed session store fronted by a per-worker near-cache
+
+    `local` is the near-cache itself (session id -> live object), so callers
+    that only need this worker's sessions can read it like a dict.
+    """
+
+    def __init__(
+        self,
+        config: Optional[SessionStoreConfig] = None,
+        encode: Callable[[Any], Any] = lambda session: session,
+        decode: Callable[[Any], Any] = lambda record: record
+    ):
+        """
+        Args:
+            config: Store configuration
+            encode: Turns a session object into a JSON-compatible record
+            decode: Rebuilds a session object from a record
+        """
+        self.config = config or SessionStoreConfig()
+        self.encode = encode
+        self.decode = decode
+
+        self.local: "OrderedDict[str, Any]" = OrderedDict()
+        self._fresh_until: Dict[str, float] = {}
+
+        self._node_id = uuid.uuid4().hex[:12]
+        self._redis = None
+        self._retry_at = 0.0
+        self._connect_lock = asyncio.Lock()
+        self._listener: Optional[asyncio.Task] = None
+        self._locks = SessionLocks()
+
+        self.stats = {
+            "local_hits": 0,
+            "remote_hits": 0,
+            "misses": 0,
+            "saves": 0,
+            "invalidations": 0,
+            "lock_timeouts": 0,
+            "errors": 0
+        }
+
+        logger.info(
+            f"SessionStore initialized (redis={'yes' if self.config.redis_url else 'no'}, "
+            f"near_cache={self.config.near_cache_size}, ttl={self.config.ttl_seconds}s)"
+        )
+
+    @property
+    def distributed(self) -> bool:
+        return bool(self.config.redis_url)
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.config.key_prefix}{session_id}"
+
+    def _count(self, result: str, stat: str) -> None:
+        self.stats[stat] += 1
+        if METRICS_ENABLED:
+            track_session_store(result)
+
+    # ------------------------------------------------------------------
+    # Redis connection and invalidation listener
+    # ------------------------------------------------------------------
+
+    async def _get_redis(self):
+        if not self.config.redis_url or self._redis is not None:
+            return self._redis
+        if time.monotonic() < self._retry_at:
+            return None
+
+        async with self._connect_lock:
+            if self._redis is not None or time.monotonic() < self._retry_at:
+                return self._redis
+            try:
+                import redis.asyncio as aioredis
+                client = aioredis.from_url(self.config.redis_url)
+                await client.ping()
+            except Exception as e:
+                logger.warning(f"SessionStore Redis unavailable, sessions are local to this worker: {e}")
+                self._retry_at = time.monotonic() + self.config.retry_seconds
+                return None
+
+            self._redis = client
+            self._listener = asyncio.create_task(self._listen(client))
+            logger.info("✅ SessionStore connected to Redis")
+        return self._redis
+
+    def _disconnect(self, error: Exception) -> None:
+        """Fall back to local sessions until Redis can be reached again"""
+        logger.warning(f"SessionStore Redis error, retrying in {self.config.retry_seconds:.0f}s: {error}")
+        self._count("error", "errors")
+        self._redis = None
+        self._retry_at = time.monotonic() + self.config.retry_seconds
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+    async def _listen(self, client) -> None:
+        """Drop near-cache copies of sessions saved by other workers"""
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(self.config.channel)
+            async for message in pubsub.listen():
+                data = message.get("data")
+                if isinstance(data, bytes):
+                    data = data.decode("utf-8")
+                node_id, _, session_id = str(data).partition(":")
+                if node_id != self._node_id and self._drop(session_id):
+                    self._count("invalidated", "invalidations")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Invalidations may have been missed; stop trusting the near-cache
+            logger.warning(f"SessionStore invalidation listener stopped: {e}")
+            self._fresh_until.clear()
+            if self._redis is client:
+                self._redis = None
+                self._listener = None
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------------
+    # Near-cache
+    # ------------------------------------------------------------------
+
+    def _remember(self, session_id: str, session: Any) -> None:
+        self.local[session_id] = session
+        self.local.move_to_end(session_id)
+        if self.distributed:
+            self._fresh_until[session_id] = time.monotonic() + self.config.near_cache_ttl
+            # Evicted sessions are still in Redis; without it the pool cleans up
+            while len(self.local) > self.config.near_cache_size:
+                evicted, _ = self.local.popitem(last=False)
+                self._fresh_until.pop(evicted, None)
+
+    def _drop(self, session_id: str) -> bool:
+        self._fresh_until.pop(session_id, None)
+        return self.local.pop(session_id, None) is not None
+
+    def _is_fresh(self, session_id: str) -> bool:
+        return time.monotonic() < self._fresh_until.get(session_id, 0.0)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def get(self, session_id: str, refresh: bool = False) -> Optional[Any]:
+        """
+        Session from the near-cache, falling back to Redis
+
+        Args:
+            session_id: Session identifier
+            refresh: Re-read from Redis even if the near-cache copy is fresh
+                (inside lock(), to see the previous holder's save)
+        """
+        session = self.local.get(session_id)
+        redis = await self._get_redis()
+        if session is not None and (redis is None or (self._is_fresh(session_id) and not refresh)):
+            self.local.move_to_end(session_id)
+            self._count("local_hit", "local_hits")
+            return session
+
+        if redis is None:
+            self._count("miss", "misses")
+            return None
+
+        try:
+            payload = await redis.get(self._key(session_id))
+        except Exception as e:
+            self._disconnect(e)
+            return session
+
+        if payload is None:
+            self._drop(session_id)
+            self._count("miss", "misses")
+            return None
+
+        try:
+            session = self.decode(unpack(payload))
+        except Exception as e:
+            logger.error(f"Discarding unreadable session {session_id}: {e}")
+            self._drop(session_id)
+            self._count("miss", "misses")
+            return None
+
+        self._remember(session_id, session)
+        self._count("remote_hit", "remote_hits")
+        return session
+
+    async def save(self, session_id: str, session: Any) -> None:
+        """Store a session and tell other workers to drop their copy"""
+        self._remember(session_id, session)
+        redis = await self._get_redis()
+        if redis is None:
+            return
+
+        # Encoding errors are the caller's bug, not a Redis outage
+        payload = pack(self.encode(session))
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.set(self._key(session_id), payload, ex=self.config.ttl_seconds)
+                pipe.publish(self.config.channel, f"{self._node_id}:{session_id}")
+                await pipe.execute()
+        except Exception as e:
+            self._disconnect(e)
+            return
+        self._count("saved", "saves")
+
+    @asynccontextmanager
+    async def lock(self, session_id: str) -> AsyncIterator[None]:
+        """
+        Hold a session for a load-modify-save cycle
+
+        Waits for other tasks in this worker, then (with Redis) for other
+        workers. If another worker holds the session past lock_wait, the
+        cycle proceeds unlocked rather than failing the request.
+        """
+        async with self._locks.get(session_id):
+            redis_lock = None
+            redis = await self._get_redis()
+            if redis is not None:
+                redis_lock = redis.lock(
+                    f"{self._key(session_id)}:lock",
+                    timeout=self.config.lock_timeout,
+                    blocking_timeout=self.config.lock_wait,
+                    thread_local=False
+                )
+                try:
+                    acquired = await redis_lock.acquire()
+                except Exception as e:
+                    self._disconnect(e)
+                    acquired = False
+                if not acquired:
+                    redis_lock = None
+                    self._count("lock_timeout", "lock_timeouts")
+                    logger.warning(f"Session {session_id} still locked after {self.config.lock_wait:.0f}s, proceeding unlocked")
+
+            try:
+                yield
+            finally:
+                if redis_lock is not None:
+                    try:
+                        await redis_lock.release()
+                    except Exception as e:
+                        # Expired (turn outlived lock_timeout) or Redis went away
+                        logger.warning(f"SessionStore lock release failed for {session_id}: {e}")
+
+    def forget_local(self, session_id: str) -> None:
+        """Drop this worker's copy only (the session stays in Redis)"""
+        self._drop(session_id)
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["local_hits"] + self.stats["remote_hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "distributed": self.distributed,
+            "connected": self._redis is not None,
+            "local_sessions": len(self.local),
+            "local_hit_rate": round(self.stats["local_hits"] / lookups, 3) if lookups else 0.0
+        }
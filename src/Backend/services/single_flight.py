@@ -0,0 +1,95 @@
+"""
+Single-Flight Request Coalescing
+Concurrent callers asking for the same key share one in-flight call instead
+of each running it, e.g. hundreds of sessions classifying the same promotion
+question at once. Only calls that overlap are collapsed; nothing is cached
+once the call completes (callers keep their own caches for that).
+
+Usage:
+    flight = SingleFlight("rag_retrieve")
+    results = await flight.run(cache_key, lambda: self._retrieve(query))
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from services.metrics.prometheus_metrics import track_single_flight
+    METRICS_ENABLED = True
+except ImportError:
+    METRICS_ENABLED = False
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers await it
+
+    A caller being cancelled does not cancel the shared call for the others.
+    A failure is raised to every caller that joined the call.
+    """
+
+    def __init__(self, name: str, share: Optional[Callable[[Any], Any]] = None):
+        """
+        Args:
+            name: Label for metrics and logs
+            share: Applied to the result handed to callers that joined an
+                existing call (e.g. dict.copy when callers mutate results)
+        """
+        self.name = name
+        self.share = share
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.stats = {
+            "executions": 0,
+            "coalesced": 0
+        }
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(call())
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._finished(key, f))
+            self.stats["executions"] += 1
+            if METRICS_ENABLED:
+                track_single_flight(self.name, "executed")
+            return await asyncio.shield(future)
+
+        self.stats["coalesced"] += 1
+        if METRICS_ENABLED:
+            track_single_flight(self.name, "coalesced")
+        result = await asyncio.shield(future)
+        return self.share(result) if self.share else result
+
+    def forget(self, key: Optional[Hashable] = None) -> None:
+        """
+        Stop handing out an in-flight call (all calls when key is None)
+
+        Use after invalidating the data a call is reading, so later callers
+        start a fresh call; callers already waiting still get the old result.
+        """
+        if key is None:
+            self._inflight.clear()
+        else:
+            self._inflight.pop(key, None)
+
+    def _finished(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        # Mark the exception retrieved even if every waiter was cancelled
+        if not future.cancelled() and future.exception() is not None:
+            logger.debug(f"{self.name} call for {key} failed: {future.exception()}")
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def get_stats(self) -> Dict[str, Any]:
+        calls = self.stats["executions"] + self.stats["coalesced"]
+        return {
+            **self.stats,
+            "inflight": self.inflight,
+            "coalesced_ratio": round(self.stats["coalesced"] / calls, 3) if calls else 0.0
+        }
@@ -15,7 +15,7 @@ import re
 import uuid
 import asyncio
 from pathlib import Path
-from typing import Dict, Optional, List, Any, Tuple
+from typing import Dict, Optional, List, Any, Tuple, Callable, Awaitable
 from llama_cpp import Llama
 
 # Import tool and context interfaces
@@ -38,6 +38,14 @@ except ImportError:
     INTENT_DETECTOR_AVAILABLE = False
     logging.warning("Intent detector module not available")
 
+from services.local_inference import (
+    InferencePriority,
+    get_local_inference_executor,
+    shutdown_local_inference_executor
+)
+from services.metrics.tracing import traced, record_span
+from services.agent_profiles import AgentProfile, AgentProfileRegistry, active_profile, profile_scoped
+
 logger = logging.getLogger(__name__)
 
 class SmartAIEngineV5:
@@ -54,11 +62,76 @@ class SmartAIEngineV5:
     - Tool calling for function execution
     - Context persistence across conversations
     - Modular agent system with custom tools
+
+    Agent/personality configuration comes from precompiled AgentProfiles. A
+    profile passed to generate() (or selected with use_profile) applies to
+    that request only; load_agent_personality() sets the engine default.
     """
-    
+
+    # Per-request profile first, then the engine default
+    @property
+    def active_profile(self) -> Optional[AgentProfile]:
+        return active_profile() or self.__dict__.get('profile')
+
+    @property
+    def system_config(self) -> Dict:
+        profile = active_profile()
+        return profile.system_config if profile else self._system_config
+
+    @system_config.setter
+    def system_config(self, value: Dict):
+        self._system_config = value
+
+    @property
+    def agent_prompts(self) -> Dict:
+        profile = active_profile()
+        return profile.agent_prompts if profile else self._agent_prompts
+
+    @agent_prompts.setter
+    def agent_prompts(self, value: Dict):
+        self._agent_prompts = value
+
+    @property
+    def personality_traits(self) -> Dict:
+        profile = active_profile()
+        return profile.personality_traits if profile else self._personality_traits
+
+    @personality_traits.setter
+    def personality_traits(self, value: Dict):
+        self._personality_traits = value
+
+    @property
+    def current_agent(self) -> Optional[str]:
+        profile = active_profile()
+        return profile.agent_id if profile else self._current_agent
+
+    @current_agent.setter
+    def current_agent(self, value: Optional[str]):
+        self._current_agent = value
+
+    @property
+    def current_personality_type(self) -> Optional[str]:
+        profile = active_profile()
+        return profile.personality_id if profile else self._current_personality_type
+
+    @current_personality_type.setter
+    def current_personality_type(self, value: Optional[str]):
+        self._current_personality_type = value
+
+    @property
+    def use_prompts(self) -> bool:
+        profile = active_profile()
+        return profile.use_prompts if profile else self._use_prompts
+
+    @use_prompts.setter
+    def use_prompts(self, value: bool):
+        self._use_prompts = value
+
     def __init__(self):
         self.current_model = None
         self.current_model_name = None
+        # llama-cpp calls run on dedicated worker threads, never on the event loop
+        self.local_inference = get_local_inference_executor()
         self.available_models = self._scan_models()
         self.loaded_prompts = {}
         self.base_prompts = {}
@@ -71,11 +144,13 @@ class SmartAIEngineV5:
         self.current_personality = None
 
         # New modular architecture support
+        self.profile: Optional[AgentProfile] = None
         self.current_agent = None
         self.current_personality_type = None
         self.agent_prompts = {}
         self.personality_traits = {}
         self.system_config = self._load_system_config()
+        self.profiles = AgentProfileRegistry(tool_config=self.system_config)
 
         # Initialize agent pool manager for multi-agent support (BEFORE tools/context)
         self.agent_pool = None
@@ -178,8 +253,8 @@ class SmartAIEngineV5:
                 LLM7GPT4Mini
             )
 
-            # Create router
-            self.llm_router = LLMRouter()
+            # Create router with response cache for repeated storefront questions
+            self.llm_router = LLMRouter(cache=self._create_response_cache())
 
             # Register cloud providers (automatically skip if no API key)
             self.llm_router.register_provider(GroqProvider())           # Ultra-fast
@@ -207,6 +282,29 @@ class SmartAIEngineV5:
             logger.error(f"Failed to initialize LLM Router: {e}")
             self.llm_router = None
     
+    def _create_response_cache(self):
+        """Create LLM response cache from LLM_CACHE_* environment settings"""
+        try:
+            from services.llm_gateway.response_cache import ResponseCache, ResponseCacheConfig
+
+            cache_config = ResponseCacheConfig.from_env()
+            if not cache_config.enabled:
+                return None
+
+            embedding_service = None
+            if cache_config.semantic_enabled:
+                try:
+                    from services.rag.embedding_service import get_embedding_service
+                    embedding_service = get_embedding_service()
+                except Exception as e:
+                    logger.warning(f"Semantic response cache unavailable: {e}")
+
+            return ResponseCache(cache_config, embedding_service=embedding_service)
+
+        except Exception as e:
+            logger.warning(f"Response cache not available: {e}")
+            return None
+
     def detect_intent(self, message: str, language: str = "auto") -> Dict[str, Any]:
         """Detect intent using the configured detector"""
         if not self.intent_detector:
@@ -242,17 +340,9 @@ class SmartAIEngineV5:
             return self._basic_intent_detection(message)
 
         try:
-            # Run intent detection in executor to avoid blocking
-            import asyncio
-            loop = asyncio.get_event_loop()
-
-            # Run the blocking detect call in a thread pool
-            result = await loop.run_in_executor(
-                None,  # Use default executor
-                self.intent_detector.detect,
-                message,
-                language
-            )
+            # Model-backed detectors queue classification in the intent lane
+            # of the local inference executor instead of blocking the loop
+            result = await self.intent_detector.detect_async(message, language)
 
             # Ensure result is a dictionary
             if not isinstance(result, dict):
@@ -343,7 +433,7 @@ class SmartAIEngineV5:
             
         try:
             # Get agent-specific tools from config
-            agent_tools = self.system_config.get('system', {}).get('tools', {}).get('agent_tools', {}).get(agent_id, [])
+            agent_tools = self.profiles.tools_for(agent_id)
             
             # Check if database tools should be used
             use_db_tools = self.system_config.get('system', {}).get('tools', {}).get('use_database', True)
@@ -499,129 +589,73 @@ class SmartAIEngineV5:
         logger.warning("No system config found, using defaults")
         return {}
     
+    def get_profile(self, agent_id: Optional[str], personality_id: Optional[str] = None) -> AgentProfile:
+        """Precompiled profile for an agent + personality (cached, hot-reloaded)"""
+        return self.profiles.get(agent_id, personality_id)
+
+    async def get_profile_async(self, agent_id: Optional[str], personality_id: Optional[str] = None) -> AgentProfile:
+        """get_profile without blocking the event loop on file reads"""
+        return await self.profiles.get_async(agent_id, personality_id)
+
+    def _apply_profile(self, profile: AgentProfile):
+        """Make a profile the engine default; fields point into the profile, nothing is copied"""
+        self.profile = profile
+        self.current_agent = profile.agent_id
+        self.current_personality_type = profile.personality_id
+        self.system_config = profile.system_config
+        self.agent_prompts = profile.agent_prompts
+        self.personality_traits = profile.personality_traits
+        self.use_prompts = profile.use_prompts
+
     def update_personality(self, personality_id: str) -> bool:
         """Update personality without reloading model or agent configuration"""
         try:
             if not self.current_agent:
                 logger.error("No agent loaded - cannot update personality")
                 return False
-            
-            logger.info(f"=== UPDATING PERSONALITY ===")
-            logger.info(f"Current agent: {self.current_agent}, New personality: {personality_id}")
-            
-            # Load new personality traits
-            agent_personality_path = Path(f"prompts/agents/{self.current_agent}/personality/{personality_id}.json")
-            
-            if agent_personality_path.exists():
-                with open(agent_personality_path, 'r') as f:
-                    personality_data = json.load(f)
-                    self.personality_traits = personality_data.get('personality', {})
-                    self.current_personality_type = personality_id
-                    logger.info(f"✅ UPDATED PERSONALITY to '{personality_id}' for agent '{self.current_agent}'")
-                    logger.info(f"  Personality name: {self.personality_traits.get('name')}")
-                    
-                    # Update use_prompts flag
-                    self.use_prompts = bool(self.agent_prompts or self.personality_traits or self.system_config)
-                    return True
-            else:
-                logger.error(f"❌ PERSONALITY NOT FOUND at {agent_personality_path}")
+
+            profile = self.get_profile(self.current_agent, personality_id)
+            if not profile.personality_traits:
+                logger.error(f"❌ PERSONALITY '{personality_id}' NOT FOUND for agent '{self.current_agent}'")
                 return False
-                
+
+            self._apply_profile(profile)
+            logger.info(f"✅ UPDATED PERSONALITY to '{personality_id}' for agent '{self.current_agent}' ({profile.personality_name})")
+            return True
+
         except Exception as e:
             logger.error(f"Failed to update personality: {e}")
             return False
-    
+
     def load_agent_personality(self, agent_id: str = None, personality_id: str = None) -> bool:
         """Load agent and personality combination for modular system"""
         try:
-            logger.info(f"=== LOADING AGENT PERSONALITY ===")
-            logger.info(f"Agent ID: {agent_id}, Personality ID: {personality_id}")
-            
-            # Reset current configuration
-            self.agent_prompts = {}
-            self.personality_traits = {}
-            self.system_config = {}
-            self.current_agent = agent_id
-            self.current_personality_type = personality_id
-            
-            # Load agent configuration and prompts
-            if agent_id:
-                # First load the config.json if it exists
-                config_path = Path(f"prompts/agents/{agent_id}/config.json")
-                if config_path.exists():
-                    with open(config_path, 'r') as f:
-                        config_data = json.load(f)
-                        # Store the entire config including system_behavior settings
-                        self.system_config = config_data
-                        # Extract system behavior settings specifically
-                        if 'system_behavior' in config_data:
-                            self.system_config.update(config_data['system_behavior'])
-                        if 'default_behavior' in config_data:
-                            self.system_config.update(config_data['default_behavior'])
-                        if 'safety_guidelines' in config_data:
-                            self.system_config['safety_guidelines'] = config_data['safety_guidelines']
-                        logger.info(f"✅ LOADED CONFIG.JSON for '{agent_id}' - Keys: {list(config_data.keys())}")
-                        if 'model_settings' in config_data:
-                            logger.info(f"  Model settings: {config_data['model_settings']}")
-                else:
-                    logger.warning(f"❌ CONFIG.JSON NOT FOUND at {config_path}")
-                
-                # Load intent configuration for this agent
+            previous_agent = self.current_agent
+            profile = self.get_profile(agent_id, personality_id)
+            self._apply_profile(profile)
+
+            # Intent configuration is per agent; a personality switch keeps it
+            if agent_id and agent_id != previous_agent:
                 if self.intent_detector:
                     loaded = self.intent_detector.load_intents(agent_id)
                     logger.info(f"✅ LOADED INTENT.JSON for agent {agent_id}: {loaded}")
                 else:
                     logger.warning(f"❌ Intent detector not initialized")
-                
-                # Then load the prompts.json
-                agent_path = Path(f"prompts/agents/{agent_id}/prompts.json")
-                if agent_path.exists():
-                    with open(agent_path, 'r') as f:
-                        agent_data = json.load(f)
-                        self.agent_prompts = agent_data.get('prompts', {})
-                        logger.info(f"✅ LOADED PROMPTS.JSON for '{agent_id}' - {len(self.agent_prompts)} prompts")
-                        logger.info(f"  Available prompts: {list(self.agent_prompts.keys())}")
-                else:
-                    logger.warning(f"❌ PROMPTS.JSON NOT FOUND at {agent_path}")
-            
-            # Load personality traits
-            if personality_id:
-                # First check for personality in agent's personality folder (note: singular 'personality')
-                agent_personality_path = Path(f"prompts/agents/{agent_id}/personality/{personality_id}.json") if agent_id else None
-                personality_path = Path(f"prompts/personality/{personality_id}/traits.json")
-                
-                if agent_personality_path and agent_personality_path.exists():
-                    # Load from agent-specific personality
-                    with open(agent_personality_path, 'r') as f:
-                        personality_data = json.load(f)
-                        self.personality_traits = personality_data.get('personality', {})
-                        logger.info(f"✅ LOADED PERSONALITY '{personality_id}' for agent '{agent_id}'")
-                        logger.info(f"  Personality name: {self.personality_traits.get('name')}")
-                        logger.info(f"  Traits: {self.personality_traits.get('traits', {})}")
-                elif personality_path.exists():
-                    # Load from global personality folder
-                    with open(personality_path, 'r') as f:
-                        personality_data = json.load(f)
-                        self.personality_traits = personality_data.get('personality', {})
-                        logger.info(f"Loaded global personality '{personality_id}' - {self.personality_traits.get('name')}")
-            
-            self.use_prompts = bool(self.agent_prompts or self.personality_traits or self.system_config)
-            
-            # Log summary of what was loaded
-            logger.info(f"=== LOADING COMPLETE ===")
-            logger.info(f"  use_prompts: {self.use_prompts}")
-            logger.info(f"  agent_prompts loaded: {len(self.agent_prompts)} prompts")
-            logger.info(f"  personality loaded: {self.personality_traits.get('name', 'None')}")
-            logger.info(f"  system_config loaded: {bool(self.system_config)}")
-            
+
+            logger.info(
+                f"Loaded agent personality {agent_id}/{personality_id}: "
+                f"{len(profile.agent_prompts)} prompts, personality {profile.personality_name or 'None'}, "
+                f"system_config loaded: {bool(profile.system_config)}"
+            )
             return True
-            
+
         except Exception as e:
             logger.error(f"Failed to load agent/personality: {e}")
             return False
-    
+
     def load_prompts(self, prompt_folder: str = None, role_folder: str = None, personality_file: str = None) -> Dict[str, Dict]:
         """Load prompts from base, role, and personality layers"""
+        self.profile = None
         self.loaded_prompts = {}
         self.base_prompts = {}
         self.role_prompts = {}
@@ -764,10 +798,13 @@ class SmartAIEngineV5:
         else:
             use_system_format = template_data.get('system_format', False)
         
-        # Replace personality variables - also check self.current_personality for backward compatibility
+        # Personality variables are pre-rendered in compiled profiles
+        profile = self.active_profile
         personality_data = self.personality_traits or self.current_personality
-        
-        if personality_data:
+
+        if profile is not None and prompt_type in profile.rendered_templates:
+            template_str = profile.rendered_templates[prompt_type]
+        elif personality_data:
             personality_name = personality_data.get('name', 'Assistant')
             logger.info(f"Replacing {{personality_name}} with '{personality_name}'")
             template_str = template_str.replace('{personality_name}', personality_name)
@@ -1055,6 +1092,7 @@ class SmartAIEngineV5:
             self.load_prompts(base_folder, role_folder, personality_file)
         else:
             # Clear prompts if none specified
+            self.profile = None
             self.loaded_prompts = {}
             self.base_prompts = {}
             self.role_prompts = {}
@@ -1070,6 +1108,8 @@ class SmartAIEngineV5:
             # Unload current model with aggressive cleanup
             if self.current_model:
                 logger.info(f"Unloading {self.current_model_name}")
+                # Let any running local inference on this model finish first
+                self.local_inference.release_model(self.current_model)
                 try:
                     # Try to explicitly free the model's memory if available
                     if hasattr(self.current_model, '__del__'):
@@ -1263,29 +1303,55 @@ class SmartAIEngineV5:
             return {"text": "general", "error": "No model loaded"}
         
         try:
-            # Direct model call without any prompt processing or intent detection
-            response = self.current_model(
+            # Direct model call without any prompt processing or intent detection,
+            # serialized with other model use on the inference workers
+            response = self.local_inference.run_sync(
                 prompt,
+                model=self.current_model,
+                priority=InferencePriority.INTENT,
                 max_tokens=max_tokens,
                 temperature=temperature,
                 top_p=top_p,
                 stop=["\n", ".", ","],
-                echo=False,
-                stream=False
+                echo=False
             )
-            
-            # Handle different response types
-            if isinstance(response, str):
-                return {"text": response.strip() if response else "general"}
-            elif isinstance(response, dict) and response.get("choices"):
-                text = response["choices"][0].get("text", "")
-                return {"text": text.strip() if text else "general"}
-            else:
-                return {"text": "general"}
+            return self._internal_response_text(response)
                 
         except Exception as e:
             logger.error(f"Internal generation failed: {e}")
             return {"text": "general", "error": str(e)}
+
+    async def _generate_internal_async(self, prompt: str, max_tokens: int = 20, temperature: float = 0.1, top_p: float = 0.9) -> Dict[str, Any]:
+        """Non-blocking _generate_internal: queued in the intent lane ahead of chat generations"""
+        if not self.current_model:
+            return {"text": "general", "error": "No model loaded"}
+
+        try:
+            response = await self.local_inference.submit(
+                prompt,
+                model=self.current_model,
+                priority=InferencePriority.INTENT,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                top_p=top_p,
+                stop=["\n", ".", ","],
+                echo=False
+            )
+            return self._internal_response_text(response)
+
+        except Exception as e:
+            logger.error(f"Internal generation failed: {e}")
+            return {"text": "general", "error": str(e)}
+
+    def _internal_response_text(self, response: Any) -> Dict[str, Any]:
+        """Normalize a raw model response for intent detection"""
+        if isinstance(response, str):
+            return {"text": response.strip() if response else "general"}
+        elif isinstance(response, dict) and response.get("choices"):
+            text = response["choices"][0].get("text", "")
+            return {"text": text.strip() if text else "general"}
+        else:
+            return {"text": "general"}
     
     def _extract_tool_calls(self, response: str) -> List[Dict]:
         """Extract tool calls from LLM response"""
@@ -1525,6 +1591,8 @@ class SmartAIEngineV5:
 
         return "".join(formatted_lines)
     
+    @traced("engine.generate")
+    @profile_scoped
     async def generate(self,
                  prompt: str,
                  prompt_type: Optional[str] = None,
@@ -1535,8 +1603,14 @@ class SmartAIEngineV5:
                  use_tools: bool = False,
                  use_context: bool = False,
                  session_id: Optional[str] = None,
-                 context: Optional[Dict[str, Any]] = None) -> Dict:
-        """Generate response with optional prompt template, tools, and context"""
+                 context: Optional[Dict[str, Any]] = None,
+                 on_token: Optional[Callable[[str], Awaitable[None]]] = None) -> Dict:
+        """Generate response with optional prompt template, tools, and context
+
+        When on_token is given, model output is streamed: each text delta is
+        awaited through on_token as it is produced and the returned dict still
+        carries the complete text.
+        """
         
         if not self.current_model:
             return {
@@ -1621,8 +1695,11 @@ class SmartAIEngineV5:
                 if self.intent_detector:
                     intent_detect_start = time.time()
                     try:
-                        intent_result = self.detect_intent(prompt)
+                        # Async detector: classification waits on the inference
+                        # pool without holding the event loop
+                        intent_result = await self.detect_intent_async(prompt)
                         timing_breakdown['intent_detection'] = time.time() - intent_detect_start
+                        record_span("engine.intent_detection", timing_breakdown['intent_detection'])
                         logger.info(f"Serial intent detection completed: {intent_result} (took {timing_breakdown['intent_detection']:.2f}s)")
                         # Extract the prompt_type from the intent result
                         if isinstance(intent_result, dict):
@@ -1809,6 +1886,7 @@ class SmartAIEngineV5:
             
             # Debug timing for model inference
             inference_start = time.time()
+            streamed_tokens = 0
 
             # Check if model is loaded
             if not self.current_model:
@@ -1842,10 +1920,18 @@ class SmartAIEngineV5:
                             task_type = TaskType.CHAT
 
                     # Create routing context
-                    context = RequestContext(
+                    # Tenant/store from the caller's context scope the router's response cache
+                    request_scope = context or {}
+                    route_context = RequestContext(
                         task_type=task_type,
                         estimated_tokens=final_max_tokens,
-                        requires_speed=(response_style == 'conversational')
+                        session_id=session_id,
+                        tenant_id=request_scope.get('tenant_id'),
+                        store_id=request_scope.get('store_id'),
+                        requires_speed=(response_style == 'conversational'),
+                        requires_streaming=on_token is not None,
+                        temperature=actual_temperature,
+                        max_tokens=final_max_tokens
                     )
 
                     # Route to cloud provider
@@ -1885,7 +1971,21 @@ class SmartAIEngineV5:
                     system_msg_len = len(messages[0]['content']) if messages and messages[0]['role'] == 'system' else 0
                     logger.info(f"Cloud inference: System message {system_msg_len} chars, User message: {len(user_message)} chars")
 
-                    result = await self.llm_router.complete(messages, context)
+                    result = await self.llm_router.complete(messages, route_context)
+
+                    if on_token is not None:
+                        # Forward deltas as they arrive; the router already
+                        # failed over if a provider broke before its first token
+                        try:
+                            async for delta in result:
+                                streamed_tokens += 1
+                                await on_token(delta)
+                        finally:
+                            # Release the provider stream if the turn was
+                            # cancelled or the token sink went away
+                            await result.aclose()
+                        timing_breakdown['time_to_first_token'] = result.time_to_first_token
+                        result = result.result
 
                     # Convert router response to V5 format
                     response = {
@@ -1906,22 +2006,39 @@ class SmartAIEngineV5:
                     logger.info(f"✅ Cloud inference complete: {result.provider} ({result.latency:.2f}s)")
 
                 except Exception as e:
+                    if streamed_tokens:
+                        # Part of the answer already reached the client
+                        raise
                     logger.error(f"Cloud inference failed: {e}, falling back to local")
                     # Fallback to local if cloud fails
                     if not self.current_model:
                         raise Exception("No local model loaded and cloud inference failed")
 
-                    response = self.current_model(
-                        final_prompt,
-                        max_tokens=final_max_tokens,
-                        temperature=actual_temperature,
-                        top_p=actual_top_p,
-                        top_k=top_k,
-                        echo=False,
-                        stop=stop_sequences[:8],
-                        stream=False,
-                        repeat_penalty=self.get_config_repeat_penalty()
-                    )
+                    if on_token is not None:
+                        response = await self._stream_local_completion(
+                            final_prompt, on_token,
+                            max_tokens=final_max_tokens,
+                            temperature=actual_temperature,
+                            top_p=actual_top_p,
+                            top_k=top_k,
+                            echo=False,
+                            stop=stop_sequences[:8],
+                            repeat_penalty=self.get_config_repeat_penalty()
+                        )
+                        timing_breakdown['time_to_first_token'] = response.get('time_to_first_token')
+                    else:
+                        response = await self.local_inference.submit(
+                            final_prompt,
+                            model=self.current_model,
+                            priority=InferencePriority.INTERACTIVE,
+                            max_tokens=final_max_tokens,
+                            temperature=actual_temperature,
+                            top_p=actual_top_p,
+                            top_k=top_k,
+                            echo=False,
+                            stop=stop_sequences[:8],
+                            repeat_penalty=self.get_config_repeat_penalty()
+                        )
 
             else:
                 # Local inference via llama-cpp
@@ -1935,21 +2052,36 @@ class SmartAIEngineV5:
                         "error": "Model not loaded"
                     }
 
-                # Optimize sampling parameters for faster generation
-                response = self.current_model(
-                    final_prompt,
-                    max_tokens=final_max_tokens,
-                    temperature=actual_temperature,
-                    top_p=actual_top_p,
-                    top_k=top_k,
-                    echo=False,
-                    stop=stop_sequences[:8],  # Allow more stop sequences for better control
-                    stream=False,
-                    repeat_penalty=self.get_config_repeat_penalty()  # Use config value
-                )
+                if on_token is not None:
+                    response = await self._stream_local_completion(
+                        final_prompt, on_token,
+                        max_tokens=final_max_tokens,
+                        temperature=actual_temperature,
+                        top_p=actual_top_p,
+                        top_k=top_k,
+                        echo=False,
+                        stop=stop_sequences[:8],
+                        repeat_penalty=self.get_config_repeat_penalty()
+                    )
+                    timing_breakdown['time_to_first_token'] = response.get('time_to_first_token')
+                else:
+                    # Optimize sampling parameters for faster generation
+                    response = await self.local_inference.submit(
+                        final_prompt,
+                        model=self.current_model,
+                        priority=InferencePriority.INTERACTIVE,
+                        max_tokens=final_max_tokens,
+                        temperature=actual_temperature,
+                        top_p=actual_top_p,
+                        top_k=top_k,
+                        echo=False,
+                        stop=stop_sequences[:8],  # Allow more stop sequences for better control
+                        repeat_penalty=self.get_config_repeat_penalty()  # Use config value
+                    )
 
             inference_time = time.time() - inference_start
             timing_breakdown['model_inference'] = inference_time
+            record_span("engine.model_inference", timing_breakdown['model_inference'])
             logger.info(f"Model inference completed in {inference_time:.2f}s")
 
             elapsed_ms = (time.time() - start_time) * 1000
@@ -2017,6 +2149,8 @@ class SmartAIEngineV5:
                     "quick_actions": quick_actions,
                     "detected_intent": intent_result.get('intent') if isinstance(intent_result, dict) and 'intent_result' in locals() else None,
                     "intent_confidence": intent_result.get('confidence') if isinstance(intent_result, dict) and 'intent_result' in locals() else None,
+                    "streamed": on_token is not None and 'time_to_first_token' in timing_breakdown,
+                    "time_to_first_token": timing_breakdown.get('time_to_first_token'),
                     "error": None,
                     **system_info  # Add system config info
                 }
@@ -2041,6 +2175,55 @@ class SmartAIEngineV5:
                 "used_prompt": self.use_prompts
             }
     
+    async def _stream_local_completion(
+        self,
+        prompt: str,
+        on_token: Callable[[str], Awaitable[None]],
+        **params
+    ) -> Dict:
+        """
+        Stream a llama-cpp completion to on_token without blocking the event loop
+
+        Args:
+            prompt: Final prompt
+            on_token: Awaited with each generated text delta
+            **params: llama-cpp generation parameters
+
+        Returns:
+            Response dict in llama-cpp completion format
+        """
+        start = time.time()
+        parts = []
+        finish_reason = None
+        time_to_first_token = None
+
+        async for chunk in self.local_inference.stream(
+            prompt,
+            model=self.current_model,
+            priority=InferencePriority.INTERACTIVE,
+            **params
+        ):
+            if isinstance(chunk, str):
+                # Model wrapper without streaming support
+                chunk = {"choices": [{"text": chunk}]}
+
+            choice = chunk.get("choices", [{}])[0]
+            finish_reason = choice.get("finish_reason") or finish_reason
+            token = choice.get("text", "")
+            if token:
+                if time_to_first_token is None:
+                    time_to_first_token = time.time() - start
+                parts.append(token)
+                await on_token(token)
+
+        return {
+            "choices": [{"text": "".join(parts), "finish_reason": finish_reason}],
+            "usage": {"completion_tokens": len(parts)},
+            "time_to_first_token": time_to_first_token
+        }
+
+    @traced("engine.generate")
+    @profile_scoped
     async def generate_async(self,
                  prompt: str,
                  prompt_type: Optional[str] = None,
@@ -2079,6 +2262,7 @@ class SmartAIEngineV5:
                 context_start = time.time()
                 final_prompt = self._add_context_to_prompt(prompt, session_id)
                 timing_breakdown['add_context'] = time.time() - context_start
+                record_span("engine.add_context", timing_breakdown['add_context'])
 
             # Handle prompt templates
             if prompt_type and self.use_prompts:
@@ -2106,6 +2290,7 @@ class SmartAIEngineV5:
                         # Run async intent detection serially
                         intent_result = await self.detect_intent_async(prompt)
                         timing_breakdown['intent_detection'] = time.time() - intent_detect_start
+                        record_span("engine.intent_detection", timing_breakdown['intent_detection'])
                         logger.info(f"Serial async intent detection completed: {intent_result} (took {timing_breakdown['intent_detection']:.2f}s)")
                         # Extract the prompt_type from the intent result
                         if isinstance(intent_result, dict):
@@ -2182,28 +2367,24 @@ class SmartAIEngineV5:
             # Log parameters
             logger.info(f"Generating async with max_tokens={final_max_tokens}, temp={actual_temperature:.2f}")
 
-            # Run model inference in executor to avoid blocking
+            # Run model inference on the local inference workers to avoid blocking
             inference_start = time.time()
-            loop = asyncio.get_event_loop()
-
-            # Run the blocking model call in executor
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.current_model(
-                    final_prompt,
-                    max_tokens=final_max_tokens,
-                    temperature=actual_temperature,
-                    top_p=actual_top_p,
-                    top_k=top_k,
-                    echo=False,
-                    stop=stop_sequences[:8],
-                    stream=False,
-                    repeat_penalty=self.get_config_repeat_penalty()
-                )
+            response = await self.local_inference.submit(
+                final_prompt,
+                model=self.current_model,
+                priority=InferencePriority.INTERACTIVE,
+                max_tokens=final_max_tokens,
+                temperature=actual_temperature,
+                top_p=actual_top_p,
+                top_k=top_k,
+                echo=False,
+                stop=stop_sequences[:8],
+                repeat_penalty=self.get_config_repeat_penalty()
             )
 
             inference_time = time.time() - inference_start
             timing_breakdown['model_inference'] = inference_time
+            record_span("engine.model_inference", timing_breakdown['model_inference'])
             logger.info(f"Async model inference completed in {inference_time:.2f}s")
 
             elapsed_ms = (time.time() - start_time) * 1000
@@ -2365,6 +2546,7 @@ class SmartAIEngineV5:
             logger.exception("[SmartAIEngineV5] Full stack trace:")
             return {}
     
+    @profile_scoped
     async def get_response_async(self, message: str, session_id: Optional[str] = None,
                     user_id: Optional[str] = None, max_tokens: int = 500,
                     include_context: bool = True) -> str:
@@ -2439,6 +2621,7 @@ Please provide a personalized response based on the user's history and preferenc
             logger.error(f"Error in get_response_async: {str(e)}")
             return "I apologize, but I'm having trouble processing your request. Please try again."
 
+    @profile_scoped
     def get_response(self, message: str, session_id: Optional[str] = None,
                     user_id: Optional[str] = None, max_tokens: int = 500,
                     include_context: bool = True) -> str:
@@ -2741,17 +2924,17 @@ Please provide a personalized response based on the user's history and preferenc
                 prompt = self._add_context_to_prompt(prompt, session_id)
             
             # Stream tokens from model
-            if hasattr(self.current_model, 'create_completion'):
-                # For llama.cpp models
-                stream = self.current_model.create_completion(
+            use_cloud = self.use_cloud_inference and self.llm_router
+            if not use_cloud and hasattr(self.current_model, 'create_completion'):
+                # For llama.cpp models (generated on the local inference workers)
+                full_response = ""
+                async for output in self.local_inference.stream(
                     prompt,
+                    model=self.current_model,
+                    priority=InferencePriority.INTERACTIVE,
                     max_tokens=500,
-                    temperature=0.7,
-                    stream=True
-                )
-                
-                full_response = ""
-                for output in stream:
+                    temperature=0.7
+                ):
                     token = output.get('choices', [{}])[0].get('text', '')
                     if token:
                         full_response += token
@@ -2765,11 +2948,40 @@ Please provide a personalized response based on the user's history and preferenc
                         {"role": "assistant", "content": full_response}
                     )
             else:
-                # Fallback for non-streaming models
-                result = await self.process_message(message, context, session_id)
-                for char in result['response']:
-                    yield char
-                    await asyncio.sleep(0.01)  # Simulate streaming
+                # Cloud routing (or model wrapper): stream real deltas via generate()
+                queue: asyncio.Queue = asyncio.Queue()
+                done = object()
+
+                async def run_generation():
+                    try:
+                        return await self.generate(
+                            prompt,
+                            max_tokens=500,
+                            temperature=0.7,
+                            session_id=session_id,
+                            on_token=queue.put
+                        )
+                    finally:
+                        await queue.put(done)
+
+                task = asyncio.create_task(run_generation())
+                streamed = False
+                try:
+                    while True:
+                        token = await queue.get()
+                        if token is done:
+                            break
+                        streamed = True
+                        yield token
+
+                    result = await task
+                finally:
+                    # Consumer went away (e.g. SSE disconnect): stop paying for tokens
+                    if not task.done():
+                        task.cancel()
+                if not streamed and result.get('text'):
+                    # Responses served without model output (e.g. tool shortcuts)
+                    yield result['text']
                     
         except Exception as e:
             logger.error(f"Error in stream_response: {e}")
@@ -2859,6 +3071,9 @@ Please provide a personalized response based on the user's history and preferenc
     def cleanup(self):
         """Cleanup resources on shutdown"""
         try:
+            # Stop local inference workers before the model goes away
+            shutdown_local_inference_executor()
+
             # Clear model from memory if needed
             if hasattr(self, 'current_model'):
                 del self.current_model
@@ -0,0 +1,198 @@
+"""
+Stage Planner for Chat Turns
+Launches independent pipeline stages (retrievals, tool calls) concurrently
+with per-stage timeouts, so one slow dependency degrades to its default
+value instead of stalling the whole turn.
+
+Usage:
+    planner = StagePlanner()
+    planner.start("rag", search_knowledge(message), timeout=1.5)
+    planner.start("intent", detector.detect_async(message), timeout=5.0)
+    intent = await planner.result("intent")
+    rag = await planner.result("rag")        # None if it timed out
+    with planner.measure("generate"):
+        result = await model.generate(...)
+    response["stage_timings"] = planner.timings()
+    planner.cancel_pending()                 # in a finally block
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Awaitable, Dict, Iterator, List, Optional, Set
+
+from services.metrics.tracing import record_span, trace_span
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageOutcome:
+    """How a single stage finished"""
+    name: str
+    status: str  # ok, timeout, error, cancelled
+    duration_ms: float
+    error: Optional[str] = None
+
+
+class StagePlanner:
+    """
+    Runs named stages as tasks and collects their results with deadlines
+
+    Each stage's timeout counts from the moment it was started, not from when
+    its result is awaited, so stages that overlap share wall-clock time.
+    """
+
+    def __init__(self, default_timeout: Optional[float] = None):
+        """
+        Args:
+            default_timeout: Timeout in seconds for stages started without one
+        """
+        self.default_timeout = default_timeout
+        self.outcomes: Dict[str, StageOutcome] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._defaults: Dict[str, Any] = {}
+        self._deadlines: Dict[str, Optional[float]] = {}
+        self._started: Dict[str, float] = {}
+        self._finished: Dict[str, float] = {}
+        self._spanned: Set[str] = set()
+
+    def start(
+        self,
+        name: str,
+        coro: Awaitable[Any],
+        timeout: Optional[float] = None,
+        default: Any = None
+    ) -> None:
+        """
+        Launch a stage in the background
+
+        Args:
+            name: Stage name (used in timings)
+            coro: Awaitable producing the stage result
+            timeout: Seconds the stage may take (None = no limit)
+            default: Value returned by result() if the stage fails or times out
+        """
+        timeout = timeout if timeout is not None else self.default_timeout
+        now = time.perf_counter()
+        self._started[name] = now
+        self._deadlines[name] = now + timeout if timeout else None
+        self._defaults[name] = default
+        task = asyncio.ensure_future(coro)
+        task.add_done_callback(lambda _: self._finished.setdefault(name, time.perf_counter()))
+        self._tasks[name] = task
+
+    async def result(self, name: str) -> Any:
+        """
+        Wait for a stage, honouring its remaining time budget
+
+        Returns:
+            The stage result, or its default on timeout, error or cancellation
+        """
+        task = self._tasks.get(name)
+        if task is None:
+            return self._defaults.get(name)
+        if name in self.outcomes:
+            if self.outcomes[name].status != "ok":
+                return self._defaults[name]
+            return task.result()
+
+        deadline = self._deadlines[name]
+        remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+        if not task.done():
+            try:
+                await asyncio.wait({task}, timeout=remaining)
+            except asyncio.CancelledError:
+                # The turn itself was cancelled (client went away)
+                self.cancel_pending()
+                raise
+
+        if not task.done():
+            self._abandon(task)
+            self._record(name, "timeout")
+            logger.warning(f"⏱️ Stage '{name}' timed out, continuing without it")
+            return self._defaults[name]
+
+        return self._settled_value(name, task)
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """Time inline work on the critical path (e.g. model generation)"""
+        self._started[name] = time.perf_counter()
+        # A live span, so spans opened by the work nest under the stage
+        self._spanned.add(name)
+        with trace_span(f"stage.{name}"):
+            try:
+                yield
+            except Exception as e:
+                self._record(name, "error", e)
+                raise
+            self._record(name, "ok")
+
+    def cancel(self, name: str) -> None:
+        """Cancel a stage whose result is no longer needed"""
+        task = self._tasks.get(name)
+        if task and not task.done() and name not in self.outcomes:
+            self._abandon(task)
+            self._record(name, "cancelled")
+
+    def cancel_pending(self) -> None:
+        """
+        Cancel every stage that has not finished yet
+
+        Safe to call from a finally block: stages that already finished but
+        were never collected have their exception retrieved, so nothing is
+        left running or logged as unhandled.
+        """
+        for name, task in list(self._tasks.items()):
+            if name in self.outcomes:
+                continue
+            if task.done():
+                task.cancelled() or task.exception()
+            else:
+                self.cancel(name)
+
+    def timings(self) -> Dict[str, float]:
+        """Per-stage wall-clock durations in milliseconds"""
+        return {name: outcome.duration_ms for name, outcome in self.outcomes.items()}
+
+    def degraded(self) -> List[str]:
+        """Stages that did not produce a real result"""
+        return [name for name, outcome in self.outcomes.items() if outcome.status != "ok"]
+
+    def _settled_value(self, name: str, task: asyncio.Task) -> Any:
+        if task.cancelled():
+            self._record(name, "cancelled")
+            return self._defaults[name]
+
+        error = task.exception()
+        if error is not None:
+            self._record(name, "error", error)
+            logger.warning(f"Stage '{name}' failed: {error}")
+            return self._defaults[name]
+
+        self._record(name, "ok")
+        return task.result()
+
+    def _record(self, name: str, status: str, error: Optional[BaseException] = None) -> None:
+        if name in self.outcomes:
+            return
+        # Stages that finished before being collected report their own runtime
+        ended = self._finished.get(name, time.perf_counter()) if status in ("ok", "error") else time.perf_counter()
+        duration = ended - self._started[name]
+        self.outcomes[name] = StageOutcome(
+            name=name,
+            status=status,
+            duration_ms=round(duration * 1000, 1),
+            error=str(error) if error else None
+        )
+        if name not in self._spanned:
+            record_span(f"stage.{name}", duration, end=ended, status=status)
+
+    @staticmethod
+    def _abandon(task: asyncio.Task) -> None:
+        task.cancel()
+        # Retrieve the eventual exception so asyncio does not log it as unhandled
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
@@ -16,6 +16,7 @@ import inspect
 # Import interfaces
 sys.path.append(str(Path(__file__).parent.parent))
 from core.interfaces import IToolManager, IDatabaseSearchTool, IDatabaseConnectionManager
+from services.metrics.tracing import traced, current_span
 
 logger = logging.getLogger(__name__)
 
@@ -179,6 +180,7 @@ class ToolManager(IToolManager):
             logger.error(f"Failed to register tool '{tool_name}': {e}")
             return False
     
+    @traced("tool.execute")
     async def execute_tool(self, tool_name: str, **kwargs) -> Dict[str, Any]:
         """
         Execute a tool with given parameters
@@ -190,7 +192,10 @@ class ToolManager(IToolManager):
         Returns:
             Tool execution result
         """
+        span = current_span()
+        span.set_attribute("tool", tool_name)
         if tool_name not in self.tools:
+            span.set_status("error", "not_found")
             return {
                 "success": False,
                 "error": f"Tool '{tool_name}' not found",
@@ -242,6 +247,7 @@ class ToolManager(IToolManager):
 
         except Exception as e:
             logger.error(f"Tool execution failed for '{tool_name}': {e}")
+            span.set_status("error", type(e).__name__)
             return {
                 "success": False,
                 "tool": tool_name,
@@ -4,7 +4,9 @@ Provides knowledge base search for AI agents
 Portable version using SQLite + FAISS
 """
 
+import json
 import logging
+from pathlib import Path
 from typing import Dict, Any, List, Optional
 from services.rag.portable_rag_service import get_portable_rag_service
 
@@ -21,18 +23,40 @@ class RAGTool:
         self.rag_service = None
         self.initialized = False
     
-    async def initialize(self, data_dir: str = "data/rag"):
+    async def initialize(self, data_dir: str = "data/rag", agents_dir: str = "prompts/agents"):
         """
         Initialize portable RAG service
         
         Args:
             data_dir: Directory for SQLite and FAISS data
+            agents_dir: Agent configs (tool_settings.knowledge_search.lexical_weight)
         """
         if not self.initialized:
             self.rag_service = await get_portable_rag_service(data_dir=data_dir)
+            self._load_agent_search_settings(Path(agents_dir))
             self.initialized = True
             logger.info("✅ Portable RAG Tool initialized")
     
+    def _load_agent_search_settings(self, agents_dir: Path):
+        """Apply per-agent lexical/vector fusion weights from agent configs"""
+        if not agents_dir.exists():
+            return
+        
+        for config_file in agents_dir.glob("*/config.json"):
+            try:
+                with open(config_file) as f:
+                    config = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read {config_file}: {e}")
+                continue
+            
+            settings = config.get("tool_settings", {}).get("knowledge_search", {})
+            if "lexical_weight" in settings:
+                self.rag_service.set_lexical_weight(config_file.parent.name, settings["lexical_weight"])
+                logger.info(
+                    f"  {config_file.parent.name}: lexical weight {settings['lexical_weight']}"
+                )
+    
     async def search_knowledge(
         self,
         query: str,
@@ -69,10 +93,12 @@ class RAGTool:
                 top_k=top_k
             )
             
-            # Filter by minimum similarity
+            # Filter by minimum similarity (exact lexical matches such as SKUs
+            # and product names are kept even if the embedding scores them low)
             filtered_results = [
                 r for r in results 
-                if r.get("similarity_score", r.get("similarity", 0)) >= min_similarity
+                if r.get("lexical_match")
+                or r.get("similarity_score", r.get("similarity", 0)) >= min_similarity
             ]
             
             # Build response
@@ -7,6 +7,8 @@ import asyncio
 import json
 import hashlib
 import logging
+import os
+import re
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
 from uuid import UUID
@@ -16,6 +18,38 @@ from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
+# Packed LLM translation: misses are sent as JSON arrays, each request holding
+# at most this many (estimated) source tokens and strings
+TRANSLATION_BATCH_MAX_TOKENS = int(os.getenv("TRANSLATION_BATCH_MAX_TOKENS", "1200"))
+TRANSLATION_BATCH_MAX_ITEMS = int(os.getenv("TRANSLATION_BATCH_MAX_ITEMS", "40"))
+TRANSLATION_BATCH_CONCURRENCY = int(os.getenv("TRANSLATION_BATCH_CONCURRENCY", "4"))
+
+# Language code to full name mapping
+LANGUAGE_NAMES = {
+    'en': 'English', 'es': 'Spanish', 'fr': 'French', 'de': 'German',
+    'zh': 'Chinese', 'ja': 'Japanese', 'ko': 'Korean', 'ar': 'Arabic',
+    'pt': 'Portuguese', 'ru': 'Russian', 'it': 'Italian', 'nl': 'Dutch',
+    'pl': 'Polish', 'tr': 'Turkish', 'vi': 'Vietnamese', 'th': 'Thai',
+    'hi': 'Hindi', 'bn': 'Bengali', 'ta': 'Tamil', 'te': 'Telugu',
+    'mr': 'Marathi', 'ur': 'Urdu', 'fa': 'Persian', 'he': 'Hebrew',
+    'id': 'Indonesian', 'ms': 'Malay', 'tl': 'Tagalog', 'sv': 'Swedish',
+    'no': 'Norwegian', 'da': 'Danish', 'fi': 'Finnish', 'cs': 'Czech',
+    'sk': 'Slovak', 'hu': 'Hungarian', 'ro': 'Romanian', 'el': 'Greek',
+    'uk': 'Ukrainian', 'bg': 'Bulgarian', 'sr': 'Serbian', 'hr': 'Croatian'
+}
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count; non-Latin scripts run closer to one token per char"""
+    return max(1, len(text) // 3)
+
+
+def _translation_key(source_text: str, namespace: Optional[str]) -> str:
+    """Database key for a source string"""
+    return f"{namespace or 'common'}.{source_text}".replace(" ", "_").lower()
+
 
 class TranslationCache:
     """In-memory LRU cache for hot translations"""
@@ -53,6 +87,7 @@ class TranslationService:
         self.redis = redis_client
         self.memory_cache = TranslationCache(max_size=1000)
         self.cache_ttl = 3600  # 1 hour Redis cache TTL
+        self._router = None
         
     def _generate_cache_key(self, source_text: str, target_language: str, 
                            context: Optional[str] = None, namespace: Optional[str] = None) -> str:
@@ -184,71 +219,138 @@ class TranslationService:
     ) -> Dict[str, Any]:
         """
         Translate multiple texts efficiently
-        
+
+        Cache tiers are checked for all texts at once (one Redis MGET, one
+        database query); the remaining texts are translated in a few packed
+        LLM requests and written back with a single insert.
+
         Args:
             texts: List of dicts with 'text', 'context', 'namespace' keys
             target_language: Target language code
             source_language: Source language code
-        
+
         Returns:
             Dict with translations and statistics
         """
-        results = []
+        items = [
+            {
+                "text": item.get('text', ''),
+                "context": item.get('context'),
+                "namespace": item.get('namespace')
+            }
+            for item in texts
+        ]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
         stats = {
-            "total": len(texts),
+            "total": len(items),
             "from_cache": 0,
             "from_ai": 0,
-            "errors": 0
+            "errors": 0,
+            "llm_requests": 0
         }
-        
-        # Process in batches for efficiency
-        batch_size = 10
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            
-            # Create translation tasks
-            tasks = []
-            for item in batch:
-                task = self.translate_single(
-                    text=item.get('text', ''),
-                    target_language=target_language,
-                    source_language=source_language,
-                    context=item.get('context'),
-                    namespace=item.get('namespace'),
-                    use_cache=True
-                )
-                tasks.append(task)
-            
-            # Execute batch concurrently
-            batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            for item, result in zip(batch, batch_results):
-                if isinstance(result, Exception):
-                    stats["errors"] += 1
-                    results.append({
-                        "original": item.get('text', ''),
-                        "translated": None,
-                        "error": str(result)
-                    })
-                else:
-                    if result.get('cache_hit'):
-                        stats["from_cache"] += 1
-                    else:
-                        stats["from_ai"] += 1
-                    
-                    results.append({
-                        "original": item.get('text', ''),
-                        "translated": result.get('translated_text'),
-                        "source": result.get('source'),
-                        "cache_hit": result.get('cache_hit', False)
-                    })
-        
+
+        # Indexes still unresolved, grouped by cache key (duplicates share one lookup)
+        pending: Dict[str, List[int]] = {}
+        for index, item in enumerate(items):
+            if not item["text"] or not target_language:
+                results[index] = {"original": item["text"], "translated": item["text"], "error": "Invalid input"}
+                stats["errors"] += 1
+            elif source_language == target_language:
+                results[index] = {"original": item["text"], "translated": item["text"], "source": "same_language", "cache_hit": True}
+                stats["from_cache"] += 1
+            else:
+                key = self._generate_cache_key(item["text"], target_language, item["context"], item["namespace"])
+                pending.setdefault(key, []).append(index)
+
+        def resolve(key: str, translated: str, source: str, cache_hit: bool = True):
+            for index in pending.pop(key):
+                results[index] = {
+                    "original": items[index]["text"],
+                    "translated": translated,
+                    "source": source,
+                    "cache_hit": cache_hit
+                }
+                stats["from_cache" if cache_hit else "from_ai"] += 1
+
+        # 1. Memory cache
+        for key in list(pending):
+            cached = self.memory_cache.get(key)
+            if cached:
+                resolve(key, cached, "memory")
+
+        # 2. Redis, one round trip
+        if pending and self.redis:
+            keys = list(pending)
+            try:
+                values = await self.redis.mget(keys)
+                for key, cached in zip(keys, values):
+                    if cached:
+                        translated_text = cached.decode('utf-8') if isinstance(cached, bytes) else cached
+                        self.memory_cache.set(key, translated_text)
+                        resolve(key, translated_text, "redis")
+            except Exception as e:
+                logger.warning(f"Redis cache error: {e}")
+
+        # 3. Database, one query
+        warm: Dict[str, str] = {}
+        if pending:
+            by_db_key = {
+                _translation_key(items[indexes[0]]["text"], items[indexes[0]]["namespace"]): key
+                for key, indexes in pending.items()
+            }
+            rows = await self._get_many_from_database(list(by_db_key), target_language)
+            for db_key, row in rows.items():
+                key = by_db_key[db_key]
+                translated_text = row['translation_value']
+                self.memory_cache.set(key, translated_text)
+                warm[key] = translated_text
+                resolve(key, translated_text, "database")
+
+        if stats["from_cache"]:
+            hit_keys = [
+                _translation_key(r["original"], item["namespace"])
+                for item, r in zip(items, results)
+                if r and r.get("source") in ("memory", "redis")
+            ]
+            await self._update_usage_stats_many(hit_keys, target_language)
+
+        # 4. Packed AI translation of everything left
+        if pending:
+            misses = [(key, items[indexes[0]]) for key, indexes in pending.items()]
+            translations, requests = await self._ai_translate_packed(
+                [item for _, item in misses], source_language, target_language
+            )
+            stats["llm_requests"] = requests
+
+            rows = []
+            for (key, item), translated_text in zip(misses, translations):
+                if translated_text is None:
+                    for index in pending.pop(key):
+                        results[index] = {"original": item["text"], "translated": item["text"], "error": "Translation failed"}
+                        stats["errors"] += 1
+                    continue
+                rows.append((item, translated_text))
+                self.memory_cache.set(key, translated_text)
+                warm[key] = translated_text
+                resolve(key, translated_text, "ai_model", cache_hit=False)
+
+            await self._save_many_to_database(rows, target_language)
+
+        if warm and self.redis:
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for key, translated_text in warm.items():
+                        pipe.setex(key, self.cache_ttl, translated_text)
+                    await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Redis cache set error: {e}")
+
         return {
             "translations": results,
             "statistics": stats,
             "target_language": target_language
         }
-    
+
     async def _get_from_database(
         self,
         source_text: str,
@@ -259,8 +361,7 @@ class TranslationService:
     ) -> Optional[Dict[str, Any]]:
         """Get translation from database"""
         try:
-            # Generate translation_key from source_text and namespace
-            translation_key = f"{namespace or 'common'}.{source_text}".replace(" ", "_").lower()
+            translation_key = _translation_key(source_text, namespace)
             
             query = """
                 SELECT 
@@ -298,8 +399,7 @@ class TranslationService:
     ):
         """Save translation to database"""
         try:
-            # Generate translation_key from source_text and namespace
-            translation_key = f"{namespace or 'common'}.{source_text}".replace(" ", "_").lower()
+            translation_key = _translation_key(source_text, namespace)
             
             query = """
                 INSERT INTO translations (
@@ -321,6 +421,80 @@ class TranslationService:
         except Exception as e:
             logger.error(f"Database save error: {e}")
     
+    async def _get_many_from_database(
+        self,
+        translation_keys: List[str],
+        target_language: str
+    ) -> Dict[str, Dict[str, Any]]:
+        """Get translations for many keys in one query, keyed by translation_key"""
+        if not translation_keys:
+            return {}
+        try:
+            query = """
+                SELECT translation_key, translation_value, is_approved
+                FROM translations
+                WHERE translation_key = ANY($1::text[])
+                AND language_code = $2
+            """
+            rows = await self.db.fetch(query, translation_keys, target_language)
+            return {row['translation_key']: dict(row) for row in rows}
+
+        except Exception as e:
+            logger.error(f"Database bulk fetch error: {e}")
+            return {}
+
+    async def _save_many_to_database(
+        self,
+        rows: List[Tuple[Dict[str, Any], str]],
+        target_language: str
+    ):
+        """Save (item, translated_text) pairs with a single insert"""
+        # One row per key; ON CONFLICT cannot touch the same row twice
+        by_key = {
+            _translation_key(item["text"], item["namespace"]): (translated_text, item["context"])
+            for item, translated_text in rows
+        }
+        if not by_key:
+            return
+        try:
+            query = """
+                INSERT INTO translations (
+                    translation_key, language_code, translation_value,
+                    context, is_approved
+                )
+                SELECT key, $2, value, context, FALSE
+                FROM unnest($1::text[], $3::text[], $4::text[]) AS t(key, value, context)
+                ON CONFLICT (translation_key, language_code)
+                DO UPDATE SET
+                    translation_value = EXCLUDED.translation_value,
+                    updated_at = CURRENT_TIMESTAMP
+            """
+            await self.db.execute(
+                query,
+                list(by_key), target_language,
+                [value for value, _ in by_key.values()],
+                [context for _, context in by_key.values()]
+            )
+
+        except Exception as e:
+            logger.error(f"Database bulk save error: {e}")
+
+    async def _update_usage_stats_many(self, translation_keys: List[str], target_language: str):
+        """Update usage statistics for many translations in one statement"""
+        if not translation_keys:
+            return
+        try:
+            query = """
+                UPDATE translations
+                SET updated_at = CURRENT_TIMESTAMP
+                WHERE translation_key = ANY($1::text[])
+                AND language_code = $2
+            """
+            await self.db.execute(query, list(set(translation_keys)), target_language)
+
+        except Exception as e:
+            logger.warning(f"Failed to update usage stats: {e}")
+
     async def _update_usage_stats(
         self,
         source_text: str,
@@ -330,8 +504,7 @@ class TranslationService:
     ):
         """Update usage statistics for a translation"""
         try:
-            # Generate translation_key from source_text and namespace
-            translation_key = f"{namespace or 'common'}.{source_text}".replace(" ", "_").lower()
+            translation_key = _translation_key(source_text, namespace)
             
             query = """
                 UPDATE translations
@@ -345,6 +518,38 @@ class TranslationService:
         except Exception as e:
             logger.warning(f"Failed to update usage stats: {e}")
     
+    def _get_router(self):
+        """LLM router shared by this service's translation requests"""
+        if self._router is None:
+            # Import here to avoid circular dependency
+            from services.llm_gateway import LLMRouter, GroqProvider, OpenRouterProvider, LLM7GPT4Mini
+
+            router = LLMRouter()
+            router.register_provider(GroqProvider())
+            router.register_provider(OpenRouterProvider())
+            router.register_provider(LLM7GPT4Mini())
+            self._router = router
+        return self._router
+
+    async def _complete(self, system_prompt: str, user_prompt: str, estimated_tokens: int, max_tokens: int = 2000) -> str:
+        """Run one translation request through the LLM router"""
+        from services.llm_gateway.types import RequestContext, TaskType
+
+        request_context = RequestContext(
+            task_type=TaskType.SIMPLE,
+            estimated_tokens=estimated_tokens,
+            temperature=0.2,
+            max_tokens=max_tokens
+        )
+        response = await self._get_router().complete(
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            context=request_context
+        )
+        return response.content.strip() if response and response.content else ""
+
     async def _ai_translate(
         self,
         text: str,
@@ -355,30 +560,24 @@ class TranslationService:
         """
         Perform AI translation using the LLM Router
         """
+        translated = await self._ai_translate_or_none(text, source_language, target_language, context)
+        if translated is None:
+            # Return original text as fallback
+            return text
+        return translated
+
+    async def _ai_translate_or_none(
+        self,
+        text: str,
+        source_language: str,
+        target_language: str,
+        context: Optional[str] = None
+    ) -> Optional[str]:
+        """Single-string AI translation; None when the model gives nothing usable"""
         try:
-            # Import here to avoid circular dependency
-            from services.llm_gateway.router import LLMRouter
-            
-            # Get or create LLM Router instance
-            router = LLMRouter()
-            
-            # Language code to full name mapping
-            lang_names = {
-                'en': 'English', 'es': 'Spanish', 'fr': 'French', 'de': 'German',
-                'zh': 'Chinese', 'ja': 'Japanese', 'ko': 'Korean', 'ar': 'Arabic',
-                'pt': 'Portuguese', 'ru': 'Russian', 'it': 'Italian', 'nl': 'Dutch',
-                'pl': 'Polish', 'tr': 'Turkish', 'vi': 'Vietnamese', 'th': 'Thai',
-                'hi': 'Hindi', 'bn': 'Bengali', 'ta': 'Tamil', 'te': 'Telugu',
-                'mr': 'Marathi', 'ur': 'Urdu', 'fa': 'Persian', 'he': 'Hebrew',
-                'id': 'Indonesian', 'ms': 'Malay', 'tl': 'Tagalog', 'sv': 'Swedish',
-                'no': 'Norwegian', 'da': 'Danish', 'fi': 'Finnish', 'cs': 'Czech',
-                'sk': 'Slovak', 'hu': 'Hungarian', 'ro': 'Romanian', 'el': 'Greek',
-                'uk': 'Ukrainian', 'bg': 'Bulgarian', 'sr': 'Serbian', 'hr': 'Croatian'
-            }
-            
-            source_lang_name = lang_names.get(source_language, source_language)
-            target_lang_name = lang_names.get(target_language, target_language)
-            
+            source_lang_name = LANGUAGE_NAMES.get(source_language, source_language)
+            target_lang_name = LANGUAGE_NAMES.get(target_language, target_language)
+
             # Prepare translation prompt
             system_prompt = f"""You are a professional translator. Translate text from {source_lang_name} to {target_lang_name}.
 Rules:
@@ -392,42 +591,114 @@ Rules:
 Translate to {target_lang_name}:
 
 {text}"""
-            
-            # Create request context for LLM Router
-            from services.llm_gateway.types import RequestContext, TaskType
-            
-            request_context = RequestContext(
-                task_type=TaskType.TRANSLATION,
-                estimated_tokens=len(text.split()) * 2,  # Rough estimate
-                user_id="translation_service"
-            )
-            
-            # Get translation from LLM Router
-            response = await router.complete(
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                context=request_context
-            )
-            
-            if response and response.content:
-                translated = response.content.strip()
-                
-                # Validate translation is not empty and different from original
-                if translated and len(translated) > 0:
-                    logger.info(f"✅ Translated {len(text)} chars from {source_language} to {target_language}")
-                    return translated
-            
-            # Fallback if AI fails
-            logger.error("AI translation failed or returned empty, returning original text")
-            return text
-            
+
+            translated = await self._complete(system_prompt, user_prompt, _estimate_tokens(text) * 2)
+
+            # Validate translation is not empty
+            if translated:
+                logger.info(f"✅ Translated {len(text)} chars from {source_language} to {target_language}")
+                return translated
+
+            logger.error("AI translation failed or returned empty")
+            return None
+
         except Exception as e:
             logger.error(f"AI translation error: {e}")
-            # Return original text as fallback
-            return text
-    
+            return None
+
+    def _pack_batches(self, items: List[Dict[str, Any]]) -> List[List[int]]:
+        """Group item indexes into requests within the token and item budgets"""
+        batches: List[List[int]] = []
+        current: List[int] = []
+        tokens = 0
+        for index, item in enumerate(items):
+            cost = _estimate_tokens(item["text"]) + _estimate_tokens(item["context"] or "") + 4
+            if current and (tokens + cost > TRANSLATION_BATCH_MAX_TOKENS or len(current) >= TRANSLATION_BATCH_MAX_ITEMS):
+                batches.append(current)
+                current, tokens = [], 0
+            current.append(index)
+            tokens += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _ai_translate_packed(
+        self,
+        items: List[Dict[str, Any]],
+        source_language: str,
+        target_language: str
+    ) -> Tuple[List[Optional[str]], int]:
+        """
+        Translate many strings with as few LLM requests as possible
+
+        Strings are sent as a JSON array and must come back as a JSON array of
+        the same length. A batch whose reply does not parse is split in half
+        and retried; single strings fall back to the plain prompt.
+
+        Returns:
+            (translation or None per item, LLM requests made)
+        """
+        translations: List[Optional[str]] = [None] * len(items)
+        requests = 0
+        semaphore = asyncio.Semaphore(TRANSLATION_BATCH_CONCURRENCY)
+
+        source_lang_name = LANGUAGE_NAMES.get(source_language, source_language)
+        target_lang_name = LANGUAGE_NAMES.get(target_language, target_language)
+        system_prompt = f"""You are a professional translator. Translate UI strings from {source_lang_name} to {target_lang_name}.
+Input is a JSON array of objects with "text" and an optional "context".
+Rules:
+- Reply with ONLY a JSON array of translated strings, same length and order as the input
+- Keep brand names (like "WeedGo", "Carlos") untranslated
+- Preserve emojis, placeholders and formatting (newlines, punctuation)
+- Maintain the same tone and style
+- Use the context, when given, for better translation accuracy"""
+
+        async def translate(indexes: List[int]):
+            nonlocal requests
+            if len(indexes) == 1:
+                item = items[indexes[0]]
+                async with semaphore:
+                    requests += 1
+                    translations[indexes[0]] = await self._ai_translate_or_none(
+                        item["text"], source_language, target_language, item["context"]
+                    )
+                return
+
+            payload = [
+                {"text": items[i]["text"], **({"context": items[i]["context"]} if items[i]["context"] else {})}
+                for i in indexes
+            ]
+            source_tokens = sum(_estimate_tokens(items[i]["text"]) for i in indexes)
+            try:
+                async with semaphore:
+                    requests += 1
+                    reply = await self._complete(
+                        system_prompt,
+                        json.dumps(payload, ensure_ascii=False),
+                        source_tokens * 3,
+                        max_tokens=min(4000, source_tokens * 4 + len(indexes) * 8 + 100)
+                    )
+                parsed = json.loads(_CODE_FENCE.sub("", reply))
+                if (not isinstance(parsed, list) or len(parsed) != len(indexes)
+                        or not all(isinstance(t, str) and t.strip() for t in parsed)):
+                    raise ValueError(f"expected {len(indexes)} strings")
+            except Exception as e:
+                logger.warning(f"Packed translation of {len(indexes)} strings failed ({e}), splitting batch")
+                middle = len(indexes) // 2
+                await asyncio.gather(translate(indexes[:middle]), translate(indexes[middle:]))
+                return
+
+            for i, translated in zip(indexes, parsed):
+                translations[i] = translated.strip()
+
+        batches = self._pack_batches(items)
+        await asyncio.gather(*(translate(batch) for batch in batches))
+        logger.info(
+            f"✅ Translated {len(items)} strings from {source_language} to {target_language} "
+            f"in {requests} LLM requests"
+        )
+        return translations, requests
+
     async def get_supported_languages(self) -> List[Dict[str, Any]]:
         """Get list of supported languages"""
         query = """
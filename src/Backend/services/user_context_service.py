@@ -10,6 +10,8 @@ import asyncpg
 import logging
 import json
 
+from services.context.database_store import append_conversation_messages
+
 logger = logging.getLogger(__name__)
 
 
@@ -66,16 +68,25 @@ class UserContextService:
             # First try ai_conversations table
             query = """
                 SELECT 
-                    conversation_id,
-                    session_id,
-                    messages,
-                    context,
-                    created_at,
-                    updated_at
-                FROM ai_conversations
-                WHERE customer_id = $1
-                AND created_at >= $2
-                ORDER BY created_at DESC
+                    c.conversation_id,
+                    c.session_id,
+                    COALESCE((
+                        SELECT jsonb_agg(recent.message ORDER BY recent.seq)
+                        FROM (
+                            SELECT m.message, m.seq
+                            FROM conversation_messages m
+                            WHERE m.conversation_id = c.conversation_id
+                            ORDER BY m.seq DESC
+                            LIMIT 50
+                        ) recent
+                    ), '[]'::jsonb) AS messages,
+                    c.context,
+                    c.created_at,
+                    c.updated_at
+                FROM ai_conversations c
+                WHERE c.customer_id = $1
+                AND c.created_at >= $2
+                ORDER BY c.created_at DESC
                 LIMIT $3
             """
             
@@ -189,15 +200,24 @@ class UserContextService:
         try:
             query = """
                 SELECT 
-                    session_id,
-                    customer_id,
-                    messages,
-                    context,
-                    created_at,
-                    updated_at
-                FROM ai_conversations
-                WHERE session_id = $1
-                ORDER BY updated_at DESC
+                    c.session_id,
+                    c.customer_id,
+                    COALESCE((
+                        SELECT jsonb_agg(recent.message ORDER BY recent.seq)
+                        FROM (
+                            SELECT m.message, m.seq
+                            FROM conversation_messages m
+                            WHERE m.conversation_id = c.conversation_id
+                            ORDER BY m.seq DESC
+                            LIMIT 50
+                        ) recent
+                    ), '[]'::jsonb) AS messages,
+                    c.context,
+                    c.created_at,
+                    c.updated_at
+                FROM ai_conversations c
+                WHERE c.session_id = $1
+                ORDER BY c.updated_at DESC
                 LIMIT 1
             """
             
@@ -354,43 +374,23 @@ class UserContextService:
                 intent, response_time, json.dumps(metadata) if metadata else None
             )
 
-            # Prepare message and context JSON
-            message_json = json.dumps([{
-                'role': 'user',
-                'content': user_message,
-                'timestamp': datetime.now().isoformat()
-            }, {
-                'role': 'assistant',
-                'content': ai_response,
-                'timestamp': datetime.now().isoformat()
-            }])
-
-            context_json = json.dumps(metadata) if metadata else '{}'
-
-            # First check if conversation exists
-            check_query = """
-                SELECT conversation_id FROM ai_conversations
-                WHERE session_id = $1
-            """
-            existing = await self.db.fetchrow(check_query, session_id)
-
-            if existing:
-                # Update existing conversation
-                conv_query = """
-                    UPDATE ai_conversations
-                    SET messages = messages || $1,
-                        context = $2,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE session_id = $3
-                """
-                await self.db.execute(conv_query, message_json, context_json, session_id)
-            else:
-                # Create new conversation
-                conv_query = """
-                    INSERT INTO ai_conversations (conversation_id, session_id, customer_id, messages, context, created_at, updated_at)
-                    VALUES (gen_random_uuid(), $1, $2, $3, $4, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                """
-                await self.db.execute(conv_query, session_id, user_id, message_json, context_json)
+            # Append the exchange and patch context in one statement
+            timestamp = datetime.now().isoformat()
+            await append_conversation_messages(
+                self.db,
+                session_id,
+                [{
+                    'role': 'user',
+                    'content': user_message,
+                    'timestamp': timestamp
+                }, {
+                    'role': 'assistant',
+                    'content': ai_response,
+                    'timestamp': timestamp
+                }],
+                context_patch=metadata,
+                customer_id=user_id
+            )
             
             return True
             
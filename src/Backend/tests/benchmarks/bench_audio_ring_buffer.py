@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Audio Ring Buffer Microbenchmark
+Per-chunk CPU cost of keeping a sliding window of streaming 16kHz audio and
+reading it back every chunk, the way the wake word, pipeline and streaming
+STT paths do:
+
+- list + pop(0) + concatenate: the old WakeWordHandler buffer, trimmed by
+  whole chunks, joined on every read
+- list + concatenate: the old streaming STT / pipeline accumulation, joined
+  on every step until the window is full, then cut back to an overlap
+- AudioRingBuffer: append plus a zero-copy view of the window
+
+Usage:
+    python tests/benchmarks/bench_audio_ring_buffer.py
+    python tests/benchmarks/bench_audio_ring_buffer.py --chunk-ms 10 --windows 1000 5000 --json results.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from core.voice.audio_ring_buffer import AudioRingBuffer  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def list_pop_concat(window: int) -> Callable[[np.ndarray], np.ndarray]:
+    chunks: List[np.ndarray] = []
+    held = [0]
+
+    def step(chunk: np.ndarray) -> np.ndarray:
+        chunks.append(chunk)
+        held[0] += len(chunk)
+        while held[0] > window and chunks:
+            held[0] -= len(chunks.pop(0))
+        return np.concatenate(chunks)
+    return step
+
+
+def list_concat_overlap(window: int, overlap: int) -> Callable[[np.ndarray], np.ndarray]:
+    chunks: List[np.ndarray] = []
+
+    def step(chunk: np.ndarray) -> np.ndarray:
+        nonlocal chunks
+        chunks.append(chunk)
+        audio = np.concatenate(chunks)
+        if len(audio) >= window:
+            chunks = [audio[-overlap:]]
+        return audio
+    return step
+
+
+def ring(window: int) -> Callable[[np.ndarray], np.ndarray]:
+    buffer = AudioRingBuffer(window)
+
+    def step(chunk: np.ndarray) -> np.ndarray:
+        buffer.append(chunk)
+        return buffer.latest()
+    return step
+
+
+def measure(name: str, step: Callable[[np.ndarray], np.ndarray], chunks: List[np.ndarray]) -> Dict[str, Any]:
+    timings = []
+    for chunk in chunks:
+        start = time.perf_counter_ns()
+        step(chunk)
+        timings.append(time.perf_counter_ns() - start)
+    timings.sort()
+    audio_seconds = sum(len(c) for c in chunks) / SAMPLE_RATE
+    total_s = sum(timings) / 1e9
+    return {
+        "mode": name,
+        "chunks": len(chunks),
+        "us_per_chunk": {
+            "p50": round(timings[len(timings) // 2] / 1000, 2),
+            "p99": round(timings[int(len(timings) * 0.99)] / 1000, 2),
+            "mean": round(statistics.mean(timings) / 1000, 2)
+        },
+        "cpu_percent_of_realtime": round(total_s / audio_seconds * 100, 4)
+    }
+
+
+def main(args) -> None:
+    chunk_samples = int(SAMPLE_RATE * args.chunk_ms / 1000)
+    rng = np.random.default_rng(0)
+    chunks = [
+        rng.standard_normal(chunk_samples).astype(np.float32) * 0.1
+        for _ in range(int(args.seconds * 1000 / args.chunk_ms))
+    ]
+
+    results = []
+    for window_ms in args.windows:
+        window = int(SAMPLE_RATE * window_ms / 1000)
+        overlap = int(SAMPLE_RATE * args.overlap_ms / 1000)
+        for name, step in [
+            ("list + pop(0) + concatenate", list_pop_concat(window)),
+            ("list + concatenate", list_concat_overlap(window, overlap)),
+            ("AudioRingBuffer", ring(window))
+        ]:
+            result = measure(name, step, chunks)
+            result["window_ms"] = window_ms
+            results.append(result)
+
+    print(f"{args.seconds}s of 16kHz audio in {args.chunk_ms}ms chunks")
+    for window_ms in args.windows:
+        print(f"\n== window {window_ms}ms ==")
+        for result in (r for r in results if r["window_ms"] == window_ms):
+            us = result["us_per_chunk"]
+            print(f"  {result['mode']:28s} p50={us['p50']:8.2f}us  p99={us['p99']:8.2f}us  "
+                  f"mean={us['mean']:8.2f}us  ({result['cpu_percent_of_realtime']}% of real time)")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark streaming audio buffers")
+    parser.add_argument("--chunk-ms", type=float, default=20.0, help="Chunk duration")
+    parser.add_argument("--seconds", type=float, default=120.0, help="Audio streamed per mode")
+    parser.add_argument("--windows", type=int, nargs="+", default=[1000, 5000, 10000],
+                        help="Window sizes (ms) to keep")
+    parser.add_argument("--overlap-ms", type=float, default=200.0,
+                        help="Overlap kept by the list + concatenate mode")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    main(parser.parse_args())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Chat Pipeline Benchmark
+Replays recorded conversations (tests/benchmarks/fixtures/chat_conversations.json)
+through AgentPoolManager.process_message and SmartAIEngineV5.generate with
+the LLM provider, intent model, tools, RAG, Postgres context store and Redis
+response cache replaced by deterministic in-process fakes (see chat_pipeline/).
+
+Reports:
+- p50/p95/p99 per stage (intent, rag, product_search, query_database,
+  generate, persist, ttft, turn) at each concurrency level
+- turns/s at N concurrent sessions
+- peak and retained memory (tracemalloc) per turn in a sequential pass
+
+Results written with --json carry the git commit and every latency setting;
+pass an earlier file to --compare to print per-stage p95 and throughput deltas.
+
+Usage:
+    python tests/benchmarks/bench_chat_pipeline.py
+    python tests/benchmarks/bench_chat_pipeline.py --sessions 1,10,50 --ttft-ms 300 --tokens-per-sec 150 --json head.json
+    python tests/benchmarks/bench_chat_pipeline.py --rag-ms 40 --db-ms 3 --stream --compare head.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from chat_pipeline import FakeProvider, PipelineHarness, load_conversations  # noqa: E402
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_stages(title: str, stages: Dict[str, Dict[str, float]]) -> None:
+    print(f"\n{title}")
+    print(f"  {'stage':<16} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for stage, s in stages.items():
+        print(f"  {stage:<16} {s['count']:>6} {s['p50']:>9.2f} {s['p95']:>9.2f} {s['p99']:>9.2f}")
+
+
+def print_comparison(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    print(f"\nCompared with {baseline['meta']['commit']} ({baseline['meta']['timestamp']})")
+    if baseline["meta"]["config"] != current["meta"]["config"]:
+        print("  ⚠️  Settings differ between runs; deltas mix code and configuration changes")
+
+    previous = {run["sessions"]: run for run in baseline["throughput"]}
+    for run in current["throughput"]:
+        before = previous.get(run["sessions"])
+        if not before:
+            continue
+        change = (run["turns_per_sec"] / before["turns_per_sec"] - 1) * 100
+        print(f"\n  {run['sessions']} sessions: {before['turns_per_sec']:.1f} -> {run['turns_per_sec']:.1f} turns/s ({change:+.1f}%)")
+        for stage, s in run["stages"].items():
+            old = before["stages"].get(stage)
+            if old:
+                print(f"    {stage:<16} p95 {old['p95']:>9.2f} -> {s['p95']:>9.2f} ms ({s['p95'] - old['p95']:+.2f})")
+
+
+async def main(args) -> None:
+    fixture = load_conversations(args.fixture)
+    provider = FakeProvider(
+        ttft_ms=args.ttft_ms,
+        tokens_per_sec=args.tokens_per_sec,
+        reply_tokens=args.reply_tokens,
+        jitter=args.jitter
+    )
+    harness = PipelineHarness(
+        fixture,
+        provider,
+        intent_ms=args.intent_ms,
+        rag_ms=args.rag_ms,
+        tool_ms=args.tool_ms,
+        db_ms=args.db_ms,
+        redis_ms=args.redis_ms,
+        stream=args.stream
+    )
+    harness.setup()
+
+    # Warm-up: first-use initialization stays out of the numbers
+    await harness.run_sessions(1)
+
+    throughput: List[Dict[str, Any]] = []
+    for n in [int(n) for n in args.sessions.split(",")]:
+        throughput.append(await harness.run_sessions(n))
+
+    engine_generate = await harness.run_engine_generate()
+    allocations = await harness.measure_allocations()
+
+    turns = sum(len(c["turns"]) for c in fixture["conversations"])
+    print(f"\n{len(fixture['conversations'])} recorded conversations, {turns} turns; "
+          f"provider TTFT {args.ttft_ms}ms at {args.tokens_per_sec} tok/s, {args.reply_tokens} tokens per reply")
+    for run in throughput:
+        print_stages(f"{run['sessions']} concurrent sessions: {run['turns']} turns in {run['seconds']}s "
+                     f"({run['turns_per_sec']} turns/s)", run["stages"])
+    print_stages("SmartAIEngineV5.generate (direct)", engine_generate)
+    print(f"\nPer turn memory: peak {allocations['peak_kib_p50']} KiB p50 / {allocations['peak_kib_p95']} KiB p95, "
+          f"retained {allocations['retained_kib_per_turn']} KiB in {allocations['retained_blocks_per_turn']} blocks")
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {
+                "fixture": str(args.fixture or "chat_conversations.json"),
+                "ttft_ms": args.ttft_ms,
+                "tokens_per_sec": args.tokens_per_sec,
+                "reply_tokens": args.reply_tokens,
+                "jitter": args.jitter,
+                "intent_ms": args.intent_ms,
+                "rag_ms": args.rag_ms,
+                "tool_ms": args.tool_ms,
+                "db_ms": args.db_ms,
+                "redis_ms": args.redis_ms,
+                "stream": args.stream
+            }
+        },
+        "throughput": throughput,
+        "engine_generate": engine_generate,
+        "allocations": allocations
+    }
+
+    if args.compare:
+        print_comparison(results, json.loads(Path(args.compare).read_text()))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark full chat turns against deterministic stand-ins")
+    parser.add_argument("--sessions", default="1,10,50", help="Comma-separated concurrent session counts")
+    parser.add_argument("--fixture", type=Path, help="Conversation fixture (default: fixtures/chat_conversations.json)")
+    parser.add_argument("--ttft-ms", type=float, default=300.0, help="Fake provider time to first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=200.0, help="Fake provider generation rate")
+    parser.add_argument("--reply-tokens", type=int, default=60, help="Tokens per fake reply")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Relative latency spread, fixed per prompt")
+    parser.add_argument("--intent-ms", type=float, default=0.0, help="Intent detection latency")
+    parser.add_argument("--rag-ms", type=float, help="Knowledge search latency (RAG stage off when omitted)")
+    parser.add_argument("--tool-ms", type=float, default=0.0, help="Product search / query_database latency")
+    parser.add_argument("--db-ms", type=float, default=2.0, help="Context store round trip")
+    parser.add_argument("--redis-ms", type=float, help="Response cache round trip (cache off when omitted)")
+    parser.add_argument("--stream", action="store_true", help="Stream generation and record time to first token")
+    parser.add_argument("--log-level", default="WARNING", help="Log level for the engine while benchmarking")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Earlier --json output to diff against")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level)
+    asyncio.run(main(args))
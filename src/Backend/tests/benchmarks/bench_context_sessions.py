@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Context Manager Session Concurrency Benchmark
+Measures get_context/add_message throughput of SimpleHybridContextManager
+with N concurrent chat sessions, against a baseline that serializes every
+lookup behind one manager-wide lock (the previous behaviour).
+
+The database is replaced by an in-process store with a fixed round-trip
+latency, so the numbers isolate lock contention from Postgres itself.
+
+Usage:
+    python tests/benchmarks/bench_context_sessions.py
+    python tests/benchmarks/bench_context_sessions.py --sessions 1,10,50,200 --db-latency-ms 5
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from services.context.simple_hybrid_manager import SimpleHybridContextManager  # noqa: E402
+
+
+class FakeDatabaseStore:
+    """Stands in for DatabaseContextStore with a fixed per-call latency"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.conversations: Dict[str, Dict[str, Any]] = {}
+        self.loads = 0
+
+    async def get_conversation(self, session_id: str, message_limit: Optional[int] = 50) -> Optional[Dict]:
+        self.loads += 1
+        await asyncio.sleep(self.latency)
+        return self.conversations.get(session_id)
+
+    async def append_messages(self, session_id, messages, context_patch=None, customer_id=None) -> bool:
+        await asyncio.sleep(self.latency)
+        conversation = self.conversations.setdefault(
+            session_id, {"messages": [], "context": {}, "created_at": None}
+        )
+        conversation["messages"].extend(messages)
+        conversation["context"].update(context_patch or {})
+        return True
+
+    async def update_context(self, session_id, context_patch, customer_id=None) -> bool:
+        return await self.append_messages(session_id, [], context_patch, customer_id)
+
+    async def update_customer_profile(self, customer_id, **kwargs) -> None:
+        await asyncio.sleep(self.latency)
+
+
+class GlobalLockManager(SimpleHybridContextManager):
+    """Baseline: every get_context waits on one lock, including DB I/O"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._global_lock = asyncio.Lock()
+
+    async def get_context(self, session_id: str, customer_id: Optional[str] = None) -> Dict:
+        async with self._global_lock:
+            return await super().get_context(session_id, customer_id)
+
+
+def build(manager_cls, latency: float):
+    manager = manager_cls()
+    manager.db_store = FakeDatabaseStore(latency)
+    return manager
+
+
+async def run_sessions(manager_cls, sessions: int, turns: int, latency: float) -> Dict[str, Any]:
+    """Each session does cold load + `turns` messages; returns ops/s"""
+    manager = build(manager_cls, latency)
+
+    # Half the sessions exist in the database already (cold restore path)
+    for i in range(0, sessions, 2):
+        manager.db_store.conversations[f"s{i}"] = {
+            "messages": [],
+            "context": {"session_id": f"s{i}", "message_count": 0},
+            "created_at": "2024-01-01T00:00:00"
+        }
+
+    async def chat(session_id: str) -> None:
+        for turn in range(turns):
+            await manager.get_context(session_id)
+            await manager.add_message(session_id, "user", f"message {turn}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(chat(f"s{i}") for i in range(sessions)))
+    elapsed = time.perf_counter() - start
+
+    # Let fire-and-forget persistence finish before the loop moves on
+    await asyncio.sleep(latency * 4)
+    ops = sessions * turns * 2
+    return {"sessions": sessions, "seconds": round(elapsed, 4), "ops_per_sec": round(ops / elapsed, 1)}
+
+
+async def coalescing_check(concurrent: int, latency: float) -> Dict[str, Any]:
+    """K concurrent get_context calls for one cold session"""
+    manager = build(SimpleHybridContextManager, latency)
+    contexts = await asyncio.gather(*(manager.get_context("cold") for _ in range(concurrent)))
+    return {
+        "concurrent_calls": concurrent,
+        "db_loads": manager.db_store.loads,
+        "same_context": all(c is contexts[0] for c in contexts)
+    }
+
+
+async def main(args) -> None:
+    latency = args.db_latency_ms / 1000
+    counts: List[int] = [int(n) for n in args.sessions.split(",")]
+
+    results = []
+    for n in counts:
+        baseline = await run_sessions(GlobalLockManager, n, args.turns, latency)
+        striped = await run_sessions(SimpleHybridContextManager, n, args.turns, latency)
+        results.append({
+            "sessions": n,
+            "global_lock_ops_per_sec": baseline["ops_per_sec"],
+            "per_session_ops_per_sec": striped["ops_per_sec"],
+            "speedup": round(striped["ops_per_sec"] / baseline["ops_per_sec"], 2)
+        })
+
+    coalescing = await coalescing_check(args.coalesce, latency)
+
+    print(f"\nDB latency {args.db_latency_ms}ms, {args.turns} turns per session\n")
+    print(f"{'sessions':>9}  {'global lock ops/s':>18}  {'per-session ops/s':>18}  {'speedup':>8}")
+    for r in results:
+        print(f"{r['sessions']:>9}  {r['global_lock_ops_per_sec']:>18.1f}  "
+              f"{r['per_session_ops_per_sec']:>18.1f}  {r['speedup']:>7.2f}x")
+    print(f"\n{coalescing['concurrent_calls']} concurrent cold loads of one session -> "
+          f"{coalescing['db_loads']} database load(s), shared context: {coalescing['same_context']}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"throughput": results, "coalescing": coalescing}, indent=2))
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark context manager session concurrency")
+    parser.add_argument("--sessions", default="1,10,50,200", help="Comma-separated concurrent session counts")
+    parser.add_argument("--turns", type=int, default=5, help="Messages per session")
+    parser.add_argument("--db-latency-ms", type=float, default=5.0, help="Simulated database round trip")
+    parser.add_argument("--coalesce", type=int, default=50, help="Concurrent calls for the coalescing check")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Local Inference Benchmark
+Compares event-loop responsiveness and throughput of direct llama-cpp calls
+(the old behaviour: model called inside async code) against the
+LocalInferenceExecutor worker pool.
+
+A ticker coroutine wakes every few milliseconds while a mixed workload of
+short intent-classification prompts and longer chat generations runs; its
+lateness is the event-loop lag every other request (health checks,
+websockets) would see.
+
+Usage:
+    python tests/benchmarks/bench_local_inference.py --model models/qwen2.5-0.5b-instruct-q4_k_m.gguf
+    python tests/benchmarks/bench_local_inference.py --fake --requests 40 --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from services.local_inference import (  # noqa: E402
+    InferencePriority,
+    LocalInferenceConfig,
+    LocalInferenceExecutor
+)
+
+INTENT_PROMPT = (
+    "Classify the customer's intent as one of: greeting, product_search, "
+    "dosage, store_info, general.\nMessage: {message}\nIntent:"
+)
+CHAT_PROMPT = "<|user|>\n{message}\n<|assistant|>\n"
+MESSAGES = [
+    "hi there",
+    "do you have any sativa pre-rolls?",
+    "how much edible should a beginner take?",
+    "what time do you close today?",
+    "recommend something for sleep",
+]
+
+
+class FakeModel:
+    """Stands in for llama-cpp: blocks (GIL released) ~per generated token"""
+
+    def __init__(self, seconds_per_token: float = 0.004, prompt_seconds: float = 0.02):
+        self.seconds_per_token = seconds_per_token
+        self.prompt_seconds = prompt_seconds
+
+    def __call__(self, prompt: str, max_tokens: int = 16, stream: bool = False, **kwargs):
+        time.sleep(self.prompt_seconds)
+        if stream:
+            return self._stream(max_tokens)
+        time.sleep(self.seconds_per_token * max_tokens)
+        return {"choices": [{"text": " ok" * max_tokens, "finish_reason": "length"}]}
+
+    def _stream(self, max_tokens: int):
+        for _ in range(max_tokens):
+            time.sleep(self.seconds_per_token)
+            yield {"choices": [{"text": " ok", "finish_reason": None}]}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def build_workload(num_requests: int, chat_tokens: int) -> List[Dict[str, Any]]:
+    """Every third request is a chat generation, the rest intent classifications"""
+    workload = []
+    for i in range(num_requests):
+        message = MESSAGES[i % len(MESSAGES)]
+        if i % 3 == 2:
+            workload.append({
+                "kind": "chat",
+                "prompt": CHAT_PROMPT.format(message=message),
+                "max_tokens": chat_tokens,
+                "priority": InferencePriority.INTERACTIVE
+            })
+        else:
+            workload.append({
+                "kind": "intent",
+                "prompt": INTENT_PROMPT.format(message=message),
+                "max_tokens": 8,
+                "priority": InferencePriority.INTENT
+            })
+    return workload
+
+
+async def ticker(interval: float, lags: List[float], stop: asyncio.Event) -> None:
+    """Record how late the event loop wakes us up"""
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def run_direct(model, workload: List[Dict[str, Any]]) -> Dict[str, List[float]]:
+    """Old behaviour: call the model synchronously inside async code"""
+    latencies: Dict[str, List[float]] = {"intent": [], "chat": []}
+
+    async def one(item):
+        start = time.perf_counter()
+        await asyncio.sleep(0)  # Yield like a real handler would before inference
+        model(item["prompt"], max_tokens=item["max_tokens"], temperature=0.1, echo=False)
+        latencies[item["kind"]].append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(item) for item in workload))
+    return latencies
+
+
+async def run_executor(executor: LocalInferenceExecutor, model, workload: List[Dict[str, Any]]) -> Dict[str, List[float]]:
+    """New behaviour: queue on the local inference workers"""
+    latencies: Dict[str, List[float]] = {"intent": [], "chat": []}
+
+    async def one(item):
+        start = time.perf_counter()
+        await executor.submit(
+            item["prompt"],
+            model=model,
+            priority=item["priority"],
+            max_tokens=item["max_tokens"],
+            temperature=0.1,
+            echo=False
+        )
+        latencies[item["kind"]].append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(item) for item in workload))
+    return latencies
+
+
+async def measure(name: str, runner, tick_interval: float) -> Dict[str, Any]:
+    lags: List[float] = []
+    stop = asyncio.Event()
+    tick_task = asyncio.create_task(ticker(tick_interval, lags, stop))
+
+    start = time.perf_counter()
+    latencies = await runner()
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await tick_task
+
+    total = sum(len(v) for v in latencies.values())
+    return {
+        "mode": name,
+        "requests": total,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "loop_lag_ms": {
+            "p50": round(percentile(lags, 50) * 1000, 2),
+            "p99": round(percentile(lags, 99) * 1000, 2),
+            "max": round(max(lags) * 1000, 2) if lags else 0.0,
+            "ticks": len(lags)
+        },
+        "latency_ms": {
+            kind: {
+                "p50": round(percentile(values, 50) * 1000, 1),
+                "p95": round(percentile(values, 95) * 1000, 1),
+                "mean": round(statistics.mean(values) * 1000, 1) if values else 0.0
+            }
+            for kind, values in latencies.items()
+        }
+    }
+
+
+def load_model(args):
+    if args.fake:
+        return FakeModel()
+    try:
+        from llama_cpp import Llama
+    except ImportError:
+        sys.exit("llama-cpp-python is not installed (use --fake for a synthetic model)")
+    return Llama(model_path=args.model, n_ctx=1024, n_threads=args.threads, verbose=False)
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    lag = result["loop_lag_ms"]
+    print(f"\n== {result['mode']} ==")
+    print(f"  requests:      {result['requests']} in {result['elapsed_s']}s "
+          f"({result['throughput_rps']} req/s)")
+    print(f"  loop lag (ms): p50={lag['p50']}  p99={lag['p99']}  max={lag['max']}  "
+          f"({lag['ticks']} ticks)")
+    for kind, stats in result["latency_ms"].items():
+        print(f"  {kind:7s} (ms):  p50={stats['p50']}  p95={stats['p95']}  mean={stats['mean']}")
+
+
+async def main(args) -> None:
+    model = load_model(args)
+    workload = build_workload(args.requests, args.chat_tokens)
+
+    # Warm up (first llama.cpp call allocates buffers)
+    model(INTENT_PROMPT.format(message="warmup"), max_tokens=1)
+
+    results = [await measure(
+        "direct (blocking)",
+        lambda: run_direct(model, workload),
+        args.tick_ms / 1000
+    )]
+
+    executor = LocalInferenceExecutor(LocalInferenceConfig(
+        workers=args.workers,
+        queue_size=max(64, args.requests * 2),
+        batch_window_ms=args.batch_window_ms
+    ))
+    try:
+        results.append(await measure(
+            "executor",
+            lambda: run_executor(executor, model, workload),
+            args.tick_ms / 1000
+        ))
+        results[-1]["executor_stats"] = executor.get_stats()
+    finally:
+        executor.shutdown()
+
+    for result in results:
+        print_result(result)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark local inference executor")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--model", help="Path to a small GGUF model")
+    source.add_argument("--fake", action="store_true", help="Use a synthetic blocking model")
+    parser.add_argument("--requests", type=int, default=30, help="Concurrent requests")
+    parser.add_argument("--chat-tokens", type=int, default=64, help="max_tokens for chat requests")
+    parser.add_argument("--workers", type=int, default=1, help="Executor worker threads")
+    parser.add_argument("--threads", type=int, default=4, help="llama.cpp threads")
+    parser.add_argument("--batch-window-ms", type=float, default=5.0, help="Micro-batch window")
+    parser.add_argument("--tick-ms", type=float, default=5.0, help="Event-loop probe interval")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Hybrid RAG Retrieval Benchmark
+Measures recall@k, MRR and latency of PortableRAGService for a range of
+lexical weights (0 = pure vector, 1 = pure BM25) on a labelled fixture set,
+to tune the per-agent rank-fusion weight.
+
+The fixture (tests/benchmarks/fixtures/rag_retrieval.json) mixes exact
+identifier queries (OCS variant numbers, product and strain names) with
+paraphrased natural-language questions.
+
+Usage:
+    python tests/benchmarks/bench_rag_retrieval.py
+    python tests/benchmarks/bench_rag_retrieval.py --weights 0,0.3,0.5,0.7 --k 5 --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from services.rag.portable_rag_service import PortableRAGService  # noqa: E402
+
+FIXTURE = Path(__file__).parent / "fixtures" / "rag_retrieval.json"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def load_fixture(service: PortableRAGService, fixture: Dict[str, Any]) -> None:
+    for doc in fixture["documents"]:
+        await service.add_document(
+            title=doc["title"],
+            content=doc["content"],
+            document_type=doc["type"],
+            document_id=doc["id"]
+        )
+
+
+async def evaluate(
+    service: PortableRAGService,
+    queries: List[Dict[str, Any]],
+    weight: float,
+    k: int,
+    repeats: int
+) -> Dict[str, Any]:
+    recalls, reciprocal_ranks, latencies = [], [], []
+    misses = []
+
+    for item in queries:
+        relevant = set(item["relevant"])
+        for _ in range(repeats):
+            service.query_cache.clear()
+            start = time.perf_counter()
+            results = await service.retrieve(item["query"], top_k=k, agent_id="admin", lexical_weight=weight)
+            latencies.append(time.perf_counter() - start)
+
+        ranked_docs = list(dict.fromkeys(r["document_id"] for r in results))
+        hits = relevant.intersection(ranked_docs)
+        recalls.append(len(hits) / len(relevant))
+
+        first = next((i for i, doc_id in enumerate(ranked_docs, start=1) if doc_id in relevant), None)
+        reciprocal_ranks.append(1.0 / first if first else 0.0)
+        if not hits:
+            misses.append(item["query"])
+
+    return {
+        "lexical_weight": weight,
+        f"recall@{k}": round(statistics.mean(recalls), 3),
+        "mrr": round(statistics.mean(reciprocal_ranks), 3),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2)
+        },
+        "missed_queries": misses
+    }
+
+
+async def main(args) -> None:
+    fixture = json.loads(Path(args.fixture).read_text())
+    weights = [float(w) for w in args.weights.split(",")]
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        service = PortableRAGService(data_dir=data_dir, embedding_model=args.model)
+        await service.initialize()
+        await load_fixture(service, fixture)
+
+        if not service.lexical_index.available:
+            print("⚠️ SQLite FTS5 not available; lexical weights other than 0 fall back to vector only")
+
+        # Warm up the embedding model
+        await service.retrieve("warmup", top_k=args.k, lexical_weight=0.5)
+
+        results = []
+        for weight in weights:
+            results.append(await evaluate(service, fixture["queries"], weight, args.k, args.repeats))
+
+    print(f"\n{len(fixture['queries'])} queries, {len(fixture['documents'])} documents, k={args.k}\n")
+    print(f"{'lexical w':>10}  {'recall@' + str(args.k):>9}  {'MRR':>6}  {'p50 ms':>8}  {'p95 ms':>8}")
+    for result in results:
+        print(f"{result['lexical_weight']:>10.2f}  {result[f'recall@{args.k}']:>9.3f}  {result['mrr']:>6.3f}  "
+              f"{result['latency_ms']['p50']:>8.2f}  {result['latency_ms']['p95']:>8.2f}")
+    for result in results:
+        if result["missed_queries"]:
+            print(f"\nmissed at w={result['lexical_weight']}: {', '.join(result['missed_queries'])}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark hybrid RAG retrieval")
+    parser.add_argument("--fixture", default=str(FIXTURE), help="Labelled documents and queries")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="Embedding model")
+    parser.add_argument("--weights", default="0,0.3,0.5,0.7,1", help="Comma-separated lexical weights")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per query")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+VAD Throughput Benchmark
+Compares Silero VAD over the repo's test WAVs three ways:
+
+- per-window: the old SileroVADHandler loop, one ort_session.run per 512-sample
+  window at a 160-sample hop, with per-call dtype conversion and reshaping
+- batched:    SileroVADModel.probabilities, the whole buffer framed once and
+  scored in lanes of batch_size windows per model call
+- stream:     SileroVADModel.stream_probabilities over 20ms chunks with a
+  VADStreamState, as a live voice session would feed it
+
+Reports real-time factor (seconds of audio per second of compute), model
+calls, and how far batched probabilities drift from exact sequential
+inference (the lane warm-up approximation).
+
+Usage:
+    python tests/benchmarks/bench_vad.py --model models/voice/silero/silero_vad.onnx
+    python tests/benchmarks/bench_vad.py --fake --repeat 3 --json results.json
+"""
+
+import argparse
+import json
+import sys
+import time
+import wave
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from core.voice.silero_vad import (  # noqa: E402
+    SAMPLE_RATE,
+    SileroVADModel,
+    VADStreamState
+)
+
+LEGACY_WINDOW = 512
+LEGACY_HOP = 160
+STREAM_CHUNK = 320  # 20ms at 16kHz
+
+
+class FakeSession:
+    """Stands in for the Silero ONNX session: fixed cost per call plus per row"""
+
+    def __init__(self, call_seconds: float = 0.00015, row_seconds: float = 0.00002):
+        self.call_seconds = call_seconds
+        self.row_seconds = row_seconds
+
+    def run(self, _outputs, feeds):
+        frames, state = feeds["input"], feeds["state"]
+        deadline = time.perf_counter() + self.call_seconds + self.row_seconds * len(frames)
+        energy = np.sqrt(np.mean(frames ** 2, axis=1))
+        state = state * 0.5
+        state[0, :, 0] += energy * 10
+        probs = 1 / (1 + np.exp(1 - state[0, :, 0]))
+        while time.perf_counter() < deadline:
+            pass
+        return [probs.reshape(-1, 1).astype(np.float32), state.astype(np.float32)]
+
+
+def load_wav(path: Path) -> np.ndarray:
+    """Mono float32 audio at 16kHz"""
+    with wave.open(str(path), "rb") as wav_file:
+        if wav_file.getsampwidth() != 2:
+            raise ValueError("only 16-bit WAVs are supported")
+        channels = wav_file.getnchannels()
+        rate = wav_file.getframerate()
+        audio = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+    audio = audio.reshape(-1, channels).mean(axis=1).astype(np.float32) / 32768.0
+    if rate != SAMPLE_RATE:
+        positions = np.arange(0, len(audio), rate / SAMPLE_RATE)
+        audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+    return audio
+
+
+def load_clips(paths: List[Path]) -> List[Tuple[str, np.ndarray]]:
+    clips = []
+    for path in paths:
+        try:
+            clips.append((path.name, load_wav(path)))
+        except Exception as e:
+            print(f"  skipping {path.name}: {e}")
+    return clips
+
+
+def per_window(session, audio: np.ndarray) -> int:
+    """Old handler loop; returns model calls"""
+    state = np.zeros((2, 1, 128), dtype=np.float32)
+    sr = np.array(SAMPLE_RATE, dtype=np.int64)
+    calls = 0
+    for i in range(0, len(audio) - LEGACY_WINDOW, LEGACY_HOP):
+        window = audio[i:i + LEGACY_WINDOW]
+        if window.dtype != np.float32:
+            window = window.astype(np.float32)
+        outputs = session.run(None, {"input": window.reshape(1, -1), "state": state, "sr": sr})
+        state = outputs[1]
+        float(outputs[0].flatten()[0])
+        calls += 1
+    return calls
+
+
+def measure(name: str, clips, run, repeat: int) -> Dict[str, Any]:
+    audio_seconds = sum(len(audio) for _, audio in clips) / SAMPLE_RATE
+    timings = []
+    calls = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        calls = sum(run(audio) for _, audio in clips)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return {
+        "mode": name,
+        "clips": len(clips),
+        "audio_s": round(audio_seconds, 2),
+        "compute_s": round(best, 4),
+        "realtime_factor": round(audio_seconds / best, 1) if best else 0.0,
+        "model_calls": calls
+    }
+
+
+def probability_drift(model: SileroVADModel, clips) -> Dict[str, float]:
+    """Batched (lanes) vs exact sequential probabilities"""
+    exact_model = SileroVADModel(model.model_path, batch_size=1)
+    exact_model.session = model.session
+    diffs = []
+    for _, audio in clips:
+        exact = exact_model.probabilities(audio)
+        batched = model.probabilities(audio)
+        if len(exact):
+            diffs.append(np.abs(exact - batched))
+    all_diffs = np.concatenate(diffs) if diffs else np.zeros(1)
+    return {"max": round(float(all_diffs.max()), 5), "mean": round(float(all_diffs.mean()), 6)}
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    print(f"\n== {result['mode']} ==")
+    print(f"  audio:        {result['audio_s']}s over {result['clips']} clips")
+    print(f"  compute:      {result['compute_s']}s  ({result['realtime_factor']}x real time)")
+    print(f"  model calls:  {result['model_calls']}")
+
+
+def main(args) -> None:
+    model = SileroVADModel(Path(args.model or "fake.onnx"), batch_size=args.batch_size,
+                           warmup_windows=args.warmup_windows)
+    if args.fake:
+        model.session = FakeSession()
+    elif not model.load():
+        sys.exit(f"Could not load {args.model} (use --fake for a synthetic model)")
+
+    paths = [Path(p) for p in args.wav] or sorted(BACKEND_DIR.glob("*.wav"))
+    clips = load_clips(paths)
+    if not clips:
+        sys.exit("No readable WAV files")
+
+    def run_batched(audio):
+        before = model.stats["model_calls"]
+        model.probabilities(audio)
+        return model.stats["model_calls"] - before
+
+    def run_stream(audio):
+        before = model.stats["model_calls"]
+        stream = VADStreamState()
+        for i in range(0, len(audio), STREAM_CHUNK):
+            model.stream_probabilities(audio[i:i + STREAM_CHUNK], stream)
+        return model.stats["model_calls"] - before
+
+    results = [
+        measure("per-window (old)", clips, lambda audio: per_window(model.session, audio), args.repeat),
+        measure("batched", clips, run_batched, args.repeat),
+        measure("stream (20ms chunks)", clips, run_stream, args.repeat)
+    ]
+    results[1]["drift_vs_sequential"] = probability_drift(model, clips)
+
+    for result in results:
+        print_result(result)
+    drift = results[1]["drift_vs_sequential"]
+    print(f"\n  batched drift vs sequential: max={drift['max']}  mean={drift['mean']}")
+    print(f"  batched speed-up over per-window: "
+          f"{results[0]['compute_s'] / max(results[1]['compute_s'], 1e-9):.1f}x")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched Silero VAD")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--model", help="Path to silero_vad.onnx")
+    source.add_argument("--fake", action="store_true", help="Use a synthetic VAD session")
+    parser.add_argument("--wav", nargs="*", default=[], help="WAV files (default: src/Backend/*.wav)")
+    parser.add_argument("--batch-size", type=int, default=16, help="Lanes per model call")
+    parser.add_argument("--warmup-windows", type=int, default=16, help="Warm-up windows per lane")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode (best is reported)")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    main(parser.parse_args())
@@ -0,0 +1,36 @@
+"""
+Chat Pipeline Benchmark Harness
+Drives full chat turns (AgentPoolManager.process_message and
+SmartAIEngineV5.generate) against deterministic stand-ins for the LLM
+provider, intent model, RAG, tools, Postgres and Redis, so per-stage
+timings can be compared across commits without network or model variance.
+
+- fakes: stand-in providers and stores with configurable latency
+- harness: engine wiring, recorded conversation replay and reporting
+
+Entry point: tests/benchmarks/bench_chat_pipeline.py
+"""
+
+from .fakes import (
+    FakeProvider,
+    FakeIntentDetector,
+    FakeProductSearchTool,
+    FakeRAGTool,
+    FakeToolManager,
+    InMemoryContextStore,
+    InMemoryRedis
+)
+from .harness import PipelineHarness, load_conversations, summarize
+
+__all__ = [
+    "FakeProvider",
+    "FakeIntentDetector",
+    "FakeProductSearchTool",
+    "FakeRAGTool",
+    "FakeToolManager",
+    "InMemoryContextStore",
+    "InMemoryRedis",
+    "PipelineHarness",
+    "load_conversations",
+    "summarize"
+]
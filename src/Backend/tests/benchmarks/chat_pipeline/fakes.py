@@ -0,0 +1,306 @@
+"""
+Deterministic Stand-ins for the Chat Pipeline Benchmark
+Every external dependency of a chat turn is replaced by an in-process fake
+with a fixed, configurable latency. Output depends only on the input text,
+so two runs over the same fixtures do the same work.
+"""
+
+import asyncio
+import fnmatch
+import time
+import zlib
+from typing import Any, AsyncGenerator, Dict, List, Optional, Union
+
+from services.llm_gateway.providers.base import BaseProvider
+from services.llm_gateway.types import CompletionResult, ProviderConfig
+
+_VOCABULARY = (
+    "we have a few great options for you today including our house blend "
+    "which is popular with customers looking for something balanced and "
+    "easy going let me know if you would like more details on pricing"
+).split()
+
+
+def _spread(text: str, jitter: float) -> float:
+    """Deterministic multiplier in [1 - jitter, 1 + jitter] derived from text"""
+    if not jitter:
+        return 1.0
+    unit = (zlib.crc32(text.encode("utf-8")) % 10000) / 9999
+    return 1.0 + jitter * (2 * unit - 1)
+
+
+class FakeProvider(BaseProvider):
+    """
+    LLM provider with a fixed time to first token and token rate
+
+    Args:
+        ttft_ms: Delay before the first token
+        tokens_per_sec: Generation rate after the first token
+        reply_tokens: Tokens per reply (capped by max_tokens)
+        jitter: Relative latency spread, derived from the prompt text
+    """
+
+    def __init__(
+        self,
+        ttft_ms: float = 300.0,
+        tokens_per_sec: float = 200.0,
+        reply_tokens: int = 60,
+        jitter: float = 0.0
+    ):
+        config = ProviderConfig(
+            name="Benchmark (fake)",
+            enabled=True,
+            avg_latency_seconds=ttft_ms / 1000 + reply_tokens / tokens_per_sec,
+            supports_streaming=True,
+            model_name="fake-model"
+        )
+        super().__init__(config)
+
+        self.ttft = ttft_ms / 1000
+        self.tokens_per_sec = tokens_per_sec
+        self.reply_tokens = reply_tokens
+        self.jitter = jitter
+        self.calls = 0
+
+    def _plan(self, messages: List[Dict], max_tokens: int):
+        prompt = messages[-1].get("content", "") if messages else ""
+        spread = _spread(prompt, self.jitter)
+        tokens = max(1, min(max_tokens, self.reply_tokens))
+        words = [_VOCABULARY[(len(prompt) + i) % len(_VOCABULARY)] for i in range(tokens)]
+        prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+        return words, prompt_tokens, self.ttft * spread, spread / self.tokens_per_sec
+
+    async def complete(
+        self,
+        messages: List[Dict],
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        stream: bool = False,
+        tools: Optional[List[Dict]] = None,
+        **kwargs
+    ) -> Union[CompletionResult, AsyncGenerator[str, None]]:
+        self.calls += 1
+        words, prompt_tokens, ttft, per_token = self._plan(messages, max_tokens)
+
+        if stream:
+            return self._stream(words, prompt_tokens, ttft, per_token, kwargs.get("stream_usage"))
+
+        start = time.perf_counter()
+        await asyncio.sleep(ttft + per_token * len(words))
+        return CompletionResult(
+            content=" ".join(words),
+            provider=self.name,
+            model=self.config.model_name,
+            selection_reason="",
+            latency=time.perf_counter() - start,
+            tokens_input=prompt_tokens,
+            tokens_output=len(words),
+            cost=0.0,
+            finish_reason="length" if len(words) == max_tokens else "stop"
+        )
+
+    async def _stream(
+        self,
+        words: List[str],
+        prompt_tokens: int,
+        ttft: float,
+        per_token: float,
+        usage: Optional[Dict]
+    ) -> AsyncGenerator[str, None]:
+        await asyncio.sleep(ttft)
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(per_token)
+            yield word if i == 0 else f" {word}"
+
+        if usage is not None:
+            usage["prompt_tokens"] = prompt_tokens
+            usage["completion_tokens"] = len(words)
+            usage["finish_reason"] = "stop"
+
+    async def check_health(self) -> bool:
+        return True
+
+
+class FakeIntentDetector:
+    """Replays recorded intents for fixture messages; unknown text is 'general'"""
+
+    def __init__(self, intents: Dict[str, str], latency_ms: float = 0.0):
+        self.intents = intents
+        self.latency = latency_ms / 1000
+        self.v5_engine = None
+        self.calls = 0
+
+    async def detect_async(self, message: str, language: str = "auto") -> Dict[str, Any]:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return {
+            "intent": self.intents.get(message, "general"),
+            "confidence": 0.9,
+            "language": "en",
+            "method": "fixture"
+        }
+
+    def detect(self, message: str, language: str = "auto") -> Dict[str, Any]:
+        return {
+            "intent": self.intents.get(message, "general"),
+            "confidence": 0.9,
+            "language": "en",
+            "method": "fixture"
+        }
+
+    def load_intents(self, agent_id: str) -> bool:
+        return True
+
+    def clear_cache(self) -> None:
+        pass
+
+
+class FakeProductSearchTool:
+    """Blocking product search (it runs on a worker thread, like the real tool)"""
+
+    def __init__(self, products: List[Dict[str, Any]], latency_ms: float = 0.0):
+        self.products = products
+        self.latency = latency_ms / 1000
+
+    def search_products(self, query: Optional[str] = None, limit: int = 20, **filters) -> Dict[str, Any]:
+        if self.latency:
+            time.sleep(self.latency)
+        words = set((query or "").lower().split())
+        ranked = sorted(
+            self.products,
+            key=lambda p: -len(words & set(p.get("name", "").lower().split()))
+        )
+        return {"success": True, "products": ranked[:limit], "count": min(limit, len(ranked))}
+
+
+class FakeRAGTool:
+    """Knowledge search returning the fixture snippets"""
+
+    def __init__(self, snippets: List[Dict[str, Any]], latency_ms: float = 0.0):
+        self.snippets = snippets
+        self.latency = latency_ms / 1000
+
+    async def search_knowledge(self, query: str, top_k: int = 5, min_similarity: float = 0.3, **kwargs) -> Dict[str, Any]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        results = self.snippets[:top_k]
+        return {"success": True, "results": results, "confidence": 0.8 if results else 0.0}
+
+
+class FakeToolManager:
+    """ToolManager stand-in answering query_database from fixture rows"""
+
+    def __init__(self, rows: Dict[str, List[Dict[str, Any]]], latency_ms: float = 0.0):
+        self.rows = rows
+        self.latency = latency_ms / 1000
+        self.calls = 0
+
+    async def execute_tool(self, tool_name: str, **kwargs) -> Dict[str, Any]:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if tool_name != "query_database":
+            return {"success": False, "error": f"Tool not available in benchmark: {tool_name}"}
+
+        data = self.rows.get(kwargs.get("resource_type") or "", [])[:kwargs.get("limit", 100)]
+        return {"success": True, "result": {"success": True, "data": data}}
+
+    def list_tools(self) -> List[str]:
+        return ["query_database"]
+
+
+class InMemoryContextStore:
+    """Stands in for DatabaseContextStore (Postgres) with a fixed round trip"""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.conversations: Dict[str, Dict[str, Any]] = {}
+        self.round_trips = 0
+
+    async def _round_trip(self) -> None:
+        self.round_trips += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def get_conversation(self, session_id: str, message_limit: Optional[int] = 50) -> Optional[Dict]:
+        await self._round_trip()
+        conversation = self.conversations.get(session_id)
+        if conversation is None or message_limit is None:
+            return conversation
+        return {**conversation, "messages": conversation["messages"][-message_limit:]}
+
+    async def get_recent_messages(self, session_id: str, limit: int = 50) -> List[Dict]:
+        await self._round_trip()
+        return self.conversations.get(session_id, {}).get("messages", [])[-limit:]
+
+    async def append_messages(
+        self,
+        session_id: str,
+        messages: List[Dict],
+        context_patch: Optional[Dict] = None,
+        customer_id: Optional[str] = None,
+        removed_keys: Optional[List[str]] = None
+    ) -> bool:
+        await self._round_trip()
+        conversation = self.conversations.setdefault(
+            session_id, {"messages": [], "context": {}, "created_at": None, "message_count": 0}
+        )
+        conversation["messages"].extend(messages)
+        conversation["message_count"] += len(messages)
+        conversation["context"].update(context_patch or {})
+        for key in removed_keys or []:
+            conversation["context"].pop(key, None)
+        return True
+
+    async def update_context(
+        self,
+        session_id: str,
+        context_patch: Dict,
+        customer_id: Optional[str] = None,
+        removed_keys: Optional[List[str]] = None
+    ) -> bool:
+        return await self.append_messages(session_id, [], context_patch, customer_id, removed_keys)
+
+    async def update_customer_profile(self, customer_id: str, **kwargs) -> None:
+        await self._round_trip()
+
+
+class InMemoryRedis:
+    """The subset of redis.asyncio used by ResponseCache, with a fixed round trip"""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.data: Dict[str, str] = {}
+        self.round_trips = 0
+
+    async def _round_trip(self) -> None:
+        self.round_trips += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def ping(self) -> bool:
+        await self._round_trip()
+        return True
+
+    async def get(self, key: str) -> Optional[str]:
+        await self._round_trip()
+        return self.data.get(key)
+
+    async def setex(self, key: str, ttl: int, value: str) -> bool:
+        await self._round_trip()
+        self.data[key] = value
+        return True
+
+    async def delete(self, key: str) -> int:
+        await self._round_trip()
+        return 1 if self.data.pop(key, None) is not None else 0
+
+    async def scan_iter(self, match: str = "*"):
+        await self._round_trip()
+        for key in [k for k in self.data if fnmatch.fnmatchcase(k, match)]:
+            yield key
+
+    async def close(self) -> None:
+        pass
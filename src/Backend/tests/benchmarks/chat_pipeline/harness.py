@@ -0,0 +1,285 @@
+"""
+Chat Pipeline Benchmark Harness
+Wires a real SmartAIEngineV5 and its AgentPoolManager to the stand-ins in
+fakes.py and replays recorded conversations through process_message.
+
+Per turn it records the planner's stage timings (intent, rag,
+product_search, query_database, signup, generate), the context persistence
+stage, time to first token when streaming, and the whole turn.
+"""
+
+import asyncio
+import json
+import os
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .fakes import (
+    FakeIntentDetector,
+    FakeProductSearchTool,
+    FakeProvider,
+    FakeRAGTool,
+    FakeToolManager,
+    InMemoryContextStore,
+    InMemoryRedis
+)
+
+# Agent and prompt configs are loaded relative to the backend root
+BACKEND_ROOT = Path(__file__).resolve().parents[3]
+FIXTURE = BACKEND_ROOT / "tests" / "benchmarks" / "fixtures" / "chat_conversations.json"
+
+# The manager agent's declarative flow calls the HTTP API, which is not faked
+UNSUPPORTED_AGENTS = {"manager"}
+
+
+def load_conversations(path: Optional[Path] = None) -> Dict[str, Any]:
+    fixture = json.loads(Path(path or FIXTURE).read_text())
+    for conversation in fixture["conversations"]:
+        if conversation["agent"] in UNSUPPORTED_AGENTS:
+            raise ValueError(f"Agent '{conversation['agent']}' cannot be benchmarked offline ({conversation['id']})")
+    return fixture
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples: List[Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """Per-stage count, mean and p50/p95/p99 (ms) over turn samples"""
+    by_stage: Dict[str, List[float]] = {}
+    for sample in samples:
+        for stage, ms in sample.items():
+            by_stage.setdefault(stage, []).append(ms)
+
+    return {
+        stage: {
+            "count": len(values),
+            "mean": round(sum(values) / len(values), 3),
+            "p50": round(percentile(values, 50), 3),
+            "p95": round(percentile(values, 95), 3),
+            "p99": round(percentile(values, 99), 3)
+        }
+        for stage, values in sorted(by_stage.items())
+    }
+
+
+class PipelineHarness:
+    """
+    Real engine and agent pool, fake everything they talk to
+
+    Args:
+        fixture: Parsed chat_conversations.json
+        provider: LLM stand-in registered as the router's only provider
+        intent_ms: Intent detection latency
+        rag_ms: Knowledge search latency (None disables the RAG stage)
+        tool_ms: Product search / query_database latency
+        db_ms: Context store round trip (Postgres stand-in)
+        redis_ms: Response cache round trip (None disables the cache)
+        stream: Stream generation through on_token and record TTFT
+    """
+
+    def __init__(
+        self,
+        fixture: Dict[str, Any],
+        provider: FakeProvider,
+        intent_ms: float = 0.0,
+        rag_ms: Optional[float] = None,
+        tool_ms: float = 0.0,
+        db_ms: float = 0.0,
+        redis_ms: Optional[float] = None,
+        stream: bool = False
+    ):
+        self.fixture = fixture
+        self.provider = provider
+        self.intent_ms = intent_ms
+        self.rag_ms = rag_ms
+        self.tool_ms = tool_ms
+        self.db_ms = db_ms
+        self.redis_ms = redis_ms
+        self.stream = stream
+
+        self.engine = None
+        self.pool = None
+        self.context_manager = None
+        self.redis: Optional[InMemoryRedis] = None
+        self._run = 0
+
+    def setup(self) -> None:
+        """Build the engine in cloud mode and swap its dependencies for fakes"""
+        os.chdir(BACKEND_ROOT)
+        os.environ["USE_CLOUD_INFERENCE"] = "true"
+        os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+
+        from services.context.simple_hybrid_manager import SimpleHybridContextManager
+        from services.llm_gateway import LLMRouter
+        from services.llm_gateway.response_cache import ResponseCache, ResponseCacheConfig
+        from services.smart_ai_engine_v5 import SmartAIEngineV5
+
+        engine = SmartAIEngineV5()
+        if engine.agent_pool is None:
+            raise RuntimeError("SmartAIEngineV5 started without an agent pool")
+
+        cache = None
+        if self.redis_ms is not None:
+            cache = ResponseCache(ResponseCacheConfig(redis_url="memory://benchmark"))
+            self.redis = cache._redis = InMemoryRedis(self.redis_ms)
+
+        router = LLMRouter(cache=cache, hedge_requests=False)
+        router.register_provider(self.provider)
+        engine.llm_router = router
+        engine.use_cloud_inference = True
+        # generate() refuses to run without a loaded model, even for cloud
+        if not engine.current_model:
+            engine.current_model = "benchmark"
+            engine.current_model_name = self.provider.config.model_name
+
+        intents = {
+            turn["message"]: turn["intent"]
+            for conversation in self.fixture["conversations"]
+            for turn in conversation["turns"]
+        }
+        pool = engine.agent_pool
+        for agent in pool.agents.values():
+            agent.intent_detector = FakeIntentDetector(intents, self.intent_ms)
+            agent.product_search_tool = FakeProductSearchTool(self.fixture.get("products", []), self.tool_ms)
+
+        pool.tool_manager = FakeToolManager(self.fixture.get("database", {}), self.tool_ms)
+        if self.rag_ms is not None:
+            pool.rag_data_dir = "benchmark"
+            pool.rag_tool = FakeRAGTool(self.fixture.get("knowledge", []), self.rag_ms)
+        else:
+            pool.rag_data_dir = None
+            pool.rag_tool = None
+
+        self.context_manager = SimpleHybridContextManager()
+        self.context_manager.db_store = InMemoryContextStore(self.db_ms)
+
+        self.engine = engine
+        self.pool = pool
+
+    async def run_turn(self, session_id: str, message: str) -> Dict[str, float]:
+        """One chat turn; returns stage durations in ms"""
+        start = time.perf_counter()
+        first_token: List[float] = []
+
+        kwargs = {}
+        if self.stream:
+            async def on_token(delta: str) -> None:
+                if not first_token:
+                    first_token.append(time.perf_counter())
+            kwargs["on_token"] = on_token
+
+        response = await self.pool.process_message(session_id, message, **kwargs)
+        if response.get("error"):
+            raise RuntimeError(f"Turn failed: {response['error']}")
+
+        persist_start = time.perf_counter()
+        await self.context_manager.add_message(session_id, "user", message)
+        await self.context_manager.add_message(session_id, "assistant", response.get("text", ""))
+        end = time.perf_counter()
+
+        sample = dict(response.get("stage_timings") or {})
+        sample["persist"] = (end - persist_start) * 1000
+        sample["turn"] = (end - start) * 1000
+        if first_token:
+            sample["ttft"] = (first_token[0] - start) * 1000
+        return sample
+
+    async def run_conversation(self, conversation: Dict[str, Any], session_id: str) -> List[Dict[str, float]]:
+        await self.pool.create_session(
+            session_id,
+            conversation["agent"],
+            personality_id=conversation.get("personality"),
+            metadata={"benchmark": True}
+        )
+        try:
+            return [await self.run_turn(session_id, turn["message"]) for turn in conversation["turns"]]
+        finally:
+            self.pool.sessions.pop(session_id, None)
+            await self.context_manager.clear_session(session_id)
+
+    def _session_id(self, index: int) -> str:
+        return f"bench-{self._run}-{index}"
+
+    async def run_sessions(self, sessions: int) -> Dict[str, Any]:
+        """N concurrent sessions, each replaying one recorded conversation"""
+        self._run += 1
+        conversations = self.fixture["conversations"]
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            self.run_conversation(conversations[i % len(conversations)], self._session_id(i))
+            for i in range(sessions)
+        ))
+        elapsed = time.perf_counter() - start
+
+        samples = [sample for conversation in results for sample in conversation]
+        return {
+            "sessions": sessions,
+            "turns": len(samples),
+            "seconds": round(elapsed, 4),
+            "turns_per_sec": round(len(samples) / elapsed, 2),
+            "stages": summarize(samples)
+        }
+
+    async def run_engine_generate(self) -> Dict[str, Dict[str, float]]:
+        """SmartAIEngineV5.generate alone on every fixture message"""
+        samples = []
+        for conversation in self.fixture["conversations"]:
+            for turn in conversation["turns"]:
+                start = time.perf_counter()
+                result = await self.engine.generate(
+                    prompt=turn["message"],
+                    prompt_type="direct",
+                    max_tokens=150,
+                    use_context=False
+                )
+                if result.get("error"):
+                    raise RuntimeError(f"generate failed: {result['error']}")
+                samples.append({"engine_generate": (time.perf_counter() - start) * 1000})
+        return summarize(samples)
+
+    async def measure_allocations(self) -> Dict[str, Any]:
+        """
+        Sequential pass over every conversation under tracemalloc
+
+        Returns:
+            Peak traced KiB per turn (p50/p95), plus KiB and allocated
+            blocks still live after the pass, per turn
+        """
+        self._run += 1
+        peaks: List[float] = []
+        turns = 0
+
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            for index, conversation in enumerate(self.fixture["conversations"]):
+                session_id = self._session_id(index)
+                await self.pool.create_session(session_id, conversation["agent"], personality_id=conversation.get("personality"))
+                for turn in conversation["turns"]:
+                    baseline = tracemalloc.get_traced_memory()[0]
+                    tracemalloc.reset_peak()
+                    await self.run_turn(session_id, turn["message"])
+                    peaks.append((tracemalloc.get_traced_memory()[1] - baseline) / 1024)
+                    turns += 1
+                self.pool.sessions.pop(session_id, None)
+                await self.context_manager.clear_session(session_id)
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+
+        diff = after.compare_to(before, "filename")
+        return {
+            "turns": turns,
+            "peak_kib_p50": round(percentile(peaks, 50), 1),
+            "peak_kib_p95": round(percentile(peaks, 95), 1),
+            "retained_kib_per_turn": round(sum(d.size_diff for d in diff) / 1024 / max(turns, 1), 2),
+            "retained_blocks_per_turn": round(sum(d.count_diff for d in diff) / max(turns, 1), 1)
+        }
@@ -0,0 +1 @@
+# Voice unit tests
\ No newline at end of file
@@ -0,0 +1,37 @@
+"""
+Unit tests for SentenceChunker boundary rules
+"""
+
+from core.voice.sentence_chunker import SentenceChunker
+
+
+def chunk(text: str, step: int = 3):
+    """Feed text in small deltas, as an LLM stream would"""
+    chunker = SentenceChunker()
+    chunks = []
+    for i in range(0, len(text), step):
+        chunks.extend(chunker.feed(text[i:i + step]))
+    tail = chunker.flush()
+    return chunks + ([tail] if tail else [])
+
+
+def test_sentence_ending_in_number_is_split():
+    assert chunk("We close at 9. Come by any time before then!") == [
+        "We close at 9.",
+        "Come by any time before then!"
+    ]
+
+
+def test_list_numbers_at_line_start_do_not_split():
+    assert chunk("Here are our picks:\n1. Blue Dream is a classic.\n2. OG Kush is strong.") == [
+        "Here are our picks:",
+        "1. Blue Dream is a classic.",
+        "2. OG Kush is strong."
+    ]
+
+
+def test_abbreviations_and_initials_do_not_split():
+    assert chunk("Ask Dr. Smith about it today. I. M. Pei designed the store.") == [
+        "Ask Dr. Smith about it today.",
+        "I. M. Pei designed the store."
+    ]